@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Benchmark der AI Provider (lokal vs. Hugging Face vs. OpenRouter)
+
+Schickt dieselben Prompts mit fester Parallelität an jeden Provider und
+misst Latenz (p50/p95/max), Durchsatz und Fehlerquote. Fehlermeldungen
+der Provider ("⚠️ Fehler ...") zählen als Fehler.
+
+Mit --fake laufen OpenRouter und Hugging Face gegen den lokalen Fake LLM
+Server (src/ai/fake_server.py) - ohne Internet und ohne Kontingent.
+
+Verwendung:
+    python scripts/benchmark_providers.py [--providers local,huggingface,openrouter]
+        [--requests 20] [--concurrency 4] [--max-tokens 64]
+        [--fake] [--fake-latency lognormal:0.4,0.5] [--fake-errors 0.05]
+"""
+
+import os
+import sys
+import time
+import asyncio
+import argparse
+from pathlib import Path
+
+# Projekt-Root zum Path hinzufügen
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from dotenv import load_dotenv
+
+from src.ai.ai_client import is_error_response
+from src.ai.factory import create_ai_provider
+from src.ai.fake_server import FakeLLMServer, FaultInjector, LatencyDistribution
+
+PROMPTS = [
+    "Was ist die Hauptstadt von Frankreich?",
+    "Erkläre kurz, was ein Kalender ist.",
+    "Gib mir einen Tipp für einen produktiven Morgen.",
+    "Wie spät ist es in Tokio, wenn es in Berlin 12 Uhr ist?",
+    "Schreibe einen Satz über Kaffee."
+]
+
+
+def percentile(values, q):
+    """Quantil einer sortierten Liste (nächster Rang)"""
+    if not values:
+        return None
+    index = min(len(values) - 1, max(0, int(round(q * len(values) + 0.5)) - 1))
+    return values[index]
+
+
+async def benchmark(provider, requests, concurrency, max_tokens):
+    """
+    Führt den Benchmark für einen Provider aus
+    
+    Returns:
+        Dict mit Latenzen, Fehlern und Gesamtdauer
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    errors = 0
+    
+    async def one(i):
+        nonlocal errors
+        async with semaphore:
+            start = time.perf_counter()
+            answer = await provider.generate_response(
+                PROMPTS[i % len(PROMPTS)], {'max_tokens': max_tokens, 'max_length': max_tokens}
+            )
+            elapsed = time.perf_counter() - start
+            if is_error_response(answer):
+                errors += 1
+            else:
+                latencies.append(elapsed)
+    
+    start = time.perf_counter()
+    await asyncio.gather(*[one(i) for i in range(requests)])
+    return {
+        'latencies': sorted(latencies),
+        'errors': errors,
+        'duration': time.perf_counter() - start
+    }
+
+
+def main():
+    """Hauptfunktion"""
+    parser = argparse.ArgumentParser(description="AI Provider Benchmark")
+    parser.add_argument('--providers', default='local,huggingface,openrouter',
+                        help="Komma-getrennte Provider-Specs (typ oder typ:modell)")
+    parser.add_argument('--requests', type=int, default=20, help="Anfragen pro Provider")
+    parser.add_argument('--concurrency', type=int, default=4, help="Parallele Anfragen")
+    parser.add_argument('--max-tokens', type=int, default=64, help="Max. Antwort-Länge")
+    parser.add_argument('--fake', action='store_true', help="Gegen den lokalen Fake LLM Server messen")
+    parser.add_argument('--fake-latency', default='lognormal:0.4,0.5', help="Latenz-Spec des Fake-Servers")
+    parser.add_argument('--fake-token-latency', default='fixed:0.02', help="Zeit pro Token des Fake-Servers")
+    parser.add_argument('--fake-errors', type=float, default=0.0, help="Anteil 429/503 Antworten (je zur Hälfte)")
+    args = parser.parse_args()
+    
+    load_dotenv()
+    
+    server = None
+    if args.fake:
+        server = FakeLLMServer(
+            latency=LatencyDistribution.parse(args.fake_latency),
+            token_latency=LatencyDistribution.parse(args.fake_token_latency),
+            faults=FaultInjector(rate_429=args.fake_errors / 2, rate_503=args.fake_errors / 2)
+        )
+        server.start_background()
+        os.environ['OPENROUTER_BASE_URL'] = server.openrouter_base_url
+        os.environ['HF_BASE_URL'] = server.hf_base_url
+        os.environ.setdefault('OPENROUTER_API_KEY', 'fake')
+        print(f"\n🧪 Fake LLM Server: {server.url} (Latenz {args.fake_latency})")
+    
+    print(f"\n🏎️  Provider Benchmark ({args.requests} Anfragen, Parallelität {args.concurrency})")
+    print("=" * 78)
+    print(f"{'Provider':<40} {'p50':>7} {'p95':>7} {'max':>7} {'req/s':>7} {'Fehler':>7}")
+    print("-" * 78)
+    
+    for spec in args.providers.split(','):
+        provider = create_ai_provider(spec)
+        if provider is None:
+            print(f"{spec:<40} {'nicht verfügbar':>38}")
+            continue
+        
+        result = asyncio.run(benchmark(provider, args.requests, args.concurrency, args.max_tokens))
+        latencies = result['latencies']
+        fmt = lambda v: f"{v:.2f}s" if v is not None else "-"
+        
+        print(
+            f"{provider.name[:40]:<40} {fmt(percentile(latencies, 0.5)):>7} "
+            f"{fmt(percentile(latencies, 0.95)):>7} {fmt(latencies[-1] if latencies else None):>7} "
+            f"{args.requests / result['duration']:>7.2f} {result['errors'] / args.requests:>7.0%}"
+        )
+        if hasattr(provider, 'load_seconds'):
+            print(f"{'':<40} (Ladezeit inkl. Warm-up: {provider.load_seconds:.1f}s)")
+    
+    print("=" * 78)
+    
+    if server is not None:
+        server.stop_background()
+
+
+if __name__ == "__main__":
+    main()
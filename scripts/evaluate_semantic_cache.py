@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Offline-Auswertung des Semantic Cache gegen geloggte Interaktionen
+
+Spielt die user_input/bot_output Paare aus data/interactions.db in
+zeitlicher Reihenfolge durch einen SemanticCache und misst pro Schwellwert:
+- Hit-Rate: Anteil der Fragen, die aus dem Cache beantwortet würden
+- False-Hit-Rate: Anteil der Treffer, deren gespeicherte Antwort nicht zur
+  tatsächlichen Antwort passt (andere Aktion oder geringe Ähnlichkeit)
+
+Alle Fragen teilen sich einen Bereich - das entspricht Nachrichten ohne
+Chat-Historie, dem Fall in dem der Bot den Cache tatsächlich nutzt.
+
+Verwendung:
+    python scripts/evaluate_semantic_cache.py [--db data/interactions.db]
+        [--thresholds 0.75,0.8,0.85,0.9,0.95] [--answer-threshold 0.6] [--show 5]
+"""
+
+import os
+import sys
+import argparse
+from pathlib import Path
+
+# Projekt-Root zum Path hinzufügen
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.ai.response_cache import normalize_prompt
+from src.ai.semantic_cache import SemanticCache, HashedNgramEmbedder
+from src.storage.interaction_logger import InteractionLogger
+
+
+def evaluate(rows, threshold, answer_threshold, max_entries, embedder):
+    """
+    Spielt alle Interaktionen durch einen Cache mit gegebenem Schwellwert
+    
+    Returns:
+        Dict mit Zählern und Beispielen für falsche Treffer
+    """
+    cache = SemanticCache(threshold=threshold, max_entries=max_entries,
+                          ttl_seconds=10 ** 9, embedder=embedder)
+    actions = {}
+    hits = 0
+    false_hits = []
+    
+    for row in rows:
+        question = row['user_input']
+        hit = cache.lookup(question, 'eval')
+        
+        if hit is None:
+            cache.store(question, row['bot_output'], 'eval')
+            actions[question] = row['bot_action']
+            continue
+        
+        hits += 1
+        if normalize_prompt(hit['prompt']) == normalize_prompt(question):
+            continue
+        
+        same_action = actions.get(hit['prompt']) == row['bot_action']
+        answer_similarity = float(embedder.embed(hit['response']) @ embedder.embed(row['bot_output']))
+        
+        if not same_action or answer_similarity < answer_threshold:
+            false_hits.append({
+                'question': question,
+                'cached_question': hit['prompt'],
+                'similarity': hit['similarity'],
+                'answer_similarity': answer_similarity
+            })
+    
+    return {
+        'lookups': len(rows),
+        'hits': hits,
+        'false_hits': false_hits
+    }
+
+
+def main():
+    """Hauptfunktion"""
+    parser = argparse.ArgumentParser(description="Semantic Cache Auswertung")
+    parser.add_argument('--db', default='data/interactions.db', help="Pfad zur Interaktions-DB")
+    parser.add_argument('--thresholds', default='0.75,0.8,0.85,0.9,0.95',
+                        help="Komma-getrennte Ähnlichkeits-Schwellwerte")
+    parser.add_argument('--answer-threshold', type=float, default=0.6,
+                        help="Mindest-Ähnlichkeit der Antworten für einen korrekten Treffer")
+    parser.add_argument('--max-entries', type=int, default=2000, help="Cache-Kapazität")
+    parser.add_argument('--show', type=int, default=5, help="Beispiele für falsche Treffer")
+    args = parser.parse_args()
+    
+    if not os.path.exists(args.db):
+        print(f"❌ Datenbank nicht gefunden: {args.db}")
+        sys.exit(1)
+    
+    rows = InteractionLogger(db_path=args.db).get_all_interactions()
+    if not rows:
+        print("⚠️  Keine Interaktionen vorhanden")
+        return
+    
+    embedder = HashedNgramEmbedder()
+    thresholds = [float(t) for t in args.thresholds.split(',')]
+    
+    print(f"\n📊 Semantic Cache Auswertung ({len(rows)} Interaktionen)")
+    print("=" * 66)
+    print(f"{'Schwelle':>9} {'Treffer':>9} {'Hit-Rate':>10} {'Falsch':>8} {'False-Hit-Rate':>16}")
+    print("-" * 66)
+    
+    results = {}
+    for threshold in thresholds:
+        result = evaluate(rows, threshold, args.answer_threshold, args.max_entries, embedder)
+        results[threshold] = result
+        
+        hits = result['hits']
+        false = len(result['false_hits'])
+        print(
+            f"{threshold:>9.2f} {hits:>9} {hits / result['lookups']:>10.1%} "
+            f"{false:>8} {(false / hits if hits else 0.0):>16.1%}"
+        )
+    
+    print("=" * 66)
+    
+    if args.show:
+        threshold = min(thresholds)
+        examples = results[threshold]['false_hits'][:args.show]
+        if examples:
+            print(f"\n🔍 Falsche Treffer bei Schwelle {threshold:.2f}:")
+            for example in examples:
+                print(f"  '{example['question'][:50]}' ≈ '{example['cached_question'][:50]}' "
+                      f"(Frage {example['similarity']:.2f}, Antwort {example['answer_similarity']:.2f})")
+
+
+if __name__ == '__main__':
+    main()
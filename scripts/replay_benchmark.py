@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Replay Benchmark - Provider mit echten Nachrichten aus interactions.db messen
+
+Spielt die gespeicherten User-Nachrichten (ohne sensible und lokal
+beantwortete) mit fester Parallelität gegen jeden Provider ab - mit dem
+System-Prompt des Bots, damit Kalender-Aktionen wie im Betrieb entstehen.
+Berichtet Durchsatz, p50/p95/p99 Latenz, Fehlerquote und wie viele
+Aktionen sich parsen lassen (siehe src/ai/replay.py).
+
+Mit --fake laufen OpenRouter und Hugging Face gegen den lokalen Fake LLM
+Server (src/ai/fake_server.py) - ohne Internet und ohne Kontingent.
+
+Verwendung:
+    python scripts/replay_benchmark.py [--db data/interactions.db]
+        [--providers openrouter,local] [--limit 200] [--concurrency 4]
+        [--timeout 60] [--structured] [--profiles] [--no-system-prompt]
+        [--fake] [--fake-latency lognormal:0.4,0.5] [--fake-errors 0.05]
+        [--json ergebnisse.json]
+"""
+
+import os
+import sys
+import json
+import asyncio
+import argparse
+from pathlib import Path
+from types import SimpleNamespace
+
+# Projekt-Root zum Path hinzufügen
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from dotenv import load_dotenv
+
+from src.ai.factory import create_ai_provider
+from src.ai.fake_server import FakeLLMServer, FaultInjector, LatencyDistribution
+from src.ai.planner import plan_context
+from src.ai.replay import load_workload, replay
+from src.ai.request_profiles import RequestProfiles
+from src.storage.interaction_logger import InteractionLogger
+
+
+def bot_context(structured: bool):
+    """
+    Kontext wie im Bot: statischer System-Prompt + aktuelle Nachricht (ohne Historie)
+    
+    Returns:
+        Funktion Nachricht -> Kontext-Dict
+    """
+    from src.bot.telegram_bot import AdonisBot
+    
+    # Nur die Felder, die der Prompt-Aufbau liest (Kalender als verfügbar)
+    bot = SimpleNamespace(calendar_provider=True, structured_output=structured,
+                          _cached_prompt_prefix=None, summarizer=None, memory=None)
+    bot._prompt_prefix = lambda: AdonisBot._prompt_prefix(bot)
+    
+    def context(prompt):
+        system_prompt = AdonisBot._build_system_prompt(bot, prompt, [], None)
+        return plan_context(system_prompt) if structured else system_prompt
+    
+    return context
+
+
+async def run_replay(provider, prompts, **kwargs):
+    """Replay eines Providers, danach die HTTP-Session des Event-Loops schließen"""
+    try:
+        return await replay(provider, prompts, **kwargs)
+    finally:
+        transport = getattr(provider, 'transport', None)
+        if transport is not None:
+            await transport.close()
+
+
+def main():
+    """Hauptfunktion"""
+    parser = argparse.ArgumentParser(description="Replay Benchmark aus interactions.db")
+    parser.add_argument('--db', default='data/interactions.db', help="Pfad zur Interaktions-Datenbank")
+    parser.add_argument('--providers', default='openrouter',
+                        help="Komma-getrennte Provider-Specs (typ oder typ:modell)")
+    parser.add_argument('--limit', type=int, default=200, help="Neueste N Nachrichten (0 = alle)")
+    parser.add_argument('--concurrency', type=int, default=4, help="Parallele Anfragen")
+    parser.add_argument('--timeout', type=float, default=60.0, help="Max. Sekunden pro Anfrage")
+    parser.add_argument('--structured', action='store_true', help="Strukturierter Modus (Plan-Schema)")
+    parser.add_argument('--profiles', action='store_true',
+                        help="max_tokens/temperature pro Anfrage-Klasse (aus derselben Datenbank gelernt)")
+    parser.add_argument('--no-system-prompt', action='store_true', help="Nachrichten ohne Bot-Prompt senden")
+    parser.add_argument('--include-fast-path', action='store_true', help="Auch lokal beantwortete Nachrichten")
+    parser.add_argument('--fake', action='store_true', help="Gegen den lokalen Fake LLM Server messen")
+    parser.add_argument('--fake-latency', default='lognormal:0.4,0.5', help="Latenz-Spec des Fake-Servers")
+    parser.add_argument('--fake-token-latency', default='fixed:0.02', help="Zeit pro Token des Fake-Servers")
+    parser.add_argument('--fake-errors', type=float, default=0.0, help="Anteil 429/503 Antworten (je zur Hälfte)")
+    parser.add_argument('--json', help="Ergebnisse zusätzlich als JSON speichern")
+    args = parser.parse_args()
+    
+    load_dotenv()
+    
+    if not Path(args.db).exists():
+        print(f"❌ Datenbank nicht gefunden: {args.db}")
+        sys.exit(1)
+    interaction_logger = InteractionLogger(db_path=args.db)
+    prompts = load_workload(interaction_logger, limit=args.limit or None,
+                            include_fast_path=args.include_fast_path)
+    if not prompts:
+        print("❌ Keine Nachrichten zum Abspielen gefunden")
+        sys.exit(1)
+    
+    context = None if args.no_system_prompt else bot_context(args.structured)
+    if args.profiles:
+        profiles = RequestProfiles()
+        profiles.load(interaction_logger)
+        base = context
+        context = lambda prompt: profiles.apply(prompt, base(prompt) if base else None)
+    
+    server = None
+    if args.fake:
+        server = FakeLLMServer(
+            latency=LatencyDistribution.parse(args.fake_latency),
+            token_latency=LatencyDistribution.parse(args.fake_token_latency),
+            faults=FaultInjector(rate_429=args.fake_errors / 2, rate_503=args.fake_errors / 2)
+        )
+        server.start_background()
+        os.environ['OPENROUTER_BASE_URL'] = server.openrouter_base_url
+        os.environ['HF_BASE_URL'] = server.hf_base_url
+        os.environ.setdefault('OPENROUTER_API_KEY', 'fake')
+        print(f"\n🧪 Fake LLM Server: {server.url} (Latenz {args.fake_latency})")
+    
+    print(f"\n🔁 Replay Benchmark ({len(prompts)} Nachrichten aus {args.db}, Parallelität {args.concurrency})")
+    print("=" * 96)
+    print(f"{'Provider':<36} {'req/s':>7} {'p50':>7} {'p95':>7} {'p99':>7} {'Fehler':>7} "
+          f"{'Aktionen':>9} {'parsebar':>9}")
+    print("-" * 96)
+    
+    results = []
+    for spec in args.providers.split(','):
+        provider = create_ai_provider(spec)
+        if provider is None:
+            print(f"{spec:<36} {'nicht verfügbar':>59}")
+            continue
+        
+        result = asyncio.run(run_replay(provider, prompts, concurrency=args.concurrency, context=context,
+                                        timeout=args.timeout, structured=args.structured))
+        results.append(result)
+        fmt = lambda v: f"{v:.2f}s" if v is not None else "-"
+        
+        print(
+            f"{provider.name[:36]:<36} {result['throughput']:>7.2f} {fmt(result['p50']):>7} "
+            f"{fmt(result['p95']):>7} {fmt(result['p99']):>7} {result['error_rate']:>7.0%} "
+            f"{result['calendar_actions']:>9} "
+            f"{(format(result['parse_rate'], '.0%') if result['parse_rate'] is not None else '-'):>9}"
+        )
+        if result['truncated']:
+            print(f"{'':<36} Abgeschnittene Aktionen: {result['truncated']} (max_tokens zu knapp?)")
+        if result['error_kinds']:
+            print(f"{'':<36} Fehler: " + ', '.join(f"{kind} {count}×" for kind, count
+                                                   in sorted(result['error_kinds'].items())))
+    
+    print("=" * 96)
+    
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+        print(f"💾 Ergebnisse gespeichert: {args.json}")
+    
+    if server is not None:
+        server.stop_background()
+
+
+if __name__ == "__main__":
+    main()
@@ -2,8 +2,58 @@
 AI Client - Interface für verschiedene AI Provider
 """
 
+import time
+import asyncio
+import logging
 from abc import ABC, abstractmethod
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Tuple, Union, AsyncIterator, Awaitable, Callable
+
+from src.ai.latency import LatencyTracker
+from src.ai.router import ProviderRouter
+from src.ai.single_flight import SingleFlight, flight_key
+from src.ai.planner import REPLY, Plan, parse_plan, plan_context
+
+logger = logging.getLogger(__name__)
+
+# Antworten mit diesem Präfix sind Fehlermeldungen der Provider
+ERROR_PREFIX = '⚠️ Fehler'
+
+
+def is_error_response(response: Optional[str]) -> bool:
+    """
+    Prüft ob eine Provider-Antwort eine Fehlermeldung ist
+    
+    Die Provider fangen Fehler ab und liefern stattdessen einen Text mit
+    ERROR_PREFIX. Solche Antworten dürfen weder gecacht noch als Erfolg
+    gewertet werden.
+    
+    Args:
+        response: Antwort des Providers
+        
+    Returns:
+        True bei leerer Antwort oder Fehlermeldung
+    """
+    return not response or response.startswith(ERROR_PREFIX)
+
+
+def normalize_context(context: Optional[Union[str, Dict[str, Any]]]) -> Dict[str, Any]:
+    """
+    Vereinheitlicht den Kontext-Parameter der Provider
+    
+    Der Bot übergibt einen System-Prompt als String, Tests und Skripte ein
+    Dictionary mit Parametern (system_prompt, temperature, max_tokens, ...).
+    
+    Args:
+        context: System-Prompt String, Parameter-Dictionary oder None
+        
+    Returns:
+        Kontext als Dictionary (Kopie)
+    """
+    if context is None:
+        return {}
+    if isinstance(context, str):
+        return {'system_prompt': context}
+    return dict(context)
 
 
 class AIProvider(ABC):
@@ -11,20 +61,51 @@ class AIProvider(ABC):
     Abstrakte Basisklasse für AI Provider
     """
     
+    # True wenn stream_response echte Token-Streams liefert
+    supports_streaming = False
+    
+    # Geschätzte Kosten in USD pro 1000 Token (für das Routing)
+    cost_per_1k_tokens = 0.0
+    
+    @property
+    def name(self) -> str:
+        """Eindeutiger Name (Klasse:Modell) für Metriken und Logs"""
+        model = getattr(self, 'model', None)
+        return f"{self.__class__.__name__}:{model}" if model else self.__class__.__name__
+    
     @abstractmethod
-    async def generate_response(self, prompt: str, context: Optional[Dict[str, Any]] = None) -> str:
+    async def generate_response(self, prompt: str,
+                                context: Optional[Union[str, Dict[str, Any]]] = None) -> str:
         """
         Generiert eine Antwort basierend auf dem Prompt
         
         Args:
             prompt: User Input / Prompt
-            context: Optionaler Kontext für die Generierung
+            context: Optionaler Kontext (System-Prompt String oder Parameter-Dict)
             
         Returns:
             Generierte Antwort als String
         """
         pass
     
+    async def stream_response(self, prompt: str,
+                              context: Optional[Union[str, Dict[str, Any]]] = None
+                              ) -> AsyncIterator[str]:
+        """
+        Streamt eine Antwort in Text-Fragmenten
+        
+        Standard-Implementierung für Provider ohne Streaming:
+        liefert die komplette Antwort als ein einziges Fragment.
+        
+        Args:
+            prompt: User Input / Prompt
+            context: Optionaler Kontext (System-Prompt String oder Parameter-Dict)
+            
+        Yields:
+            Text-Fragmente der Antwort
+        """
+        yield await self.generate_response(prompt, context)
+    
     @abstractmethod
     async def analyze_intent(self, text: str) -> Dict[str, Any]:
         """
@@ -44,32 +125,384 @@ class AIClient:
     Hauptklasse zur Verwaltung verschiedener AI Provider
     """
     
-    def __init__(self, provider: AIProvider):
+    def __init__(self, provider: AIProvider, semantic_cache=None, intent_classifier=None,
+                 fallback_providers: Optional[List[AIProvider]] = None, hedging=None,
+                 router: Optional[ProviderRouter] = None,
+                 single_flight: Optional[SingleFlight] = None,
+                 cascade=None,
+                 profiles=None):
         """
         Initialisiert den AI Client mit einem Provider
         
         Args:
             provider: AI Provider Instanz
+            semantic_cache: Optionaler SemanticCache für ähnliche Fragen
+            intent_classifier: Optionaler LocalIntentClassifier (Fast-Path vor dem Provider)
+            fallback_providers: Weitere Provider für Hedging/Failover
+            hedging: Optionale HedgingPolicy (nur aktiv mit fallback_providers)
+            router: ProviderRouter für die Reihenfolge pro Anfrage (default: Standardwerte)
+            single_flight: Optionales SingleFlight für identische gleichzeitige Anfragen
+            cascade: Optionale CascadePolicy (kleines Modell zuerst für einfache Nachrichten)
+            profiles: Optionale RequestProfiles (max_tokens/temperature pro Anfrage-Klasse)
         """
         self.provider = provider
+        self.semantic_cache = semantic_cache
+        self.intent_classifier = intent_classifier
+        self.fallback_providers = list(fallback_providers or [])
+        self.hedging = hedging
+        self.router = router or ProviderRouter()
+        self.single_flight = single_flight
+        self.cascade = cascade
+        self.profiles = profiles
+        
+        # Latenz pro Provider: komplette Antwort, erstes Token beim Streaming, Intents
+        self.latency = LatencyTracker()
+        self.stream_latency = LatencyTracker()
+        self.intent_latency = LatencyTracker()
+        
+        # Welche Stufe hat Intents beantwortet (local = eingesparter LLM-Aufruf)
+        self.intent_stats = {'local': 0, 'remote': 0}
+        
+        # plan(): Antworten mit gültigem JSON bzw. Freitext
+        self.plan_stats = {'structured': 0, 'unstructured': 0, 'errors': 0}
+    
+    @property
+    def supports_streaming(self) -> bool:
+        """True wenn der Provider echte Token-Streams liefert"""
+        return self.provider.supports_streaming
+    
+    @property
+    def providers(self) -> List[AIProvider]:
+        """Alle Provider in konfigurierter Reihenfolge (der Router sortiert pro Anfrage)"""
+        return [self.provider] + self.fallback_providers
+    
+    @property
+    def hedging_enabled(self) -> bool:
+        """True wenn Anfragen auf mehrere Provider verteilt werden"""
+        return self.hedging is not None and bool(self.fallback_providers)
+    
+    def _semantic_scope(self, message: str, context: Dict[str, Any]) -> Optional[str]:
+        """Bereich im Semantic Cache oder None (kein Cache / Live-Daten)"""
+        if self.semantic_cache is None:
+            return None
+        model = getattr(self.provider, 'model', self.provider.__class__.__name__)
+        return self.semantic_cache.scope_for(message, context, model)
     
-    async def chat(self, message: str, context: Optional[Dict[str, Any]] = None) -> str:
+    def _semantic_lookup(self, message: str, scope: Optional[str]) -> Optional[str]:
+        """Gespeicherte Antwort auf eine ähnliche Frage"""
+        if scope is None:
+            return None
+        hit = self.semantic_cache.lookup(message, scope)
+        if hit is None:
+            return None
+        logger.info(
+            f"🧲 Semantic Cache Treffer ({hit['similarity']:.2f}): "
+            f"'{message[:40]}' ≈ '{hit['prompt'][:40]}'"
+        )
+        return hit['response']
+    
+    async def chat(self, message: str,
+                   context: Optional[Union[str, Dict[str, Any]]] = None) -> str:
         """
         Chat-Funktion für Benutzer-Interaktionen
         
         Args:
             message: Benutzer-Nachricht
-            context: Optionaler Kontext
+            context: Optionaler Kontext (System-Prompt String oder Parameter-Dict)
             
         Returns:
             AI-generierte Antwort
         """
-        # TODO: Implementierung folgt in Phase 2
-        return await self.provider.generate_response(message, context)
+        if self.profiles is not None:
+            context = self.profiles.apply(message, context)
+        normalized = normalize_context(context)
+        scope = self._semantic_scope(message, normalized)
+        cached = self._semantic_lookup(message, scope)
+        if cached is not None:
+            return cached
+        
+        async def generate() -> str:
+            response = await self._generate(message, context)
+            if scope is not None:
+                self.semantic_cache.store(message, response, scope)
+            return response
+        
+        return await self._coalesce('chat', message, normalized, generate)
+    
+    async def _coalesce(self, kind: str, prompt: str, context: Optional[Dict[str, Any]],
+                        call: Callable[[], Awaitable[Any]]) -> Any:
+        """Bündelt identische gleichzeitige Anfragen (wenn Single-Flight aktiv)"""
+        if self.single_flight is None:
+            return await call()
+        model = ','.join(provider.name for provider in self.providers)
+        return await self.single_flight.do(flight_key(kind, prompt, context, model), call)
+    
+    async def _generate(self, message: str,
+                        context: Optional[Union[str, Dict[str, Any]]]) -> str:
+        """Antwort über die geroutete Provider-Kette (einfache Nachrichten zuerst über die Kaskade)"""
+        if self.cascade is not None and self.cascade.is_simple(message, context):
+            response = await self._cascade(message, context, self.latency)
+            if response is not None:
+                return response
+        
+        return await self._dispatch(
+            'chat',
+            self.latency,
+            lambda provider: provider.generate_response(message, context),
+            is_success=lambda response: not is_error_response(response)
+        )
+    
+    async def _cascade(self, message: str,
+                       context: Optional[Union[str, Dict[str, Any]]],
+                       latency: LatencyTracker) -> Optional[str]:
+        """
+        Fragt das kleine Modell der Kaskade
+        
+        Args:
+            message: Benutzer-Nachricht
+            context: Kontext des Aufrufs
+            latency: Tracker der normalen Kette (Basis für die eingesparte Latenz)
+            
+        Returns:
+            Antwort des kleinen Modells oder None (eskalieren)
+        """
+        start = time.perf_counter()
+        try:
+            response = await self.cascade.provider.generate_response(
+                message, self.cascade.small_context(context)
+            )
+        except Exception as e:
+            logger.warning(f"⚠️ {self.cascade.provider.name} fehlgeschlagen: {e}")
+            response = None
+        elapsed = time.perf_counter() - start
+        
+        expected = [latency.quantile(provider.name, 0.5, self.cascade.min_samples)
+                    for provider in self.providers]
+        expected = [seconds for seconds in expected if seconds is not None]
+        reason = self.cascade.validate(message, response)
+        self.cascade.record(elapsed, min(expected) if expected else None, reason)
+        return response if reason is None else None
+    
+    async def _first_chunk(self, provider: AIProvider, message: str,
+                           context: Optional[Union[str, Dict[str, Any]]]
+                           ) -> Tuple[AsyncIterator[str], Optional[str]]:
+        """Startet einen Stream und wartet auf das erste Fragment"""
+        stream = provider.stream_response(message, context)
+        try:
+            return stream, await stream.__anext__()
+        except StopAsyncIteration:
+            return stream, None
+        except BaseException:
+            await stream.aclose()
+            raise
+    
+    async def _open_stream(self, message: str,
+                           context: Optional[Union[str, Dict[str, Any]]]
+                           ) -> Tuple[AsyncIterator[str], Optional[str]]:
+        """Stream des gerouteten Providers (gemessen am ersten Fragment)"""
+        async def close(result):
+            await result[0].aclose()
+        
+        return await self._dispatch(
+            'stream',
+            self.stream_latency,
+            lambda provider: self._first_chunk(provider, message, context),
+            is_success=lambda result: not is_error_response(result[1]),
+            on_discard=close
+        )
+    
+    async def _dispatch(self, request_class: str, latency: LatencyTracker,
+                        call: Callable[[AIProvider], Awaitable[Any]],
+                        is_success: Callable[[Any], bool],
+                        on_discard: Optional[Callable[[Any], Awaitable[None]]] = None) -> Any:
+        """
+        Führt eine Anfrage über die vom Router gewählte Provider-Kette aus
+        
+        Mit Hedging laufen langsame Provider parallel zum nächsten, sonst
+        wird die Kette bei Fehlern nacheinander abgearbeitet.
+        
+        Args:
+            request_class: 'chat', 'stream' oder 'intent'
+            latency: Tracker für diese Anfrage-Art
+            call: Coroutine-Fabrik, erhält den Provider
+            is_success: Prüft ein Ergebnis
+            on_discard: Aufräumen für nicht genutzte Ergebnisse
+            
+        Returns:
+            Ergebnis des ersten erfolgreichen Providers (sonst das letzte Ergebnis)
+        """
+        decision = self.router.rank(self.providers, request_class, latency)
+        attempts = 0
+        
+        async def attempt(provider: AIProvider) -> Any:
+            nonlocal attempts
+            attempts += 1
+            try:
+                result = await call(provider)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                self.router.record_outcome(provider.name, False)
+                raise
+            self.router.record_outcome(provider.name, is_success(result))
+            return result
+        
+        winner = None
+        try:
+            if self.hedging_enabled:
+                result, provider = await self.hedging.race(
+                    decision['providers'], attempt, latency, is_success, on_discard
+                )
+            else:
+                result, provider = await self._run_chain(
+                    decision['providers'], attempt, latency, is_success, on_discard
+                )
+            if is_success(result):
+                winner = provider
+            return result
+        finally:
+            self.router.finish(decision, winner, attempts)
+    
+    async def _run_chain(self, candidates: List[AIProvider],
+                         call: Callable[[AIProvider], Awaitable[Any]],
+                         latency: LatencyTracker,
+                         is_success: Callable[[Any], bool],
+                         on_discard: Optional[Callable[[Any], Awaitable[None]]]
+                         ) -> Tuple[Any, AIProvider]:
+        """Fallback-Kette: Provider nacheinander bis zum ersten Erfolg"""
+        failed: Optional[Tuple[Any, AIProvider]] = None
+        last_error: Optional[Exception] = None
+        
+        for provider in candidates:
+            start = time.perf_counter()
+            try:
+                result = await call(provider)
+            except Exception as e:
+                logger.warning(f"⚠️ {provider.name} fehlgeschlagen: {e}")
+                last_error = e
+                continue
+            
+            if is_success(result):
+                latency.record(provider.name, time.perf_counter() - start)
+                if failed is not None and on_discard is not None:
+                    await on_discard(failed[0])
+                return result, provider
+            
+            if failed is not None and on_discard is not None:
+                await on_discard(failed[0])
+            failed = (result, provider)
+        
+        if failed is not None:
+            return failed
+        raise last_error
+    
+    async def chat_stream(self, message: str,
+                          context: Optional[Union[str, Dict[str, Any]]] = None
+                          ) -> AsyncIterator[str]:
+        """
+        Chat mit Token-Streaming
+        
+        Args:
+            message: Benutzer-Nachricht
+            context: Optionaler Kontext
+            
+        Yields:
+            Text-Fragmente der Antwort
+        """
+        if self.profiles is not None:
+            context = self.profiles.apply(message, context)
+        scope = self._semantic_scope(message, normalize_context(context))
+        cached = self._semantic_lookup(message, scope)
+        if cached is not None:
+            yield cached
+            return
+        
+        parts = []
+        stream = self._coalesce_stream(message, normalize_context(context), context)
+        try:
+            async for chunk in stream:
+                parts.append(chunk)
+                yield chunk
+        finally:
+            await stream.aclose()
+        
+        if scope is not None and parts:
+            self.semantic_cache.store(message, ''.join(parts).strip(), scope)
+    
+    def _coalesce_stream(self, message: str, normalized: Dict[str, Any],
+                         context: Optional[Union[str, Dict[str, Any]]]) -> AsyncIterator[str]:
+        """Bündelt identische gleichzeitige Streams (wenn Single-Flight aktiv)"""
+        if self.single_flight is None:
+            return self._stream(message, context)
+        model = ','.join(provider.name for provider in self.providers)
+        return self.single_flight.stream(
+            flight_key('stream', message, normalized, model),
+            lambda: self._stream(message, context)
+        )
+    
+    async def _stream(self, message: str,
+                      context: Optional[Union[str, Dict[str, Any]]]) -> AsyncIterator[str]:
+        """Fragmente des gerouteten Providers (einfache Nachrichten zuerst über die Kaskade)"""
+        if self.cascade is not None and self.cascade.is_simple(message, context):
+            response = await self._cascade(message, context, self.stream_latency)
+            if response is not None:
+                yield response
+                return
+        
+        stream, first = await self._open_stream(message, context)
+        if first is None:
+            return
+        
+        try:
+            yield first
+            async for chunk in stream:
+                yield chunk
+        finally:
+            await stream.aclose()
+    
+    def provider_status(self) -> List[Dict[str, Any]]:
+        """
+        Zustand aller Provider (Circuit Breaker, Latenz, Timeout)
+        
+        Returns:
+            Liste mit einem Dictionary pro Provider mit Guard
+        """
+        status = []
+        for provider in self.providers:
+            guard = getattr(provider, 'guard', None)
+            if guard is not None:
+                status.append(guard.get_status())
+        return status
+    
+    def classify_local(self, text: str) -> Optional[Dict[str, Any]]:
+        """
+        Lokale Intent-Erkennung ohne Provider-Aufruf
+        
+        Args:
+            text: Benutzer-Eingabe
+            
+        Returns:
+            Intent-Dictionary (mit 'tier': 'local') wenn der lokale Classifier
+            sicher genug ist, sonst None
+        """
+        if self.intent_classifier is None:
+            return None
+        
+        result = self.intent_classifier.classify(text)
+        if not self.intent_classifier.is_confident(result):
+            return None
+        
+        self.intent_stats['local'] += 1
+        result['tier'] = 'local'
+        logger.info(f"⚡ Intent lokal erkannt: {result['intent']} (Confidence: {result['confidence']})")
+        return result
     
     async def understand_command(self, text: str) -> Dict[str, Any]:
         """
-        Versteht und klassifiziert Befehle
+        Versteht und klassifiziert Befehle (gestuft)
+        
+        Eindeutige Eingaben beantwortet der lokale Classifier, nur unsichere
+        gehen an den Provider. 'tier' im Ergebnis zeigt, wer geantwortet hat.
         
         Args:
             text: Benutzer-Eingabe
@@ -77,5 +510,42 @@ class AIClient:
         Returns:
             Dictionary mit Befehlsinformationen
         """
-        # TODO: Implementierung folgt in Phase 2
-        return await self.provider.analyze_intent(text)
+        result = self.classify_local(text)
+        if result is not None:
+            return result
+        
+        result = await self._coalesce('intent', text, None, lambda: self._dispatch(
+            'intent',
+            self.intent_latency,
+            lambda provider: provider.analyze_intent(text),
+            is_success=lambda result: 'error' not in result
+        ))
+        result = dict(result)
+        self.intent_stats['remote'] += 1
+        result['tier'] = 'remote'
+        return result
+    
+    async def plan(self, message: str,
+                   context: Optional[Union[str, Dict[str, Any]]] = None) -> Plan:
+        """
+        Intent, Termin-Slots und Antworttext in EINEM Provider-Aufruf
+        
+        Ersetzt die Kombination aus understand_command() und chat(). Läuft
+        über chat() und nutzt damit Caches, Router und Single-Flight.
+        
+        Args:
+            message: Benutzer-Nachricht
+            context: Optionaler Kontext (System-Prompt String oder Parameter-Dict)
+            
+        Returns:
+            Plan mit intent, slots (date, time, title, location) und reply
+        """
+        response = await self.chat(message, plan_context(context))
+        if is_error_response(response):
+            self.plan_stats['errors'] += 1
+            return Plan(REPLY, reply=response, raw=response, structured=False)
+        
+        plan = parse_plan(response)
+        self.plan_stats['structured' if plan.structured else 'unstructured'] += 1
+        logger.info(f"🗺️  Plan: {plan}")
+        return plan
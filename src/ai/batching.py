@@ -0,0 +1,120 @@
+"""
+Micro-Batching - Sammelt Einzel-Anfragen zu Batch-Requests
+
+Anfragen mit gleichem Schlüssel (z.B. Modell + Parameter) werden höchstens
+`max_wait_ms` Millisekunden oder bis `max_batch_size` Einträge gesammelt
+und dann gemeinsam gesendet. Die Ergebnisse werden in Reihenfolge an die
+wartenden Futures verteilt. Das erhöht den Durchsatz unter Last und
+reduziert die Anzahl HTTP-Requests (Rate-Limits).
+"""
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class MicroBatcher:
+    """
+    Warteschlange pro Schlüssel mit zeit- und größenbasiertem Flush
+    """
+    
+    def __init__(self,
+                 send_batch: Callable[[str, List[Any]], Awaitable[List[Any]]],
+                 max_batch_size: int = 8,
+                 max_wait_ms: float = 20.0):
+        """
+        Args:
+            send_batch: Coroutine (schlüssel, einträge) -> Ergebnisse in gleicher Reihenfolge
+            max_batch_size: Max. Einträge pro Batch
+            max_wait_ms: Max. Wartezeit des ersten Eintrags in Millisekunden
+        """
+        self.send_batch = send_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        
+        self._pending: Dict[str, List[Tuple[Any, asyncio.Future]]] = {}
+        self._timers: Dict[str, asyncio.TimerHandle] = {}
+        self._tasks: Set[asyncio.Task] = set()
+        
+        self.stats = {'items': 0, 'batches': 0, 'failed_batches': 0, 'largest_batch': 0}
+    
+    async def submit(self, key: str, item: Any) -> Any:
+        """
+        Reiht einen Eintrag ein und wartet auf sein Ergebnis
+        
+        Args:
+            key: Nur Einträge mit gleichem Schlüssel landen im selben Batch
+            item: Eintrag (wird unverändert an send_batch übergeben)
+        
+        Returns:
+            Ergebnis für diesen Eintrag
+        
+        Raises:
+            Exception: Fehler des Batch-Requests
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        
+        batch = self._pending.get(key)
+        if batch is None:
+            batch = self._pending[key] = []
+            self._timers[key] = loop.call_later(self.max_wait, self._flush, key)
+        
+        batch.append((item, future))
+        self.stats['items'] += 1
+        
+        if len(batch) >= self.max_batch_size:
+            self._flush(key)
+        
+        return await future
+    
+    def _flush(self, key: str) -> None:
+        """Startet das Senden des gesammelten Batches"""
+        timer = self._timers.pop(key, None)
+        if timer is not None:
+            timer.cancel()
+        
+        batch = self._pending.pop(key, None)
+        if not batch:
+            return
+        
+        task = asyncio.ensure_future(self._send(key, batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+    
+    async def _send(self, key: str, batch: List[Tuple[Any, asyncio.Future]]) -> None:
+        """Sendet einen Batch und verteilt die Ergebnisse"""
+        self.stats['batches'] += 1
+        self.stats['largest_batch'] = max(self.stats['largest_batch'], len(batch))
+        if len(batch) > 1:
+            logger.debug(f"📦 Sende Batch mit {len(batch)} Einträgen")
+        
+        try:
+            results = await self.send_batch(key, [item for item, _ in batch])
+            if len(results) != len(batch):
+                raise ValueError(
+                    f"Batch-Antwort hat {len(results)} statt {len(batch)} Ergebnisse"
+                )
+        except Exception as e:
+            self.stats['failed_batches'] += 1
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+    
+    def get_statistics(self) -> Dict[str, Any]:
+        """
+        Zähler für Admin-Befehle
+        
+        Returns:
+            Dict mit items, batches, avg_batch_size, largest_batch, failed_batches
+        """
+        stats = dict(self.stats)
+        stats['avg_batch_size'] = stats['items'] / stats['batches'] if stats['batches'] else 0.0
+        return stats
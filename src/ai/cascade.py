@@ -0,0 +1,177 @@
+"""
+Model-Kaskade - Kleines Modell zuerst, großes nur bei Bedarf
+
+Kurze, einfache Nachrichten ("Hallo", "Danke", "Wie geht's?") gehen
+zuerst an ein schnelles, günstiges Modell (z.B. flan-t5-base oder ein
+lokales Modell). Dessen Antwort wird geprüft; lehnt die Heuristik sie ab
+(Fehler, leer, Echo, Unsicherheit, Wiederholungen, eigener Validator),
+eskaliert der AIClient an die normale Provider-Kette.
+
+Gezählt werden Eskalationsrate und eingesparte Latenz: erwartete Latenz
+der Kette (p50) minus Dauer der kleinen Antwort, abzüglich der Zeit, die
+eskalierte Versuche gekostet haben.
+"""
+
+import re
+import logging
+from typing import Any, Callable, Dict, Optional, Union
+
+from src.ai.ai_client import AIProvider, is_error_response, normalize_context
+from src.ai.intent_classifier import LocalIntentClassifier
+
+logger = logging.getLogger(__name__)
+
+# Intents, die das große Modell brauchen (Kalender-Aktionen im Antwort-Format)
+COMPLEX_INTENTS = ('calendar', 'reminder')
+
+# Floskeln, mit denen kleine Modelle Unsicherheit zeigen
+UNCERTAIN_PATTERN = re.compile(
+    r"\b(ich weiß (es )?nicht|weiß ich nicht|keine ahnung|kann ich nicht (sagen|beantworten)|"
+    r"i don'?t know|i'?m not sure|as an ai|als (ein )?ki[- ]?(sprach)?modell)\b",
+    re.IGNORECASE
+)
+
+_WORD_PATTERN = re.compile(r'\w+', re.UNICODE)
+
+
+class CascadePolicy:
+    """
+    Entscheidet, wann das kleine Modell antworten darf, und zählt Eskalationen
+    """
+    
+    def __init__(self,
+                 provider: AIProvider,
+                 max_words: int = 6,
+                 max_tokens: int = 60,
+                 min_chars: int = 2,
+                 max_repeat_ratio: float = 0.5,
+                 intent_classifier: Optional[LocalIntentClassifier] = None,
+                 validator: Optional[Callable[[str, str], Optional[str]]] = None,
+                 min_samples: int = 3):
+        """
+        Args:
+            provider: Schnelles/günstiges Modell für einfache Nachrichten
+            max_words: Nachrichten mit mehr Wörtern gehen direkt an die Kette
+            max_tokens: Antwort-Länge des kleinen Modells
+            min_chars: Kürzere Antworten werden abgelehnt
+            max_repeat_ratio: Max. Anteil wiederholter Wörter in der Antwort
+            intent_classifier: Erkennt Kalender-Nachrichten (default: LocalIntentClassifier)
+            validator: Eigene Prüfung (Nachricht, Antwort) -> Ablehnungsgrund oder None
+            min_samples: Mindestanzahl Messungen für die Latenz der Kette
+        """
+        self.provider = provider
+        self.max_words = max_words
+        self.max_tokens = max_tokens
+        self.min_chars = min_chars
+        self.max_repeat_ratio = max_repeat_ratio
+        self.intent_classifier = intent_classifier or LocalIntentClassifier()
+        self.validator = validator
+        self.min_samples = min_samples
+        
+        self.rejections: Dict[str, int] = {}
+        self.stats = {
+            'simple': 0,
+            'complex': 0,
+            'accepted': 0,
+            'escalated': 0,
+            'saved_seconds': 0.0,
+            'wasted_seconds': 0.0,
+            'unmeasured': 0
+        }
+    
+    def is_simple(self, message: str, context: Optional[Union[str, Dict[str, Any]]] = None) -> bool:
+        """
+        Prüft, ob das kleine Modell die Nachricht zuerst bekommt
+        
+        Args:
+            message: Benutzer-Nachricht
+            context: Kontext des Aufrufs (strukturierte Ausgabe -> nicht einfach)
+        
+        Returns:
+            True bei kurzer Nachricht ohne Kalender-Intent und ohne Schema
+        """
+        words = _WORD_PATTERN.findall(message)
+        simple = (
+            0 < len(words) <= self.max_words
+            and not normalize_context(context).get('response_format')
+            and self.intent_classifier.classify(message)['intent'] not in COMPLEX_INTENTS
+        )
+        self.stats['simple' if simple else 'complex'] += 1
+        return simple
+    
+    def small_context(self, context: Optional[Union[str, Dict[str, Any]]]) -> Dict[str, Any]:
+        """Kontext für das kleine Modell mit begrenzter Antwort-Länge"""
+        small = normalize_context(context)
+        small['max_tokens'] = self.max_tokens
+        small['max_length'] = self.max_tokens
+        return small
+    
+    def validate(self, message: str, response: Optional[str]) -> Optional[str]:
+        """
+        Konfidenz-Heuristik für die Antwort des kleinen Modells
+        
+        Args:
+            message: Benutzer-Nachricht
+            response: Antwort des kleinen Modells
+        
+        Returns:
+            Ablehnungsgrund ('error', 'too_short', 'echo', 'uncertain',
+            'repetitive' oder vom Validator) oder None wenn die Antwort passt
+        """
+        if is_error_response(response):
+            return 'error'
+        
+        text = response.strip()
+        if len(text) < self.min_chars:
+            return 'too_short'
+        if text.lower().strip('.!? ') == message.lower().strip('.!? '):
+            return 'echo'
+        if UNCERTAIN_PATTERN.search(text):
+            return 'uncertain'
+        
+        words = [word.lower() for word in _WORD_PATTERN.findall(text)]
+        if len(words) >= 6 and 1 - len(set(words)) / len(words) > self.max_repeat_ratio:
+            return 'repetitive'
+        
+        if self.validator is not None:
+            return self.validator(message, text)
+        return None
+    
+    def record(self, seconds: float, baseline: Optional[float], reason: Optional[str]) -> None:
+        """
+        Zählt einen Versuch des kleinen Modells
+        
+        Args:
+            seconds: Dauer des kleinen Modells
+            baseline: Erwartete Latenz der normalen Kette (None = noch nicht gemessen)
+            reason: Ablehnungsgrund oder None (Antwort übernommen)
+        """
+        if reason is None:
+            self.stats['accepted'] += 1
+            if baseline is None:
+                self.stats['unmeasured'] += 1
+            else:
+                self.stats['saved_seconds'] += baseline - seconds
+            logger.info(f"🪜 Kaskade: {self.provider.name} antwortet ({seconds:.2f}s)")
+        else:
+            self.stats['escalated'] += 1
+            self.stats['wasted_seconds'] += seconds
+            self.rejections[reason] = self.rejections.get(reason, 0) + 1
+            logger.info(f"🪜 Kaskade: eskaliert nach {seconds:.2f}s ({reason})")
+    
+    def get_statistics(self) -> Dict[str, Any]:
+        """
+        Zähler für Admin-Befehle
+        
+        Returns:
+            Dict mit simple, complex, accepted, escalated, escalation_rate,
+            saved_seconds (netto, abzüglich eskalierter Versuche), rejections
+        """
+        stats = dict(self.stats)
+        attempts = stats['accepted'] + stats['escalated']
+        stats['attempts'] = attempts
+        stats['escalation_rate'] = stats['escalated'] / attempts if attempts else 0.0
+        stats['saved_seconds'] = round(stats['saved_seconds'] - stats['wasted_seconds'], 3)
+        stats['wasted_seconds'] = round(stats['wasted_seconds'], 3)
+        stats['rejections'] = dict(self.rejections)
+        return stats
@@ -0,0 +1,356 @@
+"""
+Circuit Breaker - Schnelles Fehlschlagen bei gestörten AI Providern
+
+Jeder Provider bekommt einen eigenen Breaker mit rollierendem Zeitfenster:
+
+- closed:    Normalbetrieb, Ergebnisse werden im Fenster gezählt
+- open:      Fehlerquote zu hoch - Aufrufe schlagen sofort fehl
+- half_open: Nach der Sperrzeit darf ein Probe-Aufruf durch;
+             Erfolg schließt den Breaker, Fehler öffnet ihn erneut
+
+Zusätzlich leitet AdaptiveTimeout das Request-Timeout aus der gemessenen
+p99-Latenz ab, statt fest 30s zu warten. Timeouts gehen als zensierte
+Samples (Dauer >= Timeout) in die Messung ein, damit das Timeout nach
+einem Kaltstart wieder wächst statt den Provider auszusperren.
+"""
+
+import os
+import time
+import asyncio
+import logging
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, Tuple
+
+from src.ai.http_transport import HTTPStatusError, TransportError, TransportTimeout
+from src.ai.latency import LatencyHistogram
+
+logger = logging.getLogger(__name__)
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitOpenError(Exception):
+    """Aufruf abgelehnt, weil der Breaker offen ist"""
+    
+    def __init__(self, name: str, retry_in: float):
+        super().__init__(f"{name} vorübergehend deaktiviert (nächster Versuch in {retry_in:.0f}s)")
+        self.name = name
+        self.retry_in = retry_in
+
+
+def is_provider_failure(error: BaseException) -> bool:
+    """
+    Prüft ob ein Fehler auf einen gestörten Provider hinweist
+    
+    Timeouts, Verbindungsfehler, 5xx und 429 zählen; andere 4xx (z.B.
+    falscher API Key) sind Konfigurationsfehler und öffnen den Breaker nicht.
+    
+    Args:
+        error: Exception aus dem Transport
+    
+    Returns:
+        True wenn der Fehler für den Breaker zählt
+    """
+    if isinstance(error, HTTPStatusError):
+        return error.status >= 500 or error.status == 429
+    return isinstance(error, TransportError)
+
+
+class CircuitBreaker:
+    """
+    Breaker mit Fehlerquote über ein rollierendes Zeitfenster
+    """
+    
+    def __init__(self, name: str,
+                 window_seconds: float = 60.0,
+                 min_calls: int = 5,
+                 failure_rate: float = 0.5,
+                 open_seconds: float = 30.0):
+        """
+        Args:
+            name: Provider-Name (für Logs)
+            window_seconds: Länge des Zeitfensters
+            min_calls: Mindestanzahl Aufrufe im Fenster vor einer Entscheidung
+            failure_rate: Fehlerquote (0-1), ab der geöffnet wird
+            open_seconds: Sperrzeit bevor ein Probe-Aufruf erlaubt ist
+        """
+        self.name = name
+        self.window_seconds = window_seconds
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.open_seconds = open_seconds
+        
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._window: Deque[Tuple[float, bool]] = deque()
+        
+        self.stats = {'rejected': 0, 'opened': 0}
+    
+    @property
+    def state(self) -> str:
+        """Aktueller Zustand (open geht nach der Sperrzeit in half_open über)"""
+        if self._state == OPEN and time.monotonic() - self._opened_at >= self.open_seconds:
+            self._state = HALF_OPEN
+            self._trial_in_flight = False
+            logger.info(f"🟡 Circuit {self.name}: half-open (Probe-Aufruf erlaubt)")
+        return self._state
+    
+    def retry_in(self) -> float:
+        """Sekunden bis zum nächsten Probe-Aufruf (0 wenn nicht offen)"""
+        if self.state != OPEN:
+            return 0.0
+        return max(0.0, self.open_seconds - (time.monotonic() - self._opened_at))
+    
+    def check(self) -> None:
+        """
+        Prüft ob ein Aufruf erlaubt ist
+        
+        Raises:
+            CircuitOpenError: Wenn der Breaker offen ist oder bereits ein
+                              Probe-Aufruf läuft
+        """
+        state = self.state
+        if state == CLOSED:
+            return
+        if state == HALF_OPEN and not self._trial_in_flight:
+            self._trial_in_flight = True
+            return
+        
+        self.stats['rejected'] += 1
+        raise CircuitOpenError(self.name, self.retry_in() or self.open_seconds)
+    
+    def record_success(self) -> None:
+        """Erfolgreicher Aufruf"""
+        if self._state == HALF_OPEN:
+            logger.info(f"🟢 Circuit {self.name}: closed")
+            self._state = CLOSED
+            self._window.clear()
+        self._trial_in_flight = False
+        self._add(True)
+    
+    def record_failure(self) -> None:
+        """Fehlgeschlagener Aufruf"""
+        self._trial_in_flight = False
+        if self._state == HALF_OPEN:
+            self._open()
+            return
+        
+        self._add(False)
+        total, failures = self._counts()
+        if self._state == CLOSED and total >= self.min_calls and failures / total >= self.failure_rate:
+            self._open()
+    
+    def release(self) -> None:
+        """Aufruf ohne Ergebnis beendet (z.B. abgebrochen) - Probe-Slot freigeben"""
+        self._trial_in_flight = False
+    
+    def error_rate(self) -> float:
+        """Fehlerquote im aktuellen Fenster"""
+        total, failures = self._counts()
+        return failures / total if total else 0.0
+    
+    def get_status(self) -> Dict[str, Any]:
+        """Zustand für Admin-Befehle"""
+        total, failures = self._counts()
+        return {
+            'name': self.name,
+            'state': self.state,
+            'calls': total,
+            'failures': failures,
+            'error_rate': failures / total if total else 0.0,
+            'retry_in': self.retry_in(),
+            'rejected': self.stats['rejected'],
+            'opened': self.stats['opened']
+        }
+    
+    def _open(self) -> None:
+        self._state = OPEN
+        self._opened_at = time.monotonic()
+        self.stats['opened'] += 1
+        logger.warning(
+            f"🔴 Circuit {self.name}: open für {self.open_seconds:.0f}s "
+            f"(Fehlerquote {self.error_rate():.0%})"
+        )
+    
+    def _add(self, success: bool) -> None:
+        self._window.append((time.monotonic(), success))
+        self._trim()
+    
+    def _trim(self) -> None:
+        cutoff = time.monotonic() - self.window_seconds
+        while self._window and self._window[0][0] < cutoff:
+            self._window.popleft()
+    
+    def _counts(self) -> Tuple[int, int]:
+        self._trim()
+        failures = sum(1 for _, success in self._window if not success)
+        return len(self._window), failures
+
+
+class AdaptiveTimeout:
+    """
+    Timeout aus der beobachteten Latenz: p99 * factor, begrenzt durch
+    min_timeout und das bisher feste Timeout des Aufrufs als Obergrenze
+    """
+    
+    def __init__(self, quantile: float = 0.99, factor: float = 2.0,
+                 min_timeout: float = 5.0, min_samples: int = 20):
+        """
+        Args:
+            quantile: Latenz-Quantil als Basis
+            factor: Sicherheitsfaktor auf das Quantil
+            min_timeout: Untergrenze in Sekunden
+            min_samples: Bis dahin gilt das feste Timeout
+        """
+        self.quantile = quantile
+        self.factor = factor
+        self.min_timeout = min_timeout
+        self.min_samples = min_samples
+        self.histogram = LatencyHistogram()
+    
+    def record(self, seconds: float) -> None:
+        """Speichert die Dauer eines erfolgreichen Aufrufs"""
+        self.histogram.record(seconds)
+    
+    def record_timeout(self, timeout: float) -> None:
+        """
+        Speichert einen abgelaufenen Aufruf als zensiertes Sample
+        
+        Die echte Dauer ist unbekannt, aber mindestens das Timeout. Das
+        Sample hebt das p99 auf das Timeout, das nächste Timeout liegt
+        damit beim factor-fachen - nach wiederholten Timeouts wächst es
+        bis zur Obergrenze statt den Provider dauerhaft auszusperren.
+        """
+        self.histogram.record(timeout)
+    
+    def timeout(self, ceiling: float) -> float:
+        """
+        Timeout für den nächsten Aufruf
+        
+        Args:
+            ceiling: Bisheriges festes Timeout (Obergrenze)
+        
+        Returns:
+            Timeout in Sekunden
+        """
+        if self.histogram.count < self.min_samples:
+            return ceiling
+        estimate = self.histogram.quantile(self.quantile) * self.factor
+        return min(ceiling, max(self.min_timeout, estimate))
+
+
+class ProviderGuard:
+    """
+    Breaker und adaptives Timeout eines Providers zusammen
+    """
+    
+    def __init__(self, name: str,
+                 breaker: Optional[CircuitBreaker] = None,
+                 timeouts: Optional[AdaptiveTimeout] = None,
+                 stream_timeouts: Optional[AdaptiveTimeout] = None):
+        """
+        Args:
+            name: Provider-Name
+            breaker: Eigener Breaker (default: Standardwerte)
+            timeouts: Eigenes AdaptiveTimeout (default: Standardwerte)
+            stream_timeouts: AdaptiveTimeout für Streams (default: wie timeouts)
+        """
+        self.name = name
+        self.breaker = breaker or CircuitBreaker(name)
+        self.timeouts = timeouts or AdaptiveTimeout()
+        self.stream_timeouts = stream_timeouts or AdaptiveTimeout(
+            quantile=self.timeouts.quantile,
+            factor=self.timeouts.factor,
+            min_timeout=self.timeouts.min_timeout,
+            min_samples=self.timeouts.min_samples
+        )
+    
+    @classmethod
+    def from_env(cls, name: str) -> 'ProviderGuard':
+        """
+        Erstellt einen Guard mit Einstellungen aus der Umgebung
+        
+        AI_BREAKER_WINDOW, AI_BREAKER_MIN_CALLS, AI_BREAKER_FAILURE_RATE,
+        AI_BREAKER_OPEN_SECONDS, AI_TIMEOUT_FACTOR, AI_TIMEOUT_MIN
+        """
+        breaker = CircuitBreaker(
+            name,
+            window_seconds=float(os.getenv('AI_BREAKER_WINDOW', '60')),
+            min_calls=int(os.getenv('AI_BREAKER_MIN_CALLS', '5')),
+            failure_rate=float(os.getenv('AI_BREAKER_FAILURE_RATE', '0.5')),
+            open_seconds=float(os.getenv('AI_BREAKER_OPEN_SECONDS', '30'))
+        )
+        timeouts = AdaptiveTimeout(
+            factor=float(os.getenv('AI_TIMEOUT_FACTOR', '2.0')),
+            min_timeout=float(os.getenv('AI_TIMEOUT_MIN', '5'))
+        )
+        return cls(name, breaker, timeouts)
+    
+    def effective_timeout(self, ceiling: float, stream: bool = False) -> float:
+        """
+        Timeout für den nächsten Aufruf (nach breaker.check())
+        
+        Der Probe-Aufruf im half_open-Zustand bekommt die volle Obergrenze:
+        ein langsamer, aber gesunder Provider soll die Probe bestehen können.
+        
+        Args:
+            ceiling: Festes Timeout des Aufrufs (Obergrenze)
+            stream: Timeout für einen Stream statt eines einfachen Requests
+        """
+        if self.breaker.state == HALF_OPEN:
+            return ceiling
+        timeouts = self.stream_timeouts if stream else self.timeouts
+        return timeouts.timeout(ceiling)
+    
+    async def call(self, request: Callable[[float], Awaitable[Any]], timeout: float) -> Any:
+        """
+        Führt einen Request geschützt aus
+        
+        Args:
+            request: Coroutine-Fabrik, erhält das zu verwendende Timeout
+            timeout: Festes Timeout des Aufrufs (Obergrenze)
+        
+        Returns:
+            Ergebnis des Requests
+        
+        Raises:
+            CircuitOpenError: Breaker offen
+            TransportError: Fehler des Requests (wird durchgereicht)
+        """
+        self.breaker.check()
+        effective = self.effective_timeout(timeout)
+        start = time.perf_counter()
+        
+        try:
+            result = await request(effective)
+        except asyncio.CancelledError:
+            self.breaker.release()
+            raise
+        except Exception as e:
+            if isinstance(e, TransportTimeout):
+                self.timeouts.record_timeout(effective)
+            if is_provider_failure(e):
+                self.breaker.record_failure()
+            else:
+                self.breaker.release()
+            raise
+        
+        self.timeouts.record(time.perf_counter() - start)
+        self.breaker.record_success()
+        return result
+    
+    def get_status(self, ceiling: float = 30.0) -> Dict[str, Any]:
+        """
+        Breaker-Zustand plus p99 und aktuelles Timeout
+        
+        Args:
+            ceiling: Festes Timeout, für das das adaptive Timeout berechnet wird
+        """
+        status = self.breaker.get_status()
+        status['p99'] = self.timeouts.histogram.quantile(0.99)
+        status['samples'] = self.timeouts.histogram.count
+        status['timeout'] = self.timeouts.timeout(ceiling)
+        return status
@@ -0,0 +1,99 @@
+"""
+AI Factory - Erstellt AI Provider und die Fallback-Kette für den Router
+"""
+
+import os
+import logging
+from typing import List, Optional
+
+from .ai_client import AIProvider
+from .hf_provider import HuggingFaceProvider
+from .openrouter_provider import OpenRouterProvider
+
+logger = logging.getLogger(__name__)
+
+
+def create_ai_provider(spec: str) -> Optional[AIProvider]:
+    """
+    Erstellt einen Provider aus einer Kurzbeschreibung
+    
+    Args:
+        spec: 'typ' oder 'typ:modell', z.B. 'openrouter:mistral',
+              'huggingface:flan-t5-base' (Modell-Schlüssel aus MODELS)
+              oder 'local:/pfad/modell.gguf' (default: LOCAL_MODEL_PATH)
+    
+    Returns:
+        AIProvider oder None wenn der Provider nicht nutzbar ist
+    """
+    provider_type, _, model = spec.strip().partition(':')
+    provider_type = provider_type.lower()
+    model = model or None
+    
+    if provider_type == 'openrouter':
+        if not os.getenv('OPENROUTER_API_KEY'):
+            logger.warning(f"⚠️ {spec} übersprungen - OPENROUTER_API_KEY fehlt")
+            return None
+        if model and model not in OpenRouterProvider.MODELS:
+            logger.warning(f"⚠️ Unbekanntes OpenRouter Modell: {model}")
+            return None
+        return OpenRouterProvider(model=model)
+    
+    if provider_type in ('huggingface', 'hf'):
+        if model and model not in HuggingFaceProvider.MODELS:
+            logger.warning(f"⚠️ Unbekanntes Hugging Face Modell: {model}")
+            return None
+        return HuggingFaceProvider(model=model)
+    
+    if provider_type == 'local':
+        try:
+            from .local_provider import LocalModelProvider
+            return LocalModelProvider(model_path=model)
+        except Exception as e:
+            logger.warning(f"⚠️ {spec} übersprungen - lokales Modell nicht verfügbar: {e}")
+            return None
+    
+    logger.warning(f"⚠️ Unbekannter AI Provider: {spec}")
+    return None
+
+
+def create_provider_chain(chain: Optional[str] = None) -> List[AIProvider]:
+    """
+    Erstellt alle Provider für den Router
+    
+    Ohne AI_ROUTER_CHAIN gilt: AI_PROVIDER zuerst, der jeweils andere
+    Provider als Fallback (OpenRouter nur mit API Key).
+    
+    Args:
+        chain: Komma-getrennte Specs (default: AI_ROUTER_CHAIN aus .env)
+    
+    Returns:
+        Liste von Providern in konfigurierter Reihenfolge (mind. einer)
+    """
+    if chain is None:
+        chain = os.getenv('AI_ROUTER_CHAIN', '')
+    
+    specs = [spec for spec in chain.split(',') if spec.strip()]
+    if not specs:
+        primary = os.getenv('AI_PROVIDER', 'huggingface').lower()
+        if primary == 'local':
+            specs = ['local', 'openrouter', 'huggingface']
+        elif primary == 'openrouter' and os.getenv('OPENROUTER_API_KEY'):
+            specs = ['openrouter', 'huggingface']
+        else:
+            specs = ['huggingface', 'openrouter']
+    
+    providers = []
+    seen = set()
+    for spec in specs:
+        provider = create_ai_provider(spec)
+        if provider is None or provider.name in seen:
+            continue
+        seen.add(provider.name)
+        providers.append(provider)
+    
+    if not providers:
+        logger.warning("⚠️ Keine gültige Provider-Kette - verwende Hugging Face")
+        providers.append(HuggingFaceProvider())
+    
+    logger.info(f"🧭 Provider-Kette: {' > '.join(p.name for p in providers)}")
+    return providers
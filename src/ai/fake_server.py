@@ -0,0 +1,482 @@
+"""
+Fake LLM Server - Lokaler Ersatz für OpenRouter und die HF Inference API
+
+Für Last- und Latenztests ohne echtes Kontingent. Der Server spricht:
+
+- OpenRouter: POST /api/v1/chat/completions (JSON und SSE-Streaming mit usage)
+- Hugging Face: POST /models/<modell> (einzelne Prompts und Batches)
+
+Latenz (bis zum ersten Byte) und Zeit pro Token folgen konfigurierbaren
+Verteilungen, Fehler (429, 503, Timeout) werden mit festen Raten
+eingestreut. Antworten sind ein Echo der User-Nachricht oder reihum aus
+einer Liste vorgegebener Texte.
+
+Die Provider zeigen über OPENROUTER_BASE_URL bzw. HF_BASE_URL auf den Server:
+
+    python -m src.ai.fake_server --port 8089 --latency lognormal:0.4,0.5
+    OPENROUTER_BASE_URL=http://127.0.0.1:8089/api/v1
+    HF_BASE_URL=http://127.0.0.1:8089
+"""
+
+import json
+import time
+import random
+import asyncio
+import logging
+import argparse
+import threading
+from typing import Any, Dict, List, Optional
+
+from aiohttp import web
+
+from src.ai.prompt_cache import TokenCounter
+
+logger = logging.getLogger(__name__)
+
+# Fehlerarten der Fehler-Injektion
+FAULT_429 = '429'
+FAULT_503 = '503'
+FAULT_TIMEOUT = 'timeout'
+
+
+class LatencyDistribution:
+    """
+    Latenz-Verteilung in Sekunden
+    
+    Specs:
+    - fixed:S
+    - uniform:MIN,MAX
+    - normal:MITTEL,STDABW (negative Werte werden 0)
+    - lognormal:MEDIAN,SIGMA (lange Ausläufer wie echte APIs)
+    """
+    
+    KINDS = ('fixed', 'uniform', 'normal', 'lognormal')
+    
+    def __init__(self, kind: str = 'fixed', a: float = 0.0, b: float = 0.0,
+                 rng: Optional[random.Random] = None):
+        """
+        Args:
+            kind: fixed, uniform, normal oder lognormal
+            a: Wert / Minimum / Mittelwert / Median
+            b: - / Maximum / Standardabweichung / Sigma
+            rng: Zufallsgenerator (für reproduzierbare Läufe)
+        """
+        if kind not in self.KINDS:
+            raise ValueError(f"Unbekannte Latenz-Verteilung: {kind}")
+        self.kind = kind
+        self.a = a
+        self.b = b
+        self.rng = rng or random.Random()
+    
+    @classmethod
+    def parse(cls, spec: str, rng: Optional[random.Random] = None) -> 'LatencyDistribution':
+        """
+        Liest eine Verteilung aus einem Spec-String (z.B. 'lognormal:0.4,0.5')
+        
+        Args:
+            spec: Spec (eine Zahl allein bedeutet fixed)
+            rng: Zufallsgenerator
+        """
+        kind, _, values = spec.strip().partition(':')
+        if not values:
+            kind, values = 'fixed', kind
+        numbers = [float(value) for value in values.split(',') if value.strip()]
+        if not numbers:
+            raise ValueError(f"Latenz-Spec ohne Werte: {spec}")
+        return cls(kind, numbers[0], numbers[1] if len(numbers) > 1 else 0.0, rng)
+    
+    def sample(self) -> float:
+        """Zieht eine Latenz in Sekunden"""
+        if self.kind == 'fixed':
+            return self.a
+        if self.kind == 'uniform':
+            return self.rng.uniform(self.a, self.b)
+        if self.kind == 'normal':
+            return max(0.0, self.rng.gauss(self.a, self.b))
+        return self.rng.lognormvariate(0.0, self.b) * self.a if self.a > 0 else 0.0
+    
+    def __repr__(self):
+        return f"LatencyDistribution('{self.kind}', {self.a}, {self.b})"
+
+
+class FaultInjector:
+    """
+    Streut Fehler mit festen Raten ein
+    """
+    
+    def __init__(self, rate_429: float = 0.0, rate_503: float = 0.0, rate_timeout: float = 0.0,
+                 rng: Optional[random.Random] = None):
+        """
+        Args:
+            rate_429: Anteil der Anfragen mit 429 Too Many Requests
+            rate_503: Anteil mit 503 (HF: Modell lädt, mit estimated_time)
+            rate_timeout: Anteil, die nie antworten (Client läuft ins Timeout)
+            rng: Zufallsgenerator
+        """
+        self.rates = [(FAULT_429, rate_429), (FAULT_503, rate_503), (FAULT_TIMEOUT, rate_timeout)]
+        self.rng = rng or random.Random()
+    
+    def pick(self) -> Optional[str]:
+        """
+        Fehler für die nächste Anfrage
+        
+        Returns:
+            '429', '503', 'timeout' oder None
+        """
+        roll = self.rng.random()
+        for fault, rate in self.rates:
+            if roll < rate:
+                return fault
+            roll -= rate
+        return None
+
+
+def _message_text(content: Any) -> str:
+    """Text einer Chat-Message (String oder Liste von Text-Teilen)"""
+    if isinstance(content, list):
+        return ''.join(part.get('text', '') for part in content if isinstance(part, dict))
+    return content or ''
+
+
+def _split_tokens(text: str) -> List[str]:
+    """Teilt einen Text in Stream-Fragmente (Wörter mit Leerzeichen)"""
+    tokens = []
+    for index, word in enumerate(text.split(' ')):
+        tokens.append(word if index == 0 else ' ' + word)
+    return [token for token in tokens if token]
+
+
+class FakeLLMServer:
+    """
+    Lokaler Server mit OpenRouter- und Hugging-Face-API
+    """
+    
+    def __init__(self,
+                 latency: Optional[LatencyDistribution] = None,
+                 token_latency: Optional[LatencyDistribution] = None,
+                 faults: Optional[FaultInjector] = None,
+                 responses: Optional[List[str]] = None,
+                 retry_after: float = 1.0,
+                 estimated_time: float = 2.0,
+                 hang_seconds: float = 300.0,
+                 seed: Optional[int] = None):
+        """
+        Args:
+            latency: Zeit bis zum ersten Byte (default: 0)
+            token_latency: Zeit pro generiertem Token (default: 0)
+            faults: Fehler-Injektion (default: keine Fehler)
+            responses: Vorgegebene Antworten reihum (default: Echo)
+            retry_after: Retry-After Header bei 429 (Sekunden)
+            estimated_time: estimated_time bei HF 503 (Sekunden)
+            hang_seconds: So lange hängt eine Timeout-Anfrage
+            seed: Seed für reproduzierbare Latenzen und Fehler
+        """
+        rng = random.Random(seed)
+        self.latency = latency or LatencyDistribution('fixed', 0.0)
+        self.token_latency = token_latency or LatencyDistribution('fixed', 0.0)
+        self.latency.rng = self.token_latency.rng = rng
+        self.faults = faults or FaultInjector()
+        self.faults.rng = rng
+        self.responses = list(responses or [])
+        self.retry_after = retry_after
+        self.estimated_time = estimated_time
+        self.hang_seconds = hang_seconds
+        self.counter = TokenCounter()
+        
+        self.url: Optional[str] = None
+        self._runner: Optional[web.AppRunner] = None
+        self._next_response = 0
+        self._thread: Optional[threading.Thread] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        
+        self.stats = {
+            'requests': 0,
+            'openrouter': 0,
+            'huggingface': 0,
+            'streams': 0,
+            'prompt_tokens': 0,
+            'completion_tokens': 0,
+            FAULT_429: 0,
+            FAULT_503: 0,
+            FAULT_TIMEOUT: 0
+        }
+    
+    @property
+    def openrouter_base_url(self) -> str:
+        """Wert für OPENROUTER_BASE_URL"""
+        return f"{self.url}/api/v1"
+    
+    @property
+    def hf_base_url(self) -> str:
+        """Wert für HF_BASE_URL"""
+        return self.url
+    
+    def _app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_post('/api/v1/chat/completions', self._chat_completions)
+        app.router.add_post('/models/{model:.+}', self._hf_inference)
+        app.router.add_get('/health', self._health)
+        return app
+    
+    async def start(self, host: str = '127.0.0.1', port: int = 0) -> str:
+        """
+        Startet den Server im laufenden Event-Loop
+        
+        Args:
+            host: Bind-Adresse
+            port: Port (0 = freier Port)
+        
+        Returns:
+            Basis-URL (z.B. http://127.0.0.1:8089)
+        """
+        self._runner = web.AppRunner(self._app(), access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.url = f"http://{host}:{port}"
+        logger.info(f"🧪 Fake LLM Server läuft auf {self.url}")
+        return self.url
+    
+    async def stop(self) -> None:
+        """Stoppt den Server"""
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+    
+    def start_background(self, host: str = '127.0.0.1', port: int = 0) -> str:
+        """
+        Startet den Server in einem eigenen Thread mit eigenem Event-Loop
+        
+        So misst ein Benchmark die Client-Seite, ohne den Server im selben
+        Loop mitzurechnen.
+        
+        Returns:
+            Basis-URL
+        """
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name='fake-llm-server', daemon=True)
+        self._thread.start()
+        return asyncio.run_coroutine_threadsafe(self.start(host, port), self._loop).result()
+    
+    def stop_background(self) -> None:
+        """Stoppt einen mit start_background gestarteten Server"""
+        if self._loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(self.stop(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
+        self._loop.close()
+        self._loop = None
+        self._thread = None
+    
+    def _answer(self, prompt: str) -> str:
+        """Vorgegebene Antwort reihum oder Echo der letzten Prompt-Zeile"""
+        if self.responses:
+            answer = self.responses[self._next_response % len(self.responses)]
+            self._next_response += 1
+            return answer
+        lines = [line for line in prompt.strip().splitlines() if line.strip()]
+        return f"Echo: {lines[-1].strip() if lines else ''}"
+    
+    @staticmethod
+    def _structured(answer: str, response_format: Optional[Dict[str, Any]]) -> str:
+        """Packt ein Echo in das angeforderte JSON-Format"""
+        if not response_format or answer.lstrip().startswith('{'):
+            return answer
+        schema = (response_format.get('json_schema') or {}).get('schema') or {}
+        fields: Dict[str, Any] = {name: None for name in schema.get('properties', {})}
+        if 'action' in fields:
+            fields['action'] = 'reply'
+        fields['reply'] = answer
+        return json.dumps(fields, ensure_ascii=False)
+    
+    def _limit(self, answer: str, max_tokens: Optional[int]) -> str:
+        """Kürzt die Antwort auf max_tokens (wortweise)"""
+        if not max_tokens:
+            return answer
+        tokens = _split_tokens(answer)
+        while len(tokens) > 1 and self.counter.count(''.join(tokens)) > max_tokens:
+            tokens.pop()
+        return ''.join(tokens)
+    
+    async def _inject_fault(self, api: str) -> Optional[web.Response]:
+        """Fehler-Antwort (oder hängen) für diese Anfrage"""
+        fault = self.faults.pick()
+        if fault is None:
+            return None
+        self.stats[fault] += 1
+        
+        if fault == FAULT_TIMEOUT:
+            await asyncio.sleep(self.hang_seconds)
+            return web.json_response({'error': 'Gateway Timeout'}, status=504)
+        
+        if fault == FAULT_429:
+            body = ({'error': {'code': 429, 'message': 'Rate limit exceeded'}}
+                    if api == 'openrouter' else {'error': 'Rate limit reached'})
+            return web.json_response(body, status=429, headers={'Retry-After': f"{self.retry_after:g}"})
+        
+        if api == 'huggingface':
+            return web.json_response({'error': 'Model is currently loading',
+                                      'estimated_time': self.estimated_time}, status=503)
+        return web.json_response({'error': {'code': 503, 'message': 'Provider unavailable'}}, status=503)
+    
+    async def _health(self, request: web.Request) -> web.Response:
+        return web.json_response({'status': 'ok', 'stats': self.stats})
+    
+    async def _chat_completions(self, request: web.Request) -> web.StreamResponse:
+        """OpenRouter / OpenAI Chat Completions"""
+        data = await request.json()
+        self.stats['requests'] += 1
+        self.stats['openrouter'] += 1
+        
+        fault = await self._inject_fault('openrouter')
+        if fault is not None:
+            return fault
+        
+        messages = data.get('messages') or []
+        prompt = '\n'.join(_message_text(msg.get('content')) for msg in messages)
+        user_text = next((_message_text(msg.get('content')) for msg in reversed(messages)
+                          if msg.get('role') == 'user'), '')
+        answer = self._structured(self._answer(user_text), data.get('response_format'))
+        answer = self._limit(answer, data.get('max_tokens'))
+        model = data.get('model', 'fake')
+        
+        prompt_tokens = self.counter.count(prompt)
+        tokens = _split_tokens(answer)
+        usage = {
+            'prompt_tokens': prompt_tokens,
+            'completion_tokens': self.counter.count(answer),
+            'total_tokens': prompt_tokens + self.counter.count(answer),
+            'prompt_tokens_details': {'cached_tokens': 0}
+        }
+        self.stats['prompt_tokens'] += usage['prompt_tokens']
+        self.stats['completion_tokens'] += usage['completion_tokens']
+        completion_id = f"fake-{self.stats['requests']}"
+        
+        await asyncio.sleep(self.latency.sample())
+        
+        if not data.get('stream'):
+            for _ in tokens:
+                await asyncio.sleep(self.token_latency.sample())
+            return web.json_response({
+                'id': completion_id,
+                'object': 'chat.completion',
+                'created': int(time.time()),
+                'model': model,
+                'choices': [{'index': 0, 'message': {'role': 'assistant', 'content': answer},
+                             'finish_reason': 'stop'}],
+                'usage': usage
+            })
+        
+        self.stats['streams'] += 1
+        response = web.StreamResponse(headers={'Content-Type': 'text/event-stream',
+                                               'Cache-Control': 'no-cache'})
+        await response.prepare(request)
+        
+        def event(payload: Dict[str, Any]) -> bytes:
+            return f"data: {json.dumps(payload, ensure_ascii=False)}\n\n".encode('utf-8')
+        
+        for index, token in enumerate(tokens):
+            if index:
+                await asyncio.sleep(self.token_latency.sample())
+            await response.write(event({
+                'id': completion_id,
+                'object': 'chat.completion.chunk',
+                'model': model,
+                'choices': [{'index': 0, 'delta': {'content': token}, 'finish_reason': None}]
+            }))
+        
+        include_usage = (data.get('usage') or {}).get('include') or \
+            (data.get('stream_options') or {}).get('include_usage')
+        final = {'id': completion_id, 'object': 'chat.completion.chunk', 'model': model,
+                 'choices': [{'index': 0, 'delta': {}, 'finish_reason': 'stop'}]}
+        if include_usage:
+            final['usage'] = usage
+        await response.write(event(final))
+        await response.write(b"data: [DONE]\n\n")
+        await response.write_eof()
+        return response
+    
+    async def _hf_inference(self, request: web.Request) -> web.Response:
+        """Hugging Face Inference API (inputs als String oder Batch-Liste)"""
+        data = await request.json()
+        self.stats['requests'] += 1
+        self.stats['huggingface'] += 1
+        
+        fault = await self._inject_fault('huggingface')
+        if fault is not None:
+            return fault
+        
+        inputs = data.get('inputs', '')
+        parameters = data.get('parameters') or {}
+        max_tokens = parameters.get('max_new_tokens') or parameters.get('max_length')
+        prompts = inputs if isinstance(inputs, list) else [inputs]
+        
+        answers = [self._limit(self._answer(prompt), max_tokens) for prompt in prompts]
+        self.stats['prompt_tokens'] += sum(self.counter.count(prompt) for prompt in prompts)
+        self.stats['completion_tokens'] += sum(self.counter.count(answer) for answer in answers)
+        
+        # Ein Batch rechnet parallel: Dauer der längsten Antwort
+        await asyncio.sleep(self.latency.sample())
+        for _ in range(max(len(_split_tokens(answer)) for answer in answers)):
+            await asyncio.sleep(self.token_latency.sample())
+        
+        if isinstance(inputs, list):
+            return web.json_response([[{'generated_text': answer}] for answer in answers])
+        return web.json_response([{'generated_text': answers[0]}])
+
+
+def _load_responses(path: Optional[str]) -> Optional[List[str]]:
+    """Antworten aus einer Datei (JSON-Liste oder eine Antwort pro Zeile)"""
+    if not path:
+        return None
+    with open(path, encoding='utf-8') as f:
+        content = f.read()
+    if content.lstrip().startswith('['):
+        return [str(answer) for answer in json.loads(content)]
+    return [line for line in content.splitlines() if line.strip()]
+
+
+def main():
+    """Startet den Server auf der Kommandozeile"""
+    parser = argparse.ArgumentParser(description="Fake LLM Server (OpenRouter + Hugging Face API)")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8089)
+    parser.add_argument('--latency', default='lognormal:0.4,0.5',
+                        help="Zeit bis zum ersten Byte (fixed:S, uniform:A,B, normal:M,S, lognormal:MEDIAN,SIGMA)")
+    parser.add_argument('--token-latency', default='fixed:0.02', help="Zeit pro Token (gleiche Specs)")
+    parser.add_argument('--error-429', type=float, default=0.0, help="Anteil 429 Antworten")
+    parser.add_argument('--error-503', type=float, default=0.0, help="Anteil 503 Antworten")
+    parser.add_argument('--timeouts', type=float, default=0.0, help="Anteil hängender Anfragen")
+    parser.add_argument('--responses', help="Datei mit Antworten (JSON-Liste oder eine pro Zeile), sonst Echo")
+    parser.add_argument('--seed', type=int, help="Seed für reproduzierbare Läufe")
+    args = parser.parse_args()
+    
+    logging.basicConfig(format='%(asctime)s - %(name)s - %(levelname)s - %(message)s', level=logging.INFO)
+    
+    server = FakeLLMServer(
+        latency=LatencyDistribution.parse(args.latency),
+        token_latency=LatencyDistribution.parse(args.token_latency),
+        faults=FaultInjector(args.error_429, args.error_503, args.timeouts),
+        responses=_load_responses(args.responses),
+        seed=args.seed
+    )
+    
+    async def serve():
+        await server.start(args.host, args.port)
+        print(f"OPENROUTER_BASE_URL={server.openrouter_base_url}")
+        print(f"HF_BASE_URL={server.hf_base_url}")
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await server.stop()
+    
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
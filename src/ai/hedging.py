@@ -0,0 +1,184 @@
+"""
+Hedging - Gestaffelte Anfragen an mehrere AI Provider
+
+Der primäre Provider wird sofort gefragt. Antwortet er nicht innerhalb
+seines üblichen Latenz-Quantils (z.B. p90 aus dem LatencyTracker), wird
+der nächste Provider parallel gestartet ("Hedge"). Die erste erfolgreiche
+Antwort gewinnt, alle anderen Anfragen werden abgebrochen. Schlägt ein
+Provider fehl, wird sofort der nächste gestartet (Failover).
+"""
+
+import time
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Optional, Sequence, Tuple
+
+from src.ai.latency import LatencyTracker
+
+logger = logging.getLogger(__name__)
+
+
+class HedgingPolicy:
+    """
+    Steuert Hedge-Verzögerung und Ablauf eines Rennens zwischen Providern
+    """
+    
+    def __init__(self,
+                 quantile: float = 0.9,
+                 min_delay: float = 0.25,
+                 max_delay: float = 10.0,
+                 default_delay: float = 2.0,
+                 min_samples: int = 5):
+        """
+        Args:
+            quantile: Latenz-Quantil des laufenden Providers, nach dem gehedged wird
+            min_delay: Untergrenze der Hedge-Verzögerung in Sekunden
+            max_delay: Obergrenze der Hedge-Verzögerung in Sekunden
+            default_delay: Verzögerung solange zu wenige Messungen vorliegen
+            min_samples: Mindestanzahl Messungen für das Quantil
+        """
+        self.quantile = quantile
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.default_delay = default_delay
+        self.min_samples = min_samples
+        
+        self.stats = {'races': 0, 'hedges': 0, 'hedge_wins': 0, 'failovers': 0, 'censored': 0}
+    
+    def hedge_delay(self, latency: LatencyTracker, name: str) -> float:
+        """
+        Wartezeit bevor ein weiterer Provider gestartet wird
+        
+        Args:
+            latency: Gemessene Latenzen
+            name: Name des zuletzt gestarteten Providers
+        
+        Returns:
+            Verzögerung in Sekunden
+        """
+        estimate = latency.quantile(name, self.quantile, self.min_samples)
+        if estimate is None:
+            return self.default_delay
+        return min(self.max_delay, max(self.min_delay, estimate))
+    
+    async def race(self,
+                   candidates: Sequence[Any],
+                   call: Callable[[Any], Awaitable[Any]],
+                   latency: LatencyTracker,
+                   is_success: Callable[[Any], bool] = lambda result: True,
+                   on_discard: Optional[Callable[[Any], Awaitable[None]]] = None
+                   ) -> Tuple[Any, Any]:
+        """
+        Führt `call` gestaffelt für die Kandidaten aus
+        
+        Args:
+            candidates: Provider in Prioritäts-Reihenfolge (mind. einer)
+            call: Coroutine-Fabrik, erhält den Provider
+            latency: Tracker für die Latenz des Gewinners und (als untere
+                     Schranke) die Laufzeit abgebrochener Versuche
+            is_success: Prüft ein Ergebnis (False = wie eine Exception behandeln)
+            on_discard: Aufräumen für fertige, aber nicht genutzte Ergebnisse
+        
+        Returns:
+            Tuple (Ergebnis, Provider) des Gewinners. Schlagen alle fehl,
+            das letzte fehlgeschlagene Ergebnis.
+        
+        Raises:
+            Exception: Die letzte Exception, wenn kein Provider ein Ergebnis lieferte
+        """
+        self.stats['races'] += 1
+        pending: Dict[asyncio.Task, Tuple[Any, float]] = {}
+        next_index = 0
+        fallback: Optional[Tuple[Any, Any]] = None
+        last_error: Optional[BaseException] = None
+        
+        def launch() -> None:
+            nonlocal next_index
+            provider = candidates[next_index]
+            next_index += 1
+            task = asyncio.ensure_future(call(provider))
+            pending[task] = (provider, time.perf_counter())
+        
+        async def discard(result: Any) -> None:
+            if on_discard is not None:
+                try:
+                    await on_discard(result)
+                except Exception as e:
+                    logger.debug(f"Aufräumen fehlgeschlagen: {e}")
+        
+        launch()
+        try:
+            while pending:
+                timeout = None
+                if next_index < len(candidates):
+                    timeout = self.hedge_delay(latency, candidates[next_index - 1].name)
+                
+                done, _ = await asyncio.wait(
+                    pending.keys(), timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+                )
+                
+                if not done:
+                    self.stats['hedges'] += 1
+                    logger.info(
+                        f"🏁 Hedge: {candidates[next_index].name} startet nach {timeout:.2f}s"
+                    )
+                    launch()
+                    continue
+                
+                winner = None
+                for task in done:
+                    provider, started = pending.pop(task)
+                    elapsed = time.perf_counter() - started
+                    
+                    # Abgebrochener Versuch (z.B. Provider-intern): wie ein Fehler behandeln
+                    if task.cancelled():
+                        last_error = last_error or asyncio.CancelledError(f"{provider.name} abgebrochen")
+                        logger.warning(f"⚠️ {provider.name} abgebrochen")
+                        continue
+                    
+                    if task.exception() is not None:
+                        last_error = task.exception()
+                        logger.warning(f"⚠️ {provider.name} fehlgeschlagen: {last_error}")
+                        continue
+                    
+                    result = task.result()
+                    if winner is None and is_success(result):
+                        winner = (result, provider)
+                        latency.record(provider.name, elapsed)
+                    elif fallback is None and winner is None:
+                        fallback = (result, provider)
+                    else:
+                        await discard(result)
+                
+                if winner is not None:
+                    if fallback is not None:
+                        await discard(fallback[0])
+                    if winner[1] is not candidates[0]:
+                        self.stats['hedge_wins'] += 1
+                    return winner
+                
+                # Kein Erfolg und nichts mehr unterwegs: sofort nächsten Provider
+                if not pending and next_index < len(candidates):
+                    self.stats['failovers'] += 1
+                    launch()
+        finally:
+            # Abgebrochene Versuche als untere Schranke messen - sonst enthält
+            # das Histogramm nur schnelle Antworten und die Verzögerung sinkt stetig
+            now = time.perf_counter()
+            for task, (provider, started) in pending.items():
+                task.cancel()
+                latency.record(provider.name, now - started)
+                self.stats['censored'] += 1
+            if pending:
+                results = await asyncio.gather(*pending.keys(), return_exceptions=True)
+                for result in results:
+                    if not isinstance(result, BaseException):
+                        await discard(result)
+        
+        if fallback is not None:
+            return fallback
+        raise last_error
+    
+    def get_statistics(self) -> Dict[str, Any]:
+        """Zähler für Admin-Befehle"""
+        return dict(self.stats)
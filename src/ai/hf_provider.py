@@ -3,10 +3,23 @@ Hugging Face Provider - Kostenfreie AI-Modelle über Hugging Face Inference API
 """
 
 import os
+import json
+import time
+import asyncio
 import logging
-from typing import Optional, Dict, Any, List
-import requests
-from src.ai.ai_client import AIProvider
+from typing import Optional, Dict, Any, List, Union
+from src.ai.ai_client import AIProvider, normalize_context
+from src.ai.batching import MicroBatcher
+from src.ai.circuit_breaker import CircuitOpenError, ProviderGuard
+from src.ai.retry import RetryPolicy
+from src.ai.structured_output import constrain_prompt, response_schema, wants_structured_output
+from src.ai.usage import get_usage_stats
+from src.ai.http_transport import (
+    AsyncHTTPTransport,
+    TransportError,
+    TransportTimeout,
+    get_transport
+)
 
 logger = logging.getLogger(__name__)
 
@@ -41,84 +54,250 @@ class HuggingFaceProvider(AIProvider):
         }
     }
     
-    def __init__(self, api_token: Optional[str] = None, model: Optional[str] = None):
+    # Basis-URL der API (HF_BASE_URL, z.B. für den lokalen Fake-Server)
+    DEFAULT_BASE_URL = "https://api-inference.huggingface.co"
+    
+    def __init__(self, api_token: Optional[str] = None, model: Optional[str] = None,
+                 transport: Optional[AsyncHTTPTransport] = None, base_url: Optional[str] = None):
         """
         Initialisiert den Hugging Face Provider
         
         Args:
             api_token: Hugging Face API Token (optional)
             model: Modell-Name (default: flan-t5-base)
+            transport: HTTP Transport (default: gemeinsamer Transport)
+            base_url: Basis-URL der API (default: HF_BASE_URL oder api-inference.huggingface.co)
         """
         self.api_token = api_token or os.getenv('HF_API_TOKEN')
+        self.transport = transport or get_transport()
         
         # Verwende flan-t5-base als Standard (schneller und zuverlässiger)
         model_key = model or os.getenv('AI_MODEL', 'flan-t5-base')
         self.model_config = self.MODELS.get(model_key, self.MODELS['flan-t5-base'])
         self.model = self.model_config['name']
-        self.api_url = f"https://api-inference.huggingface.co/models/{self.model}"
+        self.base_url = (base_url or os.getenv('HF_BASE_URL') or self.DEFAULT_BASE_URL).rstrip('/')
+        self.api_url = f"{self.base_url}/models/{self.model}"
+        
+        # Circuit Breaker + adaptives Timeout (aus p99)
+        self.guard = ProviderGuard.from_env(self.name)
+        
+        # Retries bei 503 (Modell lädt, mit estimated_time) und 429
+        self.retry = RetryPolicy.from_env(self.name)
+        
+        # Token (geschätzt, die API meldet keine usage), Latenz pro Aufruf
+        self.usage = get_usage_stats()
+        
+        # Keep-Warm Scheduler (wird vom Bot angehängt, lernt aus den Anfragen)
+        self.keep_warm = None
+        
+        # Rate Limiter (wird vom RateLimitedProvider angehängt): bei Micro-Batching
+        # ein Token pro Upstream-Request statt pro Prompt
+        self.rate_limiter = None
+        
+        # Micro-Batching: gleichzeitige Prompts mit gleichen Parametern bündeln
+        self.batcher: Optional[MicroBatcher] = None
+        if os.getenv('AI_HF_BATCHING', 'true').lower() == 'true':
+            self.batcher = MicroBatcher(
+                self._send_batch,
+                max_batch_size=int(os.getenv('AI_HF_BATCH_SIZE', '8')),
+                max_wait_ms=float(os.getenv('AI_HF_BATCH_WAIT_MS', '20'))
+            )
         
         if not self.api_token:
             logger.warning("⚠️  HF_API_TOKEN nicht gesetzt - limitierte API-Nutzung")
         
         logger.info(f"✅ HuggingFace Provider initialisiert mit Modell: {self.model}")
     
-    def _make_request(self, payload: Dict[str, Any], timeout: int = 30) -> Dict[str, Any]:
+    async def _make_request(self, payload: Dict[str, Any], timeout: int = 30,
+                            timings: Optional[Dict[str, float]] = None) -> Dict[str, Any]:
         """
         Macht einen API-Request zu Hugging Face
         
         Args:
             payload: Request Payload
-            timeout: Timeout in Sekunden
+            timeout: Max. Timeout pro Versuch in Sekunden (wird aus p99 verkürzt)
+            timings: Optionales Dict für den Zeitpunkt der Antwort-Header
             
         Returns:
             API Response als Dictionary
             
         Raises:
-            Exception bei API-Fehlern
+            Exception bei API-Fehlern oder offenem Circuit Breaker
         """
         headers = {}
         if self.api_token:
             headers["Authorization"] = f"Bearer {self.api_token}"
         
+        # Inference ist frei von Seiteneffekten - auch nach Timeouts wiederholbar
         try:
-            response = requests.post(
-                self.api_url,
-                headers=headers,
-                json=payload,
-                timeout=timeout,
-                verify=False  # SSL-Workaround für Firmennetzwerke
+            return await self.retry.call(
+                lambda: self.guard.call(
+                    lambda effective_timeout: self.transport.post_json(
+                        self.api_url,
+                        payload,
+                        headers=headers,
+                        timeout=effective_timeout,
+                        timings=timings
+                    ),
+                    timeout
+                ),
+                idempotent=True
             )
-            response.raise_for_status()
-            return response.json()
             
-        except requests.exceptions.Timeout:
+        except CircuitOpenError as e:
+            logger.warning(f"🔴 {e}")
+            raise Exception(str(e))
+            
+        except TransportTimeout:
             logger.error("⏱️  Hugging Face API Timeout")
             raise Exception("API Timeout - Modell lädt möglicherweise")
             
-        except requests.exceptions.RequestException as e:
+        except TransportError as e:
             logger.error(f"❌ Hugging Face API Fehler: {e}")
             raise Exception(f"API Fehler: {str(e)}")
     
-    async def generate_response(self, prompt: str, context: Optional[Dict[str, Any]] = None) -> str:
+    async def _infer(self, payload: Dict[str, Any], timeout: int = 30) -> Any:
+        """
+        Inference für einen einzelnen Prompt (über den Micro-Batcher wenn aktiv)
+        
+        Args:
+            payload: Payload mit einem einzelnen String in "inputs"
+            timeout: Timeout in Sekunden
+            
+        Returns:
+            API Response für diesen Prompt
+        """
+        start = time.perf_counter()
+        timings: Dict[str, float] = {}
+        try:
+            if self.batcher is None:
+                result = await self._make_request(payload, timeout=timeout, timings=timings)
+            else:
+                # Nur Anfragen mit identischen Parametern teilen sich einen Batch
+                key = json.dumps({
+                    'parameters': payload.get('parameters', {}),
+                    'options': payload.get('options', {}),
+                    'timeout': timeout
+                }, sort_keys=True)
+                result = await self.batcher.submit(key, payload)
+        except asyncio.CancelledError:
+            self._record_usage(start, payload, error="Abgebrochen")
+            raise
+        except Exception as e:
+            self._record_usage(start, payload, error=str(e))
+            raise
+        
+        if self.keep_warm is not None:
+            self.keep_warm.record_request(time.perf_counter() - start)
+        self._record_usage(start, payload, result=result,
+                           ttfb=timings['headers_at'] - start if 'headers_at' in timings else None)
+        return result
+    
+    def _record_usage(self, start: float, payload: Dict[str, Any], result: Any = None,
+                      ttfb: Optional[float] = None, error: Optional[str] = None) -> None:
+        """
+        Erfasst Dauer und geschätzte Token eines Prompts (siehe src/ai/usage.py)
+        
+        Args:
+            start: perf_counter beim Start
+            payload: Payload mit einem einzelnen Prompt
+            result: API Response für diesen Prompt
+            ttfb: Zeit bis zu den Antwort-Headern (nur ohne Batching bekannt)
+            error: Fehlermeldung
+        """
+        entry = result[0] if isinstance(result, list) and result else result
+        if isinstance(entry, list):
+            entry = entry[0] if entry else None
+        completion = entry.get('generated_text') if isinstance(entry, dict) else None
+        self.usage.record(
+            self.__class__.__name__, self.model, time.perf_counter() - start,
+            ttfb=ttfb, error=error, cost_per_1k_tokens=self.cost_per_1k_tokens,
+            prompt=payload.get('inputs'), completion=completion
+        )
+    
+    async def probe(self, timeout: int = 60) -> int:
+        """
+        Minimaler Request, der das Modell geladen hält (für Keep-Warm)
+        
+        Umgeht Batcher und API-Cache, damit das Modell wirklich rechnet.
+        
+        Args:
+            timeout: Timeout in Sekunden (Kaltstarts dauern lange)
+            
+        Returns:
+            Ungefähr verbrauchte Tokens
+        """
+        length_param = 'max_length' if self.model_config['type'] == 'text2text-generation' else 'max_new_tokens'
+        payload = {
+            "inputs": "ping",
+            "parameters": {length_param: 1},
+            "options": {"wait_for_model": True, "use_cache": False}
+        }
+        await self._make_request(payload, timeout=timeout)
+        return 2
+    
+    async def _send_batch(self, key: str, payloads: List[Dict[str, Any]]) -> List[Any]:
+        """
+        Sendet mehrere Prompts als ein Request (inputs als Liste)
+        
+        Args:
+            key: Batch-Schlüssel (enthält das Timeout)
+            payloads: Einzel-Payloads mit gleichen Parametern
+            
+        Returns:
+            Eine Response pro Payload, im Format einer Einzel-Anfrage
+        """
+        timeout = json.loads(key)['timeout']
+        if self.rate_limiter is not None:
+            await self.rate_limiter.acquire(self.name)
+        
+        if len(payloads) == 1:
+            return [await self._make_request(payloads[0], timeout=timeout)]
+        
+        batch_payload = dict(payloads[0])
+        batch_payload['inputs'] = [payload['inputs'] for payload in payloads]
+        
+        logger.info(f"📦 Hugging Face Batch mit {len(payloads)} Prompts")
+        result = await self._make_request(batch_payload, timeout=timeout)
+        
+        if not isinstance(result, list):
+            raise Exception(f"Unerwartete Batch-Antwort: {str(result)[:100]}")
+        
+        # text-generation liefert pro Prompt eine Liste, text2text ein Dict
+        return [entry if isinstance(entry, list) else [entry] for entry in result]
+    
+    async def generate_response(self, prompt: str,
+                                context: Optional[Union[str, Dict[str, Any]]] = None) -> str:
         """
         Generiert eine Antwort über Hugging Face Inference API
         
         Args:
             prompt: User Input / Prompt
-            context: Optionaler Kontext (max_length, temperature, etc.)
+            context: Optionaler Kontext (System-Prompt String oder
+                     Dict mit system_prompt, max_length, temperature, response_format)
             
         Returns:
             Generierte Antwort
         """
         try:
             # Kontext-Parameter
-            max_length = context.get('max_length', 100) if context else 100
-            temperature = context.get('temperature', 0.7) if context else 0.7
+            context = normalize_context(context)
+            max_length = context.get('max_length', 100)
+            temperature = context.get('temperature', 0.7)
+            system_prompt = context.get('system_prompt')
+            
+            # Kein natives JSON-Schema - Format im Prompt vorgeben
+            if wants_structured_output(context):
+                system_prompt = constrain_prompt(system_prompt, response_schema(context))
             
             # Für T5-Modelle: Prefix für bessere Antworten
             if 't5' in self.model.lower():
                 prompt = f"Beantworte die folgende Frage: {prompt}"
             
+            # Inference API kennt keine Rollen - System-Prompt voranstellen
+            if system_prompt:
+                prompt = f"{system_prompt}\n\n{prompt}"
+            
             # Payload für API
             payload = {
                 "inputs": prompt,
@@ -134,7 +313,7 @@ class HuggingFaceProvider(AIProvider):
             }
             
             logger.info(f"🤖 Generiere Antwort mit {self.model}...")
-            result = self._make_request(payload)
+            result = await self._infer(payload)
             
             # Response-Parsing abhängig vom Modell
             if isinstance(result, list) and len(result) > 0:
@@ -184,7 +363,7 @@ class HuggingFaceProvider(AIProvider):
             }
             
             logger.info(f"🎯 Analysiere Intent für: {text[:50]}...")
-            result = self._make_request(payload, timeout=10)
+            result = await self._infer(payload, timeout=10)
             
             # Parse Intent aus Response
             if isinstance(result, list) and len(result) > 0:
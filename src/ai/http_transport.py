@@ -0,0 +1,231 @@
+"""
+HTTP Transport - Gemeinsamer asynchroner HTTP-Client für alle AI Provider
+
+Ein gepoolter Keep-Alive Client (aiohttp) mit Verbindungslimits pro Host.
+Alle Provider teilen sich standardmäßig eine Instanz, damit viele
+LLM-Requests gleichzeitig aus einem Prozess laufen können, ohne den
+Event-Loop zu blockieren.
+"""
+
+import os
+import json
+import time
+import asyncio
+import logging
+from typing import Optional, Dict, Any, AsyncIterator
+
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+
+class TransportError(Exception):
+    """Basisklasse für Fehler der HTTP-Schicht"""
+
+
+class TransportTimeout(TransportError):
+    """Request hat das Timeout überschritten"""
+
+
+class TransportConnectError(TransportError):
+    """Verbindung kam nicht zustande (DNS, Verbindungsaufbau) - Request wurde nicht gesendet"""
+
+
+class HTTPStatusError(TransportError):
+    """Server hat mit einem Fehler-Statuscode (>= 400) geantwortet"""
+    
+    def __init__(self, status: int, reason: str,
+                 headers: Optional[Dict[str, str]] = None, body: str = ''):
+        super().__init__(f"{status} {reason}")
+        self.status = status
+        self.reason = reason
+        self.headers = dict(headers or {})
+        self.body = body
+
+
+class AsyncHTTPTransport:
+    """
+    Asynchroner HTTP-Client mit Connection-Pool
+    
+    Die aiohttp-Session ist an den Event-Loop gebunden, in dem sie erstellt
+    wurde. Wird der Transport aus einem anderen Loop genutzt (z.B. in Tests
+    mit mehreren asyncio.run Aufrufen), wird automatisch eine neue Session
+    angelegt.
+    """
+    
+    def __init__(self,
+                 max_connections: Optional[int] = None,
+                 max_per_host: Optional[int] = None,
+                 keepalive_timeout: Optional[float] = None,
+                 verify_ssl: bool = False):
+        """
+        Initialisiert den Transport
+        
+        Args:
+            max_connections: Max. offene Verbindungen insgesamt (AI_HTTP_MAX_CONNECTIONS)
+            max_per_host: Max. Verbindungen pro Host (AI_HTTP_MAX_PER_HOST)
+            keepalive_timeout: Keep-Alive Dauer in Sekunden (AI_HTTP_KEEPALIVE)
+            verify_ssl: SSL-Zertifikate prüfen (default: aus, SSL-Workaround)
+        """
+        self.max_connections = max_connections or int(os.getenv('AI_HTTP_MAX_CONNECTIONS', '200'))
+        self.max_per_host = max_per_host or int(os.getenv('AI_HTTP_MAX_PER_HOST', '50'))
+        self.keepalive_timeout = keepalive_timeout or float(os.getenv('AI_HTTP_KEEPALIVE', '30'))
+        self.verify_ssl = verify_ssl
+        
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+    
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Gibt die Session für den aktuellen Event-Loop zurück"""
+        loop = asyncio.get_running_loop()
+        
+        if self._session is None or self._session.closed or self._loop is not loop:
+            connector = aiohttp.TCPConnector(
+                limit=self.max_connections,
+                limit_per_host=self.max_per_host,
+                keepalive_timeout=self.keepalive_timeout,
+                ttl_dns_cache=300,
+                ssl=None if self.verify_ssl else False  # SSL-Workaround für Firmennetzwerke
+            )
+            self._session = aiohttp.ClientSession(connector=connector)
+            self._loop = loop
+            logger.debug(
+                f"🔌 HTTP Session erstellt (limit={self.max_connections}, "
+                f"per_host={self.max_per_host})"
+            )
+        
+        return self._session
+    
+    async def post_json(self, url: str, payload: Dict[str, Any],
+                        headers: Optional[Dict[str, str]] = None,
+                        timeout: float = 30,
+                        timings: Optional[Dict[str, float]] = None) -> Any:
+        """
+        Sendet einen POST-Request mit JSON-Body
+        
+        Args:
+            url: Ziel-URL
+            payload: JSON Payload
+            headers: Optionale HTTP-Header
+            timeout: Gesamt-Timeout in Sekunden
+            timings: Optionales Dict, bekommt 'headers_at' (perf_counter beim
+                     Eintreffen der Antwort-Header, für Time-to-first-Byte)
+        
+        Returns:
+            Geparste JSON-Antwort
+        
+        Raises:
+            TransportTimeout: Bei Timeout
+            HTTPStatusError: Bei Statuscode >= 400
+            TransportConnectError: Wenn keine Verbindung zustande kam
+            TransportError: Bei sonstigen Verbindungsfehlern
+        """
+        session = self._get_session()
+        
+        try:
+            async with session.post(
+                url,
+                json=payload,
+                headers=headers,
+                timeout=aiohttp.ClientTimeout(total=timeout)
+            ) as response:
+                if timings is not None:
+                    timings['headers_at'] = time.perf_counter()
+                body = await response.text()
+                
+                if response.status >= 400:
+                    raise HTTPStatusError(response.status, response.reason or '',
+                                          response.headers, body)
+                
+                return json.loads(body) if body else {}
+        
+        except asyncio.TimeoutError:
+            raise TransportTimeout(f"Timeout nach {timeout}s: {url}")
+        
+        except aiohttp.ClientConnectorError as e:
+            raise TransportConnectError(str(e))
+        
+        except aiohttp.ClientError as e:
+            raise TransportError(str(e))
+        
+        except json.JSONDecodeError as e:
+            raise TransportError(f"Ungültige JSON-Antwort: {e}")
+    
+    async def stream_sse(self, url: str, payload: Dict[str, Any],
+                         headers: Optional[Dict[str, str]] = None,
+                         timeout: float = 60) -> AsyncIterator[str]:
+        """
+        Sendet einen POST-Request und liest die Antwort als Server-Sent Events
+        
+        Args:
+            url: Ziel-URL
+            payload: JSON Payload
+            headers: Optionale HTTP-Header
+            timeout: Gesamt-Timeout für den Stream in Sekunden
+        
+        Yields:
+            Inhalt jeder "data:" Zeile (ohne Präfix) bis "[DONE]"
+        
+        Raises:
+            TransportTimeout: Bei Timeout
+            HTTPStatusError: Bei Statuscode >= 400
+            TransportConnectError: Wenn keine Verbindung zustande kam
+            TransportError: Bei sonstigen Verbindungsfehlern
+        """
+        session = self._get_session()
+        
+        try:
+            async with session.post(
+                url,
+                json=payload,
+                headers=headers,
+                timeout=aiohttp.ClientTimeout(total=timeout)
+            ) as response:
+                if response.status >= 400:
+                    body = await response.text()
+                    raise HTTPStatusError(response.status, response.reason or '',
+                                          response.headers, body)
+                
+                async for raw_line in response.content:
+                    line = raw_line.decode('utf-8', errors='replace').strip()
+                    
+                    # Leerzeilen trennen Events, ":" leitet Kommentare ein (Keep-Alive)
+                    if not line or line.startswith(':') or not line.startswith('data:'):
+                        continue
+                    
+                    data = line[len('data:'):].strip()
+                    if data == '[DONE]':
+                        return
+                    yield data
+        
+        except asyncio.TimeoutError:
+            raise TransportTimeout(f"Stream-Timeout nach {timeout}s: {url}")
+        
+        except aiohttp.ClientConnectorError as e:
+            raise TransportConnectError(str(e))
+        
+        except aiohttp.ClientError as e:
+            raise TransportError(str(e))
+    
+    async def close(self) -> None:
+        """Schließt die aktuelle Session und alle offenen Verbindungen"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        self._loop = None
+
+
+_default_transport: Optional[AsyncHTTPTransport] = None
+
+
+def get_transport() -> AsyncHTTPTransport:
+    """
+    Gibt den gemeinsamen Transport für alle Provider zurück
+    
+    Returns:
+        AsyncHTTPTransport Singleton
+    """
+    global _default_transport
+    if _default_transport is None:
+        _default_transport = AsyncHTTPTransport()
+    return _default_transport
@@ -0,0 +1,213 @@
+"""
+Intent Classifier - Lokale Intent-Erkennung ohne Netzwerk-Aufruf
+
+Gewichtete Keyword-/Regex-Features und ein kleines lineares Modell
+(Softmax über calendar/reminder/question/general). Eindeutige Eingaben
+werden in Mikrosekunden beantwortet; nur unsichere Fälle gehen an den
+Remote-Provider (siehe AIClient.understand_command).
+"""
+
+import re
+import math
+import logging
+from typing import Dict, Any, List, Tuple, Optional
+
+logger = logging.getLogger(__name__)
+
+INTENTS = ('calendar', 'reminder', 'question', 'general')
+
+# Feature-Name -> Regex (vorkompiliert, case-insensitive)
+FEATURE_PATTERNS = {
+    'kw_termin': r'\btermin',
+    'kw_kalender': r'\bkalender',
+    'kw_event': r'\b(meeting|besprechung|treffen|verabredung|call|arzttermin)\b',
+    'time_expr': r'\b\d{1,2}([:.]\d{2})?\s*uhr\b|\b\d{1,2}:\d{2}\b',
+    'day_word': r'\b(heute|morgen|übermorgen|montag|dienstag|mittwoch|donnerstag|'
+                r'freitag|samstag|sonntag|woche|wochenende)\b',
+    'agenda_query': r'\bwas (habe|hab|steht)\b.*\b(heute|morgen|übermorgen|woche|an|vor)\b|'
+                    r'\bwas ist (heute|morgen) (los|geplant)|'
+                    r'\b(nächste[rn]?|kommende[rn]?) termin|\bwann ist mein|'
+                    r'\b(zeig|liste)\w* (mir )?(meine )?termin|\bwelche termine',
+    'create_verb': r'\b(erstell|eintrag|trag\w* .*ein\b|leg\w* .*an\b|plane?\b|einplan\w*|buch\w*|vereinbar)|'
+                   r'^\s*(neue[rn]?\s+)?termin\b',
+    'modify_verb': r'\b(lösch\w*|entfern\w*|streich\w*|storn\w*|absag\w*|sag\w* .*\bab\b|'
+                   r'verschieb\w*|verleg\w*|änder\w*|cancel\w*)',
+    'negation': r'\b(nicht|kein\w*|nie|niemals)\b',
+    'past_ref': r'\b(gestern|vorgestern|letzte[nrm]? woche|hatte|war|waren)\b',
+    'kw_remind': r'erinner|remind',
+    'kw_forget': r'vergiss nicht|nicht vergessen|denk(e)? (bitte )?(daran|an)\b',
+    'wh_start': r'^\s*(wie|was|wann|wo|warum|wieso|weshalb|wer|welche[rsnm]?)\b',
+    'question_mark': r'\?\s*$',
+    'explain': r'\b(erklär\w*|was bedeutet|definiere|warum)\b',
+    'writing': r'\b(schreib\w*|formulier\w*|übersetz\w*|zusammenfass\w*)\b',
+    'greeting': r'^\s*(hallo|hi|hey|moin|servus|grüß\w*|guten (morgen|tag|abend))\b',
+    'thanks': r'\b(danke\w*|vielen dank|merci|tschüss|bis später|alles klar)\b',
+    'smalltalk': r'\bwie geht(s| es)\b',
+}
+
+# Startgewichte (Intent -> Feature -> Gewicht), per fit() nachtrainierbar
+DEFAULT_WEIGHTS = {
+    'calendar': {
+        'kw_termin': 3.0, 'kw_kalender': 2.5, 'kw_event': 2.0, 'time_expr': 1.5,
+        'day_word': 1.2, 'agenda_query': 4.0, 'create_verb': 1.0, 'greeting': -1.5,
+    },
+    'reminder': {
+        'kw_remind': 4.5, 'kw_forget': 4.0, 'time_expr': 0.5, 'day_word': 0.4,
+        'create_verb': 0.5,
+    },
+    'question': {
+        'wh_start': 1.8, 'question_mark': 1.0, 'explain': 2.5, 'writing': 2.5,
+        'agenda_query': -1.0, 'smalltalk': -1.0, 'kw_remind': -1.0,
+    },
+    'general': {
+        'greeting': 3.0, 'thanks': 2.5, 'smalltalk': 3.0,
+    },
+}
+
+DEFAULT_BIAS = {'calendar': -0.5, 'reminder': -1.0, 'question': 0.0, 'general': 0.5}
+
+_COMPILED = {name: re.compile(pattern, re.IGNORECASE) for name, pattern in FEATURE_PATTERNS.items()}
+
+# Features, bei denen trotz Erstell-Verb kein Termin lokal angelegt wird
+# (Verneinung, Frage, Vergangenheit)
+_CREATE_BLOCKERS = frozenset({'negation', 'question_mark', 'wh_start', 'past_ref'})
+
+_TIMEFRAME_PATTERNS = (
+    ('next', re.compile(r'\b(nächste[rn]?|kommende[rn]?) termin|\bwann ist mein', re.IGNORECASE)),
+    ('week', re.compile(r'\bwoche\b', re.IGNORECASE)),
+    ('tomorrow', re.compile(r'(?<!guten )\bmorgen\b', re.IGNORECASE)),
+    ('today', re.compile(r'\bheute\b', re.IGNORECASE)),
+)
+
+
+class LocalIntentClassifier:
+    """
+    Lineares Intent-Modell über binäre Regex-Features
+    """
+    
+    def __init__(self,
+                 threshold: float = 0.85,
+                 weights: Optional[Dict[str, Dict[str, float]]] = None,
+                 bias: Optional[Dict[str, float]] = None):
+        """
+        Args:
+            threshold: Mindest-Konfidenz, ab der das lokale Ergebnis gilt
+            weights: Gewichte (Intent -> Feature -> Gewicht)
+            bias: Bias pro Intent
+        """
+        self.threshold = threshold
+        self.weights = {intent: dict((weights or DEFAULT_WEIGHTS).get(intent, {})) for intent in INTENTS}
+        self.bias = dict(bias or DEFAULT_BIAS)
+    
+    @staticmethod
+    def extract_features(text: str) -> List[str]:
+        """
+        Aktive Features eines Textes
+        
+        Args:
+            text: Benutzer-Eingabe
+        
+        Returns:
+            Namen der Features, deren Regex matcht
+        """
+        return [name for name, pattern in _COMPILED.items() if pattern.search(text)]
+    
+    def _probabilities(self, features: List[str]) -> Dict[str, float]:
+        """Softmax über die linearen Scores"""
+        scores = {
+            intent: self.bias.get(intent, 0.0) + sum(self.weights[intent].get(f, 0.0) for f in features)
+            for intent in INTENTS
+        }
+        top = max(scores.values())
+        exp = {intent: math.exp(score - top) for intent, score in scores.items()}
+        total = sum(exp.values())
+        return {intent: value / total for intent, value in exp.items()}
+    
+    def classify(self, text: str) -> Dict[str, Any]:
+        """
+        Klassifiziert einen Text
+        
+        Args:
+            text: Benutzer-Eingabe
+        
+        Returns:
+            Dictionary im Format von AIProvider.analyze_intent plus
+            'probabilities' und 'features'
+        """
+        features = self.extract_features(text)
+        probabilities = self._probabilities(features)
+        intent = max(probabilities, key=probabilities.get)
+        
+        return {
+            'intent': intent,
+            'confidence': round(probabilities[intent], 4),
+            'entities': self._extract_entities(text, intent, features),
+            'raw_text': text,
+            'probabilities': probabilities,
+            'features': features
+        }
+    
+    def is_confident(self, result: Dict[str, Any]) -> bool:
+        """True wenn das lokale Ergebnis ohne Remote-Provider verwendet werden darf"""
+        return result['confidence'] >= self.threshold
+    
+    @staticmethod
+    def _extract_entities(text: str, intent: str, features: List[str]) -> List[Dict[str, str]]:
+        """
+        Operation (list/create) und Zeitraum für Kalender-Intents
+        
+        'create' nur mit ausdrücklichem Erstell-Verb (oder "Termin ..." am
+        Satzanfang) und ohne Verneinung, Frage oder Vergangenheitsbezug.
+        """
+        if intent != 'calendar':
+            return []
+        
+        # Löschen/Verschieben/Absagen entscheidet immer die KI
+        entities = []
+        if 'modify_verb' in features:
+            pass
+        elif 'agenda_query' in features:
+            entities.append({'type': 'operation', 'value': 'list'})
+        elif 'create_verb' in features and not _CREATE_BLOCKERS.intersection(features):
+            entities.append({'type': 'operation', 'value': 'create'})
+        
+        for timeframe, pattern in _TIMEFRAME_PATTERNS:
+            if pattern.search(text):
+                entities.append({'type': 'timeframe', 'value': timeframe})
+                break
+        
+        return entities
+    
+    def fit(self, examples: List[Tuple[str, str]], epochs: int = 20,
+            learning_rate: float = 0.1) -> float:
+        """
+        Trainiert die Gewichte per Softmax-Regression nach (SGD)
+        
+        Args:
+            examples: Liste von (Text, Intent)
+            epochs: Anzahl Durchläufe
+            learning_rate: Lernrate
+        
+        Returns:
+            Genauigkeit auf den Trainingsdaten nach dem Training
+        """
+        featurized = [(self.extract_features(text), label) for text, label in examples
+                      if label in INTENTS]
+        
+        for _ in range(epochs):
+            for features, label in featurized:
+                probabilities = self._probabilities(features)
+                for intent in INTENTS:
+                    gradient = (1.0 if intent == label else 0.0) - probabilities[intent]
+                    self.bias[intent] = self.bias.get(intent, 0.0) + learning_rate * gradient
+                    for feature in features:
+                        self.weights[intent][feature] = \
+                            self.weights[intent].get(feature, 0.0) + learning_rate * gradient
+        
+        correct = sum(
+            1 for features, label in featurized
+            if max(self._probabilities(features).items(), key=lambda item: item[1])[0] == label
+        )
+        accuracy = correct / len(featurized) if featurized else 0.0
+        logger.info(f"🎓 Intent-Modell trainiert: {len(featurized)} Beispiele, Genauigkeit {accuracy:.0%}")
+        return accuracy
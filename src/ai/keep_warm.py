@@ -0,0 +1,265 @@
+"""
+Keep-Warm - Hält HuggingFace-Modelle zwischen Anfragen geladen
+
+Die kostenlose Inference API entlädt Modelle nach einer Leerlaufzeit; der
+nächste Request wartet dann 20s und mehr auf den Kaltstart. Der Scheduler
+schickt in Leerlaufphasen winzige Probe-Requests (1 Token), aber nur:
+
+- wenn seit der letzten Anfrage das gelernte Intervall verstrichen ist
+  (echter Traffic hält das Modell ohnehin warm - dann wird nichts gesendet)
+- wenn zu dieser Tageszeit üblicherweise Anfragen kommen (Tagesprofil
+  aus dem beobachteten Traffic, die aktuelle und die nächste Stunde)
+
+Das Intervall wird aus dem Traffic gelernt: Jede Anfrage meldet ihre
+Latenz und die Leerlaufzeit davor. War sie deutlich langsamer als üblich
+(Kaltstart), ist die Leerlaufzeit eine Obergrenze dafür, wie lange das
+Modell geladen bleibt; das Probe-Intervall liegt mit Sicherheitsfaktor
+darunter.
+"""
+
+import time
+import asyncio
+import logging
+from typing import Any, Callable, Dict, List, Optional
+
+from src.ai.latency import LatencyHistogram
+
+logger = logging.getLogger(__name__)
+
+WARM = 'warm'
+COLD = 'cold'
+UNKNOWN = 'unknown'
+
+HOURS_PER_DAY = 24
+
+
+class KeepWarmScheduler:
+    """
+    Probe-Requests gegen Kaltstarts eines HuggingFace-Modells
+    """
+    
+    def __init__(self, provider: Any,
+                 default_interval: float = 300.0,
+                 min_interval: float = 60.0,
+                 max_interval: float = 1800.0,
+                 safety: float = 0.5,
+                 cold_factor: float = 4.0,
+                 min_cold_seconds: float = 3.0,
+                 min_hourly_requests: float = 0.5,
+                 clock: Callable[[], float] = time.time):
+        """
+        Args:
+            provider: HuggingFaceProvider (braucht probe() und name)
+            default_interval: Probe-Intervall solange nichts gelernt ist
+            min_interval: Untergrenze des Intervalls in Sekunden
+            max_interval: Obergrenze des Intervalls in Sekunden
+            safety: Anteil der kürzesten Leerlaufzeit mit Kaltstart
+            cold_factor: Ab diesem Vielfachen des p50 gilt eine Antwort als Kaltstart
+            min_cold_seconds: ... und mindestens ab so vielen Sekunden
+            min_hourly_requests: Erwartete Anfragen pro Stunde, ab denen gewärmt wird
+            clock: Zeitquelle (Sekunden seit Epoch, für Tests austauschbar)
+        """
+        self.provider = provider
+        self.default_interval = default_interval
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.safety = safety
+        self.cold_factor = cold_factor
+        self.min_cold_seconds = min_cold_seconds
+        self.min_hourly_requests = min_hourly_requests
+        self.clock = clock
+        
+        self.latency = LatencyHistogram()
+        self.idle_limit: Optional[float] = None
+        self.last_activity: Optional[float] = None
+        self.last_request: Optional[float] = None
+        self.last_probe: Optional[float] = None
+        self.last_cold_start: Optional[float] = None
+        
+        # Anfragen pro Stunde des Tages (lokale Zeit)
+        self._hourly: List[float] = [0.0] * HOURS_PER_DAY
+        self._first_seen: Optional[float] = None
+        self._last_skip: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+        
+        self.stats = {
+            'probes': 0,
+            'probe_failures': 0,
+            'probe_seconds': 0.0,
+            'probe_tokens': 0,
+            'cold_starts': 0,
+            'skipped_busy': 0,
+            'skipped_quiet': 0
+        }
+    
+    @property
+    def interval(self) -> float:
+        """Aktuelles Probe-Intervall in Sekunden"""
+        if self.idle_limit is None:
+            return self.default_interval
+        return min(self.max_interval, max(self.min_interval, self.idle_limit * self.safety))
+    
+    def _is_cold(self, seconds: float) -> bool:
+        p50 = self.latency.quantile(0.5)
+        if p50 is None or self.latency.count < 5:
+            return seconds >= self.min_cold_seconds * self.cold_factor
+        return seconds >= max(self.min_cold_seconds, p50 * self.cold_factor)
+    
+    def _observe(self, seconds: float, now: float) -> bool:
+        """Lernt aus Latenz und vorheriger Leerlaufzeit; True bei Kaltstart"""
+        idle = None if self.last_activity is None else now - seconds - self.last_activity
+        cold = self._is_cold(seconds)
+        
+        if cold:
+            self.stats['cold_starts'] += 1
+            self.last_cold_start = now
+            if idle is not None and idle > 0:
+                self.idle_limit = idle if self.idle_limit is None else min(self.idle_limit, idle)
+                logger.info(f"🥶 {self.provider.name}: Kaltstart nach {idle:.0f}s Leerlauf "
+                            f"- Probe-Intervall jetzt {self.interval:.0f}s")
+        else:
+            self.latency.record(seconds)
+        
+        self.last_activity = now
+        return cold
+    
+    def record_request(self, seconds: float) -> None:
+        """
+        Meldet eine echte Anfrage an das Modell
+        
+        Args:
+            seconds: Latenz der Anfrage
+        """
+        now = self.clock()
+        self._observe(seconds, now)
+        self.last_request = now
+        if self._first_seen is None:
+            self._first_seen = now
+        self._hourly[time.localtime(now).tm_hour] += 1
+    
+    def expected_requests(self, timestamp: Optional[float] = None) -> Optional[float]:
+        """
+        Erwartete Anfragen pro Stunde zu einer Uhrzeit (Tagesprofil)
+        
+        Returns:
+            Anfragen pro Stunde oder None solange weniger als ein Tag beobachtet ist
+        """
+        now = self.clock() if timestamp is None else timestamp
+        if self._first_seen is None or now - self._first_seen < 24 * 3600:
+            return None
+        days = (now - self._first_seen) / (24 * 3600)
+        return self._hourly[time.localtime(now).tm_hour] / days
+    
+    @property
+    def state(self) -> str:
+        """
+        warm, cold oder unknown - geschätzt aus der Leerlaufzeit seit der
+        letzten Anfrage (nach jeder Antwort ist das Modell geladen)
+        """
+        if self.last_activity is None:
+            return UNKNOWN
+        idle_limit = self.idle_limit if self.idle_limit is not None else 2 * self.default_interval
+        if self.clock() - self.last_activity >= idle_limit:
+            return COLD
+        return WARM
+    
+    def should_probe(self) -> bool:
+        """
+        Entscheidet, ob jetzt ein Probe-Request gesendet wird
+        
+        Returns:
+            True wenn das Intervall abgelaufen ist und Traffic erwartet wird
+        """
+        now = self.clock()
+        if self.last_activity is not None and now - self.last_activity < self.interval:
+            # Echter Traffic hält das Modell warm - keine Probe nötig
+            if self.last_request == self.last_activity and self._skip_due(now):
+                self.stats['skipped_busy'] += 1
+            return False
+        
+        if not self._traffic_expected(now):
+            if self._skip_due(now):
+                self.stats['skipped_quiet'] += 1
+            return False
+        return True
+    
+    def _skip_due(self, now: float) -> bool:
+        """Zählt ausgelassene Proben höchstens einmal pro Intervall"""
+        if self._last_skip is not None and now - self._last_skip < self.interval:
+            return False
+        self._last_skip = now
+        return True
+    
+    def _traffic_expected(self, now: float) -> bool:
+        """Kommen jetzt oder in der nächsten Stunde üblicherweise Anfragen?"""
+        current = self.expected_requests(now)
+        if current is None:
+            return True
+        upcoming = self.expected_requests(now + 3600) or 0.0
+        return max(current, upcoming) >= self.min_hourly_requests
+    
+    async def probe(self) -> Optional[float]:
+        """
+        Sendet einen Probe-Request
+        
+        Returns:
+            Latenz in Sekunden oder None bei Fehler
+        """
+        start = time.perf_counter()
+        self.last_probe = self.clock()
+        self.stats['probes'] += 1
+        try:
+            tokens = await self.provider.probe()
+        except Exception as e:
+            self.stats['probe_failures'] += 1
+            logger.warning(f"⚠️ Keep-Warm Probe für {self.provider.name} fehlgeschlagen: {e}")
+            return None
+        
+        seconds = time.perf_counter() - start
+        self.stats['probe_seconds'] += seconds
+        self.stats['probe_tokens'] += tokens
+        cold = self._observe(seconds, self.clock())
+        logger.info(f"🔥 Keep-Warm Probe {self.provider.name}: {seconds:.1f}s"
+                    f"{' (war kalt)' if cold else ''}")
+        return seconds
+    
+    async def run(self) -> None:
+        """Scheduler-Schleife (läuft bis stop())"""
+        logger.info(f"🔥 Keep-Warm für {self.provider.name} aktiv (Intervall {self.interval:.0f}s)")
+        while True:
+            if self.should_probe():
+                await self.probe()
+            await asyncio.sleep(max(1.0, min(30.0, self.interval / 4)))
+    
+    def start(self, loop: asyncio.AbstractEventLoop) -> None:
+        """
+        Startet den Scheduler auf einem laufenden Event-Loop
+        
+        Args:
+            loop: Event-Loop (z.B. der Hintergrund-Loop des Bots)
+        """
+        def create():
+            self._task = loop.create_task(self.run())
+        loop.call_soon_threadsafe(create)
+    
+    def stop(self) -> None:
+        """Beendet den Scheduler"""
+        if self._task is not None:
+            self._task.get_loop().call_soon_threadsafe(self._task.cancel)
+    
+    def get_status(self) -> Dict[str, Any]:
+        """
+        Zustand und Kosten für Admin-Befehle
+        
+        Returns:
+            Dict mit name, state, interval, idle_limit, expected_requests,
+            probes, probe_seconds, probe_tokens, probe_cost, cold_starts, skipped_*
+        """
+        status = dict(self.stats)
+        status['name'] = self.provider.name
+        status['state'] = self.state
+        status['interval'] = self.interval
+        status['idle_limit'] = self.idle_limit
+        status['expected_requests'] = self.expected_requests()
+        status['probe_cost'] = status['probe_tokens'] / 1000 * getattr(self.provider, 'cost_per_1k_tokens', 0.0)
+        return status
@@ -0,0 +1,142 @@
+"""
+Latency - Latenz-Histogramme pro AI Provider
+
+Logarithmische Buckets von 10ms bis ~5min. Quantile (p50/p90/p99) werden
+aus den kumulierten Bucket-Zählern interpoliert. Damit alte Messungen
+nicht ewig nachwirken, werden alle Zähler halbiert, sobald `max_samples`
+erreicht ist (exponentielles Vergessen).
+"""
+
+import math
+import bisect
+import logging
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class LatencyHistogram:
+    """
+    Histogramm über Antwortzeiten in Sekunden
+    """
+    
+    def __init__(self, min_seconds: float = 0.01, max_seconds: float = 300.0,
+                 buckets_per_decade: int = 12, max_samples: int = 1000):
+        """
+        Args:
+            min_seconds: Untere Grenze des ersten Buckets
+            max_seconds: Obere Grenze des letzten Buckets
+            buckets_per_decade: Auflösung (Buckets pro Zehnerpotenz)
+            max_samples: Ab dieser Anzahl werden die Zähler halbiert
+        """
+        decades = math.log10(max_seconds / min_seconds)
+        count = int(math.ceil(decades * buckets_per_decade))
+        factor = 10 ** (1.0 / buckets_per_decade)
+        
+        self.bounds: List[float] = [min_seconds * factor ** i for i in range(count + 1)]
+        self.counts: List[float] = [0.0] * (len(self.bounds) + 1)
+        self.max_samples = max_samples
+        self.total = 0.0
+        self.last: Optional[float] = None
+    
+    def record(self, seconds: float) -> None:
+        """
+        Speichert eine Messung
+        
+        Args:
+            seconds: Dauer in Sekunden
+        """
+        self.counts[bisect.bisect_left(self.bounds, seconds)] += 1
+        self.total += 1
+        self.last = seconds
+        
+        if self.total >= self.max_samples:
+            self.counts = [c / 2 for c in self.counts]
+            self.total /= 2
+    
+    @property
+    def count(self) -> int:
+        """Anzahl (gewichteter) Messungen"""
+        return int(self.total)
+    
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        Schätzt ein Quantil
+        
+        Args:
+            q: Quantil zwischen 0 und 1 (z.B. 0.99)
+        
+        Returns:
+            Dauer in Sekunden oder None ohne Messungen
+        """
+        if self.total <= 0:
+            return None
+        
+        target = q * self.total
+        cumulative = 0.0
+        
+        for idx, bucket_count in enumerate(self.counts):
+            if bucket_count <= 0:
+                continue
+            if cumulative + bucket_count >= target:
+                lower = self.bounds[idx - 1] if idx > 0 else 0.0
+                upper = self.bounds[idx] if idx < len(self.bounds) else self.bounds[-1]
+                fraction = (target - cumulative) / bucket_count
+                return lower + (upper - lower) * fraction
+            cumulative += bucket_count
+        
+        return self.bounds[-1]
+    
+    def summary(self) -> Dict[str, Optional[float]]:
+        """
+        Kennzahlen für Logs und Admin-Befehle
+        
+        Returns:
+            Dict mit count, p50, p90, p99 (Sekunden)
+        """
+        return {
+            'count': self.count,
+            'p50': self.quantile(0.5),
+            'p90': self.quantile(0.9),
+            'p99': self.quantile(0.99)
+        }
+
+
+class LatencyTracker:
+    """
+    Sammlung von Histogrammen, ein Histogramm pro Provider-Name
+    """
+    
+    def __init__(self):
+        self.histograms: Dict[str, LatencyHistogram] = {}
+    
+    def get(self, name: str) -> LatencyHistogram:
+        """Histogramm eines Providers (wird bei Bedarf angelegt)"""
+        if name not in self.histograms:
+            self.histograms[name] = LatencyHistogram()
+        return self.histograms[name]
+    
+    def record(self, name: str, seconds: float) -> None:
+        """Speichert eine Messung für einen Provider"""
+        self.get(name).record(seconds)
+    
+    def quantile(self, name: str, q: float, min_samples: int = 1) -> Optional[float]:
+        """
+        Quantil eines Providers
+        
+        Args:
+            name: Provider-Name
+            q: Quantil zwischen 0 und 1
+            min_samples: Mindestanzahl Messungen, sonst None
+        
+        Returns:
+            Dauer in Sekunden oder None
+        """
+        histogram = self.histograms.get(name)
+        if histogram is None or histogram.count < min_samples:
+            return None
+        return histogram.quantile(q)
+    
+    def summary(self) -> Dict[str, Dict[str, Optional[float]]]:
+        """Kennzahlen aller Provider"""
+        return {name: histogram.summary() for name, histogram in self.histograms.items()}
@@ -0,0 +1,252 @@
+"""
+Local Provider - Quantisiertes Modell lokal auf der CPU (llama.cpp / GGUF)
+
+Keine Anfrage verlässt den Rechner. Die Gewichte werden einmal beim Start
+geladen (inkl. Warm-up), die Generierung läuft in einem begrenzten
+Thread-Pool. Ist die Warteschlange voll, wird sofort mit einer
+Fehlermeldung geantwortet, damit der Router auf einen anderen Provider
+ausweichen kann.
+
+Benötigt: pip install llama-cpp-python  und ein GGUF-Modell, z.B.
+qwen2.5-0.5b-instruct-q4_k_m.gguf (LOCAL_MODEL_PATH).
+"""
+
+import os
+import time
+import queue
+import asyncio
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, Any, List, Tuple, Union, Callable
+
+from src.ai.ai_client import AIProvider, normalize_context
+from src.ai.structured_output import constrain_prompt, response_schema, wants_structured_output
+from src.ai.usage import get_usage_stats
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SYSTEM_PROMPT = 'Du bist AdonisAI, ein hilfreicher persönlicher Assistent auf Deutsch.'
+
+INTENT_SYSTEM_PROMPT = """Du bist ein Intent-Klassifikator.
+Klassifiziere die Benutzer-Eingabe in eine der folgenden Kategorien:
+- calendar: Termin-bezogene Anfragen
+- reminder: Erinnerungs-bezogene Anfragen
+- question: Informations-Fragen
+- general: Allgemeine Konversation
+
+Antworte nur mit dem Intent-Namen."""
+
+
+def _load_llama(model_path: str, n_ctx: int, n_threads: int):
+    """Lädt ein GGUF-Modell mit llama-cpp-python"""
+    try:
+        from llama_cpp import Llama
+    except ImportError:
+        raise Exception("llama-cpp-python nicht installiert - pip install llama-cpp-python")
+    
+    return Llama(model_path=model_path, n_ctx=n_ctx, n_threads=n_threads, verbose=False)
+
+
+class LocalModelProvider(AIProvider):
+    """
+    Lokaler AI Provider (CPU-Inference ohne Netzwerk)
+    """
+    
+    def __init__(self,
+                 model_path: Optional[str] = None,
+                 pool_size: Optional[int] = None,
+                 max_queue: Optional[int] = None,
+                 n_ctx: int = 2048,
+                 n_threads: Optional[int] = None,
+                 warmup: bool = True,
+                 model_loader: Optional[Callable[[str, int, int], Any]] = None):
+        """
+        Initialisiert den Provider und lädt die Gewichte
+        
+        Args:
+            model_path: Pfad zur GGUF-Datei (LOCAL_MODEL_PATH)
+            pool_size: Anzahl Modell-Instanzen / Worker-Threads (LOCAL_MODEL_POOL, default: 1)
+            max_queue: Max. wartende Anfragen zusätzlich zum Pool (LOCAL_MODEL_MAX_QUEUE, default: 8)
+            n_ctx: Kontextlänge in Token
+            n_threads: CPU-Threads pro Instanz (default: CPU-Kerne / pool_size)
+            warmup: Nach dem Laden einmal generieren (lädt Seiten in den RAM)
+            model_loader: Alternative Ladefunktion (pfad, n_ctx, n_threads) -> Modell
+        
+        Raises:
+            Exception wenn kein Modell-Pfad gesetzt ist oder das Laden fehlschlägt
+        """
+        self.model_path = model_path or os.getenv('LOCAL_MODEL_PATH')
+        if not self.model_path:
+            raise Exception("Kein lokales Modell - setze LOCAL_MODEL_PATH in .env")
+        
+        self.model = os.path.basename(self.model_path)
+        self.pool_size = pool_size or int(os.getenv('LOCAL_MODEL_POOL', '1'))
+        self.max_queue = max_queue if max_queue is not None else int(os.getenv('LOCAL_MODEL_MAX_QUEUE', '8'))
+        threads = n_threads or max(1, (os.cpu_count() or 1) // self.pool_size)
+        loader = model_loader or _load_llama
+        
+        # Gewichte einmal laden - jede Instanz wird immer nur von einem Thread genutzt
+        start = time.perf_counter()
+        self._instances: "queue.SimpleQueue[Any]" = queue.SimpleQueue()
+        for _ in range(self.pool_size):
+            self._instances.put(loader(self.model_path, n_ctx, threads))
+        self._executor = ThreadPoolExecutor(max_workers=self.pool_size, thread_name_prefix='adonis-local-llm')
+        self._pending = 0
+        self._pending_lock = threading.Lock()
+        self.usage = get_usage_stats()
+        
+        if warmup:
+            for _ in range(self.pool_size):
+                self._complete([{"role": "user", "content": "Hallo"}], temperature=0.0, max_tokens=1)
+        
+        self.load_seconds = time.perf_counter() - start
+        logger.info(
+            f"✅ Lokales Modell geladen: {self.model} "
+            f"({self.pool_size}x, {threads} Threads, {self.load_seconds:.1f}s)"
+        )
+    
+    def _complete(self, messages: List[Dict[str, str]], temperature: float,
+                  max_tokens: int) -> Tuple[str, Optional[Dict[str, Any]]]:
+        """
+        Generiert synchron mit einer freien Modell-Instanz (läuft im Worker-Thread)
+        
+        Returns:
+            Tuple (Antwort, usage von llama.cpp oder None)
+        """
+        llm = self._instances.get()
+        try:
+            result = llm.create_chat_completion(
+                messages=messages,
+                temperature=temperature,
+                max_tokens=max_tokens
+            )
+        finally:
+            self._instances.put(llm)
+        
+        choices = result.get('choices') or []
+        if not choices:
+            return '', result.get('usage')
+        return (choices[0].get('message', {}).get('content') or '').strip(), result.get('usage')
+    
+    async def _run(self, messages: List[Dict[str, str]], temperature: float, max_tokens: int) -> str:
+        """
+        Führt eine Generierung im Thread-Pool aus
+        
+        Raises:
+            Exception wenn Pool und Warteschlange voll sind
+        """
+        with self._pending_lock:
+            if self._pending >= self.pool_size + self.max_queue:
+                raise Exception(f"Lokales Modell ausgelastet ({self._pending} Anfragen offen)")
+            self._pending += 1
+        
+        # Slot erst freigeben, wenn der Thread wirklich fertig ist - ein
+        # abgebrochener Aufrufer (z.B. verlorener Hedge) stoppt die Generierung nicht
+        start = time.perf_counter()
+        future = self._executor.submit(self._complete, messages, temperature, max_tokens)
+        future.add_done_callback(self._release_slot)
+        prompt = '\n'.join(msg['content'] for msg in messages)
+        try:
+            answer, usage = await asyncio.wrap_future(future)
+        except Exception as e:
+            self.usage.record(self.__class__.__name__, self.model, time.perf_counter() - start,
+                              error=str(e), prompt=prompt)
+            raise
+        
+        self.usage.record(self.__class__.__name__, self.model, time.perf_counter() - start,
+                          usage=usage, prompt=prompt, completion=answer)
+        return answer
+    
+    def _release_slot(self, _future) -> None:
+        """Done-Callback des Executor-Futures (läuft im Worker-Thread)"""
+        with self._pending_lock:
+            self._pending -= 1
+    
+    @property
+    def pending(self) -> int:
+        """Laufende und wartende Generierungen"""
+        return self._pending
+    
+    async def generate_response(self, prompt: str,
+                                context: Optional[Union[str, Dict[str, Any]]] = None) -> str:
+        """
+        Generiert eine Antwort mit dem lokalen Modell
+        
+        Args:
+            prompt: User Input / Prompt
+            context: Optionaler System-Prompt String oder Dict mit
+                     system_prompt, temperature, max_tokens, response_format
+        
+        Returns:
+            Generierte Antwort
+        """
+        try:
+            context = normalize_context(context)
+            system_prompt = context.get('system_prompt') or DEFAULT_SYSTEM_PROMPT
+            if wants_structured_output(context):
+                system_prompt = constrain_prompt(system_prompt, response_schema(context))
+            messages = [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": prompt}
+            ]
+            
+            logger.info(f"🖥️  Generiere Antwort lokal mit {self.model}...")
+            answer = await self._run(
+                messages,
+                temperature=context.get('temperature', 0.7),
+                max_tokens=context.get('max_tokens', 300)
+            )
+            
+            logger.info(f"✅ Antwort generiert ({len(answer)} Zeichen)")
+            return answer if answer else "Entschuldigung, ich konnte keine Antwort generieren."
+        
+        except Exception as e:
+            logger.error(f"❌ Fehler bei lokaler Antwort-Generierung: {e}")
+            return f"⚠️ Fehler: {str(e)}"
+    
+    async def analyze_intent(self, text: str) -> Dict[str, Any]:
+        """
+        Analysiert die Absicht mit dem lokalen Modell
+        
+        Args:
+            text: Benutzer-Eingabe
+        
+        Returns:
+            Dictionary mit Intent-Informationen
+        """
+        try:
+            messages = [
+                {"role": "system", "content": INTENT_SYSTEM_PROMPT},
+                {"role": "user", "content": text}
+            ]
+            
+            logger.info(f"🎯 Analysiere Intent lokal für: {text[:50]}...")
+            intent_text = (await self._run(messages, temperature=0.0, max_tokens=8)).lower()
+            
+            intent = 'general'
+            for candidate in ('calendar', 'reminder', 'question'):
+                if candidate in intent_text:
+                    intent = candidate
+                    break
+            
+            logger.info(f"✅ Intent erkannt: {intent}")
+            return {
+                'intent': intent,
+                'confidence': 0.7,
+                'entities': [],
+                'raw_text': text
+            }
+        
+        except Exception as e:
+            logger.error(f"❌ Fehler bei lokaler Intent-Analyse: {e}")
+            return {
+                'intent': 'unknown',
+                'confidence': 0.0,
+                'entities': [],
+                'error': str(e)
+            }
+    
+    def close(self) -> None:
+        """Beendet den Thread-Pool"""
+        self._executor.shutdown(wait=False)
@@ -0,0 +1,396 @@
+"""
+Memory Index - Langzeitgedächtnis über die gespeicherten Interaktionen
+
+Der ContextManager vergisst nach 30 Minuten bzw. 10 Nachrichten, die
+InteractionLogger-Datenbank enthält aber die komplette Historie. Dieser
+Index macht frühere Gespräche (user_input/bot_output) durchsuchbar:
+
+- Vektoren wie im Semantic Cache (gehashte n-Gramme, L2-normiert)
+- Ein Shard pro User (kein Zugriff auf Gespräche anderer User)
+- Kleine Shards: NumPy Brute-Force (ein Matrix-Vektor-Produkt)
+- Große Shards: IVF-Index (k-Means-Buckets, nur `nprobe` Buckets werden
+  durchsucht) - einige Millisekunden auch bei 100k Zeilen
+- Inkrementell: neue Interaktionen kommen per Listener des InteractionLoggers
+  dazu, der Bestand wird beim Start im Hintergrund geladen
+
+context_for_prompt() liefert die relevantesten früheren Gespräche innerhalb
+eines Token-Budgets für den System-Prompt.
+"""
+
+import time
+import logging
+import threading
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from src.ai.ai_client import is_error_response
+from src.ai.latency import LatencyHistogram
+from src.ai.prompt_cache import TokenCounter, get_token_counter
+from src.ai.semantic_cache import HashedNgramEmbedder
+
+logger = logging.getLogger(__name__)
+
+# Aktionen ohne verwertbaren Gesprächsinhalt (Fast-Path, abgelöste Anfragen)
+SKIPPED_ACTION_PREFIXES = ('fast_', 'superseded')
+
+# Gewicht der Bot-Antwort im Vektor relativ zur User-Nachricht
+OUTPUT_WEIGHT = 0.5
+
+
+def shorten(text: str, max_tokens: int, counter: TokenCounter) -> str:
+    """Kürzt einen Text vom Ende her auf ein Token-Budget (Anfang bleibt erhalten)"""
+    if counter.count(text) <= max_tokens:
+        return text
+    while text and counter.count(text + ' …') > max_tokens:
+        text = text[:int(len(text) * 0.8)].rstrip()
+    return text + ' …' if text else ''
+
+
+class _Shard:
+    """
+    Vektoren und Einträge eines Users (wachsende Matrix, optional IVF)
+    """
+    
+    def __init__(self, dim: int, capacity: int = 64):
+        self.vectors = np.zeros((capacity, dim), dtype=np.float32)
+        self.entries: List[Dict[str, Any]] = []
+        self.centroids: Optional[np.ndarray] = None
+        self.assign = np.zeros(capacity, dtype=np.int32)
+        self.trained_size = 0
+    
+    def __len__(self) -> int:
+        return len(self.entries)
+    
+    def append(self, vector: np.ndarray, entry: Dict[str, Any]) -> None:
+        """Hängt einen Eintrag an (Kapazität wird verdoppelt)"""
+        size = len(self.entries)
+        if size == len(self.vectors):
+            self.vectors = np.concatenate([self.vectors, np.zeros_like(self.vectors)])
+            self.assign = np.concatenate([self.assign, np.zeros_like(self.assign)])
+        self.vectors[size] = vector
+        if self.centroids is not None:
+            self.assign[size] = int(np.argmax(self.centroids @ vector))
+        self.entries.append(entry)
+    
+    def train(self, nlist: int, iterations: int, sample_size: int, rng: np.random.Generator) -> None:
+        """k-Means (Kosinus) über eine Stichprobe, danach alle Zeilen zuordnen"""
+        size = len(self.entries)
+        vectors = self.vectors[:size]
+        sample = vectors[rng.choice(size, min(size, sample_size), replace=False)]
+        centroids = sample[rng.choice(len(sample), nlist, replace=False)].copy()
+        
+        for _ in range(iterations):
+            labels = np.argmax(sample @ centroids.T, axis=1)
+            for cluster in range(nlist):
+                members = sample[labels == cluster]
+                if len(members):
+                    centroid = members.sum(axis=0)
+                    norm = np.linalg.norm(centroid)
+                    if norm > 0:
+                        centroids[cluster] = centroid / norm
+        
+        self.centroids = centroids
+        for start in range(0, size, 8192):
+            end = min(start + 8192, size)
+            self.assign[start:end] = np.argmax(vectors[start:end] @ centroids.T, axis=1)
+        self.trained_size = size
+    
+    def candidates(self, query: np.ndarray, nprobe: int) -> Optional[np.ndarray]:
+        """Zeilen der `nprobe` nächsten Buckets (None = Brute-Force)"""
+        if self.centroids is None:
+            return None
+        probe = np.argpartition(self.centroids @ query, -nprobe)[-nprobe:] \
+            if nprobe < len(self.centroids) else np.arange(len(self.centroids))
+        selected = np.zeros(len(self.centroids), dtype=bool)
+        selected[probe] = True
+        return np.flatnonzero(selected[self.assign[:len(self.entries)]])
+
+
+class InteractionMemory:
+    """
+    Vektor-Index über frühere Gespräche, pro User
+    """
+    
+    def __init__(self,
+                 top_k: int = 3,
+                 token_budget: int = 300,
+                 min_similarity: float = 0.35,
+                 exclude_recent: int = 5,
+                 index: str = 'auto',
+                 ivf_min_rows: int = 20000,
+                 nprobe: int = 8,
+                 max_entry_tokens: int = 120,
+                 embedder: Optional[HashedNgramEmbedder] = None,
+                 counter: Optional[TokenCounter] = None,
+                 seed: int = 0):
+        """
+        Args:
+            top_k: Max. Anzahl früherer Gespräche im Prompt
+            token_budget: Max. Token aller eingefügten Gespräche zusammen
+            min_similarity: Mindest-Ähnlichkeit (0-1) für einen Treffer
+            exclude_recent: Die letzten N Gespräche eines Users überspringen
+                            (stehen ohnehin im Kurzzeit-Kontext)
+            index: 'flat' (Brute-Force), 'ivf' oder 'auto' (IVF ab ivf_min_rows)
+            ivf_min_rows: Ab dieser Shard-Größe wird der IVF-Index trainiert
+            nprobe: Anzahl durchsuchter IVF-Buckets pro Anfrage
+            max_entry_tokens: Max. Token pro eingefügtem Gespräch
+            embedder: Vektorisierer (default: HashedNgramEmbedder mit 256 Dimensionen)
+            counter: Token-Zähler (default: get_token_counter())
+            seed: Zufalls-Seed für das IVF-Training
+        """
+        if index not in ('flat', 'ivf', 'auto'):
+            raise ValueError(f"Unbekannter Index-Typ: {index}")
+        
+        self.top_k = top_k
+        self.token_budget = token_budget
+        self.min_similarity = min_similarity
+        self.exclude_recent = exclude_recent
+        self.index = index
+        self.ivf_min_rows = ivf_min_rows if index == 'auto' else (0 if index == 'ivf' else None)
+        self.nprobe = nprobe
+        self.max_entry_tokens = max_entry_tokens
+        self.embedder = embedder or HashedNgramEmbedder(dim=256)
+        self.counter = counter or get_token_counter()
+        
+        self.shards: Dict[int, _Shard] = {}
+        self.last_id = 0  # höchste aus der Datenbank geladene ID
+        self.loaded = False
+        self._pending: List[Dict[str, Any]] = []  # neue Zeilen während des Ladens
+        self.query_latency = LatencyHistogram(min_seconds=0.00001, max_seconds=10.0)
+        self._rng = np.random.default_rng(seed)
+        self._lock = threading.Lock()
+        
+        self.stats = {'indexed': 0, 'skipped': 0, 'queries': 0, 'hits': 0, 'trainings': 0}
+    
+    def embed(self, user_input: str, bot_output: str = '') -> np.ndarray:
+        """
+        Vektor eines Gesprächs (User-Nachricht stärker gewichtet als die Antwort)
+        
+        Args:
+            user_input: Nachricht des Users
+            bot_output: Antwort des Bots
+        
+        Returns:
+            L2-normierter float32 Vektor
+        """
+        vector = self.embedder.embed(user_input)
+        if bot_output:
+            vector = vector + OUTPUT_WEIGHT * self.embedder.embed(bot_output)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
+    
+    def add(self, row: Dict[str, Any]) -> bool:
+        """
+        Nimmt eine gespeicherte Interaktion in den Index auf
+        
+        Args:
+            row: Zeile der Tabelle interactions (id, user_id, user_input,
+                 bot_output, bot_action, timestamp, is_sensitive)
+        
+        Returns:
+            True wenn die Interaktion indexiert wurde
+        """
+        user_input = (row.get('user_input') or '').strip()
+        bot_output = (row.get('bot_output') or '').strip()
+        action = row.get('bot_action') or ''
+        if (row.get('is_sensitive') or not user_input or is_error_response(bot_output)
+                or action.startswith(SKIPPED_ACTION_PREFIXES)):
+            self.stats['skipped'] += 1
+            return False
+        
+        vector = self.embed(user_input, bot_output)
+        entry = {
+            'id': row['id'],
+            'timestamp': row.get('timestamp'),
+            'user_input': user_input,
+            'bot_output': bot_output
+        }
+        
+        with self._lock:
+            shard = self.shards.get(row['user_id'])
+            if shard is None:
+                shard = self.shards[row['user_id']] = _Shard(self.embedder.dim)
+            shard.append(vector, entry)
+            self.stats['indexed'] += 1
+            self._maybe_train(shard)
+        return True
+    
+    def on_interaction(self, row: Dict[str, Any]) -> None:
+        """
+        Listener für den InteractionLogger (neue Zeile gespeichert)
+        
+        Während load() noch läuft, werden neue Zeilen gepuffert und danach
+        in ID-Reihenfolge übernommen.
+        
+        Args:
+            row: Zeile der Tabelle interactions
+        """
+        with self._lock:
+            if not self.loaded:
+                self._pending.append(row)
+                return
+        self.add(row)
+    
+    def _maybe_train(self, shard: _Shard) -> None:
+        """(Neu-)Training des IVF-Index, wenn der Shard groß genug / stark gewachsen ist"""
+        if self.ivf_min_rows is None:
+            return
+        size = len(shard)
+        if size < max(self.ivf_min_rows, 2 * self.nprobe):
+            return
+        if shard.trained_size and size < 2 * shard.trained_size:
+            return
+        
+        start = time.perf_counter()
+        nlist = max(self.nprobe, int(np.sqrt(size)))
+        shard.train(nlist, iterations=8, sample_size=20000, rng=self._rng)
+        self.stats['trainings'] += 1
+        logger.info(f"🗂️  IVF-Index trainiert: {size} Zeilen, {nlist} Buckets "
+                    f"({time.perf_counter() - start:.2f}s)")
+    
+    def load(self, interaction_logger, batch_size: int = 2000) -> int:
+        """
+        Lädt den Bestand der Datenbank (ab der zuletzt indexierten ID)
+        
+        Args:
+            interaction_logger: InteractionLogger
+            batch_size: Zeilen pro Datenbank-Abfrage
+        
+        Returns:
+            Anzahl indexierter Interaktionen
+        """
+        start = time.perf_counter()
+        indexed = 0
+        while True:
+            rows = interaction_logger.get_all_interactions(limit=batch_size, min_id=self.last_id)
+            for row in rows:
+                indexed += int(self.add(row))
+                self.last_id = row['id']
+            if len(rows) < batch_size:
+                break
+        
+        with self._lock:
+            self.loaded = True
+            pending, self._pending = self._pending, []
+        for row in pending:
+            # Während des Ladens gespeicherte Zeilen stehen ggf. schon im Bestand
+            if row['id'] > self.last_id:
+                indexed += int(self.add(row))
+        
+        logger.info(f"🗂️  Langzeitgedächtnis geladen: {indexed} Gespräche von {len(self.shards)} Usern "
+                    f"({time.perf_counter() - start:.1f}s)")
+        return indexed
+    
+    def start_loading(self, interaction_logger) -> threading.Thread:
+        """
+        Lädt den Bestand in einem Hintergrund-Thread (neue Zeilen kommen parallel per add)
+        
+        Args:
+            interaction_logger: InteractionLogger
+        
+        Returns:
+            Gestarteter Daemon-Thread
+        """
+        def run():
+            try:
+                self.load(interaction_logger)
+            except Exception as e:
+                logger.warning(f"⚠️ Langzeitgedächtnis konnte nicht geladen werden: {e}")
+        
+        thread = threading.Thread(target=run, name='adonis-memory-load', daemon=True)
+        thread.start()
+        return thread
+    
+    def search(self, user_id: int, query: str, k: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Ähnlichste frühere Gespräche eines Users
+        
+        Args:
+            user_id: Telegram User ID
+            query: Aktuelle Nachricht
+            k: Anzahl Treffer (default: top_k)
+        
+        Returns:
+            Liste von Dicts mit id, timestamp, user_input, bot_output, similarity
+            (absteigend nach Ähnlichkeit, mindestens min_similarity)
+        """
+        k = k or self.top_k
+        start = time.perf_counter()
+        vector = self.embedder.embed(query)
+        self.stats['queries'] += 1
+        
+        with self._lock:
+            shard = self.shards.get(user_id)
+            searchable = len(shard) - self.exclude_recent if shard is not None else 0
+            if searchable <= 0:
+                return []
+            
+            rows = shard.candidates(vector, self.nprobe)
+            if rows is None:
+                similarities = shard.vectors[:searchable] @ vector
+                rows = np.arange(searchable)
+            else:
+                rows = rows[rows < searchable]
+                similarities = shard.vectors[rows] @ vector
+            
+            if len(rows) > k:
+                top = np.argpartition(similarities, -k)[-k:]
+            else:
+                top = np.arange(len(rows))
+            top = top[np.argsort(similarities[top])[::-1]]
+            
+            results = [
+                {**shard.entries[rows[i]], 'similarity': float(similarities[i])}
+                for i in top if similarities[i] >= self.min_similarity
+            ]
+        
+        self.query_latency.record(time.perf_counter() - start)
+        self.stats['hits'] += len(results)
+        return results
+    
+    def context_for_prompt(self, user_id: int, query: str) -> List[Dict[str, Any]]:
+        """
+        Relevante frühere Gespräche innerhalb des Token-Budgets
+        
+        Args:
+            user_id: Telegram User ID
+            query: Aktuelle Nachricht
+        
+        Returns:
+            Treffer aus search() (user_input/bot_output ggf. gekürzt), zusammen
+            höchstens token_budget Token
+        """
+        selected = []
+        used = 0
+        for hit in self.search(user_id, query):
+            user_input = shorten(hit['user_input'], self.max_entry_tokens // 2, self.counter)
+            bot_output = shorten(hit['bot_output'], self.max_entry_tokens // 2, self.counter)
+            tokens = self.counter.count(user_input) + self.counter.count(bot_output)
+            if used + tokens > self.token_budget:
+                break
+            used += tokens
+            selected.append({**hit, 'user_input': user_input, 'bot_output': bot_output})
+        return selected
+    
+    def __len__(self) -> int:
+        return sum(len(shard) for shard in self.shards.values())
+    
+    def get_statistics(self) -> Dict[str, Any]:
+        """
+        Zähler und Suchlatenz für Admin-Befehle
+        
+        Returns:
+            Dict mit indexed, skipped, queries, hits, trainings, entries, users,
+            loaded, p50_ms, p95_ms
+        """
+        p50 = self.query_latency.quantile(0.5)
+        p95 = self.query_latency.quantile(0.95)
+        return {
+            **self.stats,
+            'entries': len(self),
+            'users': len(self.shards),
+            'loaded': self.loaded,
+            'p50_ms': p50 * 1000 if p50 is not None else None,
+            'p95_ms': p95 * 1000 if p95 is not None else None
+        }
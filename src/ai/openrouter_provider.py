@@ -3,10 +3,24 @@ OpenRouter Provider - Gateway zu verschiedenen Open-Source Modellen
 """
 
 import os
+import json
+import time
+import asyncio
 import logging
-from typing import Optional, Dict, Any, List
-import requests
-from src.ai.ai_client import AIProvider
+from typing import Optional, Dict, Any, List, Union, AsyncIterator, Callable
+from src.ai.ai_client import AIProvider, normalize_context
+from src.ai.circuit_breaker import CircuitOpenError, ProviderGuard, is_provider_failure
+from src.ai.retry import RetryPolicy
+from src.ai.prompt_cache import get_prompt_cache_stats, supports_cache_control
+from src.ai.structured_output import openrouter_response_format, response_schema
+from src.ai.usage import get_usage_stats
+from src.ai.http_transport import (
+    AsyncHTTPTransport,
+    HTTPStatusError,
+    TransportError,
+    TransportTimeout,
+    get_transport
+)
 
 logger = logging.getLogger(__name__)
 
@@ -30,28 +44,163 @@ class OpenRouterProvider(AIProvider):
         'mistral': 'mistralai/mistral-7b-instruct'
     }
     
-    def __init__(self, api_key: Optional[str] = None, model: Optional[str] = None):
+    # Ungefähre Kosten in USD pro 1000 Token (Routing-Gewichtung)
+    MODEL_COSTS = {
+        'openai/gpt-3.5-turbo': 0.0015,
+        'anthropic/claude-instant-v1': 0.0016,
+        'google/palm-2-codechat-bison': 0.0005,
+        'mistralai/mistral-7b-instruct': 0.0002
+    }
+    
+    # Basis-URL der API (OPENROUTER_BASE_URL, z.B. für den lokalen Fake-Server)
+    DEFAULT_BASE_URL = "https://openrouter.ai/api/v1"
+    
+    def __init__(self, api_key: Optional[str] = None, model: Optional[str] = None,
+                 transport: Optional[AsyncHTTPTransport] = None, base_url: Optional[str] = None):
         """
         Initialisiert den OpenRouter Provider
         
         Args:
             api_key: OpenRouter API Key (optional)
             model: Modell-Name (default: gpt-3.5-turbo)
+            transport: HTTP Transport (default: gemeinsamer Transport)
+            base_url: Basis-URL der API (default: OPENROUTER_BASE_URL oder openrouter.ai)
         """
         self.api_key = api_key or os.getenv('OPENROUTER_API_KEY')
+        self.transport = transport or get_transport()
         model_key = model or os.getenv('OPENROUTER_MODEL', 'gpt-3.5')
         self.model = self.MODELS.get(model_key, self.MODELS['gpt-3.5'])
-        self.api_url = "https://openrouter.ai/api/v1/chat/completions"
+        self.base_url = (base_url or os.getenv('OPENROUTER_BASE_URL') or self.DEFAULT_BASE_URL).rstrip('/')
+        self.api_url = f"{self.base_url}/chat/completions"
+        self.cost_per_1k_tokens = self.MODEL_COSTS.get(self.model, 0.0)
+        
+        # Circuit Breaker + adaptives Timeout (aus p99)
+        self.guard = ProviderGuard.from_env(self.name)
+        
+        # Retries bei 429/503 (Retry-After); abgelaufene Anfragen sind evtl.
+        # schon abgerechnet und werden nicht wiederholt
+        self.retry = RetryPolicy.from_env(self.name)
+        
+        # Ersparnis durch Provider-seitiges Caching des System-Prompt-Prefix
+        self.prompt_cache = get_prompt_cache_stats()
+        
+        # Token, Latenz und Kosten pro Aufruf
+        self.usage = get_usage_stats()
         
         if not self.api_key:
             logger.warning("⚠️  OPENROUTER_API_KEY nicht gesetzt")
         
         logger.info(f"✅ OpenRouter Provider initialisiert mit Modell: {self.model}")
     
-    def _make_request(self, messages: List[Dict[str, str]], 
-                      temperature: float = 0.7, 
-                      max_tokens: int = 150,
-                      timeout: int = 30) -> Dict[str, Any]:
+    # OpenRouter liefert Token-Streams per Server-Sent Events
+    supports_streaming = True
+    
+    def _headers(self) -> Dict[str, str]:
+        """
+        Erstellt die HTTP-Header für OpenRouter
+        
+        Raises:
+            Exception wenn kein API Key gesetzt ist
+        """
+        if not self.api_key:
+            raise Exception("OpenRouter API Key fehlt - setze OPENROUTER_API_KEY in .env")
+        
+        return {
+            "Authorization": f"Bearer {self.api_key}",
+            "HTTP-Referer": "https://github.com/wvusaah/AdonisAI",
+            "X-Title": "AdonisAI",
+            "Content-Type": "application/json"
+        }
+    
+    def _build_messages(self, prompt: str, context: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Erstellt Chat-Messages im OpenAI-Format
+        
+        Ist ein statischer Prefix markiert (system_prefix), bekommt er bei
+        Modellen mit expliziten Cache-Breakpoints `cache_control`; andere
+        Modelle cachen den gleichbleibenden Anfang automatisch.
+        
+        Args:
+            prompt: User Input
+            context: Normalisierter Kontext
+            
+        Returns:
+            Liste mit System- und User-Message
+        """
+        system_prompt = context.get('system_prompt') or \
+            'Du bist AdonisAI, ein hilfreicher persönlicher Assistent auf Deutsch.'
+        
+        system_content: Any = system_prompt
+        prefix = context.get('system_prefix')
+        if prefix and system_prompt.startswith(prefix) and supports_cache_control(self.model):
+            system_content = [{"type": "text", "text": prefix, "cache_control": {"type": "ephemeral"}}]
+            if len(system_prompt) > len(prefix):
+                system_content.append({"type": "text", "text": system_prompt[len(prefix):]})
+        
+        return [
+            {"role": "system", "content": system_content},
+            {"role": "user", "content": prompt}
+        ]
+    
+    def _record_prompt_cache(self, context: Dict[str, Any], usage: Optional[Dict[str, Any]],
+                             seconds: float) -> None:
+        """Meldet Token-/Latenz-Ersparnis einer Anfrage mit statischem Prefix"""
+        prefix = context.get('system_prefix')
+        if prefix:
+            self.prompt_cache.record(self.model, prefix, usage, seconds)
+    
+    def _record_usage(self, start: float, messages: List[Dict[str, Any]],
+                      usage: Optional[Dict[str, Any]] = None,
+                      ttfb: Optional[float] = None,
+                      streamed: bool = False,
+                      error: Optional[str] = None,
+                      completion: Optional[str] = None) -> None:
+        """
+        Erfasst Token, Dauer und Kosten eines Aufrufs (siehe src/ai/usage.py)
+        
+        Args:
+            start: perf_counter beim Start des Aufrufs
+            messages: Gesendete Messages (für die Token-Schätzung ohne usage)
+            usage: `usage` der API
+            ttfb: Zeit bis zum ersten Byte / Fragment
+            streamed: True bei Streaming
+            error: Fehlermeldung
+            completion: Antworttext (für die Token-Schätzung ohne usage)
+        """
+        prompt = None
+        if not usage:
+            prompt = '\n'.join(
+                ''.join(part.get('text', '') for part in msg['content'])
+                if isinstance(msg['content'], list) else msg['content']
+                for msg in messages
+            )
+        self.usage.record(
+            self.__class__.__name__, self.model, time.perf_counter() - start,
+            usage=usage, ttfb=ttfb, streamed=streamed, error=error,
+            cost_per_1k_tokens=self.cost_per_1k_tokens, prompt=prompt, completion=completion
+        )
+    
+    @staticmethod
+    def _response_format(context: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        `response_format` für strukturierte Ausgabe (JSON-Schema aus dem Kontext)
+        
+        Args:
+            context: Normalisierter Kontext
+            
+        Returns:
+            response_format oder None für Freitext
+        """
+        schema = response_schema(context)
+        if schema is None:
+            return None
+        return openrouter_response_format(schema)
+    
+    async def _make_request(self, messages: List[Dict[str, str]], 
+                            temperature: float = 0.7, 
+                            max_tokens: int = 150,
+                            timeout: int = 30,
+                            response_format: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """
         Macht einen API-Request zu OpenRouter
         
@@ -59,23 +208,16 @@ class OpenRouterProvider(AIProvider):
             messages: Chat-Messages (OpenAI-Format)
             temperature: Kreativität (0-1)
             max_tokens: Max. Antwort-Länge
-            timeout: Timeout in Sekunden
+            timeout: Max. Timeout pro Versuch in Sekunden (wird aus p99 verkürzt)
+            response_format: Optionales Ausgabeformat (JSON-Schema)
             
         Returns:
             API Response
             
         Raises:
-            Exception bei API-Fehlern
+            Exception bei API-Fehlern oder offenem Circuit Breaker
         """
-        if not self.api_key:
-            raise Exception("OpenRouter API Key fehlt - setze OPENROUTER_API_KEY in .env")
-        
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "HTTP-Referer": "https://github.com/wvusaah/AdonisAI",
-            "X-Title": "AdonisAI",
-            "Content-Type": "application/json"
-        }
+        headers = self._headers()
         
         payload = {
             "model": self.model,
@@ -83,52 +225,80 @@ class OpenRouterProvider(AIProvider):
             "temperature": temperature,
             "max_tokens": max_tokens
         }
+        if response_format:
+            payload["response_format"] = response_format
         
+        start = time.perf_counter()
+        timings: Dict[str, float] = {}
         try:
-            response = requests.post(
-                self.api_url,
-                headers=headers,
-                json=payload,
-                timeout=timeout,
-                verify=False  # SSL-Workaround
+            result = await self.retry.call(
+                lambda: self.guard.call(
+                    lambda effective_timeout: self.transport.post_json(
+                        self.api_url,
+                        payload,
+                        headers=headers,
+                        timeout=effective_timeout,
+                        timings=timings
+                    ),
+                    timeout
+                ),
+                idempotent=False
+            )
+            choices = result.get('choices') or [{}]
+            self._record_usage(
+                start, messages, usage=result.get('usage'),
+                ttfb=timings['headers_at'] - start if 'headers_at' in timings else None,
+                completion=(choices[0].get('message') or {}).get('content')
             )
-            response.raise_for_status()
-            return response.json()
+            return result
+            
+        except asyncio.CancelledError:
+            # Abgelöste Anfrage (neuere Nachricht) - zählt trotzdem zum Kontingent
+            self._record_usage(start, messages, error="Abgebrochen")
+            raise
             
-        except requests.exceptions.Timeout:
+        except CircuitOpenError as e:
+            self._record_usage(start, messages, error=str(e))
+            logger.warning(f"🔴 {e}")
+            raise Exception(str(e))
+            
+        except TransportTimeout:
+            self._record_usage(start, messages, error="API Timeout")
             logger.error("⏱️  OpenRouter API Timeout")
             raise Exception("API Timeout")
             
-        except requests.exceptions.RequestException as e:
+        except TransportError as e:
+            self._record_usage(start, messages, error=str(e))
             logger.error(f"❌ OpenRouter API Fehler: {e}")
-            if hasattr(e.response, 'text'):
-                logger.error(f"Response: {e.response.text}")
+            if isinstance(e, HTTPStatusError) and e.body:
+                logger.error(f"Response: {e.body}")
             raise Exception(f"API Fehler: {str(e)}")
     
-    def generate_response(self, prompt: str, context: Optional[str] = None) -> str:
+    async def generate_response(self, prompt: str,
+                                context: Optional[Union[str, Dict[str, Any]]] = None) -> str:
         """
-        Generiert eine Antwort über OpenRouter (synchron)
+        Generiert eine Antwort über OpenRouter
         
         Args:
             prompt: User Input / Prompt
-            context: Optionaler System-Prompt String
+            context: Optionaler System-Prompt String oder Dict mit
+                     system_prompt, temperature, max_tokens, response_format
             
         Returns:
             Generierte Antwort
         """
         try:
-            # System-Prompt
-            system_prompt = context if context else \
-                'Du bist AdonisAI, ein hilfreicher persönlicher Assistent auf Deutsch.'
-            
             # Messages im OpenAI-Format
-            messages = [
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": prompt}
-            ]
+            context = normalize_context(context)
+            messages = self._build_messages(prompt, context)
+            temperature = context.get('temperature', 0.8)
+            max_tokens = context.get('max_tokens', 500)
             
             logger.info(f"🤖 Generiere Antwort mit {self.model}...")
-            result = self._make_request(messages, temperature=0.8, max_tokens=500)
+            start = time.perf_counter()
+            result = await self._make_request(messages, temperature=temperature, max_tokens=max_tokens,
+                                              response_format=self._response_format(context))
+            self._record_prompt_cache(context, result.get('usage'), time.perf_counter() - start)
             
             # Parse Response
             if 'choices' in result and len(result['choices']) > 0:
@@ -143,6 +313,148 @@ class OpenRouterProvider(AIProvider):
             logger.error(f"❌ Fehler bei Antwort-Generierung: {e}")
             return f"⚠️ Fehler: {str(e)}"
     
+    async def stream_response(self, prompt: str,
+                              context: Optional[Union[str, Dict[str, Any]]] = None,
+                              timeout: int = 60) -> AsyncIterator[str]:
+        """
+        Streamt eine Antwort Token für Token (SSE, stream: true)
+        
+        Args:
+            prompt: User Input / Prompt
+            context: Optionaler System-Prompt String oder Parameter-Dict
+            timeout: Obergrenze des Gesamt-Timeouts für den Stream in Sekunden
+                     (das tatsächliche Timeout passt sich der Stream-Dauer an)
+            
+        Yields:
+            Text-Fragmente in Reihenfolge
+            
+        Raises:
+            Exception bei API-Fehlern oder offenem Circuit Breaker
+        """
+        context = normalize_context(context)
+        payload = {
+            "model": self.model,
+            "messages": self._build_messages(prompt, context),
+            "temperature": context.get('temperature', 0.8),
+            "max_tokens": context.get('max_tokens', 500),
+            "stream": True,
+            # Token-Verbrauch im letzten SSE-Fragment
+            "usage": {"include": True}
+        }
+        response_format = self._response_format(context)
+        if response_format:
+            payload["response_format"] = response_format
+        
+        logger.info(f"🌊 Streame Antwort mit {self.model}...")
+        # Wiederholt wird nur, solange noch kein Fragment angekommen ist
+        start = time.perf_counter()
+        reported: Dict[str, Any] = {}
+        
+        def on_usage(usage: Dict[str, Any]) -> None:
+            reported.update(usage)
+            self._record_prompt_cache(context, usage, time.perf_counter() - start)
+        
+        stream = self.retry.stream(
+            lambda: self._stream_attempt(payload, timeout, on_usage=on_usage),
+            idempotent=False
+        )
+        first_at = None
+        parts: List[str] = []
+        error = None
+        try:
+            async for delta in stream:
+                if first_at is None:
+                    first_at = time.perf_counter()
+                parts.append(delta)
+                yield delta
+                
+        except TransportTimeout:
+            error = "API Timeout"
+            raise Exception(error)
+            
+        except TransportError as e:
+            error = f"API Fehler: {str(e)}"
+            raise Exception(error)
+        
+        except Exception as e:
+            error = str(e)
+            raise
+        
+        finally:
+            await stream.aclose()
+            # Auch abgebrochene Streams (z.B. Aktion erkannt) werden erfasst
+            self._record_usage(
+                start, payload['messages'], usage=reported or None,
+                ttfb=first_at - start if first_at is not None else None,
+                streamed=True, error=error, completion=''.join(parts)
+            )
+    
+    async def _stream_attempt(self, payload: Dict[str, Any], timeout: float,
+                              on_usage: Optional[Callable[[Dict[str, Any]], None]] = None
+                              ) -> AsyncIterator[str]:
+        """
+        Ein Stream-Versuch mit Circuit Breaker und adaptivem Timeout
+        
+        Args:
+            payload: Request Payload (stream: true)
+            timeout: Obergrenze des Gesamt-Timeouts in Sekunden
+            on_usage: Wird mit `usage` aufgerufen, sobald der Stream ihn meldet
+            
+        Yields:
+            Text-Fragmente in Reihenfolge
+            
+        Raises:
+            CircuitOpenError, TransportError (unverändert für die Retry-Policy)
+        """
+        self.guard.breaker.check()
+        effective = self.guard.effective_timeout(timeout, stream=True)
+        start = time.perf_counter()
+        
+        try:
+            async for data in self.transport.stream_sse(
+                self.api_url,
+                payload,
+                headers=self._headers(),
+                timeout=effective
+            ):
+                try:
+                    chunk = json.loads(data)
+                except json.JSONDecodeError:
+                    logger.debug(f"Ungültiges SSE-Fragment ignoriert: {data[:80]}")
+                    continue
+                
+                if chunk.get('usage') and on_usage is not None:
+                    on_usage(chunk['usage'])
+                
+                choices = chunk.get('choices') or []
+                if choices:
+                    delta = choices[0].get('delta', {}).get('content')
+                    if delta:
+                        yield delta
+            
+            self.guard.stream_timeouts.record(time.perf_counter() - start)
+            self.guard.breaker.record_success()
+            
+        except TransportTimeout:
+            logger.error(f"⏱️  OpenRouter Stream Timeout ({effective:.1f}s)")
+            self.guard.stream_timeouts.record_timeout(effective)
+            self.guard.breaker.record_failure()
+            raise
+            
+        except TransportError as e:
+            logger.error(f"❌ OpenRouter Stream Fehler: {e}")
+            if is_provider_failure(e):
+                self.guard.breaker.record_failure()
+            else:
+                self.guard.breaker.release()
+            if isinstance(e, HTTPStatusError) and e.body:
+                logger.error(f"Response: {e.body}")
+            raise
+        
+        finally:
+            # Abgebrochener Stream (z.B. verlorener Hedge) ohne Ergebnis
+            self.guard.breaker.release()
+    
     async def analyze_intent(self, text: str) -> Dict[str, Any]:
         """
         Analysiert die Absicht über OpenRouter
@@ -170,7 +482,7 @@ Antworte nur mit dem Intent-Namen."""
             ]
             
             logger.info(f"🎯 Analysiere Intent für: {text[:50]}...")
-            result = self._make_request(messages, temperature=0.3, max_tokens=20, timeout=10)
+            result = await self._make_request(messages, temperature=0.3, max_tokens=20, timeout=10)
             
             # Parse Intent
             if 'choices' in result and len(result['choices']) > 0:
@@ -0,0 +1,231 @@
+"""
+Planner - Intent, Slots und Antwort in einem einzigen Provider-Aufruf
+
+Statt erst den Intent zu klassifizieren und dann eine Antwort zu erzeugen,
+liefert das Modell beides als JSON nach PLAN_SCHEMA: die Aktion, die
+Termin-Slots (Datum, Uhrzeit, Titel, Ort) und den Antworttext. Plan ist
+das typisierte Ergebnis und kann direkt an den Kalender übergeben werden.
+"""
+
+import logging
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Optional, Union
+
+from src.ai.structured_output import CALENDAR_ACTIONS, parse_action
+from src.utils.nlp_utils import parse_event_from_text
+
+logger = logging.getLogger(__name__)
+
+REPLY = 'reply'
+
+SLOT_NAMES = ('date', 'time', 'title', 'location')
+
+WEEKDAYS = ['Montag', 'Dienstag', 'Mittwoch', 'Donnerstag', 'Freitag', 'Samstag', 'Sonntag']
+
+# Aktion und Slots vor dem Antworttext - Aktionen können früh starten
+PLAN_SCHEMA: Dict[str, Any] = {
+    'type': 'object',
+    'properties': {
+        'action': {'type': 'string', 'enum': [REPLY] + list(CALENDAR_ACTIONS)},
+        'timeframe': {'type': ['string', 'null'], 'enum': ['today', 'tomorrow', 'week', None]},
+        'date': {'type': ['string', 'null'], 'description': 'Termin-Datum als YYYY-MM-DD'},
+        'time': {'type': ['string', 'null'], 'description': 'Termin-Uhrzeit als HH:MM'},
+        'title': {'type': ['string', 'null'], 'description': 'Kurzer Termin-Titel mit Namen/Details'},
+        'location': {'type': ['string', 'null'], 'description': 'Ort des Termins'},
+        'text': {'type': ['string', 'null'], 'description': 'Vollständige Termin-Beschreibung'},
+        'reply': {'type': ['string', 'null'], 'description': 'Antworttext für den User'}
+    },
+    'required': ['action', 'timeframe', 'date', 'time', 'title', 'location', 'text', 'reply'],
+    'additionalProperties': False
+}
+
+
+def plan_instructions(today: Optional[date] = None) -> str:
+    """
+    Anweisung für das Plan-Format (mit heutigem Datum für relative Angaben)
+    
+    Args:
+        today: Bezugsdatum (default: heute)
+    """
+    today = today or date.today()
+    return (
+        f"Heute ist {WEEKDAYS[today.weekday()]}, der {today.isoformat()}.\n"
+        "Antworte als JSON-Objekt:\n"
+        "- action: create_event (Termin mit Datum und Uhrzeit anlegen), list_events "
+        "(Termine zeigen, timeframe today|tomorrow|week), next_event oder reply\n"
+        "- date (YYYY-MM-DD), time (HH:MM), title, location: Termin-Details, "
+        "auch aus der vorherigen Konversation, sonst null\n"
+        "- reply: deine Antwort an den User (bei Rückfragen oder normalem Chat)"
+    )
+
+
+def plan_context(context: Optional[Union[str, Dict[str, Any]]] = None,
+                 today: Optional[date] = None) -> Dict[str, Any]:
+    """
+    Kontext für einen Plan-Aufruf: Format-Anweisung und PLAN_SCHEMA
+    
+    Args:
+        context: System-Prompt String oder Kontext-Dict des Aufrufers
+        today: Bezugsdatum (default: heute)
+    
+    Returns:
+        Neues Kontext-Dict mit system_prompt und response_format
+    """
+    if isinstance(context, dict):
+        planned = dict(context)
+    else:
+        planned = {'system_prompt': context} if context else {}
+    system_prompt = planned.get('system_prompt')
+    instructions = plan_instructions(today)
+    planned['system_prompt'] = f"{system_prompt}\n\n{instructions}" if system_prompt else instructions
+    planned['response_format'] = PLAN_SCHEMA
+    return planned
+
+
+def _parse_slot(value: Optional[str], fmt: str) -> Optional[datetime]:
+    """Liest einen Datums-/Zeit-Slot (None wenn leer oder anders formatiert)"""
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value.strip(), fmt)
+    except ValueError:
+        return None
+
+
+class Plan:
+    """
+    Ergebnis von AIClient.plan(): Intent, Slots und Antworttext
+    """
+    
+    def __init__(self,
+                 intent: str,
+                 slots: Optional[Dict[str, Optional[str]]] = None,
+                 timeframe: Optional[str] = None,
+                 text: Optional[str] = None,
+                 reply: Optional[str] = None,
+                 raw: str = '',
+                 structured: bool = True):
+        """
+        Args:
+            intent: reply, create_event, list_events oder next_event
+            slots: date, time, title, location (fehlende als None)
+            timeframe: today, tomorrow oder week (list_events)
+            text: Vollständige Termin-Beschreibung der KI
+            reply: Antworttext für den User
+            raw: Unveränderte Antwort des Providers
+            structured: False wenn das Modell kein JSON geliefert hat
+        """
+        self.intent = intent
+        self.slots = {name: (slots or {}).get(name) for name in SLOT_NAMES}
+        self.timeframe = timeframe
+        self.text = text
+        self.reply = reply
+        self.raw = raw
+        self.structured = structured
+    
+    @classmethod
+    def from_fields(cls, fields: Dict[str, Any], raw: str = '') -> 'Plan':
+        """
+        Erstellt einen Plan aus den Feldern einer JSON-Antwort
+        
+        Args:
+            fields: Felder (z.B. aus parse_action oder ActionStream)
+            raw: Unveränderte Antwort
+        """
+        intent = fields.get('action')
+        if intent not in CALENDAR_ACTIONS:
+            intent = REPLY
+        return cls(
+            intent=intent,
+            slots={name: fields.get(name) for name in SLOT_NAMES},
+            timeframe=fields.get('timeframe'),
+            text=fields.get('text'),
+            reply=fields.get('reply'),
+            raw=raw
+        )
+    
+    @property
+    def is_action(self) -> bool:
+        """True wenn der Bot eine Kalender-Aktion ausführen soll"""
+        return self.intent in CALENDAR_ACTIONS
+    
+    def event_data(self, fallback_text: str, default_duration: int = 60) -> Dict[str, Any]:
+        """
+        Termin-Daten für den Kalender (Format wie parse_event_from_text)
+        
+        Slots haben Vorrang; was fehlt, wird aus dem Text der KI bzw. der
+        User-Nachricht gelesen.
+        
+        Args:
+            fallback_text: User-Nachricht, falls die KI keinen Text geliefert hat
+            default_duration: Dauer in Minuten, wenn keine erkannt wurde
+        
+        Returns:
+            Dict mit title, start, end, duration_minutes, location, description, raw_text
+        """
+        event = parse_event_from_text(self.text or fallback_text)
+        day = _parse_slot(self.slots['date'], '%Y-%m-%d')
+        clock = _parse_slot(self.slots['time'], '%H:%M')
+        parsed = event['start']
+        
+        start = None
+        if day and clock:
+            start = datetime.combine(day.date(), clock.time())
+        elif day:
+            start = datetime.combine(day.date(), parsed.time()) if parsed else None
+        elif clock:
+            start = datetime.combine((parsed or datetime.now()).date(), clock.time())
+        
+        if start is not None:
+            duration = event.get('duration_minutes') or default_duration
+            event['start'] = start
+            event['end'] = start + timedelta(minutes=duration)
+        if self.slots['title']:
+            event['title'] = self.slots['title']
+        if self.slots['location']:
+            event['location'] = self.slots['location']
+        return event
+    
+    def to_action(self) -> Dict[str, Any]:
+        """Felder im Format der JSON-Aktionen (siehe structured_output)"""
+        action = {'action': self.intent, 'timeframe': self.timeframe, 'text': self.text, 'reply': self.reply}
+        action.update(self.slots)
+        return action
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Konvertiert den Plan zu einem Dictionary"""
+        return {
+            'intent': self.intent,
+            'slots': dict(self.slots),
+            'timeframe': self.timeframe,
+            'text': self.text,
+            'reply': self.reply,
+            'structured': self.structured
+        }
+    
+    def __repr__(self):
+        slots = {name: value for name, value in self.slots.items() if value}
+        return f"Plan('{self.intent}', {slots})"
+
+
+def parse_plan(response: str) -> Plan:
+    """
+    Liest einen Plan aus einer Provider-Antwort
+    
+    Liefert das Modell kein JSON, ist die ganze Antwort der Antworttext.
+    
+    Args:
+        response: Antwort des Providers
+    
+    Returns:
+        Plan (structured=False wenn kein JSON erkannt wurde)
+    """
+    fields = parse_action(response)
+    if fields is None:
+        logger.debug("Plan ohne JSON - Antwort wird als Text verwendet")
+        return Plan(REPLY, reply=(response or '').strip(), raw=response or '', structured=False)
+    
+    plan = Plan.from_fields(fields, raw=response)
+    if plan.intent == REPLY and not plan.reply:
+        plan.reply = fields.get('text') or ''
+    return plan
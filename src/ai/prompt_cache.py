@@ -0,0 +1,248 @@
+"""
+Prompt Cache - Statischer System-Prompt-Prefix und Provider-seitiges Caching
+
+Der System-Prompt des Bots besteht aus einem großen statischen Teil
+(Regeln, Aktionsformate, Beispiele) und einem kleinen dynamischen Teil
+(Historie, aktuelle Nachricht). Steht der statische Teil immer unverändert
+am Anfang, können Provider ihn cachen:
+
+- Anthropic/Gemini über OpenRouter: expliziter `cache_control` Breakpoint
+- OpenAI, DeepSeek u.a.: automatisches Prefix-Caching (ab ~1024 Token)
+
+Die Token des Prefix werden einmal lokal gezählt (tiktoken wenn
+installiert, sonst Schätzung) und mit den vom Provider gemeldeten
+`cached_tokens` pro Anfrage als Ersparnis protokolliert.
+"""
+
+import re
+import math
+import hashlib
+import logging
+from functools import lru_cache
+from typing import Any, Dict, Optional
+
+from src.ai.latency import LatencyHistogram
+
+logger = logging.getLogger(__name__)
+
+# Modelle mit explizitem cache_control (OpenRouter Modell-ID Präfix)
+CACHE_CONTROL_PREFIXES = ('anthropic/', 'google/gemini')
+
+# Darunter cachen die meisten Provider nicht
+MIN_CACHEABLE_TOKENS = 1024
+
+_TOKEN_PATTERN = re.compile(r'\w+|[^\w\s]', re.UNICODE)
+
+
+def supports_cache_control(model: str) -> bool:
+    """
+    Prüft ob ein OpenRouter-Modell explizite cache_control Breakpoints nutzt
+    
+    Args:
+        model: OpenRouter Modell-ID (z.B. 'anthropic/claude-instant-v1')
+    """
+    return model.startswith(CACHE_CONTROL_PREFIXES)
+
+
+class TokenCounter:
+    """
+    Zählt Token lokal (tiktoken wenn installiert, sonst BPE-Schätzung)
+    """
+    
+    def __init__(self, encoding: str = 'cl100k_base'):
+        """
+        Args:
+            encoding: tiktoken Encoding
+        """
+        self.encoding = None
+        try:
+            import tiktoken
+            self.encoding = tiktoken.get_encoding(encoding)
+        except Exception:
+            logger.debug("tiktoken nicht verfügbar - Token werden geschätzt")
+    
+    @property
+    def exact(self) -> bool:
+        """True wenn ein echter Tokenizer verwendet wird"""
+        return self.encoding is not None
+    
+    def count(self, text: str) -> int:
+        """
+        Anzahl Token eines Textes
+        
+        Args:
+            text: Text
+        
+        Returns:
+            Token-Anzahl (geschätzt: Satzzeichen einzeln, Wörter je ~4 Zeichen)
+        """
+        if not text:
+            return 0
+        if self.encoding is not None:
+            return len(self.encoding.encode(text))
+        return sum(max(1, math.ceil(len(token) / 4)) for token in _TOKEN_PATTERN.findall(text))
+
+
+_default_counter: Optional[TokenCounter] = None
+
+
+def get_token_counter() -> TokenCounter:
+    """
+    Gibt den gemeinsamen TokenCounter zurück
+    
+    Returns:
+        TokenCounter Singleton
+    """
+    global _default_counter
+    if _default_counter is None:
+        _default_counter = TokenCounter()
+    return _default_counter
+
+
+@lru_cache(maxsize=32)
+def prefix_tokens(prefix: str) -> int:
+    """
+    Token eines Prompt-Prefix (einmal gezählt, danach aus dem Cache)
+    
+    Args:
+        prefix: Statischer Prompt-Teil
+    """
+    return get_token_counter().count(prefix)
+
+
+class PromptPrefix:
+    """
+    Statischer Anfang eines System-Prompts
+    """
+    
+    def __init__(self, text: str):
+        """
+        Args:
+            text: Statischer Prompt-Teil (ändert sich zwischen Anfragen nicht)
+        """
+        self.text = text
+        self.tokens = prefix_tokens(text)
+        self.key = hashlib.sha256(text.encode('utf-8')).hexdigest()[:12]
+        
+        if self.tokens < MIN_CACHEABLE_TOKENS:
+            logger.info(f"💾 Prompt-Prefix {self.key}: {self.tokens} Token "
+                        f"(unter {MIN_CACHEABLE_TOKENS}, automatisches Caching greift evtl. nicht)")
+        else:
+            logger.info(f"💾 Prompt-Prefix {self.key}: {self.tokens} Token")
+    
+    def context(self, suffix: str, live_state: bool = False) -> Dict[str, Any]:
+        """
+        Kontext mit vollständigem System-Prompt und markiertem Prefix
+        
+        Args:
+            suffix: Dynamischer Teil (Historie, aktuelle Nachricht)
+            live_state: Suffix enthält Live-Kalenderdaten (Antwort nicht cachen)
+        
+        Returns:
+            Dict mit system_prompt, system_prefix, system_suffix (und live_state falls gesetzt)
+        """
+        context = {'system_prompt': self.text + suffix, 'system_prefix': self.text, 'system_suffix': suffix}
+        if live_state:
+            context['live_state'] = True
+        return context
+
+
+class PromptCacheStats:
+    """
+    Token- und Latenz-Ersparnis durch Provider-seitiges Prompt-Caching
+    """
+    
+    def __init__(self):
+        self.hit_latency = LatencyHistogram()
+        self.miss_latency = LatencyHistogram()
+        self.last: Optional[Dict[str, Any]] = None
+        
+        self.stats = {
+            'requests': 0,
+            'hits': 0,
+            'unreported': 0,
+            'prompt_tokens': 0,
+            'cached_tokens': 0,
+            'prefix_tokens': 0
+        }
+    
+    def record(self, model: str, prefix: str, usage: Optional[Dict[str, Any]], seconds: float) -> Dict[str, Any]:
+        """
+        Protokolliert eine Anfrage mit Prompt-Prefix
+        
+        Args:
+            model: Modell-ID
+            prefix: Statischer Prompt-Teil der Anfrage
+            usage: `usage` aus der Provider-Antwort (prompt_tokens_details.cached_tokens)
+            seconds: Dauer der Anfrage
+        
+        Returns:
+            Ersparnis dieser Anfrage (model, prefix_tokens, prompt_tokens,
+            cached_tokens, seconds, saved_seconds)
+        """
+        usage = usage or {}
+        details = usage.get('prompt_tokens_details') or {}
+        cached = details.get('cached_tokens')
+        prefix_count = prefix_tokens(prefix)
+        
+        self.stats['requests'] += 1
+        self.stats['prefix_tokens'] += prefix_count
+        self.stats['prompt_tokens'] += usage.get('prompt_tokens') or 0
+        if cached is None:
+            self.stats['unreported'] += 1
+        elif cached > 0:
+            self.stats['hits'] += 1
+            self.stats['cached_tokens'] += cached
+        
+        # Ersparnis = Latenz ohne Cache-Treffer (Median) minus aktuelle Latenz
+        baseline = self.miss_latency.quantile(0.5)
+        saved = max(0.0, baseline - seconds) if cached and baseline is not None else None
+        (self.hit_latency if cached else self.miss_latency).record(seconds)
+        
+        self.last = {
+            'model': model,
+            'prefix_tokens': prefix_count,
+            'prompt_tokens': usage.get('prompt_tokens'),
+            'cached_tokens': cached,
+            'seconds': seconds,
+            'saved_seconds': saved
+        }
+        if cached:
+            logger.info(f"💾 Prompt-Cache {model}: {cached}/{usage.get('prompt_tokens', '?')} Token gecacht "
+                        f"(Prefix {prefix_count}), {seconds:.2f}s"
+                        f"{f', ~{saved:.2f}s gespart' if saved else ''}")
+        else:
+            logger.info(f"💾 Prompt-Cache {model}: kein Treffer (Prefix {prefix_count} Token), {seconds:.2f}s")
+        return self.last
+    
+    def get_statistics(self) -> Dict[str, Any]:
+        """
+        Gesamt-Ersparnis
+        
+        Returns:
+            Dict mit requests, hits, hit_rate, cached_tokens, cached_share,
+            p50_hit, p50_miss, unreported
+        """
+        stats = dict(self.stats)
+        stats['hit_rate'] = stats['hits'] / stats['requests'] if stats['requests'] else 0.0
+        stats['cached_share'] = (stats['cached_tokens'] / stats['prompt_tokens']
+                                 if stats['prompt_tokens'] else 0.0)
+        stats['p50_hit'] = self.hit_latency.quantile(0.5)
+        stats['p50_miss'] = self.miss_latency.quantile(0.5)
+        return stats
+
+
+_default_stats: Optional[PromptCacheStats] = None
+
+
+def get_prompt_cache_stats() -> PromptCacheStats:
+    """
+    Gibt die gemeinsame Prompt-Cache-Statistik aller Provider zurück
+    
+    Returns:
+        PromptCacheStats Singleton
+    """
+    global _default_stats
+    if _default_stats is None:
+        _default_stats = PromptCacheStats()
+    return _default_stats
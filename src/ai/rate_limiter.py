@@ -0,0 +1,416 @@
+"""
+Rate Limiter - Token Buckets pro Provider und pro User mit fairer Warteschlange
+
+Die Free-Tier-Limits von HuggingFace und OpenRouter enden bei Bursts in
+429-Antworten. Statt die Provider ins Limit laufen zu lassen, wartet jede
+Anfrage vorher auf einen Token:
+
+- pro User:     eigener Bucket, begrenzt wie oft ein User fragen darf
+- pro Provider: Bucket mit dem Limit des Providers; wartende Anfragen
+                werden reihum pro User bedient (Round Robin), damit ein
+                gesprächiger User die anderen nicht aushungert
+
+estimate_wait() schätzt die Wartezeit, damit der Bot dem User sagen kann,
+dass seine Anfrage in der Warteschlange steht.
+"""
+
+import time
+import asyncio
+import logging
+import contextvars
+from collections import OrderedDict, deque
+from typing import Any, AsyncIterator, Deque, Dict, Hashable, Optional, Tuple, Union
+
+from src.ai.ai_client import AIProvider
+
+logger = logging.getLogger(__name__)
+
+# User der aktuellen Anfrage (wird vom Bot gesetzt, für die faire Warteschlange)
+current_user: contextvars.ContextVar = contextvars.ContextVar('ai_current_user', default=None)
+
+
+def parse_provider_limits(spec: str) -> Dict[str, Tuple[float, float]]:
+    """
+    Liest Provider-Limits aus einem String wie
+    'HuggingFaceProvider=0.5/3,OpenRouterProvider=2/10' (rate/burst)
+    
+    Args:
+        spec: Komma-getrennte Einträge name=rate/burst
+    
+    Returns:
+        Dict Provider-Name -> (rate, burst)
+    """
+    limits = {}
+    for entry in spec.split(','):
+        if '=' not in entry:
+            continue
+        name, values = entry.split('=', 1)
+        rate, _, burst = values.partition('/')
+        limits[name.strip()] = (float(rate), float(burst or rate))
+    return limits
+
+
+class RateLimitExceeded(Exception):
+    """Warteschlange eines Providers ist voll"""
+    
+    def __init__(self, name: str, queued: int):
+        super().__init__(f"{name}: Warteschlange voll ({queued} Anfragen)")
+        self.name = name
+        self.queued = queued
+
+
+class TokenBucket:
+    """
+    Klassischer Token Bucket: `rate` Tokens pro Sekunde, höchstens `capacity`
+    """
+    
+    def __init__(self, rate: float, capacity: float):
+        """
+        Args:
+            rate: Nachfüllrate in Tokens pro Sekunde
+            capacity: Maximale Anzahl Tokens (Burst)
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self._updated = time.monotonic()
+    
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+    
+    def available(self) -> float:
+        """Aktuell verfügbare Tokens (negativ bei Reservierungen)"""
+        self._refill()
+        return self.tokens
+    
+    def wait_time(self, tokens: float = 1.0) -> float:
+        """
+        Sekunden bis `tokens` verfügbar sind
+        
+        Args:
+            tokens: Benötigte Tokens
+        """
+        self._refill()
+        if self.tokens >= tokens:
+            return 0.0
+        return (tokens - self.tokens) / self.rate
+    
+    def try_consume(self, tokens: float = 1.0) -> bool:
+        """Nimmt `tokens`, wenn verfügbar"""
+        self._refill()
+        if self.tokens >= tokens:
+            self.tokens -= tokens
+            return True
+        return False
+    
+    def reserve(self, tokens: float = 1.0) -> float:
+        """
+        Nimmt `tokens` sofort (auch auf Vorschuss)
+        
+        Returns:
+            Sekunden, die der Aufrufer warten muss, bis die Tokens gedeckt sind
+        """
+        wait = self.wait_time(tokens)
+        self.tokens -= tokens
+        return wait
+    
+    def refund(self, tokens: float = 1.0) -> None:
+        """Gibt reservierte Tokens zurück (z.B. bei Abbruch)"""
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens + tokens)
+
+
+class FairQueue:
+    """
+    Warteschlange mit Round Robin über User
+    
+    Jeder User hat eine eigene FIFO; pop() nimmt reihum die älteste
+    Anfrage des nächsten Users.
+    """
+    
+    def __init__(self):
+        self._users: 'OrderedDict[Hashable, Deque[asyncio.Future]]' = OrderedDict()
+    
+    def push(self, user: Hashable, future: asyncio.Future) -> None:
+        """Reiht eine wartende Anfrage ein"""
+        self._users.setdefault(user, deque()).append(future)
+    
+    def pop(self) -> Optional[asyncio.Future]:
+        """Nächste noch wartende Anfrage (abgebrochene werden übersprungen)"""
+        while self._users:
+            user, waiting = next(iter(self._users.items()))
+            future = waiting.popleft()
+            if waiting:
+                self._users.move_to_end(user)
+            else:
+                del self._users[user]
+            if not future.done():
+                return future
+        return None
+    
+    def ahead_of(self, user: Hashable) -> int:
+        """
+        Anfragen, die vor einer neuen Anfrage von `user` bedient werden
+        
+        Bei Round Robin kommt jeder andere User höchstens so oft dran,
+        wie `user` selbst schon wartet (plus einmal für die neue Anfrage).
+        """
+        own = len(self._users.get(user, ()))
+        others = sum(
+            min(len(waiting), own + 1)
+            for other, waiting in self._users.items() if other != user
+        )
+        return own + others
+    
+    def __len__(self) -> int:
+        return sum(len(waiting) for waiting in self._users.values())
+
+
+class RateLimiter:
+    """
+    Token Buckets pro Provider und pro User mit fairer Warteschlange
+    """
+    
+    def __init__(self, provider_rate: float = 1.0, provider_burst: float = 5.0,
+                 user_rate: float = 0.2, user_burst: float = 3.0,
+                 max_queue: int = 100,
+                 provider_limits: Optional[Dict[str, Tuple[float, float]]] = None):
+        """
+        Args:
+            provider_rate: Anfragen pro Sekunde je Provider
+            provider_burst: Burst je Provider
+            user_rate: Anfragen pro Sekunde je User
+            user_burst: Burst je User
+            max_queue: Max. wartende Anfragen je Provider (danach RateLimitExceeded)
+            provider_limits: Eigene (rate, burst) pro Provider-Name oder
+                             Provider-Klasse (z.B. 'HuggingFaceProvider')
+        """
+        self.provider_rate = provider_rate
+        self.provider_burst = provider_burst
+        self.user_rate = user_rate
+        self.user_burst = user_burst
+        self.max_queue = max_queue
+        self.provider_limits = provider_limits or {}
+        
+        self._provider_buckets: Dict[str, TokenBucket] = {}
+        self._user_buckets: Dict[Hashable, TokenBucket] = {}
+        self._queues: Dict[str, FairQueue] = {}
+        self._drainers: Dict[str, asyncio.Task] = {}
+        
+        self.stats = {
+            'granted': 0,
+            'queued': 0,
+            'rejected': 0,
+            'user_throttled': 0,
+            'wait_seconds': 0.0
+        }
+    
+    def _provider_bucket(self, provider: str) -> TokenBucket:
+        bucket = self._provider_buckets.get(provider)
+        if bucket is None:
+            default = (self.provider_rate, self.provider_burst)
+            rate, burst = self.provider_limits.get(
+                provider, self.provider_limits.get(provider.split(':')[0], default)
+            )
+            bucket = TokenBucket(rate, burst)
+            self._provider_buckets[provider] = bucket
+        return bucket
+    
+    def _user_bucket(self, user: Hashable) -> TokenBucket:
+        bucket = self._user_buckets.get(user)
+        if bucket is None:
+            bucket = TokenBucket(self.user_rate, self.user_burst)
+            self._user_buckets[user] = bucket
+        return bucket
+    
+    def _queue(self, provider: str) -> FairQueue:
+        return self._queues.setdefault(provider, FairQueue())
+    
+    async def admit_user(self, user: Hashable) -> float:
+        """
+        Wartet auf einen Token aus dem Bucket des Users
+        
+        Args:
+            user: User-ID
+        
+        Returns:
+            Gewartete Sekunden
+        """
+        bucket = self._user_bucket(user)
+        wait = bucket.reserve()
+        if wait <= 0:
+            return 0.0
+        
+        self.stats['user_throttled'] += 1
+        logger.info(f"🚦 User {user} gedrosselt: {wait:.1f}s Wartezeit")
+        try:
+            await asyncio.sleep(wait)
+        except asyncio.CancelledError:
+            bucket.refund()
+            raise
+        self.stats['wait_seconds'] += wait
+        return wait
+    
+    async def acquire(self, provider: str, user: Optional[Hashable] = None) -> float:
+        """
+        Wartet auf einen Token des Providers (fair reihum pro User)
+        
+        Args:
+            provider: Provider-Name
+            user: User-ID (default: current_user)
+        
+        Returns:
+            Gewartete Sekunden
+        
+        Raises:
+            RateLimitExceeded: Warteschlange des Providers ist voll
+        """
+        if user is None:
+            user = current_user.get()
+        bucket = self._provider_bucket(provider)
+        queue = self._queue(provider)
+        
+        if not len(queue) and bucket.try_consume():
+            self.stats['granted'] += 1
+            return 0.0
+        
+        if len(queue) >= self.max_queue:
+            self.stats['rejected'] += 1
+            raise RateLimitExceeded(provider, len(queue))
+        
+        future = asyncio.get_running_loop().create_future()
+        queue.push(user, future)
+        self.stats['queued'] += 1
+        self._ensure_drainer(provider)
+        
+        start = time.monotonic()
+        await future
+        waited = time.monotonic() - start
+        self.stats['granted'] += 1
+        self.stats['wait_seconds'] += waited
+        return waited
+    
+    def _ensure_drainer(self, provider: str) -> None:
+        task = self._drainers.get(provider)
+        if task is None or task.done():
+            self._drainers[provider] = asyncio.ensure_future(self._drain(provider))
+    
+    async def _drain(self, provider: str) -> None:
+        """Vergibt Tokens an die Warteschlange, sobald der Bucket sie hergibt"""
+        bucket = self._provider_bucket(provider)
+        queue = self._queue(provider)
+        
+        while len(queue):
+            wait = bucket.wait_time()
+            if wait > 0:
+                await asyncio.sleep(wait)
+                continue
+            future = queue.pop()
+            if future is None:
+                break
+            bucket.try_consume()
+            future.set_result(None)
+    
+    def estimate_wait(self, user: Optional[Hashable] = None,
+                      provider: Optional[str] = None) -> float:
+        """
+        Geschätzte Wartezeit für eine neue Anfrage
+        
+        Args:
+            user: User-ID (ohne: nur Provider)
+            provider: Provider-Name (ohne: nur User)
+        
+        Returns:
+            Sekunden (0 = sofort)
+        """
+        wait = 0.0
+        if user is not None:
+            wait = self._user_bucket(user).wait_time()
+        
+        if provider is not None:
+            bucket = self._provider_bucket(provider)
+            ahead = self._queue(provider).ahead_of(user)
+            needed = ahead + 1 - bucket.available()
+            if needed > 0:
+                wait = max(wait, needed / bucket.rate)
+        
+        return wait
+    
+    def get_statistics(self) -> Dict[str, Any]:
+        """
+        Zähler für Admin-Befehle
+        
+        Returns:
+            Dict mit granted, queued, rejected, user_throttled,
+            avg_wait und aktuell wartenden Anfragen pro Provider
+        """
+        stats = dict(self.stats)
+        waited = stats['queued'] + stats['user_throttled']
+        stats['avg_wait'] = stats['wait_seconds'] / waited if waited else 0.0
+        stats['waiting'] = {name: len(queue) for name, queue in self._queues.items() if len(queue)}
+        return stats
+
+
+class RateLimitedProvider(AIProvider):
+    """
+    AIProvider-Wrapper, der vor jedem Aufruf einen Provider-Token holt
+    
+    Gehört unter den Antwort-Cache: Cache-Treffer verbrauchen keine Tokens.
+    Provider mit Micro-Batching (HuggingFace) bekommen den Limiter angehängt
+    und holen den Token selbst - einen pro Upstream-Request, nicht pro Prompt.
+    """
+    
+    def __init__(self, provider: AIProvider, limiter: RateLimiter):
+        """
+        Args:
+            provider: Eigentlicher AI Provider
+            limiter: Gemeinsamer RateLimiter
+        """
+        self.provider = provider
+        self.limiter = limiter
+        self.model = getattr(provider, 'model', provider.__class__.__name__)
+        
+        # Gebündelte Prompts teilen sich einen Request und damit einen Token
+        self.batched = getattr(provider, 'batcher', None) is not None and hasattr(provider, 'rate_limiter')
+        if self.batched:
+            provider.rate_limiter = limiter
+        self.supports_streaming = provider.supports_streaming
+        self.cost_per_1k_tokens = provider.cost_per_1k_tokens
+    
+    @property
+    def name(self) -> str:
+        """Name des eigentlichen Providers (Metriken gelten für ihn)"""
+        return self.provider.name
+    
+    @property
+    def guard(self):
+        """Circuit Breaker des eigentlichen Providers (falls vorhanden)"""
+        return getattr(self.provider, 'guard', None)
+    
+    async def generate_response(self, prompt: str,
+                                context: Optional[Union[str, Dict[str, Any]]] = None) -> str:
+        """Antwort nach Token des Providers"""
+        if not self.batched:
+            await self.limiter.acquire(self.name)
+        return await self.provider.generate_response(prompt, context)
+    
+    async def stream_response(self, prompt: str,
+                              context: Optional[Union[str, Dict[str, Any]]] = None
+                              ) -> AsyncIterator[str]:
+        """Stream nach Token des Providers"""
+        if not self.batched:
+            await self.limiter.acquire(self.name)
+        stream = self.provider.stream_response(prompt, context)
+        try:
+            async for chunk in stream:
+                yield chunk
+        finally:
+            await stream.aclose()
+    
+    async def analyze_intent(self, text: str) -> Dict[str, Any]:
+        """Intent-Analyse nach Token des Providers"""
+        if not self.batched:
+            await self.limiter.acquire(self.name)
+        return await self.provider.analyze_intent(text)
@@ -0,0 +1,164 @@
+"""
+Replay Benchmark - Echte Nachrichten aus der Interaktions-Datenbank erneut abspielen
+
+Statt fester Beispiel-Prompts (scripts/benchmark_providers.py) werden die
+gespeicherten `user_input` Zeilen des InteractionLoggers gegen einen
+beliebigen AIProvider geschickt - echter Provider, lokales Modell oder der
+Fake LLM Server. So wird jeder Provider-/Modellwechsel am echten Mix aus
+Kalender-Befehlen, Chat und langen Texten gemessen.
+
+Gemessen werden Durchsatz, Latenz-Quantile (p50/p95/p99), Fehlerquote und
+wie oft sich Aktionen so parsen lassen, wie _process_ai_response sie
+ausführen würde (parse_action + CALENDAR_ACTIONS). Abgeschnittenes JSON
+(z.B. max_tokens zu knapp) liest parse_action trotzdem als Aktion - es wird
+separat als `truncated` gezählt und nicht als Erfolg.
+"""
+
+import time
+import asyncio
+import logging
+from typing import Any, Callable, Dict, List, Optional, Union
+
+from src.ai.ai_client import AIProvider, is_error_response
+from src.ai.structured_output import CALENDAR_ACTIONS, StreamingJSONParser
+
+logger = logging.getLogger(__name__)
+
+# Interaktionen ohne Provider-Aufruf (lokaler Fast-Path, abgelöste Anfragen)
+SKIPPED_ACTION_PREFIXES = ('fast_', 'superseded')
+
+ContextSource = Union[None, str, Dict[str, Any], Callable[[str], Any]]
+
+
+def percentile(values: List[float], q: float) -> Optional[float]:
+    """Quantil einer sortierten Liste (nächster Rang)"""
+    if not values:
+        return None
+    index = min(len(values) - 1, max(0, int(round(q * len(values) + 0.5)) - 1))
+    return values[index]
+
+
+def load_workload(interaction_logger, limit: Optional[int] = None,
+                  include_fast_path: bool = False) -> List[str]:
+    """
+    Nachrichten aus der Interaktions-Datenbank (ohne sensible Einträge)
+    
+    Args:
+        interaction_logger: InteractionLogger
+        limit: Nur die neuesten N Nachrichten (None = alle)
+        include_fast_path: Auch lokal beantwortete Nachrichten abspielen
+    
+    Returns:
+        user_input Texte in ursprünglicher Reihenfolge
+    """
+    prompts = []
+    for row in interaction_logger.get_all_interactions():
+        action = row.get('bot_action') or ''
+        if not include_fast_path and action.startswith(SKIPPED_ACTION_PREFIXES):
+            continue
+        if (row.get('user_input') or '').strip():
+            prompts.append(row['user_input'])
+    return prompts[-limit:] if limit else prompts
+
+
+def check_action(response: str, structured: bool = False) -> Dict[str, bool]:
+    """
+    Prüft eine Antwort wie _process_ai_response
+    
+    Args:
+        response: Antwort des Providers
+        structured: Strukturierter Modus (jede Antwort soll ein JSON-Objekt sein)
+    
+    Returns:
+        Dict mit attempted (Antwort enthält eine Aktion), parsed (vollständige
+        gültige Aktion bzw. Plan), truncated (Aktion ohne schließende Klammer)
+        und calendar (würde eine Kalender-Aktion ausführen)
+    """
+    parser = StreamingJSONParser()
+    parser.feed(response)
+    action = parser.fields.get('action')
+    valid = action in CALENDAR_ACTIONS or (structured and action == 'reply')
+    return {
+        'attempted': structured or action is not None or '"action"' in response,
+        'parsed': valid and parser.done,
+        'truncated': valid and not parser.done,
+        'calendar': action in CALENDAR_ACTIONS
+    }
+
+
+async def replay(provider: AIProvider,
+                 prompts: List[str],
+                 concurrency: int = 4,
+                 context: ContextSource = None,
+                 timeout: Optional[float] = None,
+                 structured: bool = False) -> Dict[str, Any]:
+    """
+    Spielt die Nachrichten mit begrenzter Parallelität gegen einen Provider ab
+    
+    Args:
+        provider: Zu messender AIProvider
+        prompts: Nachrichten (z.B. aus load_workload)
+        concurrency: Max. gleichzeitige Anfragen
+        context: Kontext für jeden Aufruf oder Funktion Nachricht -> Kontext
+        timeout: Max. Sekunden pro Anfrage (None = ohne Limit)
+        structured: Antworten im strukturierten Format erwartet
+    
+    Returns:
+        Dict mit requests, duration, throughput, p50, p95, p99, max, errors,
+        error_rate, error_kinds, attempted, parsed, truncated, calendar_actions,
+        parse_rate
+    """
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    latencies: List[float] = []
+    error_kinds: Dict[str, int] = {}
+    actions = {'attempted': 0, 'parsed': 0, 'truncated': 0, 'calendar': 0}
+    
+    def fail(kind: str) -> None:
+        error_kinds[kind] = error_kinds.get(kind, 0) + 1
+    
+    async def one(prompt: str) -> None:
+        call_context = context(prompt) if callable(context) else context
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                response = await asyncio.wait_for(provider.generate_response(prompt, call_context), timeout)
+            except asyncio.TimeoutError:
+                fail('timeout')
+                return
+            except Exception as e:
+                fail(type(e).__name__)
+                return
+            elapsed = time.perf_counter() - start
+        
+        if is_error_response(response):
+            fail('error_response')
+            return
+        latencies.append(elapsed)
+        for key, value in check_action(response, structured).items():
+            actions[key] += int(value)
+    
+    start = time.perf_counter()
+    await asyncio.gather(*[one(prompt) for prompt in prompts])
+    duration = time.perf_counter() - start
+    
+    latencies.sort()
+    errors = sum(error_kinds.values())
+    return {
+        'provider': provider.name,
+        'requests': len(prompts),
+        'concurrency': concurrency,
+        'duration': duration,
+        'throughput': len(prompts) / duration if duration > 0 else 0.0,
+        'p50': percentile(latencies, 0.5),
+        'p95': percentile(latencies, 0.95),
+        'p99': percentile(latencies, 0.99),
+        'max': latencies[-1] if latencies else None,
+        'errors': errors,
+        'error_rate': errors / len(prompts) if prompts else 0.0,
+        'error_kinds': error_kinds,
+        'attempted': actions['attempted'],
+        'parsed': actions['parsed'],
+        'truncated': actions['truncated'],
+        'calendar_actions': actions['calendar'],
+        'parse_rate': actions['parsed'] / actions['attempted'] if actions['attempted'] else None
+    }
@@ -0,0 +1,238 @@
+"""
+Request Profiles - Antwort-Länge und Sampling pro Anfrage-Klasse
+
+Bisher bekam jede Anfrage dieselben Parameter (OpenRouter max_tokens=500 /
+temperature=0.8, HuggingFace max_length=100), egal ob "Danke!" oder
+"Schreib mir eine Bewerbung". Hier wird jede Nachricht einer Klasse
+zugeordnet:
+
+- action: Kalender-/Erinnerungs-Aktionen (Antwort-Format muss parsebar sein,
+  daher niedrige Temperatur)
+- chat: kurze Unterhaltung
+- longform: Texte schreiben, erklären, lange Nachrichten
+
+max_tokens jeder Klasse wird aus der beobachteten Antwort-Länge gelernt
+(Quantil der completion_tokens aus `ai_calls` plus Reserve). Stoßen zu viele
+Antworten an das aktuelle Limit, wird es angehoben statt weiter gelernt -
+abgeschnittene Antworten würden das Quantil sonst immer weiter drücken.
+
+Parameter, die der Aufrufer selbst setzt, haben Vorrang.
+"""
+
+import logging
+import threading
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Union
+
+from src.ai.ai_client import normalize_context
+from src.ai.intent_classifier import LocalIntentClassifier
+
+logger = logging.getLogger(__name__)
+
+# Standard-Parameter pro Klasse (bis genug Antworten beobachtet wurden)
+DEFAULT_PROFILES = {
+    'action': {'max_tokens': 300, 'temperature': 0.3, 'min_tokens': 120},
+    'chat': {'max_tokens': 200, 'temperature': 0.8, 'min_tokens': 40},
+    'longform': {'max_tokens': 800, 'temperature': 0.7, 'min_tokens': 200},
+}
+
+# Intents mit Aktion im Antwort-Format
+ACTION_INTENTS = ('calendar', 'reminder')
+
+# Features für ausführliche Antworten
+LONGFORM_FEATURES = ('writing', 'explain')
+
+
+def _percentile(values: List[int], q: float) -> int:
+    """Quantil einer sortierten Liste (nächster Rang)"""
+    index = min(len(values) - 1, max(0, int(round(q * (len(values) - 1)))))
+    return values[index]
+
+
+class RequestProfiles:
+    """
+    Ordnet Nachrichten einer Klasse zu und lernt deren Antwort-Länge
+    """
+    
+    def __init__(self,
+                 profiles: Optional[Dict[str, Dict[str, Any]]] = None,
+                 quantile: float = 0.95,
+                 headroom: float = 1.25,
+                 max_tokens_cap: int = 1500,
+                 longform_words: int = 25,
+                 window: int = 1000,
+                 min_samples: int = 30,
+                 saturation_rate: float = 0.1,
+                 growth: float = 1.5,
+                 refit_every: int = 20,
+                 intent_classifier: Optional[LocalIntentClassifier] = None):
+        """
+        Args:
+            profiles: Start-Parameter pro Klasse (default: DEFAULT_PROFILES)
+            quantile: Dieses Quantil der Antwort-Längen muss ins Limit passen
+            headroom: Reserve auf das Quantil
+            max_tokens_cap: Obergrenze für gelernte Limits
+            longform_words: Nachrichten ab so vielen Wörtern gelten als longform
+            window: So viele letzte Antwort-Längen pro Klasse werden betrachtet
+            min_samples: Mindestanzahl Antworten, bevor gelernt wird
+            saturation_rate: Anteil Antworten am Limit, ab dem es angehoben wird
+            growth: Faktor beim Anheben eines ausgeschöpften Limits
+            refit_every: Neu lernen nach so vielen neuen Antworten einer Klasse
+            intent_classifier: Lokaler Intent-Klassifikator (default: LocalIntentClassifier)
+        """
+        self.profiles = {
+            name: dict(profile) for name, profile in (profiles or DEFAULT_PROFILES).items()
+        }
+        self.quantile = quantile
+        self.headroom = headroom
+        self.max_tokens_cap = max_tokens_cap
+        self.longform_words = longform_words
+        self.min_samples = min_samples
+        self.saturation_rate = saturation_rate
+        self.growth = growth
+        self.refit_every = refit_every
+        self.intent_classifier = intent_classifier or LocalIntentClassifier()
+        
+        self.lengths: Dict[str, Deque[int]] = {name: deque(maxlen=window) for name in self.profiles}
+        self._new_samples = {name: 0 for name in self.profiles}
+        self._lock = threading.Lock()
+        
+        self.stats = {name: {'requests': 0, 'fits': 0, 'raised': 0} for name in self.profiles}
+    
+    def classify(self, message: str) -> str:
+        """
+        Klasse einer Nachricht
+        
+        Args:
+            message: Benutzer-Nachricht
+        
+        Returns:
+            'action', 'chat' oder 'longform'
+        """
+        result = self.intent_classifier.classify(message)
+        if result['intent'] in ACTION_INTENTS:
+            return 'action'
+        if (any(feature in result['features'] for feature in LONGFORM_FEATURES)
+                or len(message.split()) >= self.longform_words):
+            return 'longform'
+        return 'chat'
+    
+    def apply(self, message: str,
+              context: Optional[Union[str, Dict[str, Any]]] = None) -> Dict[str, Any]:
+        """
+        Kontext mit den Parametern der passenden Klasse
+        
+        Args:
+            message: Benutzer-Nachricht
+            context: Kontext des Aufrufs (gesetzte Parameter bleiben erhalten)
+        
+        Returns:
+            Normalisierter Kontext mit max_tokens, max_length und temperature
+        """
+        name = self.classify(message)
+        profile = self.profiles[name]
+        self.stats[name]['requests'] += 1
+        
+        context = normalize_context(context)
+        context.setdefault('max_tokens', profile['max_tokens'])
+        context.setdefault('max_length', profile['max_tokens'])
+        context.setdefault('temperature', profile['temperature'])
+        return context
+    
+    def record(self, message: str, completion_tokens: Optional[int]) -> None:
+        """
+        Merkt sich die Länge einer Antwort
+        
+        Args:
+            message: Benutzer-Nachricht
+            completion_tokens: Token der Antwort (None/0 = unbekannt, ignoriert)
+        """
+        if not completion_tokens:
+            return
+        name = self.classify(message)
+        with self._lock:
+            self.lengths[name].append(completion_tokens)
+            self._new_samples[name] += 1
+            if self._new_samples[name] >= self.refit_every:
+                self._fit(name)
+    
+    def on_interaction(self, row: Dict[str, Any]) -> None:
+        """
+        Listener für den InteractionLogger: längste erfolgreiche Antwort der Interaktion
+        
+        Args:
+            row: Gespeicherte Interaktion inkl. 'ai_calls'
+        """
+        tokens = [
+            call.get('completion_tokens') or 0
+            for call in row.get('ai_calls') or []
+            if not call.get('error')
+        ]
+        if tokens:
+            self.record(row.get('user_input') or '', max(tokens))
+    
+    def load(self, interaction_logger, limit: int = 5000) -> int:
+        """
+        Lernt die Limits aus den gespeicherten Antwort-Längen
+        
+        Args:
+            interaction_logger: InteractionLogger
+            limit: Max. Anzahl der neuesten Interaktionen
+        
+        Returns:
+            Anzahl verwendeter Interaktionen
+        """
+        rows = interaction_logger.get_completion_lengths(limit=limit)
+        with self._lock:
+            for row in reversed(rows):
+                self.lengths[self.classify(row['user_input'] or '')].append(row['completion_tokens'])
+            for name in self.profiles:
+                self._fit(name)
+        
+        logger.info("📐 Anfrage-Profile: " + ', '.join(
+            f"{name} max_tokens={profile['max_tokens']}" for name, profile in self.profiles.items()
+        ) + f" ({len(rows)} Antworten)")
+        return len(rows)
+    
+    def _fit(self, name: str) -> None:
+        """Neues max_tokens einer Klasse (Lock muss gehalten werden)"""
+        self._new_samples[name] = 0
+        lengths = sorted(self.lengths[name])
+        if len(lengths) < self.min_samples:
+            return
+        
+        profile = self.profiles[name]
+        current = profile['max_tokens']
+        saturated = sum(1 for length in lengths if length >= 0.95 * current) / len(lengths)
+        if saturated > self.saturation_rate:
+            # Viele Antworten am Limit: vermutlich abgeschnitten -> anheben
+            limit = int(current * self.growth)
+            self.stats[name]['raised'] += 1
+        else:
+            limit = int(_percentile(lengths, self.quantile) * self.headroom) + 1
+        
+        profile['max_tokens'] = max(profile.get('min_tokens', 1), min(self.max_tokens_cap, limit))
+        self.stats[name]['fits'] += 1
+        if profile['max_tokens'] != current:
+            logger.debug(f"📐 Profil {name}: max_tokens {current} -> {profile['max_tokens']}")
+    
+    def get_statistics(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Parameter und beobachtete Längen pro Klasse
+        
+        Returns:
+            Dict Klasse -> max_tokens, temperature, samples, p50, p95, requests, fits, raised
+        """
+        result = {}
+        with self._lock:
+            for name, profile in self.profiles.items():
+                lengths = sorted(self.lengths[name])
+                result[name] = {
+                    'max_tokens': profile['max_tokens'],
+                    'temperature': profile['temperature'],
+                    'samples': len(lengths),
+                    'p50': _percentile(lengths, 0.5) if lengths else None,
+                    'p95': _percentile(lengths, 0.95) if lengths else None,
+                    **self.stats[name]
+                }
+        return result
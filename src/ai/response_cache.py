@@ -0,0 +1,410 @@
+"""
+Response Cache - LRU/TTL Cache vor AIProvider.generate_response
+
+Zwei Stufen:
+- In-Memory LRU (schnell, pro Prozess)
+- Optional SQLite (überlebt Neustarts, liegt neben data/interactions.db)
+
+Schlüssel ist ein Hash aus normalisiertem Prompt, System-Prompt (ohne den
+dynamischen Teil mit Historie und wiederholter Nachricht), Modell und
+Sampling-Parametern. Anfragen mit Live-Kalenderdaten (Flag `live_state` im
+Kontext, vom Bot gesetzt) werden nie gecacht.
+"""
+
+import re
+import json
+import time
+import sqlite3
+import asyncio
+import hashlib
+import logging
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Optional, Dict, Any, Union, AsyncIterator, Tuple
+
+from src.ai.ai_client import AIProvider, ERROR_PREFIX, normalize_context
+
+logger = logging.getLogger(__name__)
+
+# Kontext-Felder, die keine Sampling-Parameter sind
+NON_PARAM_KEYS = ('system_prompt', 'system_prefix', 'system_suffix', 'live_state', 'no_cache')
+
+def normalize_prompt(prompt: str) -> str:
+    """
+    Normalisiert einen Prompt für den Cache-Schlüssel
+    
+    Kleinschreibung, zusammengefasste Leerzeichen, ohne Satzzeichen am Ende:
+    "Was habe ich heute?" == "was habe  ich heute"
+    
+    Args:
+        prompt: Original-Prompt
+    
+    Returns:
+        Normalisierter Prompt
+    """
+    text = ' '.join(prompt.lower().split())
+    return re.sub(r'[\s?!.,;:]+$', '', text)
+
+
+def is_cacheable(context: Dict[str, Any]) -> bool:
+    """
+    Prüft ob eine Anfrage gecacht werden darf
+    
+    Args:
+        context: Normalisierter Kontext
+    
+    Returns:
+        False bei live_state (Live-Kalenderdaten) oder no_cache Flag
+    """
+    return not (context.get('live_state') or context.get('no_cache'))
+
+
+def make_cache_key(prompt: str, context: Dict[str, Any], model: str) -> str:
+    """
+    Erstellt den Cache-Schlüssel
+    
+    Args:
+        prompt: User-Prompt
+        context: Normalisierter Kontext (System-Prompt + Sampling-Parameter)
+        model: Modell-Name des Providers
+    
+    Returns:
+        SHA-256 Hex-Digest
+    """
+    # Historie und wiederholte Nachricht gehören nicht in den Schlüssel
+    system_prompt = context.get('system_prompt') or ''
+    suffix = context.get('system_suffix')
+    system_prompt = system_prompt.replace(suffix, '') if suffix else system_prompt.replace(prompt, '')
+    
+    params = {k: v for k, v in context.items() if k not in NON_PARAM_KEYS}
+    material = json.dumps({
+        'prompt': normalize_prompt(prompt),
+        'system': system_prompt,
+        'model': model,
+        'params': params
+    }, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(material.encode('utf-8')).hexdigest()
+
+
+class ResponseCache:
+    """
+    Zweistufiger Antwort-Cache (Memory LRU + optional SQLite)
+    """
+    
+    def __init__(self,
+                 max_entries: int = 1000,
+                 ttl_seconds: float = 3600,
+                 db_path: Optional[str] = None,
+                 max_db_entries: int = 20000):
+        """
+        Args:
+            max_entries: Max. Einträge im Memory-Tier
+            ttl_seconds: Lebensdauer eines Eintrags in Sekunden
+            db_path: Pfad zur SQLite-Datei (None = nur Memory)
+            max_db_entries: Max. Einträge im SQLite-Tier
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.db_path = db_path
+        self.max_db_entries = max_db_entries
+        
+        self._memory: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self.stats = {
+            'memory_hits': 0,
+            'disk_hits': 0,
+            'misses': 0,
+            'bypassed': 0,
+            'stores': 0,
+            'evictions': 0
+        }
+        
+        if self.db_path:
+            Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+            self._init_database()
+        
+        logger.info(
+            f"✅ ResponseCache initialisiert (max={max_entries}, ttl={ttl_seconds}s, "
+            f"db={db_path or '-'})"
+        )
+    
+    @contextmanager
+    def _get_connection(self):
+        """Context Manager für Datenbankverbindung"""
+        conn = sqlite3.connect(self.db_path)
+        try:
+            yield conn
+            conn.commit()
+        finally:
+            conn.close()
+    
+    def _init_database(self):
+        """Erstellt die Cache-Tabelle falls nicht vorhanden"""
+        with self._get_connection() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS response_cache (
+                    cache_key TEXT PRIMARY KEY,
+                    response TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    expires_at REAL NOT NULL
+                )
+            """)
+            conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_cache_expires
+                ON response_cache(expires_at)
+            """)
+    
+    def get(self, key: str) -> Optional[str]:
+        """
+        Sucht eine Antwort im Memory-Tier
+        
+        Args:
+            key: Cache-Schlüssel
+        
+        Returns:
+            Antwort oder None
+        """
+        entry = self._memory.get(key)
+        if entry is None:
+            return None
+        
+        response, expires_at = entry
+        if expires_at < time.time():
+            del self._memory[key]
+            return None
+        
+        self._memory.move_to_end(key)
+        return response
+    
+    def put(self, key: str, response: str, expires_at: Optional[float] = None) -> None:
+        """
+        Speichert eine Antwort im Memory-Tier
+        
+        Args:
+            key: Cache-Schlüssel
+            response: Antwort
+            expires_at: Ablaufzeitpunkt (default: jetzt + TTL)
+        """
+        self._memory[key] = (response, expires_at or time.time() + self.ttl_seconds)
+        self._memory.move_to_end(key)
+        
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self.stats['evictions'] += 1
+    
+    def get_persistent(self, key: str) -> Optional[Tuple[str, float]]:
+        """
+        Sucht eine Antwort im SQLite-Tier (blockierend)
+        
+        Args:
+            key: Cache-Schlüssel
+        
+        Returns:
+            Tuple (Antwort, Ablaufzeitpunkt) oder None
+        """
+        if not self.db_path:
+            return None
+        
+        with self._get_connection() as conn:
+            row = conn.execute(
+                "SELECT response, expires_at FROM response_cache "
+                "WHERE cache_key = ? AND expires_at > ?",
+                (key, time.time())
+            ).fetchone()
+        
+        return (row[0], row[1]) if row else None
+    
+    def put_persistent(self, key: str, response: str) -> None:
+        """
+        Speichert eine Antwort im SQLite-Tier und hält das Größenlimit ein (blockierend)
+        
+        Args:
+            key: Cache-Schlüssel
+            response: Antwort
+        """
+        if not self.db_path:
+            return
+        
+        now = time.time()
+        with self._get_connection() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO response_cache "
+                "(cache_key, response, created_at, expires_at) VALUES (?, ?, ?, ?)",
+                (key, response, now, now + self.ttl_seconds)
+            )
+            conn.execute("DELETE FROM response_cache WHERE expires_at <= ?", (now,))
+            conn.execute("""
+                DELETE FROM response_cache WHERE cache_key IN (
+                    SELECT cache_key FROM response_cache
+                    ORDER BY created_at DESC LIMIT -1 OFFSET ?
+                )
+            """, (self.max_db_entries,))
+    
+    async def lookup(self, key: str) -> Optional[str]:
+        """
+        Sucht in beiden Tiers (SQLite-Treffer werden in den Memory-Tier übernommen)
+        
+        Args:
+            key: Cache-Schlüssel
+        
+        Returns:
+            Antwort oder None
+        """
+        response = self.get(key)
+        if response is not None:
+            self.stats['memory_hits'] += 1
+            return response
+        
+        if self.db_path:
+            try:
+                entry = await asyncio.to_thread(self.get_persistent, key)
+            except sqlite3.Error as e:
+                logger.warning(f"⚠️ Cache-Lesefehler: {e}")
+                entry = None
+            
+            if entry is not None:
+                self.stats['disk_hits'] += 1
+                self.put(key, entry[0], expires_at=entry[1])
+                return entry[0]
+        
+        self.stats['misses'] += 1
+        return None
+    
+    async def store(self, key: str, response: str) -> None:
+        """
+        Speichert in beiden Tiers
+        
+        Args:
+            key: Cache-Schlüssel
+            response: Antwort
+        """
+        self.put(key, response)
+        self.stats['stores'] += 1
+        
+        if self.db_path:
+            try:
+                await asyncio.to_thread(self.put_persistent, key, response)
+            except sqlite3.Error as e:
+                logger.warning(f"⚠️ Cache-Schreibfehler: {e}")
+    
+    def get_statistics(self) -> Dict[str, Any]:
+        """
+        Gibt Hit/Miss-Zähler zurück
+        
+        Returns:
+            Dict mit Zählern, Hit-Rate und aktueller Größe
+        """
+        hits = self.stats['memory_hits'] + self.stats['disk_hits']
+        lookups = hits + self.stats['misses']
+        return {
+            **self.stats,
+            'hit_rate': hits / lookups if lookups else 0.0,
+            'memory_entries': len(self._memory)
+        }
+
+
+class CachedProvider(AIProvider):
+    """
+    AIProvider-Wrapper mit Antwort-Cache
+    
+    Kann um jeden Provider gelegt werden; analyze_intent wird durchgereicht.
+    """
+    
+    def __init__(self, provider: AIProvider, cache: Optional[ResponseCache] = None):
+        """
+        Args:
+            provider: Eigentlicher AI Provider
+            cache: ResponseCache Instanz (default: nur Memory)
+        """
+        self.provider = provider
+        self.cache = cache or ResponseCache()
+        self.model = getattr(provider, 'model', provider.__class__.__name__)
+        self.supports_streaming = provider.supports_streaming
+        self.cost_per_1k_tokens = provider.cost_per_1k_tokens
+    
+    @property
+    def name(self) -> str:
+        """Name des eigentlichen Providers (Metriken gelten für ihn)"""
+        return self.provider.name
+    
+    @property
+    def guard(self):
+        """Circuit Breaker des eigentlichen Providers (falls vorhanden)"""
+        return getattr(self.provider, 'guard', None)
+    
+    def _cache_key(self, prompt: str, context: Dict[str, Any]) -> str:
+        """Cache-Schlüssel inkl. Provider-Klasse"""
+        model = f"{self.provider.__class__.__name__}:{self.model}"
+        return make_cache_key(prompt, context, model)
+    
+    async def generate_response(self, prompt: str,
+                                context: Optional[Union[str, Dict[str, Any]]] = None) -> str:
+        """
+        Antwort aus dem Cache oder vom Provider
+        
+        Args:
+            prompt: User Input / Prompt
+            context: Optionaler Kontext (System-Prompt String oder Parameter-Dict)
+        
+        Returns:
+            Generierte oder gecachte Antwort
+        """
+        normalized = normalize_context(context)
+        
+        if not is_cacheable(normalized):
+            self.cache.stats['bypassed'] += 1
+            return await self.provider.generate_response(prompt, context)
+        
+        key = self._cache_key(prompt, normalized)
+        cached = await self.cache.lookup(key)
+        if cached is not None:
+            logger.info("⚡ Antwort aus Cache")
+            return cached
+        
+        response = await self.provider.generate_response(prompt, context)
+        
+        if response and not response.startswith(ERROR_PREFIX):
+            await self.cache.store(key, response)
+        
+        return response
+    
+    async def stream_response(self, prompt: str,
+                              context: Optional[Union[str, Dict[str, Any]]] = None
+                              ) -> AsyncIterator[str]:
+        """
+        Stream mit Cache: Treffer als ein Fragment, sonst Stream durchreichen und merken
+        
+        Args:
+            prompt: User Input / Prompt
+            context: Optionaler Kontext
+        
+        Yields:
+            Text-Fragmente
+        """
+        normalized = normalize_context(context)
+        
+        if not is_cacheable(normalized):
+            self.cache.stats['bypassed'] += 1
+            async for chunk in self.provider.stream_response(prompt, context):
+                yield chunk
+            return
+        
+        key = self._cache_key(prompt, normalized)
+        cached = await self.cache.lookup(key)
+        if cached is not None:
+            logger.info("⚡ Antwort aus Cache")
+            yield cached
+            return
+        
+        parts = []
+        async for chunk in self.provider.stream_response(prompt, context):
+            parts.append(chunk)
+            yield chunk
+        
+        response = ''.join(parts).strip()
+        if response and not response.startswith(ERROR_PREFIX):
+            await self.cache.store(key, response)
+    
+    async def analyze_intent(self, text: str) -> Dict[str, Any]:
+        """Intent-Analyse ohne Cache (durchgereicht)"""
+        return await self.provider.analyze_intent(text)
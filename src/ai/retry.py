@@ -0,0 +1,399 @@
+"""
+Retry - Wiederholung gestörter Provider-Aufrufe mit Backoff und Server-Hinweisen
+
+Gemeinsame Retry-Policy für alle HTTP-Provider:
+
+- Exponentielles Backoff mit "Full Jitter": Wartezeit zufällig zwischen 0
+  und base_delay * 2^Versuch (begrenzt durch max_delay)
+- Server-Hinweise haben Vorrang: `Retry-After` (Sekunden oder HTTP-Datum)
+  und HuggingFaces `estimated_time` während ein Modell lädt
+- Retry-Budget: Wiederholungen höchstens als Anteil der Anfragen im
+  Zeitfenster, damit Retries einen gestörten Provider nicht zusätzlich fluten
+- Idempotenz: nicht-idempotente Anfragen werden nur wiederholt, wenn der
+  Server sie sicher nicht bearbeitet hat (429/503, Verbindungsaufbau
+  gescheitert) - nicht nach Timeout oder Verbindungsabbruch, bei denen die
+  Anfrage evtl. schon gesendet war
+- Abbrechbar: die Wartezeit ist ein normales asyncio.sleep
+- Jeder Versuch wird gemessen, um die zusätzliche Latenz durch Retries
+  auszuweisen
+"""
+
+import os
+import json
+import time
+import random
+import asyncio
+import logging
+from collections import deque
+from email.utils import parsedate_to_datetime
+from typing import Any, AsyncIterator, Awaitable, Callable, Deque, Dict, Optional
+
+from src.ai.http_transport import (
+    HTTPStatusError,
+    TransportConnectError,
+    TransportError,
+    TransportTimeout
+)
+
+logger = logging.getLogger(__name__)
+
+# Statuscodes, bei denen der Server die Anfrage nicht bearbeitet hat
+REJECTED_STATUSES = {429, 503}
+
+# Statuscodes, die eine Wiederholung lohnen
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Liest einen Retry-After Header
+    
+    Args:
+        value: Header-Wert (Sekunden oder HTTP-Datum)
+    
+    Returns:
+        Wartezeit in Sekunden oder None
+    """
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def server_retry_hint(error: BaseException) -> Optional[float]:
+    """
+    Wartezeit, die der Server für einen neuen Versuch vorgibt
+    
+    Berücksichtigt den Retry-After Header (OpenRouter, allgemein) und
+    `estimated_time` im Body einer HuggingFace 503-Antwort (Modell lädt).
+    
+    Args:
+        error: Fehler des Versuchs
+    
+    Returns:
+        Sekunden oder None ohne Hinweis
+    """
+    if not isinstance(error, HTTPStatusError):
+        return None
+    
+    headers = {key.lower(): value for key, value in error.headers.items()}
+    hint = parse_retry_after(headers.get('retry-after'))
+    if hint is not None:
+        return hint
+    
+    if error.body:
+        try:
+            body = json.loads(error.body)
+        except (TypeError, ValueError):
+            return None
+        if isinstance(body, dict) and isinstance(body.get('estimated_time'), (int, float)):
+            return max(0.0, float(body['estimated_time']))
+    return None
+
+
+def is_retryable(error: BaseException, idempotent: bool = True) -> bool:
+    """
+    Prüft ob ein Fehler eine Wiederholung rechtfertigt
+    
+    Args:
+        error: Fehler des Versuchs
+        idempotent: Anfrage darf auch nach evtl. erfolgter Bearbeitung wiederholt werden
+    
+    Returns:
+        True wenn ein neuer Versuch sinnvoll ist
+    """
+    if isinstance(error, HTTPStatusError):
+        if idempotent:
+            return error.status in RETRYABLE_STATUSES
+        return error.status in REJECTED_STATUSES
+    if isinstance(error, TransportConnectError):
+        return True
+    if isinstance(error, TransportError):
+        # Timeout, Abbruch, kaputte Antwort: Anfrage war evtl. schon gesendet
+        return idempotent
+    return False
+
+
+class RetryBudget:
+    """
+    Begrenzt Wiederholungen auf einen Anteil der Anfragen im Zeitfenster
+    """
+    
+    def __init__(self, ratio: float = 0.2, min_retries: int = 3, window_seconds: float = 60.0):
+        """
+        Args:
+            ratio: Erlaubte Retries pro Anfrage (0.2 = 20%)
+            min_retries: Retries, die im Fenster immer erlaubt sind
+            window_seconds: Länge des Zeitfensters
+        """
+        self.ratio = ratio
+        self.min_retries = min_retries
+        self.window_seconds = window_seconds
+        self._requests: Deque[float] = deque()
+        self._retries: Deque[float] = deque()
+    
+    def _trim(self, now: float) -> None:
+        cutoff = now - self.window_seconds
+        for window in (self._requests, self._retries):
+            while window and window[0] < cutoff:
+                window.popleft()
+    
+    def record_request(self) -> None:
+        """Zählt eine neue (erste) Anfrage"""
+        self._requests.append(time.monotonic())
+    
+    def try_spend(self) -> bool:
+        """
+        Nimmt einen Retry aus dem Budget
+        
+        Returns:
+            False wenn das Budget erschöpft ist
+        """
+        now = time.monotonic()
+        self._trim(now)
+        allowed = max(self.min_retries, self.ratio * len(self._requests))
+        if len(self._retries) >= allowed:
+            return False
+        self._retries.append(now)
+        return True
+
+
+class RetryPolicy:
+    """
+    Retry-Policy eines Providers
+    """
+    
+    def __init__(self, max_attempts: int = 3, base_delay: float = 0.5,
+                 max_delay: float = 20.0, max_hint: float = 60.0,
+                 budget: Optional[RetryBudget] = None, name: str = ''):
+        """
+        Args:
+            max_attempts: Maximale Versuche inkl. dem ersten
+            base_delay: Basis des exponentiellen Backoffs in Sekunden
+            max_delay: Obergrenze des Backoffs
+            max_hint: Längere Server-Hinweise werden nicht abgewartet
+            budget: Retry-Budget (default: 20% der Anfragen)
+            name: Provider-Name (für Logs)
+        """
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_hint = max_hint
+        self.budget = budget or RetryBudget()
+        self.name = name
+        
+        self.attempts: Deque[Dict[str, Any]] = deque(maxlen=500)
+        self.stats = {
+            'calls': 0,
+            'retried_calls': 0,
+            'retries': 0,
+            'gave_up': 0,
+            'budget_exhausted': 0,
+            'hinted': 0,
+            'retry_seconds': 0.0
+        }
+    
+    @classmethod
+    def from_env(cls, name: str = '') -> 'RetryPolicy':
+        """
+        Erstellt eine Policy mit Einstellungen aus der Umgebung
+        
+        AI_RETRY_MAX_ATTEMPTS, AI_RETRY_BASE_DELAY, AI_RETRY_MAX_DELAY,
+        AI_RETRY_MAX_HINT, AI_RETRY_BUDGET
+        """
+        return cls(
+            max_attempts=int(os.getenv('AI_RETRY_MAX_ATTEMPTS', '3')),
+            base_delay=float(os.getenv('AI_RETRY_BASE_DELAY', '0.5')),
+            max_delay=float(os.getenv('AI_RETRY_MAX_DELAY', '20')),
+            max_hint=float(os.getenv('AI_RETRY_MAX_HINT', '60')),
+            budget=RetryBudget(ratio=float(os.getenv('AI_RETRY_BUDGET', '0.2'))),
+            name=name
+        )
+    
+    def backoff(self, attempt: int) -> float:
+        """
+        Full-Jitter-Backoff nach dem `attempt`-ten fehlgeschlagenen Versuch
+        
+        Args:
+            attempt: Anzahl bisheriger Versuche (ab 1)
+        """
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+    
+    def next_delay(self, error: BaseException, attempt: int, idempotent: bool = True) -> Optional[float]:
+        """
+        Wartezeit vor dem nächsten Versuch
+        
+        Args:
+            error: Fehler des letzten Versuchs
+            attempt: Anzahl bisheriger Versuche (ab 1)
+            idempotent: Siehe is_retryable
+        
+        Returns:
+            Sekunden oder None, wenn nicht wiederholt werden soll
+        """
+        if attempt >= self.max_attempts or not is_retryable(error, idempotent):
+            return None
+        
+        hint = server_retry_hint(error)
+        if hint is not None and hint > self.max_hint:
+            logger.info(f"⏳ {self.name}: Server verlangt {hint:.0f}s Pause - kein Retry")
+            return None
+        
+        if not self.budget.try_spend():
+            self.stats['budget_exhausted'] += 1
+            logger.warning(f"💸 {self.name}: Retry-Budget erschöpft")
+            return None
+        
+        if hint is not None:
+            self.stats['hinted'] += 1
+            # Etwas Jitter, damit wartende Clients nicht gleichzeitig zurückkommen
+            return hint + random.uniform(0, self.base_delay)
+        return self.backoff(attempt)
+    
+    def record_attempt(self, attempt: int, seconds: float, error: Optional[BaseException]) -> None:
+        """Speichert Dauer und Ergebnis eines Versuchs"""
+        self.attempts.append({
+            'attempt': attempt,
+            'seconds': seconds,
+            'error': None if error is None else type(error).__name__,
+            'status': getattr(error, 'status', None)
+        })
+    
+    async def call(self, request: Callable[[], Awaitable[Any]], idempotent: bool = True) -> Any:
+        """
+        Führt einen Request mit Wiederholungen aus
+        
+        Args:
+            request: Coroutine-Fabrik für einen Versuch
+            idempotent: Siehe is_retryable
+        
+        Returns:
+            Ergebnis des ersten erfolgreichen Versuchs
+        
+        Raises:
+            Fehler des letzten Versuchs; CancelledError bricht auch während
+            der Wartezeit sofort ab
+        """
+        self.stats['calls'] += 1
+        self.budget.record_request()
+        started = time.perf_counter()
+        attempt = 0
+        
+        while True:
+            attempt += 1
+            attempt_start = time.perf_counter()
+            try:
+                result = await request()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                delay = self._on_failure(e, attempt, idempotent, started, attempt_start)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+                continue
+            
+            self._on_success(attempt, started, attempt_start)
+            return result
+    
+    async def stream(self, open_stream: Callable[[], AsyncIterator[Any]],
+                     idempotent: bool = True) -> AsyncIterator[Any]:
+        """
+        Streamt mit Wiederholungen, solange noch kein Fragment geliefert wurde
+        
+        Bricht ein Stream nach dem ersten Fragment ab, wird nicht wiederholt -
+        der Empfänger hat den Anfang der Antwort schon angezeigt.
+        
+        Args:
+            open_stream: Fabrik für einen Stream-Versuch
+            idempotent: Siehe is_retryable
+        
+        Yields:
+            Fragmente des ersten erfolgreichen Versuchs
+        """
+        self.stats['calls'] += 1
+        self.budget.record_request()
+        started = time.perf_counter()
+        attempt = 0
+        
+        while True:
+            attempt += 1
+            attempt_start = time.perf_counter()
+            delivered = False
+            stream = open_stream()
+            try:
+                async for chunk in stream:
+                    if not delivered:
+                        delivered = True
+                        self._on_success(attempt, started, attempt_start)
+                    yield chunk
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                if delivered:
+                    raise
+                delay = self._on_failure(e, attempt, idempotent, started, attempt_start)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+                continue
+            finally:
+                await stream.aclose()
+            
+            if not delivered:
+                self._on_success(attempt, started, attempt_start)
+            return
+    
+    def _on_success(self, attempt: int, started: float, attempt_start: float) -> None:
+        """Erfolgreicher Versuch"""
+        self.record_attempt(attempt, time.perf_counter() - attempt_start, None)
+        if attempt > 1:
+            self._finish(started, attempt_start)
+    
+    def _on_failure(self, error: Exception, attempt: int, idempotent: bool,
+                    started: float, attempt_start: float) -> Optional[float]:
+        """
+        Fehlgeschlagener Versuch
+        
+        Returns:
+            Wartezeit bis zum nächsten Versuch oder None (aufgeben)
+        """
+        self.record_attempt(attempt, time.perf_counter() - attempt_start, error)
+        delay = self.next_delay(error, attempt, idempotent)
+        if delay is None:
+            if attempt > 1:
+                self.stats['gave_up'] += 1
+                self._finish(started, attempt_start)
+            return None
+        
+        if attempt == 1:
+            self.stats['retried_calls'] += 1
+        self.stats['retries'] += 1
+        logger.info(f"🔁 {self.name}: Versuch {attempt} fehlgeschlagen ({error}) - nächster in {delay:.1f}s")
+        return delay
+    
+    def _finish(self, started: float, last_attempt_start: float) -> None:
+        """Zählt die Zeit vor dem letzten Versuch als Zusatzlatenz durch Retries"""
+        self.stats['retry_seconds'] += last_attempt_start - started
+    
+    def get_statistics(self) -> Dict[str, Any]:
+        """
+        Zähler für Admin-Befehle
+        
+        Returns:
+            Dict mit calls, retries, gave_up, budget_exhausted, hinted,
+            retry_rate und avg_added_latency (Sekunden pro wiederholtem Aufruf)
+        """
+        stats = dict(self.stats)
+        stats['retry_rate'] = stats['retried_calls'] / stats['calls'] if stats['calls'] else 0.0
+        stats['avg_added_latency'] = (
+            stats['retry_seconds'] / stats['retried_calls'] if stats['retried_calls'] else 0.0
+        )
+        return stats
@@ -0,0 +1,197 @@
+"""
+Provider Router - Wählt pro Anfrage die Reihenfolge der AI Provider
+
+Jeder Provider bekommt pro Anfrage einen Score in "Sekunden-Äquivalent":
+
+    erwartete Latenz (p50)  +  Fehlerquote * error_penalty  +  Kosten * seconds_per_dollar
+
+Der niedrigste Score wird zuerst gefragt, die übrigen bilden die
+Fallback-Kette. Provider mit offenem Circuit Breaker rutschen ans Ende.
+Jede Entscheidung wird geloggt und optional als JSON-Zeile gespeichert
+(z.B. für Durchsatz-Analysen).
+"""
+
+import json
+import time
+import logging
+import threading
+from collections import deque
+from pathlib import Path
+from typing import Any, Deque, Dict, Optional, Sequence
+
+from src.ai.latency import LatencyTracker
+
+logger = logging.getLogger(__name__)
+
+# Anfrage-Klassen mit erwarteter Token-Zahl (für die Kostenschätzung)
+# und Gewichtung der Latenz
+REQUEST_CLASSES = {
+    'chat': {'tokens': 600, 'latency_weight': 1.0},
+    'stream': {'tokens': 600, 'latency_weight': 1.5},
+    'intent': {'tokens': 60, 'latency_weight': 2.0}
+}
+
+
+class ProviderRouter:
+    """
+    Bewertet Provider nach Latenz, Fehlerquote, Kosten und Anfrage-Klasse
+    """
+    
+    def __init__(self,
+                 default_latency: float = 3.0,
+                 error_penalty: float = 10.0,
+                 seconds_per_dollar: float = 1000.0,
+                 error_alpha: float = 0.2,
+                 min_samples: int = 3,
+                 log_path: Optional[str] = None,
+                 max_decisions: int = 500):
+        """
+        Args:
+            default_latency: Angenommene Latenz ohne Messungen (Sekunden)
+            error_penalty: Sekunden-Aufschlag bei 100% Fehlerquote
+            seconds_per_dollar: Umrechnung Kosten -> Sekunden (1000 = 1ct ≙ 10s)
+            error_alpha: Glättung der Fehlerquote (EWMA)
+            min_samples: Mindestanzahl Messungen für die gemessene Latenz
+            log_path: Optionale JSONL-Datei für Routing-Entscheidungen
+            max_decisions: Anzahl Entscheidungen im Speicher
+        """
+        self.default_latency = default_latency
+        self.error_penalty = error_penalty
+        self.seconds_per_dollar = seconds_per_dollar
+        self.error_alpha = error_alpha
+        self.min_samples = min_samples
+        self.log_path = Path(log_path) if log_path else None
+        
+        self.error_rates: Dict[str, float] = {}
+        self.decisions: Deque[Dict[str, Any]] = deque(maxlen=max_decisions)
+        self.stats = {'routed': 0, 'fallbacks': 0, 'failed': 0}
+        self._log_lock = threading.Lock()
+        
+        if self.log_path:
+            self.log_path.parent.mkdir(parents=True, exist_ok=True)
+    
+    def score(self, provider: Any, request_class: str, latency: LatencyTracker) -> Dict[str, Any]:
+        """
+        Berechnet den Score eines Providers (niedriger = besser)
+        
+        Args:
+            provider: AIProvider
+            request_class: 'chat', 'stream' oder 'intent'
+            latency: Latenz-Messungen für diese Anfrage-Art
+        
+        Returns:
+            Dict mit name, score, latency, error_rate, cost, open
+        """
+        profile = REQUEST_CLASSES.get(request_class, REQUEST_CLASSES['chat'])
+        name = provider.name
+        
+        expected = latency.quantile(name, 0.5, self.min_samples)
+        if expected is None:
+            expected = self.default_latency
+        
+        error_rate = self.error_rates.get(name, 0.0)
+        guard = getattr(provider, 'guard', None)
+        is_open = False
+        if guard is not None:
+            error_rate = max(error_rate, guard.breaker.error_rate())
+            is_open = guard.breaker.state == 'open'
+        
+        cost = getattr(provider, 'cost_per_1k_tokens', 0.0) * profile['tokens'] / 1000
+        
+        score = (expected * profile['latency_weight']
+                 + error_rate * self.error_penalty
+                 + cost * self.seconds_per_dollar)
+        
+        return {
+            'name': name,
+            'score': round(score, 3),
+            'latency': round(expected, 3),
+            'error_rate': round(error_rate, 3),
+            'cost': cost,
+            'open': is_open
+        }
+    
+    def rank(self, providers: Sequence[Any], request_class: str,
+             latency: LatencyTracker) -> Dict[str, Any]:
+        """
+        Sortiert die Provider für eine Anfrage
+        
+        Args:
+            providers: Provider in konfigurierter Reihenfolge (bei Gleichstand maßgeblich)
+            request_class: 'chat', 'stream' oder 'intent'
+            latency: Latenz-Messungen für diese Anfrage-Art
+        
+        Returns:
+            Entscheidung mit 'providers' (sortiert), 'scores' und Metadaten
+        """
+        scored = [(self.score(p, request_class, latency), index, p) for index, p in enumerate(providers)]
+        scored.sort(key=lambda item: (item[0]['open'], item[0]['score'], item[1]))
+        
+        self.stats['routed'] += 1
+        decision = {
+            'timestamp': time.time(),
+            'request_class': request_class,
+            'providers': [p for _, _, p in scored],
+            'scores': [s for s, _, _ in scored],
+            '_started': time.perf_counter()
+        }
+        
+        if len(scored) > 1:
+            logger.info(
+                f"🧭 Route {request_class}: " +
+                " > ".join(f"{s['name']} ({s['score']:.2f})" for s, _, _ in scored)
+            )
+        return decision
+    
+    def record_outcome(self, name: str, success: bool) -> None:
+        """
+        Aktualisiert die geglättete Fehlerquote eines Providers
+        
+        Args:
+            name: Provider-Name
+            success: True bei brauchbarer Antwort
+        """
+        previous = self.error_rates.get(name, 0.0)
+        self.error_rates[name] = (1 - self.error_alpha) * previous + self.error_alpha * (0.0 if success else 1.0)
+    
+    def finish(self, decision: Dict[str, Any], winner: Optional[Any], attempts: int) -> None:
+        """
+        Schließt eine Entscheidung ab und protokolliert sie
+        
+        Args:
+            decision: Ergebnis von rank()
+            winner: Provider mit der verwendeten Antwort (None = alle fehlgeschlagen)
+            attempts: Anzahl gestarteter Provider
+        """
+        planned = decision['providers'][0]
+        if winner is None:
+            self.stats['failed'] += 1
+        elif winner is not planned:
+            self.stats['fallbacks'] += 1
+        
+        record = {
+            'timestamp': decision['timestamp'],
+            'request_class': decision['request_class'],
+            'chain': [s['name'] for s in decision['scores']],
+            'scores': decision['scores'],
+            'winner': winner.name if winner is not None else None,
+            'attempts': attempts,
+            'duration': round(time.perf_counter() - decision['_started'], 3)
+        }
+        self.decisions.append(record)
+        
+        if winner is not None and winner is not planned:
+            logger.info(f"🔁 Fallback: {planned.name} -> {winner.name}")
+        
+        if self.log_path:
+            try:
+                with self._log_lock, open(self.log_path, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps(record, ensure_ascii=False) + '\n')
+            except OSError as e:
+                logger.warning(f"⚠️ Routing-Log nicht schreibbar: {e}")
+    
+    def get_statistics(self) -> Dict[str, Any]:
+        """Zähler und geglättete Fehlerquoten"""
+        stats = dict(self.stats)
+        stats['error_rates'] = {name: round(rate, 3) for name, rate in self.error_rates.items()}
+        return stats
@@ -0,0 +1,296 @@
+"""
+Semantic Cache - Ähnlichkeits-Cache für fast gleiche Fragen
+
+"Wann ist mein nächster Termin?" und "nächster Termin wann?" sollen dieselbe
+gespeicherte Antwort bekommen. Läuft lokal auf der CPU:
+- Texte werden als gehashte Zeichen-n-Gramme + Wörter vektorisiert
+- Suche per Kosinus-Ähnlichkeit über eine NumPy-Matrix
+- Treffer nur oberhalb eines konfigurierbaren Schwellwerts
+
+Zahlen, Zeitangaben (15 Uhr, morgen, Montag) und Verneinungen müssen exakt
+übereinstimmen, alle übrigen Inhaltswörter zumindest im Wortanfang - sonst
+gäbe es falsche Treffer bei "Termin morgen 15 Uhr" vs. "... 16 Uhr" oder
+"Ist morgen frei?" vs. "Ist morgen nicht frei?".
+"""
+
+import re
+import time
+import zlib
+import hashlib
+import logging
+from typing import Optional, Dict, Any, List, FrozenSet, Tuple
+
+import numpy as np
+
+from src.ai.response_cache import ERROR_PREFIX, NON_PARAM_KEYS, normalize_prompt, is_cacheable
+
+logger = logging.getLogger(__name__)
+
+# Häufige Füllwörter tragen kaum Bedeutung für die Frage
+STOPWORDS = frozenset({
+    'ist', 'sind', 'mein', 'meine', 'meinen', 'ich', 'du', 'der', 'die', 'das',
+    'ein', 'eine', 'einen', 'bitte', 'mal', 'mir', 'mich', 'doch', 'denn', 'so',
+    'und', 'oder', 'es', 'zu', 'an', 'am', 'im', 'in', 'habe', 'hab', 'hast'
+})
+
+# Wörter, die eine Antwort zeitlich festlegen - müssen exakt übereinstimmen
+TEMPORAL_WORDS = frozenset({
+    'heute', 'morgen', 'übermorgen', 'gestern', 'vorgestern', 'jetzt',
+    'montag', 'dienstag', 'mittwoch', 'donnerstag', 'freitag', 'samstag', 'sonntag',
+    'woche', 'wochenende', 'monat', 'jahr', 'nächste', 'nächsten', 'letzte', 'letzten'
+})
+
+# Verneinungen kehren die Bedeutung um ("frei" vs. "nicht frei")
+NEGATION_WORDS = frozenset({
+    'nicht', 'kein', 'keine', 'keinen', 'keinem', 'keiner', 'keines',
+    'nie', 'niemals', 'nichts', 'ohne'
+})
+
+# Inhaltswörter werden über ihren Anfang verglichen ("Termin" == "Termine")
+CONTENT_STEM_LENGTH = 5
+
+_WORD_RE = re.compile(r'\w+', re.UNICODE)
+
+
+class HashedNgramEmbedder:
+    """
+    Vektorisiert Texte über gehashte Zeichen-n-Gramme und Wörter
+    
+    Kein Training, keine Modelldateien - deterministisch über Prozesse hinweg.
+    """
+    
+    def __init__(self, dim: int = 1024, ngram_range: Tuple[int, int] = (3, 4),
+                 word_weight: float = 2.0):
+        """
+        Args:
+            dim: Vektor-Dimension (Anzahl Hash-Buckets)
+            ngram_range: Min./Max. Länge der Zeichen-n-Gramme
+            word_weight: Gewicht ganzer Wörter relativ zu n-Grammen
+        """
+        self.dim = dim
+        self.ngram_range = ngram_range
+        self.word_weight = word_weight
+    
+    def _tokens(self, text: str) -> List[str]:
+        """Bedeutungstragende Wörter (ohne Füllwörter)"""
+        words = _WORD_RE.findall(normalize_prompt(text))
+        return [w for w in words if w not in STOPWORDS] or words
+    
+    def embed(self, text: str) -> np.ndarray:
+        """
+        Erstellt einen L2-normierten Vektor
+        
+        Args:
+            text: Eingabetext
+        
+        Returns:
+            float32 Vektor der Länge dim
+        """
+        vector = np.zeros(self.dim, dtype=np.float32)
+        
+        for word in self._tokens(text):
+            self._add(vector, 'w:' + word, self.word_weight)
+            
+            padded = f"<{word}>"
+            for n in range(self.ngram_range[0], self.ngram_range[1] + 1):
+                for i in range(len(padded) - n + 1):
+                    self._add(vector, padded[i:i + n], 1.0)
+        
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
+    
+    def _add(self, vector: np.ndarray, feature: str, weight: float) -> None:
+        """Signed Hashing Trick: Bucket und Vorzeichen aus CRC32"""
+        h = zlib.crc32(feature.encode('utf-8'))
+        sign = 1.0 if (h >> 31) & 1 else -1.0
+        vector[h % self.dim] += sign * weight
+
+
+def guard_tokens(text: str) -> FrozenSet[str]:
+    """
+    Tokens, die bei einem Treffer identisch sein müssen
+    
+    Zahlen, Zeitwörter und Verneinungen exakt, alle übrigen Inhaltswörter
+    (ohne Füllwörter) über ihren Wortanfang. Die Reihenfolge ist egal:
+    "nächster Termin wann" == "Wann ist mein nächster Termin", aber
+    "... mit Max" != "... mit Moritz".
+    
+    Args:
+        text: Eingabetext
+    
+    Returns:
+        Menge der Guard-Tokens
+    """
+    guards = set()
+    for word in _WORD_RE.findall(normalize_prompt(text)):
+        if word.isdigit() or word in TEMPORAL_WORDS or word in NEGATION_WORDS:
+            guards.add(word)
+        elif word not in STOPWORDS:
+            guards.add('~' + word[:CONTENT_STEM_LENGTH])
+    return frozenset(guards)
+
+
+def scope_key(prompt: str, context: Dict[str, Any], model: str) -> str:
+    """
+    Bereich, innerhalb dessen Antworten austauschbar sind
+    
+    System-Prompt (ohne die darin wiederholte User-Nachricht), Modell und
+    Sampling-Parameter müssen übereinstimmen.
+    
+    Args:
+        prompt: User-Nachricht
+        context: Normalisierter Kontext
+        model: Modell-Name
+    
+    Returns:
+        Kurzer Hash
+    """
+    system_prompt = (context.get('system_prompt') or '').replace(prompt, '')
+    params = sorted((k, str(v)) for k, v in context.items() if k not in NON_PARAM_KEYS)
+    material = f"{model}\x00{system_prompt}\x00{params}"
+    return hashlib.sha1(material.encode('utf-8')).hexdigest()
+
+
+class SemanticCache:
+    """
+    Kosinus-Ähnlichkeits-Cache mit fester Kapazität
+    
+    Alle Vektoren liegen in einer vorab allokierten Matrix; ein Lookup ist
+    ein einziges Matrix-Vektor-Produkt.
+    """
+    
+    def __init__(self,
+                 threshold: float = 0.9,
+                 max_entries: int = 2000,
+                 ttl_seconds: float = 3600,
+                 embedder: Optional[HashedNgramEmbedder] = None):
+        """
+        Args:
+            threshold: Mindest-Ähnlichkeit (0-1) für einen Treffer
+            max_entries: Kapazität (danach wird der am längsten ungenutzte Eintrag verdrängt)
+            ttl_seconds: Lebensdauer eines Eintrags in Sekunden
+            embedder: Vektorisierer (default: HashedNgramEmbedder)
+        """
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.embedder = embedder or HashedNgramEmbedder()
+        
+        self._vectors = np.zeros((max_entries, self.embedder.dim), dtype=np.float32)
+        self._expires_at = np.zeros(max_entries, dtype=np.float64)  # 0 = freier Slot
+        self._last_used = np.zeros(max_entries, dtype=np.float64)
+        self._scopes: List[Optional[str]] = [None] * max_entries
+        self._guards: List[FrozenSet[str]] = [frozenset()] * max_entries
+        self._entries: List[Optional[Dict[str, Any]]] = [None] * max_entries
+        
+        self.stats = {'hits': 0, 'misses': 0, 'bypassed': 0, 'stores': 0, 'evictions': 0}
+        
+        logger.info(f"✅ SemanticCache initialisiert (threshold={threshold}, max={max_entries})")
+    
+    def scope_for(self, prompt: str, context: Dict[str, Any], model: str) -> Optional[str]:
+        """
+        Bereich für eine Anfrage oder None wenn sie nicht gecacht werden darf
+        
+        Args:
+            prompt: User-Nachricht
+            context: Normalisierter Kontext
+            model: Modell-Name
+            
+        Returns:
+            Bereich (siehe scope_key) oder None bei Live-Daten
+        """
+        if not is_cacheable(context):
+            self.stats['bypassed'] += 1
+            return None
+        return scope_key(prompt, context, model)
+    
+    def lookup(self, prompt: str, scope: str) -> Optional[Dict[str, Any]]:
+        """
+        Sucht die ähnlichste gespeicherte Frage im selben Bereich
+        
+        Args:
+            prompt: User-Nachricht
+            scope: Bereich (siehe scope_key)
+        
+        Returns:
+            Dict mit response, prompt, similarity oder None
+        """
+        now = time.time()
+        query = self.embedder.embed(prompt)
+        guards = guard_tokens(prompt)
+        
+        valid = self._expires_at > now
+        if not valid.any():
+            self.stats['misses'] += 1
+            return None
+        
+        similarities = self._vectors @ query
+        similarities[~valid] = -1.0
+        
+        # Kandidaten absteigend prüfen, bis Bereich und Guards passen
+        for idx in np.argsort(similarities)[::-1]:
+            similarity = float(similarities[idx])
+            if similarity < self.threshold:
+                break
+            if self._scopes[idx] != scope or self._guards[idx] != guards:
+                continue
+            
+            self._last_used[idx] = now
+            self.stats['hits'] += 1
+            entry = self._entries[idx]
+            return {**entry, 'similarity': similarity}
+        
+        self.stats['misses'] += 1
+        return None
+    
+    def store(self, prompt: str, response: str, scope: str) -> None:
+        """
+        Speichert eine Antwort
+        
+        Args:
+            prompt: User-Nachricht
+            response: Antwort
+            scope: Bereich (siehe scope_key)
+        """
+        if not response or response.startswith(ERROR_PREFIX):
+            return
+        
+        now = time.time()
+        idx = self._free_slot(now)
+        
+        self._vectors[idx] = self.embedder.embed(prompt)
+        self._expires_at[idx] = now + self.ttl_seconds
+        self._last_used[idx] = now
+        self._scopes[idx] = scope
+        self._guards[idx] = guard_tokens(prompt)
+        self._entries[idx] = {'prompt': prompt, 'response': response}
+        self.stats['stores'] += 1
+    
+    def _free_slot(self, now: float) -> int:
+        """Freier/abgelaufener Slot oder der am längsten ungenutzte (LRU)"""
+        expired = np.flatnonzero(self._expires_at <= now)
+        if expired.size:
+            idx = int(expired[0])
+            if self._entries[idx] is not None:
+                self.stats['evictions'] += 1
+            return idx
+        
+        self.stats['evictions'] += 1
+        return int(np.argmin(self._last_used))
+    
+    def __len__(self) -> int:
+        return int((self._expires_at > time.time()).sum())
+    
+    def get_statistics(self) -> Dict[str, Any]:
+        """
+        Gibt Hit/Miss-Zähler zurück
+        
+        Returns:
+            Dict mit Zählern, Hit-Rate und Anzahl gültiger Einträge
+        """
+        lookups = self.stats['hits'] + self.stats['misses']
+        return {
+            **self.stats,
+            'hit_rate': self.stats['hits'] / lookups if lookups else 0.0,
+            'entries': len(self)
+        }
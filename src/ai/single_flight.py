@@ -0,0 +1,203 @@
+"""
+Single-Flight - Identische gleichzeitige AI-Anfragen teilen sich einen Aufruf
+
+Stellen mehrere Benutzer gleichzeitig dieselbe Frage (gleiches Modell,
+gleicher Prompt, gleiche Parameter), läuft nur ein Upstream-Aufruf. Alle
+Wartenden erhalten dasselbe Ergebnis bzw. dieselbe Exception. Sobald der
+Aufruf fertig ist, wird der Schlüssel wieder freigegeben - es ist also
+kein Cache, sondern nur eine Bündelung laufender Anfragen.
+
+Streams werden ebenfalls gebündelt: ein Upstream-Stream, dessen Fragmente
+an alle Abonnenten verteilt werden. Spät hinzukommende Abonnenten erhalten
+zuerst die bereits empfangenen Fragmente und dann den Rest live.
+"""
+
+import json
+import asyncio
+import hashlib
+import logging
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+
+def flight_key(kind: str, prompt: str, context: Optional[Dict[str, Any]], model: str) -> str:
+    """
+    Schlüssel für eine Anfrage
+    
+    Args:
+        kind: Art der Anfrage (z.B. 'chat', 'intent')
+        prompt: Prompt (exakt, ohne Normalisierung)
+        context: Normalisierter Kontext
+        model: Modell bzw. Provider-Kette
+    
+    Returns:
+        SHA256 Hex-String
+    """
+    material = json.dumps(
+        {'kind': kind, 'prompt': prompt, 'context': context or {}, 'model': model},
+        sort_keys=True,
+        ensure_ascii=False,
+        default=str
+    )
+    return hashlib.sha256(material.encode('utf-8')).hexdigest()
+
+
+class _Flight:
+    """Laufender Upstream-Aufruf mit Anzahl Wartender"""
+    
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class _StreamFlight:
+    """Laufender Upstream-Stream mit Puffer für alle Abonnenten"""
+    
+    def __init__(self):
+        self.chunks: List[str] = []
+        self.finished = False
+        self.error: Optional[BaseException] = None
+        self.changed = asyncio.Event()
+        self.task: Optional[asyncio.Task] = None
+        self.subscribers = 0
+    
+    def notify(self) -> None:
+        """Weckt alle Abonnenten (neues Fragment oder Ende)"""
+        self.changed.set()
+        self.changed = asyncio.Event()
+
+
+class SingleFlight:
+    """
+    Bündelt gleichzeitige Aufrufe mit gleichem Schlüssel
+    """
+    
+    def __init__(self):
+        self._flights: Dict[str, Union[_Flight, _StreamFlight]] = {}
+        self.stats = {'calls': 0, 'upstream': 0, 'saved': 0}
+    
+    async def do(self, key: str, call: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Führt `call` aus oder hängt sich an einen laufenden Aufruf an
+        
+        Wird ein Wartender abgebrochen, läuft der Upstream-Aufruf für die
+        übrigen weiter; erst wenn niemand mehr wartet, wird er abgebrochen.
+        
+        Args:
+            key: Schlüssel (z.B. aus flight_key)
+            call: Coroutine-Fabrik für den Upstream-Aufruf
+        
+        Returns:
+            Ergebnis des (geteilten) Aufrufs
+        """
+        self.stats['calls'] += 1
+        flight = self._flights.get(key)
+        
+        if flight is None:
+            self.stats['upstream'] += 1
+            flight = _Flight(asyncio.ensure_future(call()))
+            self._flights[key] = flight
+            flight.task.add_done_callback(lambda _: self._release(key, flight))
+        else:
+            self.stats['saved'] += 1
+            logger.info(f"🤝 Single-Flight: Anfrage an laufenden Aufruf angehängt ({flight.waiters} wartend)")
+        
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        except asyncio.CancelledError:
+            if flight.waiters == 1 and not flight.task.done():
+                flight.task.cancel()
+                # Abbruch abwarten, damit der Aufruf aufgeräumt hat (z.B. Verbrauch erfasst)
+                await asyncio.wait([flight.task])
+            raise
+        finally:
+            flight.waiters -= 1
+    
+    async def stream(self, key: str,
+                     open_stream: Callable[[], AsyncIterator[str]]) -> AsyncIterator[str]:
+        """
+        Streamt `open_stream()` oder abonniert einen laufenden Stream
+        
+        Bricht ein Abonnent ab, läuft der Upstream-Stream für die übrigen
+        weiter; erst wenn niemand mehr liest, wird er abgebrochen.
+        
+        Args:
+            key: Schlüssel (z.B. aus flight_key)
+            open_stream: Fabrik für den Upstream-Stream
+        
+        Yields:
+            Alle Fragmente des (geteilten) Streams in Reihenfolge
+        """
+        self.stats['calls'] += 1
+        flight = self._flights.get(key)
+        
+        if not isinstance(flight, _StreamFlight):
+            self.stats['upstream'] += 1
+            flight = _StreamFlight()
+            self._flights[key] = flight
+            flight.task = asyncio.ensure_future(self._pump(flight, open_stream))
+            flight.task.add_done_callback(lambda _: self._release(key, flight))
+        else:
+            self.stats['saved'] += 1
+            logger.info(f"🤝 Single-Flight: Stream an laufenden Aufruf angehängt ({flight.subscribers} lesend)")
+        
+        flight.subscribers += 1
+        index = 0
+        try:
+            while True:
+                while index < len(flight.chunks):
+                    index += 1
+                    yield flight.chunks[index - 1]
+                if flight.finished:
+                    if flight.error is not None:
+                        raise flight.error
+                    return
+                await flight.changed.wait()
+        finally:
+            flight.subscribers -= 1
+            if flight.subscribers == 0 and not flight.finished:
+                self._release(key, flight)
+                flight.task.cancel()
+    
+    @staticmethod
+    async def _pump(flight: _StreamFlight, open_stream: Callable[[], AsyncIterator[str]]) -> None:
+        """Liest den Upstream-Stream in den Puffer"""
+        stream = open_stream()
+        try:
+            async for chunk in stream:
+                flight.chunks.append(chunk)
+                flight.notify()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            flight.error = e
+        finally:
+            flight.finished = True
+            flight.notify()
+            aclose = getattr(stream, 'aclose', None)
+            if aclose is not None:
+                await aclose()
+    
+    def _release(self, key: str, flight: Union[_Flight, _StreamFlight]) -> None:
+        """Gibt den Schlüssel frei, sobald der Aufruf fertig ist"""
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+    
+    @property
+    def in_flight(self) -> int:
+        """Anzahl laufender Upstream-Aufrufe"""
+        return len(self._flights)
+    
+    def get_statistics(self) -> Dict[str, Any]:
+        """
+        Zähler für Admin-Befehle
+        
+        Returns:
+            Dict mit calls, upstream, saved, saved_rate, in_flight
+        """
+        stats = dict(self.stats)
+        stats['saved_rate'] = stats['saved'] / stats['calls'] if stats['calls'] else 0.0
+        stats['in_flight'] = self.in_flight
+        return stats
@@ -0,0 +1,343 @@
+"""
+Structured Output - JSON-Antworten der KI und inkrementelles Parsen von Aktionen
+
+Die KI antwortet entweder mit Text oder mit einer JSON-Aktion wie
+{"action": "list_events", "timeframe": "today"}. Im strukturierten Modus
+ist JEDE Antwort ein JSON-Objekt nach ACTION_SCHEMA (Text als
+{"action": "reply", "reply": "..."}):
+
+- OpenRouter: `response_format` mit JSON-Schema
+- HuggingFace / lokale Modelle: Schema als Anweisung im Prompt
+
+StreamingJSONParser liest die Antwort Token für Token und meldet jedes
+Feld des ersten JSON-Objekts, sobald sein Wert vollständig ist. Damit
+kann der Bot eine Aktion ausführen, bevor der Rest der Antwort da ist,
+und verschachteltes JSON wird korrekt erkannt.
+"""
+
+import json
+import logging
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+# Aktionen, die der Bot ausführt (statt Text anzuzeigen)
+CALENDAR_ACTIONS = ('create_event', 'list_events', 'next_event')
+
+# Felder, die eine Aktion braucht, bevor sie ausgeführt werden kann
+REQUIRED_FIELDS = {
+    'create_event': ('text',),
+    'list_events': ('timeframe',),
+    'next_event': (),
+    'reply': ('reply',)
+}
+
+# Strict-Modus verlangt alle Felder - ungenutzte sind null. Die Reihenfolge
+# (Aktion und ihre Felder vor dem Antworttext) erlaubt frühes Ausführen.
+ACTION_SCHEMA: Dict[str, Any] = {
+    'type': 'object',
+    'properties': {
+        'action': {'type': 'string', 'enum': ['reply'] + list(CALENDAR_ACTIONS)},
+        'timeframe': {'type': ['string', 'null'], 'enum': ['today', 'tomorrow', 'week', None]},
+        'text': {'type': ['string', 'null'], 'description': 'Vollständige Termin-Beschreibung (action=create_event)'},
+        'reply': {'type': ['string', 'null'], 'description': 'Antworttext für den User (action=reply)'}
+    },
+    'required': ['action', 'timeframe', 'text', 'reply'],
+    'additionalProperties': False
+}
+
+
+def response_schema(context: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    JSON-Schema, das eine Anfrage verlangt
+    
+    Args:
+        context: Normalisierter Kontext (response_format 'json' oder eigenes Schema)
+    
+    Returns:
+        Schema oder None für Freitext
+    """
+    response_format = context.get('response_format')
+    if response_format == 'json':
+        return ACTION_SCHEMA
+    if isinstance(response_format, dict):
+        return response_format
+    return None
+
+
+def wants_structured_output(context: Dict[str, Any]) -> bool:
+    """
+    Prüft ob eine Anfrage JSON nach Schema verlangt
+    
+    Args:
+        context: Normalisierter Kontext
+    """
+    return response_schema(context) is not None
+
+
+def openrouter_response_format(schema: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    `response_format` für OpenRouter (OpenAI-kompatibles JSON-Schema)
+    
+    Args:
+        schema: JSON-Schema (default: ACTION_SCHEMA)
+    """
+    return {
+        'type': 'json_schema',
+        'json_schema': {
+            'name': 'adonis_action',
+            'strict': True,
+            'schema': schema or ACTION_SCHEMA
+        }
+    }
+
+
+def constrain_prompt(system_prompt: Optional[str], schema: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Ergänzt einen System-Prompt um die Pflicht, JSON nach Schema zu antworten
+    
+    Für Provider ohne native Schema-Unterstützung (HuggingFace, llama.cpp).
+    
+    Args:
+        system_prompt: Bisheriger System-Prompt
+        schema: JSON-Schema (default: ACTION_SCHEMA)
+    
+    Returns:
+        System-Prompt mit Format-Anweisung
+    """
+    instruction = (
+        "AUSGABEFORMAT: Antworte AUSSCHLIESSLICH mit einem einzigen JSON-Objekt "
+        "nach diesem Schema, ohne Text davor oder danach:\n"
+        f"{json.dumps(schema or ACTION_SCHEMA, ensure_ascii=False)}\n"
+        'Normale Antworten: {"action": "reply", "reply": "..."}'
+    )
+    if not system_prompt:
+        return instruction
+    return f"{system_prompt}\n\n{instruction}"
+
+
+def _decode_partial_string(raw: str) -> str:
+    """Dekodiert einen unvollständigen JSON-String (ohne Anführungszeichen)"""
+    for cut in range(0, 7):
+        candidate = raw[:len(raw) - cut] if cut else raw
+        try:
+            return json.loads(f'"{candidate}"')
+        except ValueError:
+            continue
+    return ''
+
+
+class StreamingJSONParser:
+    """
+    Inkrementeller Parser für das erste JSON-Objekt mit "action" im Text
+    
+    Text vor dem Objekt wird ignoriert. Objekte ohne "action" werden
+    übersprungen und der Parser sucht das nächste.
+    """
+    
+    def __init__(self):
+        self.fields: Dict[str, Any] = {}
+        self.done = False
+        self._reset()
+    
+    def _reset(self) -> None:
+        """Wartet auf den Beginn des nächsten Objekts"""
+        self.started = False
+        self.fields = {}
+        self._raw = ''
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._expect = 'key'
+        self._key: Optional[str] = None
+        self._token_start = 0
+        self._value_start: Optional[int] = None
+        self._value_kind: Optional[str] = None
+    
+    def feed(self, chunk: str) -> List[Tuple[str, Any]]:
+        """
+        Verarbeitet ein Text-Fragment
+        
+        Args:
+            chunk: Neues Fragment
+        
+        Returns:
+            Neu vollständige Felder als (Name, Wert)
+        """
+        completed: List[Tuple[str, Any]] = []
+        for char in chunk:
+            if self.done:
+                break
+            if not self.started:
+                if char == '{':
+                    self.started = True
+                    self._raw = '{'
+                    self._depth = 1
+                continue
+            self._raw += char
+            self._step(char, len(self._raw) - 1, completed)
+        return completed
+    
+    def _set_field(self, value_end: int, completed: List[Tuple[str, Any]]) -> None:
+        """Liest den Wert des aktuellen Feldes aus dem Puffer"""
+        raw_value = self._raw[self._value_start:value_end].strip()
+        try:
+            value = json.loads(raw_value)
+        except ValueError:
+            logger.debug(f"Ungültiger JSON-Wert ignoriert: {raw_value[:40]}")
+        else:
+            if self._key is not None:
+                self.fields[self._key] = value
+                completed.append((self._key, value))
+        self._expect = 'comma'
+        self._value_start = None
+        self._value_kind = None
+    
+    def _step(self, char: str, index: int, completed: List[Tuple[str, Any]]) -> None:
+        """Zustandsautomat für ein Zeichen innerhalb des Objekts"""
+        if self._in_string:
+            if self._escape:
+                self._escape = False
+            elif char == '\\':
+                self._escape = True
+            elif char == '"':
+                self._in_string = False
+                if self._depth == 1 and self._expect == 'key':
+                    self._key = json.loads(self._raw[self._token_start:index + 1])
+                    self._expect = 'colon'
+                elif self._depth == 1 and self._value_kind == 'string':
+                    self._set_field(index + 1, completed)
+            return
+        
+        if char == '"':
+            self._in_string = True
+            if self._depth == 1:
+                if self._expect == 'key':
+                    self._token_start = index
+                elif self._expect == 'value':
+                    self._value_start = index
+                    self._value_kind = 'string'
+            return
+        
+        if char in '{[':
+            if self._depth == 1 and self._expect == 'value':
+                self._value_start = index
+                self._value_kind = 'nested'
+            self._depth += 1
+            return
+        
+        if char in '}]':
+            self._depth -= 1
+            if self._depth == 1 and self._value_kind == 'nested':
+                self._set_field(index + 1, completed)
+            elif self._depth == 0:
+                if self._value_kind == 'primitive':
+                    self._set_field(index, completed)
+                self._finish_object()
+            return
+        
+        if self._depth != 1:
+            return
+        
+        if char == ':' and self._expect == 'colon':
+            self._expect = 'value'
+        elif char == ',':
+            if self._value_kind == 'primitive':
+                self._set_field(index, completed)
+            self._expect = 'key'
+        elif not char.isspace() and self._expect == 'value' and self._value_kind is None:
+            self._value_start = index
+            self._value_kind = 'primitive'
+    
+    def _finish_object(self) -> None:
+        """Objekt vollständig - ohne "action" weitersuchen"""
+        if 'action' in self.fields:
+            self.done = True
+        else:
+            self._reset()
+    
+    def partial(self, key: str) -> Optional[str]:
+        """
+        Bisheriger Inhalt eines String-Feldes (auch während es noch gestreamt wird)
+        
+        Args:
+            key: Feldname
+        
+        Returns:
+            Dekodierter (Teil-)String oder None
+        """
+        if key in self.fields:
+            value = self.fields[key]
+            return value if isinstance(value, str) else None
+        if (self._key == key and self._value_kind == 'string'
+                and self._in_string and self._value_start is not None):
+            return _decode_partial_string(self._raw[self._value_start + 1:])
+        return None
+
+
+class ActionStream:
+    """
+    Erkennt eine Kalender-Aktion in einem Token-Stream
+    
+    feed() liefert die Aktion genau einmal, sobald "action" und die dafür
+    nötigen Felder vollständig sind - der Rest der Antwort wird nicht
+    abgewartet.
+    """
+    
+    def __init__(self):
+        self.parser = StreamingJSONParser()
+        self.action: Optional[Dict[str, Any]] = None
+    
+    def feed(self, chunk: str) -> Optional[Dict[str, Any]]:
+        """
+        Verarbeitet ein Fragment
+        
+        Args:
+            chunk: Neues Fragment
+        
+        Returns:
+            Aktion (Dict mit allen bisher vollständigen Feldern) oder None
+        """
+        if self.action is not None:
+            return None
+        
+        self.parser.feed(chunk)
+        action = self.parser.fields.get('action')
+        if action not in CALENDAR_ACTIONS:
+            return None
+        
+        required = REQUIRED_FIELDS[action]
+        if self.parser.done or all(name in self.parser.fields for name in required):
+            self.action = dict(self.parser.fields)
+            return self.action
+        return None
+    
+    @property
+    def pending(self) -> bool:
+        """Ein JSON-Objekt wird gerade gestreamt (Zwischenstände nicht anzeigen)"""
+        return self.parser.started and self.action is None
+    
+    def reply_text(self) -> Optional[str]:
+        """Bisheriger Antworttext im strukturierten Modus ({"action": "reply", ...})"""
+        if self.parser.fields.get('action', 'reply') != 'reply':
+            return None
+        return self.parser.partial('reply')
+
+
+def parse_action(text: Union[str, None]) -> Optional[Dict[str, Any]]:
+    """
+    Liest die erste JSON-Aktion aus einer vollständigen Antwort
+    
+    Args:
+        text: KI-Antwort
+    
+    Returns:
+        Felder der Aktion oder None wenn keine Aktion enthalten ist
+    """
+    if not text:
+        return None
+    parser = StreamingJSONParser()
+    parser.feed(text)
+    if 'action' not in parser.fields:
+        return None
+    return dict(parser.fields)
@@ -0,0 +1,347 @@
+"""
+Conversation Summarizer - Laufende Zusammenfassung älterer Nachrichten
+
+Statt die Historie wörtlich in den Prompt zu kopieren, bekommt der Prompt
+eine kurze Zusammenfassung älterer Nachrichten und nur die neuesten
+Nachrichten wörtlich - zusammen begrenzt auf ein festes Token-Budget.
+
+Zusammengefasst wird im Hintergrund (auf dem AI Event-Loop), nachdem die
+Antwort gesendet wurde - nie im Antwortpfad:
+
+- extractive: lokal, ohne Provider-Aufruf (Sätze mit Namen, Zeiten, Daten)
+- provider: über den konfigurierten AI Client (Fallback: extractive)
+
+Auch Nachrichten, die der ContextManager nach max_messages / TTL verwirft,
+landen in der Zusammenfassung statt verloren zu gehen.
+"""
+
+import re
+import asyncio
+import logging
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from src.ai.ai_client import is_error_response
+from src.ai.prompt_cache import TokenCounter, get_token_counter
+from src.ai.rate_limiter import current_user
+from src.ai.usage import collect_calls
+
+logger = logging.getLogger(__name__)
+
+EXTRACTIVE = 'extractive'
+PROVIDER = 'provider'
+
+SUMMARY_PROMPT = (
+    "Du fasst eine Chat-Konversation zwischen einem User und dem Assistenten "
+    "AdonisAI zusammen. Behalte ALLE Fakten: Namen, Daten, Uhrzeiten, Orte, "
+    "offene Fragen und Wünsche des Users. Stichpunkte, maximal {max_tokens} Token, "
+    "keine Einleitung."
+)
+
+CALENDAR_WORDS = (
+    'termin', 'meeting', 'treffen', 'uhr', 'morgen', 'heute', 'woche',
+    'montag', 'dienstag', 'mittwoch', 'donnerstag', 'freitag', 'samstag', 'sonntag'
+)
+
+_SENTENCE_SPLIT = re.compile(r'(?<=[.!?])\s+')
+_NAME = re.compile(r'(?<!^)(?<![.!?]\s)\b[A-ZÄÖÜ][a-zäöüß]+')
+
+
+def _role_label(role: str) -> str:
+    return "User" if role == 'user' else "Du"
+
+
+def _score(sentence: str, role: str) -> float:
+    """Wie viele merkenswerte Fakten enthält ein Satz?"""
+    lower = sentence.lower()
+    score = 1.0 if role == 'user' else 0.0
+    score += 2.0 * bool(re.search(r'\d', sentence))
+    score += sum(1.0 for word in CALENDAR_WORDS if word in lower)
+    score += len(_NAME.findall(sentence))
+    return score
+
+
+def truncate_to_tokens(text: str, max_tokens: int, counter: Optional[TokenCounter] = None) -> str:
+    """
+    Kürzt einen Text zeilenweise (älteste Zeilen zuerst) auf ein Token-Budget
+    
+    Args:
+        text: Text mit einer Information pro Zeile
+        max_tokens: Token-Budget
+        counter: TokenCounter (default: gemeinsamer Counter)
+    
+    Returns:
+        Gekürzter Text
+    """
+    counter = counter or get_token_counter()
+    lines = [line for line in text.splitlines() if line.strip()]
+    while len(lines) > 1 and counter.count('\n'.join(lines)) > max_tokens:
+        lines.pop(0)
+    result = '\n'.join(lines)
+    while result and counter.count(result) > max_tokens:
+        result = result[:int(len(result) * 0.8)].rstrip()
+    return result
+
+
+def extractive_summary(previous: Optional[str], messages: List[Dict[str, Any]], max_tokens: int,
+                       counter: Optional[TokenCounter] = None) -> str:
+    """
+    Lokale Zusammenfassung ohne Provider-Aufruf
+    
+    Wählt die Sätze mit den meisten Fakten (Zahlen, Kalender-Begriffe,
+    Namen) und behält ihre Reihenfolge bei.
+    
+    Args:
+        previous: Bisherige Zusammenfassung (eine Information pro Zeile)
+        messages: Neu zusammenzufassende Nachrichten (role, content)
+        max_tokens: Token-Budget der Zusammenfassung
+        counter: TokenCounter (default: gemeinsamer Counter)
+    
+    Returns:
+        Zusammenfassung mit einer Zeile pro Information
+    """
+    counter = counter or get_token_counter()
+    candidates: List[Tuple[float, int, str]] = []
+    
+    for line in (previous or '').splitlines():
+        if line.strip():
+            role = 'user' if line.startswith('- User:') else 'assistant'
+            candidates.append((_score(line, role), len(candidates), line.strip()))
+    
+    for msg in messages:
+        content = msg['content'].strip()
+        if not content or (content.startswith('[') and content.endswith(']')):
+            continue  # Aktions-Marker wie [fast_list_today]
+        for sentence in _SENTENCE_SPLIT.split(content):
+            sentence = sentence.strip()[:200]
+            if sentence:
+                line = f"- {_role_label(msg['role'])}: {sentence}"
+                candidates.append((_score(sentence, msg['role']), len(candidates), line))
+    
+    # Beste Sätze zuerst auswählen, dann chronologisch ausgeben
+    chosen = []
+    used = 0
+    for score, index, line in sorted(candidates, key=lambda c: (-c[0], -c[1])):
+        tokens = counter.count(line) + 1
+        if used + tokens > max_tokens:
+            continue
+        chosen.append((index, line))
+        used += tokens
+    
+    seen = set()
+    lines = []
+    for _, line in sorted(chosen):
+        if line not in seen:
+            seen.add(line)
+            lines.append(line)
+    return '\n'.join(lines)
+
+
+class ConversationSummarizer:
+    """
+    Fasst ältere Nachrichten pro User im Hintergrund zusammen
+    """
+    
+    def __init__(self, context_manager: Any,
+                 ai_client: Any = None,
+                 mode: str = EXTRACTIVE,
+                 keep_recent: int = 4,
+                 token_budget: int = 400,
+                 summary_tokens: int = 120,
+                 counter: Optional[TokenCounter] = None,
+                 usage_sink: Optional[Callable[[List[Dict[str, Any]]], None]] = None):
+        """
+        Args:
+            context_manager: ContextManager mit keep_evicted=True
+            ai_client: AIClient für mode='provider'
+            mode: 'extractive' (lokal) oder 'provider'
+            keep_recent: So viele neueste Nachrichten bleiben wörtlich
+            token_budget: Max. Token für Zusammenfassung + Historie im Prompt
+            summary_tokens: Max. Token der Zusammenfassung
+            counter: TokenCounter (default: gemeinsamer Counter)
+            usage_sink: Speichert die AI-Aufrufe eines Laufs (z.B. InteractionLogger.log_ai_calls)
+        """
+        self.context_manager = context_manager
+        self.ai_client = ai_client
+        self.mode = mode
+        self.keep_recent = keep_recent
+        self.token_budget = token_budget
+        self.summary_tokens = summary_tokens
+        self.counter = counter or get_token_counter()
+        self.usage_sink = usage_sink
+        
+        self._running: Dict[int, bool] = {}  # user_id -> erneut laufen?
+        
+        self.stats = {
+            'runs': 0,
+            'provider': 0,
+            'extractive': 0,
+            'fallbacks': 0,
+            'summarized_messages': 0,
+            'prompt_tokens_saved': 0,
+            'dropped_messages': 0
+        }
+    
+    def pending_messages(self, user_id: int) -> List[Dict[str, Any]]:
+        """
+        Nachrichten, die in die Zusammenfassung gehören, aber noch fehlen
+        
+        Das sind verdrängte Nachrichten und alle außer den keep_recent neuesten.
+        
+        Args:
+            user_id: Telegram User ID
+        """
+        summary = self.context_manager.get_summary(user_id)
+        until = summary['until'] if summary else None
+        messages = self.context_manager.get_messages(user_id)
+        older = messages[:-self.keep_recent] if self.keep_recent else messages
+        candidates = self.context_manager.take_evicted(user_id) + older
+        return [msg for msg in candidates if until is None or msg['timestamp'] > until]
+    
+    async def summarize(self, user_id: int) -> Optional[str]:
+        """
+        Aktualisiert die Zusammenfassung eines Users
+        
+        Args:
+            user_id: Telegram User ID
+        
+        Returns:
+            Neue Zusammenfassung oder None wenn nichts zu tun war
+        """
+        messages = self.pending_messages(user_id)
+        if not messages:
+            return None
+        
+        summary = self.context_manager.get_summary(user_id)
+        previous = summary['text'] if summary else None
+        text = None
+        
+        if self.mode == PROVIDER and self.ai_client is not None:
+            text = await self._provider_summary(previous, messages)
+            if text is None:
+                self.stats['fallbacks'] += 1
+            else:
+                self.stats['provider'] += 1
+        
+        if text is None:
+            text = extractive_summary(previous, messages, self.summary_tokens, self.counter)
+            self.stats['extractive'] += 1
+        
+        text = truncate_to_tokens(text, self.summary_tokens, self.counter)
+        self.context_manager.set_summary(user_id, text, until=messages[-1]['timestamp'])
+        
+        self.stats['runs'] += 1
+        self.stats['summarized_messages'] += len(messages)
+        logger.info(f"🗜️  Zusammenfassung für {user_id}: {len(messages)} Nachrichten -> "
+                    f"{self.counter.count(text)} Token")
+        return text
+    
+    async def _provider_summary(self, previous: Optional[str], messages: List[Dict[str, Any]]) -> Optional[str]:
+        """Zusammenfassung über den AI Client (None bei Fehler)"""
+        transcript = '\n'.join(f"{_role_label(msg['role'])}: {msg['content']}" for msg in messages)
+        if previous:
+            transcript = f"Bisherige Zusammenfassung:\n{previous}\n\nNeue Nachrichten:\n{transcript}"
+        
+        context = {
+            'system_prompt': SUMMARY_PROMPT.format(max_tokens=self.summary_tokens),
+            'temperature': 0.2,
+            'max_tokens': self.summary_tokens,
+            'max_length': self.summary_tokens,
+            'no_cache': True
+        }
+        try:
+            response = await self.ai_client.chat(transcript, context)
+        except Exception as e:
+            logger.warning(f"⚠️ Zusammenfassung über Provider fehlgeschlagen: {e}")
+            return None
+        if is_error_response(response) or not response.strip():
+            return None
+        return response.strip()
+    
+    async def _run(self, user_id: int) -> None:
+        """Fasst zusammen, bis keine neuen Nachrichten mehr anstehen"""
+        # Hintergrund-Aufrufe zählen nicht gegen das Rate-Limit des Users
+        current_user.set(None)
+        calls = collect_calls()
+        try:
+            while self._running.get(user_id):
+                self._running[user_id] = False
+                await self.summarize(user_id)
+        except Exception as e:
+            logger.error(f"❌ Zusammenfassung für {user_id} fehlgeschlagen: {e}")
+        finally:
+            self._running.pop(user_id, None)
+        
+        # SQLite nicht im Event-Loop schreiben
+        if calls and self.usage_sink is not None:
+            await asyncio.get_running_loop().run_in_executor(None, self.usage_sink, calls)
+    
+    def schedule(self, user_id: int, loop: asyncio.AbstractEventLoop) -> None:
+        """
+        Startet die Zusammenfassung im Hintergrund (blockiert nicht)
+        
+        Läuft für den User schon eine, wird sie danach wiederholt.
+        
+        Args:
+            user_id: Telegram User ID
+            loop: Laufender Event-Loop (z.B. der Hintergrund-Loop des Bots)
+        """
+        if user_id in self._running:
+            self._running[user_id] = True
+            return
+        self._running[user_id] = True
+        asyncio.run_coroutine_threadsafe(self._run(user_id), loop)
+    
+    def history_for_prompt(self, user_id: int,
+                           skip_last: int = 0) -> Tuple[Optional[str], List[Dict[str, str]]]:
+        """
+        Zusammenfassung und wörtliche Historie im Token-Budget
+        
+        Die aktuelle (letzte) Nachricht ist nicht enthalten. Neueste
+        Nachrichten haben Vorrang; was nicht ins Budget passt und noch
+        nicht zusammengefasst ist, fehlt bis zum nächsten Lauf.
+        
+        Args:
+            user_id: Telegram User ID
+            skip_last: So viele Nachrichten vor der aktuellen weglassen
+                       (z.B. bereits in die aktuelle Nachricht zusammengeführte)
+        
+        Returns:
+            Tuple (Zusammenfassung oder None, Messages mit role und content)
+        """
+        summary = self.context_manager.get_summary(user_id)
+        history = self.context_manager.get_messages(user_id)[:-1]
+        if skip_last:
+            history = history[:-skip_last]
+        messages = history
+        text = None
+        budget = self.token_budget
+        
+        if summary:
+            messages = [msg for msg in messages if msg['timestamp'] > summary['until']]
+            text = summary['text']
+            budget -= self.counter.count(text)
+        
+        recent: List[Dict[str, str]] = []
+        for msg in reversed(messages):
+            tokens = self.counter.count(msg['content']) + 3
+            if tokens > budget:
+                break
+            recent.insert(0, {'role': msg['role'], 'content': msg['content']})
+            budget -= tokens
+        
+        self.stats['dropped_messages'] += len(messages) - len(recent)
+        verbatim = sum(self.counter.count(msg['content']) for msg in history)
+        self.stats['prompt_tokens_saved'] += max(0, verbatim - (self.token_budget - budget))
+        return text, recent
+    
+    def get_statistics(self) -> Dict[str, Any]:
+        """
+        Statistiken
+        
+        Returns:
+            Dict mit runs, provider, extractive, fallbacks, summarized_messages,
+            prompt_tokens_saved, dropped_messages, users
+        """
+        stats = dict(self.stats)
+        stats['users'] = len(self.context_manager.summaries)
+        return stats
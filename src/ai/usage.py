@@ -0,0 +1,245 @@
+"""
+Usage - Token, Latenz und Kosten pro AI-Aufruf
+
+Jeder Provider-Aufruf wird mit Provider, Modell, Token (`usage` der API,
+sonst lokal geschätzt), Dauer, Zeit bis zum ersten Byte und geschätzten
+Kosten erfasst:
+
+- In-Memory-Aggregate für /stats: p50/p95 Latenz pro Modell, Token pro
+  User und Tag (get_usage_stats)
+- Pro Anfrage gesammelt (collect_calls) und vom InteractionLogger neben
+  der Interaktion in `ai_calls` gespeichert
+
+Der User wird aus `current_user` (Rate-Limiter) gelesen; Sammlung und User
+wandern wie dort per ContextVar in den AI Event-Loop.
+"""
+
+import time
+import logging
+import contextvars
+from datetime import date
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.ai.latency import LatencyHistogram
+from src.ai.prompt_cache import get_token_counter
+from src.ai.rate_limiter import current_user
+
+logger = logging.getLogger(__name__)
+
+# Aufrufe der aktuellen Anfrage (None = nicht sammeln)
+current_calls: contextvars.ContextVar = contextvars.ContextVar('ai_calls', default=None)
+
+
+def collect_calls() -> List[Dict[str, Any]]:
+    """
+    Startet die Sammlung der AI-Aufrufe für die aktuelle Anfrage
+    
+    Returns:
+        Liste, in die alle folgenden Aufrufe (auch im AI Event-Loop) eingetragen werden
+    """
+    calls: List[Dict[str, Any]] = []
+    current_calls.set(calls)
+    return calls
+
+
+def estimate_tokens(text: Optional[str]) -> int:
+    """Token-Schätzung für Provider ohne `usage` (z.B. HF Inference API)"""
+    return get_token_counter().count(text or '')
+
+
+class UsageStats:
+    """
+    Aggregierte Token, Latenzen und Kosten aller AI-Aufrufe
+    """
+    
+    def __init__(self, max_days: int = 30):
+        """
+        Args:
+            max_days: So viele Tage werden Token pro User im Speicher gehalten
+        """
+        self.max_days = max_days
+        self.latency: Dict[str, LatencyHistogram] = {}
+        self.ttfb: Dict[str, LatencyHistogram] = {}
+        self.models: Dict[str, Dict[str, Any]] = {}
+        self.daily: Dict[Tuple[Optional[int], str], Dict[str, Any]] = {}
+        self.last: Optional[Dict[str, Any]] = None
+        
+        self.stats = {
+            'calls': 0,
+            'errors': 0,
+            'prompt_tokens': 0,
+            'completion_tokens': 0,
+            'estimated': 0,
+            'cost': 0.0
+        }
+    
+    def record(self,
+               provider: str,
+               model: str,
+               seconds: float,
+               usage: Optional[Dict[str, Any]] = None,
+               ttfb: Optional[float] = None,
+               streamed: bool = False,
+               error: Optional[str] = None,
+               cost_per_1k_tokens: float = 0.0,
+               prompt: Optional[str] = None,
+               completion: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Erfasst einen AI-Aufruf
+        
+        Args:
+            provider: Provider-Klasse (z.B. 'OpenRouterProvider')
+            model: Modell-ID
+            seconds: Dauer des Aufrufs (inkl. Retries)
+            usage: `usage` der API (prompt_tokens, completion_tokens, ...)
+            ttfb: Zeit bis zum ersten Byte bzw. ersten Stream-Fragment
+            streamed: True bei Streaming
+            error: Fehlermeldung, wenn der Aufruf fehlgeschlagen ist
+            cost_per_1k_tokens: Preis in USD pro 1000 Token
+            prompt: Prompt-Text (für die Schätzung ohne usage)
+            completion: Antwort-Text (für die Schätzung ohne usage)
+        
+        Returns:
+            Eintrag des Aufrufs (wie in der Tabelle ai_calls)
+        """
+        usage = usage or {}
+        estimated = not usage and error is None
+        prompt_tokens = usage.get('prompt_tokens')
+        completion_tokens = usage.get('completion_tokens')
+        if prompt_tokens is None:
+            prompt_tokens = estimate_tokens(prompt) if error is None else 0
+        if completion_tokens is None:
+            completion_tokens = estimate_tokens(completion) if error is None else 0
+        cached_tokens = (usage.get('prompt_tokens_details') or {}).get('cached_tokens')
+        cost = (prompt_tokens + completion_tokens) / 1000 * cost_per_1k_tokens
+        user_id = current_user.get()
+        
+        call = {
+            'timestamp': time.time(),
+            'user_id': user_id,
+            'provider': provider,
+            'model': model,
+            'prompt_tokens': prompt_tokens,
+            'completion_tokens': completion_tokens,
+            'cached_tokens': cached_tokens,
+            'estimated': estimated,
+            'seconds': seconds,
+            'ttfb': ttfb,
+            'streamed': streamed,
+            'cost': cost,
+            'error': error
+        }
+        
+        calls = current_calls.get()
+        if calls is not None:
+            calls.append(call)
+        self._aggregate(call)
+        self.last = call
+        
+        ttfb_text = f", erstes Byte {ttfb:.2f}s" if ttfb is not None else ''
+        logger.info(f"🧾 {model}: {prompt_tokens}+{completion_tokens} Token"
+                    f"{' (geschätzt)' if estimated else ''}, {seconds:.2f}s{ttfb_text}"
+                    f"{f', ${cost:.5f}' if cost else ''}{' ❌' if error else ''}")
+        return call
+    
+    def _aggregate(self, call: Dict[str, Any]) -> None:
+        """Aktualisiert Latenz-Histogramme, Modell- und Tages-Zähler"""
+        model = call['model']
+        tokens = call['prompt_tokens'] + call['completion_tokens']
+        
+        self.stats['calls'] += 1
+        self.stats['prompt_tokens'] += call['prompt_tokens']
+        self.stats['completion_tokens'] += call['completion_tokens']
+        self.stats['estimated'] += int(call['estimated'])
+        self.stats['cost'] += call['cost']
+        
+        per_model = self.models.setdefault(model, {'provider': call['provider'], 'calls': 0,
+                                                   'errors': 0, 'tokens': 0, 'cost': 0.0})
+        per_model['calls'] += 1
+        per_model['tokens'] += tokens
+        per_model['cost'] += call['cost']
+        if call['error']:
+            self.stats['errors'] += 1
+            per_model['errors'] += 1
+        else:
+            self.latency.setdefault(model, LatencyHistogram()).record(call['seconds'])
+            if call['ttfb'] is not None:
+                self.ttfb.setdefault(model, LatencyHistogram()).record(call['ttfb'])
+        
+        day = date.fromtimestamp(call['timestamp']).isoformat()
+        daily = self.daily.setdefault((call['user_id'], day), {'calls': 0, 'prompt_tokens': 0,
+                                                               'completion_tokens': 0, 'cost': 0.0})
+        daily['calls'] += 1
+        daily['prompt_tokens'] += call['prompt_tokens']
+        daily['completion_tokens'] += call['completion_tokens']
+        daily['cost'] += call['cost']
+        
+        if len({key[1] for key in self.daily}) > self.max_days:
+            oldest = min(key[1] for key in self.daily)
+            self.daily = {key: value for key, value in self.daily.items() if key[1] != oldest}
+    
+    def get_model_latency(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Latenz und Verbrauch pro Modell
+        
+        Returns:
+            Dict Modell -> provider, calls, errors, tokens, cost, p50, p95, ttfb_p50, ttfb_p95
+        """
+        result = {}
+        for model, per_model in self.models.items():
+            latency = self.latency.get(model)
+            ttfb = self.ttfb.get(model)
+            result[model] = dict(per_model)
+            result[model].update({
+                'p50': latency.quantile(0.5) if latency else None,
+                'p95': latency.quantile(0.95) if latency else None,
+                'ttfb_p50': ttfb.quantile(0.5) if ttfb else None,
+                'ttfb_p95': ttfb.quantile(0.95) if ttfb else None
+            })
+        return result
+    
+    def get_daily_tokens(self, user_id: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Token pro User und Tag
+        
+        Args:
+            user_id: Nur dieser User (default: alle)
+        
+        Returns:
+            Liste von Dicts mit user_id, day, calls, prompt_tokens, completion_tokens, cost
+        """
+        rows = []
+        for (uid, day), values in sorted(self.daily.items(), key=lambda item: (item[0][1], str(item[0][0]))):
+            if user_id is not None and uid != user_id:
+                continue
+            row = {'user_id': uid, 'day': day}
+            row.update(values)
+            rows.append(row)
+        return rows
+    
+    def get_statistics(self) -> Dict[str, Any]:
+        """
+        Gesamtverbrauch
+        
+        Returns:
+            Dict mit calls, errors, prompt_tokens, completion_tokens, estimated, cost, models
+        """
+        stats = dict(self.stats)
+        stats['models'] = len(self.models)
+        return stats
+
+
+_default_stats: Optional[UsageStats] = None
+
+
+def get_usage_stats() -> UsageStats:
+    """
+    Gibt die gemeinsame Usage-Statistik aller Provider zurück
+    
+    Returns:
+        UsageStats Singleton
+    """
+    global _default_stats
+    if _default_stats is None:
+        _default_stats = UsageStats()
+    return _default_stats
@@ -0,0 +1,225 @@
+"""
+Stream Renderer - Zeigt gestreamte KI-Antworten schrittweise in Telegram an
+
+Sendet sofort eine Platzhalter-Nachricht und bearbeitet sie gebündelt,
+sobald neue Token eintreffen. Telegram limitiert Edits pro Chat, daher
+wird höchstens alle `min_interval` Sekunden aktualisiert. Der endgültige
+Text kommt immer an - notfalls als neue Nachricht, überlange Antworten
+in mehreren Nachrichten.
+"""
+
+import time
+import logging
+from typing import List, Optional
+
+from telegram import Message
+from telegram.error import BadRequest, RetryAfter, TelegramError
+
+logger = logging.getLogger(__name__)
+
+# Telegram erlaubt max. 4096 Zeichen pro Nachricht
+MAX_MESSAGE_LENGTH = 4096
+
+
+def split_message(text: str, limit: int = MAX_MESSAGE_LENGTH) -> List[str]:
+    """
+    Teilt einen Text in Stücke, die in eine Telegram-Nachricht passen
+    
+    Geschnitten wird bevorzugt an einem Zeilenumbruch, sonst an einem
+    Leerzeichen - nur ohne beides mitten im Wort.
+    
+    Args:
+        text: Vollständiger Text
+        limit: Max. Zeichen pro Stück
+    
+    Returns:
+        Liste der Stücke (mindestens eins)
+    """
+    parts = []
+    while len(text) > limit:
+        cut = text.rfind('\n', 0, limit)
+        if cut < limit // 2:
+            cut = text.rfind(' ', 0, limit)
+        if cut < limit // 2:
+            cut = limit
+        parts.append(text[:cut])
+        text = text[cut:].lstrip()
+    if text or not parts:
+        parts.append(text)
+    return parts
+
+
+class StreamingReply:
+    """
+    Progressive Antwort-Nachricht für einen Token-Stream
+    """
+    
+    def __init__(self,
+                 reply_to: Message,
+                 placeholder: str = "✍️ ...",
+                 min_interval: float = 1.0,
+                 min_chars: int = 15,
+                 cursor: str = " ▌",
+                 hold_marker: Optional[str] = '{'):
+        """
+        Args:
+            reply_to: Nachricht, auf die geantwortet wird
+            placeholder: Text der Platzhalter-Nachricht
+            min_interval: Mindestabstand zwischen zwei Edits in Sekunden
+            min_chars: Mindestanzahl neuer Zeichen pro Edit
+            cursor: Wird während des Streams an den Text angehängt
+            hold_marker: Taucht dieses Zeichen auf, werden keine Zwischenstände
+                         mehr angezeigt (z.B. JSON-Aktionen der KI)
+        """
+        self.reply_to = reply_to
+        self.placeholder = placeholder
+        self.min_interval = min_interval
+        self.min_chars = min_chars
+        self.cursor = cursor
+        self.hold_marker = hold_marker
+        
+        self.message: Optional[Message] = None
+        self.text = ""
+        self.held = False
+        self.edit_count = 0
+        self.first_chunk_at: Optional[float] = None
+        self.started_at: Optional[float] = None
+        
+        self._shown_text = ""
+        self._last_edit_at = 0.0
+    
+    def start(self) -> None:
+        """Sendet die Platzhalter-Nachricht"""
+        self.started_at = time.monotonic()
+        self.message = self.reply_to.reply_text(self.placeholder)
+        self._last_edit_at = time.monotonic()
+    
+    def feed(self, chunk: str) -> None:
+        """
+        Hängt ein Text-Fragment an und aktualisiert die Nachricht bei Bedarf
+        
+        Args:
+            chunk: Neues Text-Fragment aus dem Stream
+        """
+        if self.first_chunk_at is None:
+            self.first_chunk_at = time.monotonic()
+        
+        self.text += chunk
+        
+        if self.hold_marker and self.hold_marker in self.text:
+            self.held = True
+        
+        if self.held or self.message is None:
+            return
+        
+        now = time.monotonic()
+        new_chars = len(self.text) - len(self._shown_text)
+        
+        if now - self._last_edit_at >= self.min_interval and new_chars >= self.min_chars:
+            self._edit(self.text + self.cursor)
+    
+    def finish(self, final_text: Optional[str] = None) -> None:
+        """
+        Zeigt den endgültigen Text an
+        
+        Bei Flood-Control wird nach `retry_after` ein zweites Mal bearbeitet;
+        schlägt auch das fehl, ersetzt eine neue Nachricht den Platzhalter.
+        Text über MAX_MESSAGE_LENGTH folgt in weiteren Nachrichten.
+        
+        Args:
+            final_text: Endgültiger Text (default: gesammelter Stream-Text)
+        """
+        text = final_text if final_text is not None else self.text
+        if not text.strip():
+            text = "Entschuldigung, ich konnte keine Antwort generieren."
+        
+        first, *rest = split_message(text)
+        if self.message is None or not self._final_edit(first):
+            # Platzhalter mit halbem Text und Cursor nicht stehen lassen
+            self.discard()
+            self._send(first)
+        for part in rest:
+            self._send(part)
+    
+    def discard(self) -> None:
+        """Löscht die Platzhalter-Nachricht (z.B. wenn eine Aktion ausgeführt wird)"""
+        if self.message is None:
+            return
+        
+        try:
+            self.message.delete()
+        except TelegramError as e:
+            logger.debug(f"Platzhalter konnte nicht gelöscht werden: {e}")
+        self.message = None
+    
+    @property
+    def time_to_first_chunk(self) -> Optional[float]:
+        """Sekunden zwischen Platzhalter und erstem Token"""
+        if self.first_chunk_at is None or self.started_at is None:
+            return None
+        return self.first_chunk_at - self.started_at
+    
+    def _final_edit(self, text: str) -> bool:
+        """
+        Letzter Edit der Nachricht, bei Flood-Control ein zweiter Versuch
+        
+        Args:
+            text: Endgültiger Text (passt in eine Nachricht)
+        
+        Returns:
+            True wenn die Nachricht den Text zeigt
+        """
+        if text == self._shown_text:
+            return True
+        
+        for attempt in range(2):
+            try:
+                self.message.edit_text(text)
+                self._shown_text = text
+                self.edit_count += 1
+                return True
+            except RetryAfter as e:
+                if attempt:
+                    break
+                logger.warning(f"⏳ Telegram Flood-Control - letzter Edit in {e.retry_after}s")
+                time.sleep(float(e.retry_after))
+            except BadRequest as e:
+                if 'not modified' in str(e).lower():
+                    return True
+                logger.warning(f"⚠️ Letzter Edit fehlgeschlagen: {e}")
+                break
+            except TelegramError as e:
+                logger.warning(f"⚠️ Letzter Edit fehlgeschlagen: {e}")
+                break
+        return False
+    
+    def _send(self, text: str) -> None:
+        """Sendet eine neue Nachricht, bei Flood-Control nach retry_after erneut"""
+        try:
+            self.reply_to.reply_text(text)
+        except RetryAfter as e:
+            logger.warning(f"⏳ Telegram Flood-Control - Senden in {e.retry_after}s")
+            time.sleep(float(e.retry_after))
+            self.reply_to.reply_text(text)
+    
+    def _edit(self, text: str) -> None:
+        """Bearbeitet die Nachricht (Fehler werden nur geloggt)"""
+        text = text[:MAX_MESSAGE_LENGTH]
+        if text == self._shown_text:
+            return
+        
+        try:
+            self.message.edit_text(text)
+            self._shown_text = text
+            self.edit_count += 1
+        except RetryAfter as e:
+            # Flood-Control: Edits seltener durchführen
+            self.min_interval = max(self.min_interval, float(e.retry_after))
+            logger.warning(f"⏳ Telegram Flood-Control - Edit-Intervall jetzt {self.min_interval}s")
+        except BadRequest as e:
+            # z.B. "Message is not modified"
+            logger.debug(f"Edit übersprungen: {e}")
+        except TelegramError as e:
+            logger.warning(f"⚠️ Edit fehlgeschlagen: {e}")
+        finally:
+            self._last_edit_at = time.monotonic()
@@ -0,0 +1,175 @@
+"""
+Request Supersession - Neuere Nachrichten lösen laufende KI-Anfragen ab
+
+Schickt ein User mehrere Nachrichten kurz hintereinander, bricht jede neue
+Nachricht die noch laufende KI-Anfrage desselben Users ab (CancelToken).
+So kommen Antworten nicht in falscher Reihenfolge an und abgelöste Aufrufe
+belasten das Kontingent nicht weiter.
+
+Optional:
+- Ruhefenster (Debounce): vor dem KI-Aufruf kurz warten, ob noch eine
+  Nachricht kommt - abgelöste Anfragen starten gar nicht erst
+- Zusammenführen: die Texte abgelöster Anfragen werden der neuen Anfrage
+  als ein gemeinsamer Prompt vorangestellt
+
+Hat eine Anfrage ihre Antwort bereits übernommen (commit), wird sie nicht
+mehr abgelöst - z.B. damit ein Termin nicht doppelt angelegt wird.
+"""
+
+import logging
+import threading
+from typing import Any, Dict, List
+
+from src.utils.async_bridge import CancelToken
+
+logger = logging.getLogger(__name__)
+
+
+class PendingRequest:
+    """
+    Laufende KI-Anfrage eines Users
+    """
+    
+    def __init__(self, user_id: int, texts: List[str]):
+        """
+        Args:
+            user_id: Telegram User-ID
+            texts: Nachrichten dieser Anfrage (abgelöste zuerst, neueste zuletzt)
+        """
+        self.user_id = user_id
+        self.texts = texts
+        self.token = CancelToken()
+        self.committed = False
+        self._superseded = threading.Event()
+    
+    @property
+    def superseded(self) -> bool:
+        """True wenn eine neuere Nachricht die Anfrage abgelöst hat"""
+        return self._superseded.is_set()
+    
+    @property
+    def merged(self) -> int:
+        """Anzahl zusammengeführter älterer Nachrichten"""
+        return len(self.texts) - 1
+    
+    @property
+    def prompt(self) -> str:
+        """Text für den KI-Aufruf (zusammengeführte Nachrichten zeilenweise)"""
+        return '\n'.join(self.texts)
+    
+    def wait_superseded(self, timeout: float) -> bool:
+        """Wartet höchstens `timeout` Sekunden auf eine Ablösung (True = abgelöst)"""
+        return self._superseded.wait(timeout)
+    
+    def supersede(self) -> None:
+        """Bricht die Anfrage ab (laufende run_sync-Aufrufe und das Ruhefenster)"""
+        self._superseded.set()
+        self.token.cancel()
+
+
+class RequestSupersession:
+    """
+    Hält pro User die aktuelle KI-Anfrage und löst ältere ab
+    """
+    
+    def __init__(self, quiet_window: float = 0.0, merge: bool = True, max_merge: int = 5):
+        """
+        Args:
+            quiet_window: Ruhefenster in Sekunden vor dem KI-Aufruf (0 = nur abbrechen)
+            merge: Texte abgelöster Anfragen in die neue Anfrage übernehmen
+            max_merge: Max. Anzahl Nachrichten in einem zusammengeführten Prompt
+        """
+        self.quiet_window = quiet_window
+        self.merge = merge
+        self.max_merge = max_merge
+        
+        self.pending: Dict[int, PendingRequest] = {}
+        self._lock = threading.Lock()
+        
+        self.stats = {
+            'requests': 0,
+            'superseded': 0,
+            'debounced': 0,
+            'merged': 0
+        }
+    
+    def begin(self, user_id: int, text: str) -> PendingRequest:
+        """
+        Meldet eine neue Anfrage an und löst die laufende des Users ab
+        
+        Args:
+            user_id: Telegram User-ID
+            text: Neue Nachricht
+        
+        Returns:
+            PendingRequest (prompt enthält ggf. zusammengeführte Nachrichten)
+        """
+        with self._lock:
+            self.stats['requests'] += 1
+            texts = [text]
+            previous = self.pending.get(user_id)
+            if previous is not None and not previous.committed:
+                previous.supersede()
+                self.stats['superseded'] += 1
+                if self.merge:
+                    texts = (previous.texts + texts)[-self.max_merge:]
+                    self.stats['merged'] += len(texts) - 1
+                logger.info(f"⏭️  Anfrage von {user_id} abgelöst"
+                            f"{f' ({len(texts)} Nachrichten zusammengeführt)' if len(texts) > 1 else ''}")
+            
+            request = PendingRequest(user_id, texts)
+            self.pending[user_id] = request
+            return request
+    
+    def wait_quiet(self, request: PendingRequest) -> bool:
+        """
+        Wartet das Ruhefenster ab (blockiert den Worker-Thread)
+        
+        Args:
+            request: Anfrage aus begin()
+        
+        Returns:
+            False wenn während des Wartens eine neuere Nachricht kam
+        """
+        if self.quiet_window > 0 and request.wait_superseded(self.quiet_window):
+            self.stats['debounced'] += 1
+            return False
+        return not request.superseded
+    
+    def commit(self, request: PendingRequest) -> bool:
+        """
+        Übernimmt die Antwort einer Anfrage (danach wird sie nicht mehr abgelöst)
+        
+        Args:
+            request: Anfrage aus begin()
+        
+        Returns:
+            False wenn die Anfrage bereits abgelöst wurde (Antwort verwerfen)
+        """
+        with self._lock:
+            if request.superseded:
+                return False
+            request.committed = True
+            return True
+    
+    def finish(self, request: PendingRequest) -> None:
+        """
+        Meldet eine Anfrage ab
+        
+        Args:
+            request: Anfrage aus begin()
+        """
+        with self._lock:
+            if self.pending.get(request.user_id) is request:
+                del self.pending[request.user_id]
+    
+    def get_statistics(self) -> Dict[str, Any]:
+        """
+        Zähler für Admin-Befehle
+        
+        Returns:
+            Dict mit requests, superseded, debounced, merged, pending
+        """
+        stats = dict(self.stats)
+        stats['pending'] = len(self.pending)
+        return stats
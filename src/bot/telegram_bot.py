@@ -6,7 +6,8 @@ Verwaltet die Telegram Bot Logik und Nachrichtenverarbeitung
 import os
 import sys
 import logging
-from typing import Optional
+from typing import Any, Dict, List, Optional
+from concurrent.futures import CancelledError
 from datetime import datetime, timedelta
 from functools import wraps
 from telegram import Update
@@ -15,13 +16,35 @@ from telegram.ext import (
     CommandHandler,
     MessageHandler,
     Filters,
-    CallbackContext
+    CallbackContext,
+    run_async
 )
 
 # AI Integration
+from src.ai.ai_client import AIClient
+from src.ai.factory import create_ai_provider, create_provider_chain
+from src.ai.response_cache import CachedProvider, ResponseCache
+from src.ai.semantic_cache import SemanticCache
+from src.ai.intent_classifier import LocalIntentClassifier
+from src.ai.hedging import HedgingPolicy
+from src.ai.router import ProviderRouter
+from src.ai.single_flight import SingleFlight
+from src.ai.cascade import CascadePolicy
+from src.ai.local_provider import LocalModelProvider
 from src.ai.hf_provider import HuggingFaceProvider
-from src.ai.openrouter_provider import OpenRouterProvider
+from src.ai.keep_warm import KeepWarmScheduler
+from src.ai.rate_limiter import RateLimitedProvider, RateLimiter, current_user, parse_provider_limits
+from src.ai.structured_output import CALENDAR_ACTIONS, ActionStream, parse_action
+from src.ai.planner import Plan, plan_context
+from src.ai.prompt_cache import PromptPrefix, get_prompt_cache_stats
+from src.ai.summarizer import ConversationSummarizer
+from src.ai.memory_index import InteractionMemory
+from src.ai.request_profiles import RequestProfiles
+from src.ai.usage import collect_calls, get_usage_stats
 from src.utils.nlp_utils import detect_command_type, parse_event_from_text
+from src.utils.async_bridge import CancelToken, run_sync, iterate_sync, get_background_loop
+from src.bot.stream_renderer import StreamingReply
+from src.bot.supersession import PendingRequest, RequestSupersession
 
 # Calendar Integration
 from src.gcalendar.factory import create_calendar_provider
@@ -39,6 +62,9 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Platzhalter in der Historie für Antworten des Fast-Path (z.B. "[fast_list_today]")
+FAST_PATH_MARKER = '[fast_'
+
 
 def admin_only(func):
     """
@@ -97,19 +123,68 @@ class AdonisBot:
         self.use_ai = use_ai
         self.use_calendar = use_calendar
         self.ai_provider = None
+        self.ai_client: Optional[AIClient] = None
+        self.rate_limiter: Optional[RateLimiter] = None
+        self.keep_warm: List[KeepWarmScheduler] = []
+        self.summarizer: Optional[ConversationSummarizer] = None
         self.calendar_provider = None
         
-        # Context Manager für Chat-Historie
-        self.context_manager = ContextManager(max_messages=10, ttl_minutes=30)
+        # Token-Streaming mit schrittweiser Anzeige (wenn Provider es unterstützt)
+        self.streaming_enabled = os.getenv('AI_STREAMING', 'true').lower() == 'true'
+        self.stream_edit_interval = float(os.getenv('STREAM_EDIT_INTERVAL', '1.0'))
+        
+        # Jede KI-Antwort als JSON nach Schema (response_format / Prompt-Vorgabe)
+        self.structured_output = os.getenv('AI_STRUCTURED_OUTPUT', 'false').lower() == 'true'
+        
+        # Neuere Nachrichten lösen laufende KI-Anfragen desselben Users ab
+        self.supersession: Optional[RequestSupersession] = None
+        if os.getenv('AI_SUPERSEDE_ENABLED', 'true').lower() == 'true':
+            self.supersession = RequestSupersession(
+                quiet_window=float(os.getenv('AI_SUPERSEDE_QUIET_MS', '0')) / 1000,
+                merge=os.getenv('AI_SUPERSEDE_MERGE', 'true').lower() == 'true'
+            )
+        
+        # Statischer System-Prompt-Prefix (wird nur bei Änderungen neu gebaut)
+        self._cached_prompt_prefix = None
+        
+        # Context Manager für Chat-Historie (verdrängte Nachrichten gehen in die Zusammenfassung)
+        summary_enabled = os.getenv('AI_SUMMARY_ENABLED', 'true').lower() == 'true'
+        self.context_manager = ContextManager(max_messages=10, ttl_minutes=30, keep_evicted=summary_enabled)
         
         # Interaction Logger für Personal AI Training
         self.interaction_logger = InteractionLogger()
         logger.info("🧠 Interaction Logging aktiviert - Sammle Daten für Personal AI")
         
+        # Langzeitgedächtnis: relevante frühere Gespräche aus der Datenbank
+        self.memory: Optional[InteractionMemory] = None
+        if os.getenv('AI_MEMORY_ENABLED', 'true').lower() == 'true':
+            self.memory = InteractionMemory(
+                top_k=int(os.getenv('AI_MEMORY_TOP_K', '3')),
+                token_budget=int(os.getenv('AI_MEMORY_TOKEN_BUDGET', '300')),
+                min_similarity=float(os.getenv('AI_MEMORY_MIN_SIMILARITY', '0.35')),
+                index=os.getenv('AI_MEMORY_INDEX', 'auto')
+            )
+            self.interaction_logger.add_listener(self.memory.on_interaction)
+            self.memory.start_loading(self.interaction_logger)
+        
         # Initialisiere AI Provider wenn gewünscht
         if self.use_ai:
             self._init_ai_provider()
         
+        # Laufende Zusammenfassung älterer Nachrichten (im Hintergrund)
+        if self.ai_client and summary_enabled:
+            self.summarizer = ConversationSummarizer(
+                self.context_manager,
+                ai_client=self.ai_client,
+                mode=os.getenv('AI_SUMMARY_MODE', 'extractive'),
+                keep_recent=int(os.getenv('AI_SUMMARY_KEEP_RECENT', '4')),
+                token_budget=int(os.getenv('AI_HISTORY_TOKEN_BUDGET', '400')),
+                summary_tokens=int(os.getenv('AI_SUMMARY_MAX_TOKENS', '120')),
+                usage_sink=self.interaction_logger.log_ai_calls
+            )
+            logger.info(f"🗜️  Zusammenfassung aktiviert ({self.summarizer.mode}, "
+                        f"Budget {self.summarizer.token_budget} Token)")
+        
         # Initialisiere Calendar Provider wenn gewünscht
         if self.use_calendar:
             self._init_calendar_provider()
@@ -117,15 +192,131 @@ class AdonisBot:
     def _init_ai_provider(self):
         """Initialisiert den AI Provider"""
         try:
-            # Prüfe welcher Provider verfügbar ist
-            provider_type = os.getenv('AI_PROVIDER', 'huggingface').lower()
+            # Provider-Kette für den Router (AI_ROUTER_CHAIN, sonst AI_PROVIDER + Fallback)
+            providers = create_provider_chain()
+            if os.getenv('AI_ROUTER_ENABLED', 'true').lower() != 'true':
+                providers = providers[:1]
             
-            if provider_type == 'openrouter' and os.getenv('OPENROUTER_API_KEY'):
-                logger.info("🌐 Verwende OpenRouter Provider")
-                self.ai_provider = OpenRouterProvider()
-            else:
-                logger.info("🤖 Verwende Hugging Face Provider")
-                self.ai_provider = HuggingFaceProvider()
+            # HuggingFace-Modelle gegen Kaltstarts warm halten (startet mit run())
+            if os.getenv('AI_HF_KEEP_WARM', 'true').lower() == 'true':
+                for provider in providers:
+                    if isinstance(provider, HuggingFaceProvider):
+                        provider.keep_warm = KeepWarmScheduler(
+                            provider,
+                            default_interval=float(os.getenv('AI_HF_KEEP_WARM_INTERVAL', '300')),
+                            min_interval=float(os.getenv('AI_HF_KEEP_WARM_MIN_INTERVAL', '60')),
+                            max_interval=float(os.getenv('AI_HF_KEEP_WARM_MAX_INTERVAL', '1800'))
+                        )
+                        self.keep_warm.append(provider.keep_warm)
+            
+            # Token Buckets vor den Remote-Providern (lokale Modelle haben eine eigene Queue)
+            if os.getenv('AI_RATE_LIMIT_ENABLED', 'true').lower() == 'true':
+                self.rate_limiter = RateLimiter(
+                    provider_rate=float(os.getenv('AI_RATE_LIMIT_PROVIDER_RATE', '1.0')),
+                    provider_burst=float(os.getenv('AI_RATE_LIMIT_PROVIDER_BURST', '5')),
+                    user_rate=float(os.getenv('AI_RATE_LIMIT_USER_RATE', '0.2')),
+                    user_burst=float(os.getenv('AI_RATE_LIMIT_USER_BURST', '3')),
+                    max_queue=int(os.getenv('AI_RATE_LIMIT_MAX_QUEUE', '100')),
+                    provider_limits=parse_provider_limits(os.getenv('AI_RATE_LIMIT_PROVIDERS', ''))
+                )
+                self.rate_limit_notice = float(os.getenv('AI_RATE_LIMIT_NOTICE_SECONDS', '2'))
+                providers = [
+                    p if isinstance(p, LocalModelProvider) else RateLimitedProvider(p, self.rate_limiter)
+                    for p in providers
+                ]
+            
+            self.ai_provider = providers[0]
+            fallback_providers = providers[1:]
+            logger.info(f"🤖 Verwende {self.ai_provider.name}")
+            
+            router = ProviderRouter(
+                seconds_per_dollar=float(os.getenv('AI_ROUTER_SECONDS_PER_DOLLAR', '1000')),
+                log_path=os.getenv('AI_ROUTER_LOG') or None
+            )
+            
+            # Identische gleichzeitige Anfragen (z.B. Gruppen-Chats) bündeln
+            single_flight = None
+            if os.getenv('AI_SINGLE_FLIGHT', 'true').lower() == 'true':
+                single_flight = SingleFlight()
+            
+            # Hedging: langsame Provider parallel zum nächsten der Kette
+            hedging = None
+            if fallback_providers and os.getenv('AI_HEDGE_ENABLED', 'true').lower() == 'true':
+                hedging = HedgingPolicy(
+                    quantile=float(os.getenv('AI_HEDGE_QUANTILE', '0.9')),
+                    min_delay=float(os.getenv('AI_HEDGE_MIN_DELAY', '0.25')),
+                    max_delay=float(os.getenv('AI_HEDGE_MAX_DELAY', '10'))
+                )
+                logger.info(f"🏁 Hedging aktiv mit {[p.name for p in fallback_providers]}")
+            
+            # Antwort-Cache vor den Provider schalten
+            cache = None
+            if os.getenv('AI_CACHE_ENABLED', 'true').lower() == 'true':
+                persist = os.getenv('AI_CACHE_PERSIST', 'true').lower() == 'true'
+                cache = ResponseCache(
+                    max_entries=int(os.getenv('AI_CACHE_MAX_ENTRIES', '1000')),
+                    ttl_seconds=float(os.getenv('AI_CACHE_TTL', '3600')),
+                    db_path=os.getenv('AI_CACHE_DB_PATH', 'data/response_cache.db') if persist else None
+                )
+                self.ai_provider = CachedProvider(self.ai_provider, cache)
+                fallback_providers = [CachedProvider(p, cache) for p in fallback_providers]
+            
+            # Kaskade: einfache Nachrichten zuerst an ein kleines Modell
+            cascade = None
+            if os.getenv('AI_CASCADE_ENABLED', 'false').lower() == 'true':
+                small = create_ai_provider(os.getenv('AI_CASCADE_MODEL', 'huggingface:flan-t5-base'))
+                if small is not None:
+                    if self.rate_limiter and not isinstance(small, LocalModelProvider):
+                        small = RateLimitedProvider(small, self.rate_limiter)
+                    if cache is not None:
+                        small = CachedProvider(small, cache)
+                    cascade = CascadePolicy(
+                        small,
+                        max_words=int(os.getenv('AI_CASCADE_MAX_WORDS', '6')),
+                        max_tokens=int(os.getenv('AI_CASCADE_MAX_TOKENS', '60'))
+                    )
+                    logger.info(f"🪜 Kaskade aktiv mit {small.name}")
+            
+            # Semantic Cache für ähnlich formulierte Fragen
+            semantic_cache = None
+            if os.getenv('AI_SEMANTIC_CACHE_ENABLED', 'true').lower() == 'true':
+                semantic_cache = SemanticCache(
+                    threshold=float(os.getenv('AI_SEMANTIC_CACHE_THRESHOLD', '0.9')),
+                    max_entries=int(os.getenv('AI_SEMANTIC_CACHE_MAX_ENTRIES', '2000')),
+                    ttl_seconds=float(os.getenv('AI_CACHE_TTL', '3600'))
+                )
+            
+            # Lokaler Intent-Classifier für eindeutige Befehle
+            intent_classifier = None
+            if os.getenv('AI_INTENT_FAST_PATH', 'true').lower() == 'true':
+                intent_classifier = LocalIntentClassifier(
+                    threshold=float(os.getenv('AI_INTENT_THRESHOLD', '0.85'))
+                )
+            
+            # Anfrage-Profile: max_tokens/temperature pro Klasse aus den Antwort-Längen
+            profiles = None
+            if os.getenv('AI_PROFILES_ENABLED', 'true').lower() == 'true':
+                profiles = RequestProfiles(
+                    quantile=float(os.getenv('AI_PROFILES_QUANTILE', '0.95')),
+                    max_tokens_cap=int(os.getenv('AI_PROFILES_MAX_TOKENS', '1500'))
+                )
+                try:
+                    profiles.load(self.interaction_logger)
+                except Exception as e:
+                    logger.warning(f"⚠️ Antwort-Längen konnten nicht geladen werden: {e}")
+                self.interaction_logger.add_listener(profiles.on_interaction)
+            
+            self.ai_client = AIClient(
+                self.ai_provider,
+                semantic_cache=semantic_cache,
+                intent_classifier=intent_classifier,
+                fallback_providers=fallback_providers,
+                hedging=hedging,
+                router=router,
+                single_flight=single_flight,
+                cascade=cascade,
+                profiles=profiles
+            )
             
             logger.info("✅ AI Provider initialisiert")
             
@@ -133,6 +324,9 @@ class AdonisBot:
             logger.warning(f"⚠️  AI Provider konnte nicht initialisiert werden: {e}")
             logger.info("ℹ️  Bot läuft im Echo-Modus")
             self.ai_provider = None
+            self.ai_client = None
+            self.rate_limiter = None
+            self.keep_warm = []
     
     def _init_calendar_provider(self):
         """Initialisiert den Calendar Provider"""
@@ -194,7 +388,8 @@ class AdonisBot:
             
             "**🔒 Admin-Befehle:**\n"
             "/shutdown - Bot herunterfahren (nur Admin)\n"
-            "/stats - Training Dataset Statistiken (nur Admin)\n\n"
+            "/stats - Training Dataset Statistiken (nur Admin)\n"
+            "/health - Zustand der AI Provider (nur Admin)\n\n"
             
             "**📅 Kalender-Befehle:**\n"
             "/today - Heutige Termine anzeigen\n"
@@ -361,6 +556,115 @@ class AdonisBot:
             for action, count in sorted(stats['actions'].items(), key=lambda x: x[1], reverse=True):
                 stats_text += f"• {action}: {count}x\n"
             
+            # Antwort-Cache
+            if isinstance(self.ai_provider, CachedProvider):
+                cache_stats = self.ai_provider.cache.get_statistics()
+                stats_text += (
+                    f"\n⚡ **AI Cache:**\n"
+                    f"• Treffer: {cache_stats['memory_hits']} Memory / {cache_stats['disk_hits']} Disk\n"
+                    f"• Fehlschläge: {cache_stats['misses']} (umgangen: {cache_stats['bypassed']})\n"
+                    f"• Hit-Rate: {cache_stats['hit_rate']:.0%}\n"
+                )
+            
+            if self.ai_client and self.ai_client.semantic_cache:
+                semantic_stats = self.ai_client.semantic_cache.get_statistics()
+                stats_text += (
+                    f"• Ähnliche Fragen: {semantic_stats['hits']} Treffer "
+                    f"({semantic_stats['entries']} Einträge)\n"
+                )
+            
+            if self.ai_client:
+                intent_stats = self.ai_client.intent_stats
+                stats_text += (
+                    f"• Intents lokal/remote: {intent_stats['local']}/{intent_stats['remote']} "
+                    f"(LLM-Aufrufe gespart: {intent_stats['local']})\n"
+                )
+            
+            if self.ai_client and self.ai_client.fallback_providers:
+                router_stats = self.ai_client.router.get_statistics()
+                stats_text += (
+                    f"• Routing: {router_stats['routed']} Anfragen, "
+                    f"{router_stats['fallbacks']} Fallbacks, {router_stats['failed']} ohne Antwort\n"
+                )
+            
+            if self.ai_client and self.ai_client.profiles:
+                profile_stats = self.ai_client.profiles.get_statistics()
+                stats_text += "• Profile: " + ', '.join(
+                    f"{name} {profile['max_tokens']} Token ({profile['requests']}×)"
+                    for name, profile in profile_stats.items()
+                ) + "\n"
+            
+            if self.ai_client and self.ai_client.cascade:
+                cascade_stats = self.ai_client.cascade.get_statistics()
+                stats_text += (
+                    f"• Kaskade: {cascade_stats['accepted']} von {cascade_stats['attempts']} "
+                    f"vom kleinen Modell (Eskalation {cascade_stats['escalation_rate']:.0%}, "
+                    f"{cascade_stats['saved_seconds']:.1f}s gespart)\n"
+                )
+            
+            if self.supersession and self.supersession.stats['superseded']:
+                supersession_stats = self.supersession.get_statistics()
+                stats_text += (
+                    f"• Abgelöst: {supersession_stats['superseded']} von {supersession_stats['requests']} "
+                    f"KI-Anfragen ({supersession_stats['debounced']} vor dem Aufruf, "
+                    f"{supersession_stats['merged']} Nachrichten zusammengeführt)\n"
+                )
+            
+            if self.ai_client and self.ai_client.single_flight:
+                flight_stats = self.ai_client.single_flight.get_statistics()
+                stats_text += (
+                    f"• Gebündelt: {flight_stats['saved']} von {flight_stats['calls']} Anfragen "
+                    f"(Upstream-Aufrufe gespart: {flight_stats['saved_rate']:.0%})\n"
+                )
+            
+            if self.summarizer:
+                summary_stats = self.summarizer.get_statistics()
+                stats_text += (
+                    f"• Zusammenfassungen: {summary_stats['runs']} für {summary_stats['users']} User, "
+                    f"{summary_stats['prompt_tokens_saved']} Prompt-Token gespart\n"
+                )
+            
+            if self.memory:
+                memory_stats = self.memory.get_statistics()
+                p50 = f", Suche p50 {memory_stats['p50_ms']:.1f}ms" if memory_stats['p50_ms'] is not None else ''
+                stats_text += (
+                    f"• Gedächtnis: {memory_stats['entries']} Gespräche, "
+                    f"{memory_stats['hits']} Treffer in {memory_stats['queries']} Suchen{p50}\n"
+                )
+            
+            usage_stats = get_usage_stats()
+            if usage_stats.stats['calls']:
+                stats_text += (
+                    f"• AI-Aufrufe: {usage_stats.stats['calls']} "
+                    f"({usage_stats.stats['prompt_tokens'] + usage_stats.stats['completion_tokens']} Token, "
+                    f"~${usage_stats.stats['cost']:.4f})\n"
+                )
+                for model, latency in usage_stats.get_model_latency().items():
+                    if latency['p50'] is not None:
+                        stats_text += f"  - {model}: p50 {latency['p50']:.2f}s, p95 {latency['p95']:.2f}s\n"
+            
+            prompt_stats = get_prompt_cache_stats().get_statistics()
+            if prompt_stats['requests']:
+                stats_text += (
+                    f"• Prompt-Cache: {prompt_stats['hits']}/{prompt_stats['requests']} Treffer, "
+                    f"{prompt_stats['cached_tokens']} Token gecacht ({prompt_stats['cached_share']:.0%})\n"
+                )
+            
+            if self.rate_limiter:
+                limit_stats = self.rate_limiter.get_statistics()
+                stats_text += (
+                    f"• Rate-Limit: {limit_stats['queued']} angestellt, "
+                    f"{limit_stats['user_throttled']} gedrosselt, {limit_stats['rejected']} abgelehnt "
+                    f"(Ø {limit_stats['avg_wait']:.1f}s)\n"
+                )
+            
+            if self.ai_client and self.ai_client.hedging_enabled:
+                hedge_stats = self.ai_client.hedging.get_statistics()
+                stats_text += (
+                    f"• Hedges: {hedge_stats['hedges']} gestartet, "
+                    f"{hedge_stats['hedge_wins']} gewonnen, {hedge_stats['failovers']} Failover\n"
+                )
+            
             stats_text += (
                 f"\n💡 **Tipp:**\n"
                 f"Je mehr du den Bot nutzt, desto besser kann\n"
@@ -387,6 +691,47 @@ class AdonisBot:
                 "Prüfe die Logs für Details."
             )
     
+    @admin_only
+    def health_command(self, update: Update, context: CallbackContext) -> None:
+        """
+        Handler für den /health Befehl - Circuit Breaker und Timeouts der AI Provider (Admin only)
+        
+        Args:
+            update: Telegram Update Objekt
+            context: Callback Context
+        """
+        if not self.ai_client:
+            update.message.reply_text("❌ Kein AI Provider aktiv (Echo-Modus)")
+            return
+        
+        icons = {'closed': '🟢', 'half_open': '🟡', 'open': '🔴'}
+        text = "🩺 **AI Provider Status**\n"
+        
+        for status in self.ai_client.provider_status():
+            p99 = f"{status['p99']:.1f}s" if status['p99'] is not None else "n/a"
+            text += (
+                f"\n{icons.get(status['state'], '⚪')} **{status['name']}**: {status['state']}\n"
+                f"• Fehlerquote: {status['error_rate']:.0%} "
+                f"({status['failures']}/{status['calls']} im Fenster)\n"
+                f"• p99: {p99} ({status['samples']} Messungen), Timeout: {status['timeout']:.1f}s\n"
+                f"• Abgelehnt: {status['rejected']}, geöffnet: {status['opened']}x\n"
+            )
+            if status['state'] == 'open':
+                text += f"• Nächster Versuch in {status['retry_in']:.0f}s\n"
+        
+        warm_icons = {'warm': '🔥', 'cold': '🥶', 'unknown': '⚪'}
+        for scheduler in self.keep_warm:
+            warm = scheduler.get_status()
+            text += (
+                f"\n{warm_icons[warm['state']]} **Keep-Warm {warm['name']}**: {warm['state']}\n"
+                f"• Intervall: {warm['interval']:.0f}s, Kaltstarts: {warm['cold_starts']}\n"
+                f"• Proben: {warm['probes']} ({warm['probe_seconds']:.0f}s, "
+                f"{warm['probe_tokens']} Tokens, ${warm['probe_cost']:.4f}), "
+                f"ausgelassen: {warm['skipped_busy']} Traffic / {warm['skipped_quiet']} ruhig\n"
+            )
+        
+        update.message.reply_text(text)
+    
     @admin_only
     def shutdown_command(self, update: Update, context: CallbackContext) -> None:
         """
@@ -576,10 +921,14 @@ class AdonisBot:
             logger.error(f"Fehler bei /next: {e}")
             update.message.reply_text("❌ Fehler beim Abrufen des Termins")
     
+    @run_async
     def handle_message(self, update: Update, context: CallbackContext) -> None:
         """
         Handler für Textnachrichten - KI-basiert mit Kontext
         
+        Läuft in einem eigenen Worker-Thread, damit ein langsamer KI-Aufruf
+        die Nachrichten anderer User nicht blockiert.
+        
         Args:
             update: Telegram Update Objekt
             context: Callback Context
@@ -593,19 +942,65 @@ class AdonisBot:
         self.context_manager.add_message(user.id, 'user', message_text)
         
         # Wenn KI verfügbar: Lass KI die Anfrage analysieren und verarbeiten
-        if self.ai_provider:
+        if self.ai_client:
+            request = None
+            ai_calls = None
             try:
                 # Hole Chat-Historie
                 chat_history = self.context_manager.get_context(user.id)
                 
-                # Erstelle einen Kontext-Prompt für die KI
-                system_prompt = self._build_system_prompt(message_text, chat_history)
+                # Eindeutige Kalender-Befehle ohne LLM-Aufruf beantworten
+                if self._try_fast_path(update, message_text, chat_history):
+                    self._schedule_summary(user.id)
+                    return
                 
-                # KI analysiert die Anfrage MIT Kontext
-                response = self.ai_provider.generate_response(
-                    message_text,
-                    context=system_prompt
-                )
+                # Laufende Anfrage des Users ablösen, ggf. Ruhefenster abwarten
+                merged = 0
+                if self.supersession:
+                    request = self.supersession.begin(user.id, message_text)
+                    if not self.supersession.wait_quiet(request):
+                        logger.info(f"⏭️  Nachricht von {user.id} wird mit der nächsten beantwortet")
+                        return
+                    if request.merged:
+                        # Zusammengeführte Nachrichten nicht zusätzlich als Historie
+                        message_text = request.prompt
+                        merged = request.merged
+                token = request.token if request else None
+                
+                # Fair anstellen statt in 429-Antworten laufen
+                current_user.set(user.id)
+                ai_calls = collect_calls()
+                self._wait_for_rate_limit(update, user.id, token)
+                
+                # Erstelle einen Kontext-Prompt für die KI (statischer Prefix + Historie)
+                system_prompt = self._build_system_prompt(message_text, chat_history, user_id=user.id,
+                                                          skip_last=merged)
+                
+                # KI analysiert die Anfrage MIT Kontext (auf dem AI Event-Loop)
+                ai_context = self._ai_context(system_prompt)
+                reply = None
+                dispatched = False
+                if self.streaming_enabled and self.ai_client.supports_streaming:
+                    response, reply, dispatched = self._stream_ai_response(update, message_text, ai_context,
+                                                                           request)
+                elif self.structured_output:
+                    # Ein Aufruf für Intent, Termin-Slots und Antwort
+                    plan = run_sync(self.ai_client.plan(message_text, context=system_prompt), token=token)
+                    response = plan.raw if plan.is_action and self.calendar_provider else plan.reply or plan.raw
+                else:
+                    response = run_sync(self.ai_client.chat(
+                        message_text,
+                        context=ai_context
+                    ), token=token)
+                
+                # Abgelöst, während die Antwort unterwegs war: verwerfen
+                if request is not None and not self.supersession.commit(request):
+                    raise CancelledError()
+                
+                # Strukturierte Text-Antwort: nur den Antworttext verwenden
+                action_data = parse_action(response) if self.structured_output else None
+                if action_data and action_data.get('action') == 'reply':
+                    response = action_data.get('reply') or ''
                 
                 # Speichere Bot-Antwort im Kontext
                 self.context_manager.add_message(user.id, 'assistant', response)
@@ -616,16 +1011,30 @@ class AdonisBot:
                     user_input=message_text,
                     bot_output=response,
                     bot_action='ai_response',
-                    chat_history=chat_history
+                    chat_history=chat_history,
+                    ai_calls=ai_calls
                 )
                 
-                # Verarbeite KI-Response
-                self._process_ai_response(update, message_text, response)
+                # Verarbeite KI-Response (Aktion lief ggf. schon während des Streams)
+                if not dispatched:
+                    self._process_ai_response(update, message_text, response, reply=reply)
+                
+                # Ältere Nachrichten zusammenfassen, nachdem die Antwort raus ist
+                self._schedule_summary(user.id)
                 return
                 
+            except CancelledError:
+                # Die neuere Nachricht beantwortet auch diese - bisherige Aufrufe trotzdem speichern
+                logger.info(f"⏭️  KI-Anfrage von {user.id} abgebrochen (neuere Nachricht)")
+                if ai_calls:
+                    self.interaction_logger.log_ai_calls(ai_calls)
+                return
             except Exception as e:
                 logger.error(f"KI-Fehler: {e}")
                 # Fallback zu alter Logik
+            finally:
+                if request is not None:
+                    self.supersession.finish(request)
         
         # Fallback ohne KI (alte Logik)
         command_type = detect_command_type(message_text)
@@ -635,29 +1044,202 @@ class AdonisBot:
         else:
             update.message.reply_text(f"Echo: {message_text}")
     
-    def _build_system_prompt(self, user_message: str, chat_history: list) -> str:
+    def _try_fast_path(self, update: Update, message_text: str, chat_history: list) -> bool:
         """
-        Erstellt System-Prompt für KI basierend auf verfügbaren Features und Chat-Historie
+        Beantwortet eindeutige Kalender-Befehle über den lokalen Intent-Classifier
+        
+        Termin-Abfragen (heute/morgen/Woche/nächster) laufen immer über den
+        Fast-Path. Termine werden nur ohne vorherige Konversation direkt
+        erstellt - sonst muss die KI Details aus der Historie kombinieren.
         
         Args:
-            user_message: User-Nachricht
-            chat_history: Liste von vorherigen Nachrichten
+            update: Telegram Update
+            message_text: User-Nachricht
+            chat_history: Chat-Historie inkl. aktueller Nachricht
             
         Returns:
-            System-Prompt String
+            True wenn die Nachricht beantwortet wurde
+        """
+        if not self.calendar_provider or not self.ai_client.intent_classifier:
+            return False
+        
+        result = self.ai_client.intent_classifier.classify(message_text)
+        if result['intent'] != 'calendar' or not self.ai_client.intent_classifier.is_confident(result):
+            return False
+        
+        entities = {entity['type']: entity['value'] for entity in result['entities']}
+        operation = entities.get('operation')
+        
+        list_handlers = {
+            'today': self.today_command,
+            'tomorrow': self.tomorrow_command,
+            'week': self.week_command,
+            'next': self.next_command
+        }
+        
+        if operation == 'list':
+            timeframe = entities.get('timeframe', 'today')
+            list_handlers[timeframe](update, None)
+            bot_action = f'fast_list_{timeframe}'
+        elif operation == 'create' and len(chat_history) <= 1:
+            self._handle_calendar_message(update, message_text)
+            bot_action = 'fast_create_event'
+        else:
+            return False
+        
+        self.ai_client.intent_stats['local'] += 1
+        logger.info(f"⚡ Fast-Path ohne LLM: {bot_action} (Confidence: {result['confidence']})")
+        
+        self.context_manager.add_message(update.effective_user.id, 'assistant', f"[{bot_action}]")
+        self._log_interaction(
+            user=update.effective_user,
+            user_input=message_text,
+            bot_output=f"[{bot_action}]",
+            bot_action=bot_action,
+            chat_history=chat_history
+        )
+        return True
+    
+    def _schedule_summary(self, user_id: int) -> None:
+        """
+        Startet die Zusammenfassung älterer Nachrichten auf dem AI Event-Loop
+        
+        Args:
+            user_id: Telegram User-ID
+        """
+        if self.summarizer:
+            self.summarizer.schedule(user_id, get_background_loop())
+    
+    def _wait_for_rate_limit(self, update: Update, user_id: int,
+                             token: Optional[CancelToken] = None) -> None:
+        """
+        Wartet auf den Token-Bucket des Users und meldet längere Wartezeiten
+        
+        Args:
+            update: Telegram Update
+            user_id: Telegram User-ID
+            token: Bricht das Warten ab, wenn eine neuere Nachricht kommt
+        """
+        if not self.rate_limiter:
+            return
+        
+        wait = self.rate_limiter.estimate_wait(user_id, self.ai_provider.name)
+        if wait >= self.rate_limit_notice:
+            update.message.reply_text(
+                f"⏳ Gerade viele Anfragen - deine Nachricht ist in der Warteschlange "
+                f"(ca. {wait:.0f}s)."
+            )
+        run_sync(self.rate_limiter.admit_user(user_id), token=token)
+    
+    def _ai_context(self, system_prompt: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Kontext für den KI-Aufruf (im strukturierten Modus mit Plan-Schema)
+        
+        Args:
+            system_prompt: Kontext aus _build_system_prompt
+            
+        Returns:
+            Kontext-Dict
+        """
+        if not self.structured_output:
+            return system_prompt
+        return plan_context(system_prompt)
+    
+    def _stream_ai_response(self, update: Update, message_text: str, ai_context: Any,
+                            request: Optional[PendingRequest] = None) -> tuple:
+        """
+        Streamt die KI-Antwort und zeigt sie schrittweise an
+        
+        Kalender-Aktionen werden ausgeführt, sobald ihre Felder vollständig
+        sind - der Rest des Streams wird dann nicht mehr abgewartet.
+        
+        Args:
+            update: Telegram Update
+            message_text: User-Nachricht
+            ai_context: System-Prompt oder Kontext-Dict für die KI
+            request: Laufende Anfrage (eine neuere Nachricht bricht den Stream ab)
+            
+        Returns:
+            Tuple (Antwort bis hierher, StreamingReply, ob eine Aktion ausgeführt wurde)
+            
+        Raises:
+            CancelledError: Wenn eine neuere Nachricht die Anfrage abgelöst hat
+        """
+        # Im strukturierten Modus wird der dekodierte "reply"-Text angezeigt
+        reply = StreamingReply(update.message, min_interval=self.stream_edit_interval,
+                               hold_marker=None if self.structured_output else '{')
+        reply.start()
+        actions = ActionStream()
+        raw = ''
+        action_data = None
+        
+        chunks = iterate_sync(self.ai_client.chat_stream(message_text, context=ai_context),
+                              token=request.token if request else None)
+        try:
+            for chunk in chunks:
+                raw += chunk
+                action_data = actions.feed(chunk)
+                if action_data and self.calendar_provider:
+                    break
+                action_data = None
+                
+                if not self.structured_output:
+                    reply.feed(chunk)
+                    continue
+                text = actions.reply_text()
+                if text is not None and len(text) > len(reply.text):
+                    reply.feed(text[len(reply.text):])
+                elif not actions.parser.started:
+                    # Modell hält sich nicht an das Format - Text direkt anzeigen
+                    reply.feed(chunk)
+        except Exception:
+            reply.discard()
+            raise
+        finally:
+            # Bei früher Aktion: restliche Token nicht mehr abrufen
+            chunks.close()
+        
+        # Abgelöst: weder Aktion ausführen noch Teil-Antwort stehen lassen
+        if request is not None and not self.supersession.commit(request):
+            reply.discard()
+            raise CancelledError()
+        
+        if action_data:
+            logger.info(f"⚡ Aktion {action_data['action']} nach {len(raw)} Zeichen - Stream beendet")
+            self._run_action(update, message_text, action_data, reply)
+            return raw.strip(), reply, True
+        
+        ttft = reply.time_to_first_chunk
+        logger.info(
+            f"🌊 Stream beendet: {len(raw)} Zeichen, {reply.edit_count} Edits, "
+            f"erstes Token nach {ttft:.2f}s" if ttft is not None else
+            f"🌊 Stream beendet ohne Token"
+        )
+        return raw.strip(), reply, False
+    
+    def _prompt_prefix(self) -> PromptPrefix:
+        """
+        Statischer Teil des System-Prompts (Regeln, Aktionsformate, Beispiele)
+        
+        Wird nur neu gebaut, wenn sich Kalender-Status oder Ausgabemodus
+        ändern - Token werden dabei einmal lokal gezählt.
+        
+        Returns:
+            PromptPrefix (gleich für alle Anfragen)
         """
         calendar_status = "verfügbar" if self.calendar_provider else "nicht verfügbar"
         
-        # Erstelle Kontext-Zusammenfassung aus Historie
-        history_context = ""
-        if len(chat_history) > 1:  # Mehr als nur aktuelle Nachricht
-            history_context = "\n\n📝 VORHERIGE KONVERSATION (WICHTIG - LIES GENAU!):\n"
-            for msg in chat_history[-8:-1]:  # Letzte 7 Nachrichten (ohne aktuelle)
-                role = "👤 User" if msg['role'] == 'user' else "🤖 Du"
-                history_context += f"{role}: {msg['content']}\n"
-            history_context += "\n⚠️ WICHTIG: Berücksichtige ALLE Informationen aus dieser Historie für deine Antwort!\n"
+        # Im strukturierten Modus ist auch eine Text-Antwort ein JSON-Objekt
+        if self.structured_output:
+            reply_rule = 'SONST: {"action": "reply", "reply": "..."} - hilfreich, aber KURZ und PRÄZISE!'
+        else:
+            reply_rule = "SONST: Antworte hilfreich, aber KURZ und PRÄZISE!"
+        
+        cached = self._cached_prompt_prefix
+        if cached is not None and cached[0] == (calendar_status, reply_rule):
+            return cached[1]
         
-        prompt = f"""Du bist AdonisAI, ein intelligenter persönlicher Assistent.
+        prefix = PromptPrefix(f"""Du bist AdonisAI, ein intelligenter persönlicher Assistent.
 
 KALENDER-MANAGEMENT: {calendar_status}
 
@@ -667,7 +1249,7 @@ Du MUSST die vorherige Konversation VOLLSTÄNDIG lesen und verstehen!
 - Wenn User einen Namen erwähnt (z.B. "Kunde Max") → MERKE den Namen für später!
 - Wenn User "die genannten Tage prüfen" sagt → Schau was vorher genannt wurde!
 - Kombiniere ALLE Informationen aus der Historie zu einem vollständigen Bild!
-{history_context}
+
 TERMIN-ERSTELLUNG REGELN:
 1. Erstelle NUR einen Termin bei EXPLIZITER Aufforderung mit komplettem Datum/Zeit
 2. Bei unvollständigen Infos → Stelle GEZIELTE Fragen
@@ -694,15 +1276,77 @@ User3: "14 Uhr"
 WENN User Termine sehen will:
 {{"action": "list_events", "timeframe": "today|tomorrow|week"}}
 
-SONST: Antworte hilfreich, aber KURZ und PRÄZISE!
-
+{reply_rule}
+""")
+        self._cached_prompt_prefix = ((calendar_status, reply_rule), prefix)
+        return prefix
+    
+    def _build_system_prompt(self, user_message: str, chat_history: list,
+                             user_id: Optional[int] = None, skip_last: int = 0) -> Dict[str, Any]:
+        """
+        Erstellt System-Prompt für KI basierend auf verfügbaren Features und Chat-Historie
+        
+        Der statische Teil steht unverändert am Anfang (Provider-Cache), nur
+        Historie und aktuelle Nachricht werden pro Anfrage angehängt. Mit
+        Summarizer: Zusammenfassung + neueste Nachrichten im Token-Budget.
+        Mit Langzeitgedächtnis: relevante frühere Gespräche im Token-Budget.
+        Enthält die Historie Kalender-Ergebnisse des Fast-Path, hängt die
+        Antwort vom aktuellen Kalender ab und wird als live_state markiert.
+        
+        Args:
+            user_message: User-Nachricht
+            chat_history: Liste von vorherigen Nachrichten
+            user_id: Telegram User-ID (für Zusammenfassung und Langzeitgedächtnis)
+            skip_last: So viele Nachrichten vor der aktuellen weglassen (schon in
+                       user_message zusammengeführt)
+            
+        Returns:
+            Kontext-Dict mit system_prompt, system_prefix und system_suffix
+        """
+        summary = None
+        history = chat_history[:-1]  # Ohne aktuelle Nachricht
+        if skip_last:
+            history = history[:-skip_last]
+        recent = history[-7:]
+        if self.summarizer and user_id is not None:
+            summary, recent = self.summarizer.history_for_prompt(user_id, skip_last=skip_last)
+        
+        memories = []
+        if self.memory and user_id is not None:
+            memories = self.memory.context_for_prompt(user_id, user_message)
+        
+        # Erstelle Kontext-Zusammenfassung aus Historie
+        history_context = ""
+        if memories:
+            history_context += "\n🗂️ FRÜHERE GESPRÄCHE (nur verwenden, wenn sie zur Nachricht passen):\n"
+            for memory in memories:
+                day = (memory['timestamp'] or '')[:10]
+                history_context += f"[{day}] 👤 User: {memory['user_input']}\n[{day}] 🤖 Du: {memory['bot_output']}\n"
+        if summary:
+            history_context += f"\n📝 ZUSAMMENFASSUNG FRÜHERER NACHRICHTEN:\n{summary}\n"
+        if recent:
+            history_context += "\n📝 VORHERIGE KONVERSATION (WICHTIG - LIES GENAU!):\n"
+            for msg in recent:
+                role = "👤 User" if msg['role'] == 'user' else "🤖 Du"
+                history_context += f"{role}: {msg['content']}\n"
+        if history_context:
+            history_context += "\n⚠️ WICHTIG: Berücksichtige ALLE Informationen aus dieser Historie für deine Antwort!\n"
+        
+        # Vom Kalender beantwortete Nachrichten in der Historie -> Live-Daten
+        live_state = any(
+            msg['role'] == 'assistant' and msg['content'].startswith(FAST_PATH_MARKER)
+            for msg in recent
+        )
+        
+        suffix = f"""{history_context}
 Aktuelle User-Nachricht: "{user_message}"
 
 Analysiere JETZT die GESAMTE Konversation und antworte:"""
         
-        return prompt
+        return self._prompt_prefix().context(suffix, live_state=live_state)
     
-    def _process_ai_response(self, update: Update, original_message: str, ai_response: str) -> None:
+    def _process_ai_response(self, update: Update, original_message: str, ai_response: str,
+                             reply: Optional[StreamingReply] = None) -> None:
         """
         Verarbeitet KI-Response und führt entsprechende Aktionen aus
         
@@ -710,57 +1354,76 @@ Analysiere JETZT die GESAMTE Konversation und antworte:"""
             update: Telegram Update
             original_message: Original User-Nachricht
             ai_response: KI-Antwort
+            reply: Platzhalter-Nachricht eines Streams (wird bearbeitet statt neu gesendet)
+        """
+        # Erste JSON-Aktion der Antwort (auch mit verschachteltem JSON)
+        action_data = parse_action(ai_response)
+        if action_data and self._run_action(update, original_message, action_data, reply):
+            return
+        
+        # Normale Text-Antwort
+        if reply:
+            reply.finish(ai_response)
+        else:
+            update.message.reply_text(ai_response)
+    
+    def _run_action(self, update: Update, original_message: str, action_data: Dict[str, Any],
+                    reply: Optional[StreamingReply] = None) -> bool:
         """
-        import json
-        import re
+        Führt eine Kalender-Aktion der KI aus
         
-        # Versuche JSON-Action zu extrahieren
-        json_match = re.search(r'\{[^}]+\}', ai_response)
+        Args:
+            update: Telegram Update
+            original_message: Original User-Nachricht
+            action_data: Felder der JSON-Aktion
+            reply: Platzhalter-Nachricht eines Streams (wird durch die Aktion ersetzt)
+            
+        Returns:
+            True wenn eine Aktion ausgeführt wurde
+        """
+        action = action_data.get('action')
+        if action not in CALENDAR_ACTIONS or not self.calendar_provider:
+            return False
         
-        if json_match:
-            try:
-                action_data = json.loads(json_match.group(0))
-                action = action_data.get('action')
-                
-                if action == 'create_event' and self.calendar_provider:
-                    # Erstelle Termin
-                    self._handle_calendar_message(update, original_message)
-                    return
-                
-                elif action == 'list_events' and self.calendar_provider:
-                    # Liste Termine
-                    timeframe = action_data.get('timeframe', 'today')
-                    
-                    if timeframe == 'today':
-                        self.today_command(update, None)
-                    elif timeframe == 'tomorrow':
-                        self.tomorrow_command(update, None)
-                    elif timeframe == 'week':
-                        self.week_command(update, None)
-                    return
-                
-                elif action == 'next_event' and self.calendar_provider:
-                    # Zeige nächsten Termin
-                    self.next_command(update, None)
-                    return
-                    
-            except json.JSONDecodeError:
-                pass  # Kein valides JSON, fahre mit normaler Antwort fort
+        if reply:
+            # Aktion ersetzt den Stream-Platzhalter
+            reply.discard()
         
-        # Normale Text-Antwort
-        update.message.reply_text(ai_response)
+        if action == 'create_event':
+            # Erstelle Termin aus den Slots bzw. dem Text der KI (Details aus der Historie)
+            event_data = Plan.from_fields(action_data).event_data(original_message)
+            self._handle_calendar_message(update, original_message, event_data=event_data)
+        
+        elif action == 'list_events':
+            # Liste Termine
+            timeframe = action_data.get('timeframe', 'today')
+            
+            if timeframe == 'tomorrow':
+                self.tomorrow_command(update, None)
+            elif timeframe == 'week':
+                self.week_command(update, None)
+            else:
+                self.today_command(update, None)
+        
+        else:
+            # Zeige nächsten Termin
+            self.next_command(update, None)
+        return True
     
-    def _handle_calendar_message(self, update: Update, message_text: str) -> None:
+    def _handle_calendar_message(self, update: Update, message_text: str,
+                                 event_data: Optional[Dict[str, Any]] = None) -> None:
         """
         Verarbeitet Calendar-bezogene Nachrichten
         
         Args:
             update: Telegram Update
             message_text: Nachricht vom User
+            event_data: Bereits extrahierte Termin-Daten (z.B. aus Plan.event_data)
         """
         try:
             # Parse Event aus Text
-            event_data = parse_event_from_text(message_text)
+            if event_data is None:
+                event_data = parse_event_from_text(message_text)
             
             if not event_data['start']:
                 update.message.reply_text(
@@ -841,7 +1504,8 @@ Analysiere JETZT die GESAMTE Konversation und antworte:"""
         bot_output: str,
         bot_action: Optional[str] = None,
         chat_history: Optional[list] = None,
-        is_sensitive: bool = False
+        is_sensitive: bool = False,
+        ai_calls: Optional[list] = None
     ) -> None:
         """
         Speichert eine Bot-Interaktion für Personal AI Training
@@ -853,6 +1517,7 @@ Analysiere JETZT die GESAMTE Konversation und antworte:"""
             bot_action: Art der Aktion (create_event, answer_question, etc.)
             chat_history: Vorherige Konversation
             is_sensitive: Ob diese Nachricht sensibel ist (kein Training)
+            ai_calls: AI-Aufrufe der Anfrage (Token, Latenz, Kosten)
         """
         try:
             # Context-Daten sammeln
@@ -874,7 +1539,8 @@ Analysiere JETZT die GESAMTE Konversation und antworte:"""
                 bot_action=bot_action,
                 context_data=context_data,
                 conversation_history=chat_history,
-                is_sensitive=is_sensitive
+                is_sensitive=is_sensitive,
+                ai_calls=ai_calls
             )
             
         except Exception as e:
@@ -914,6 +1580,7 @@ Analysiere JETZT die GESAMTE Konversation und antworte:"""
         # Command Handler - Admin
         dispatcher.add_handler(CommandHandler("shutdown", self.shutdown_command))
         dispatcher.add_handler(CommandHandler("stats", self.stats_command))
+        dispatcher.add_handler(CommandHandler("health", self.health_command))
         
         # Command Handler - Calendar
         dispatcher.add_handler(CommandHandler("today", self.today_command))
@@ -945,6 +1612,7 @@ Analysiere JETZT die GESAMTE Konversation und antworte:"""
         self.updater = Updater(
             token=self.token, 
             use_context=True,
+            workers=int(os.getenv('BOT_WORKERS', '16')),
             request_kwargs={
                 'read_timeout': 10,
                 'connect_timeout': 10
@@ -954,6 +1622,10 @@ Analysiere JETZT die GESAMTE Konversation und antworte:"""
         # Handler registrieren
         self.setup_handlers()
         
+        # Keep-Warm Proben auf dem AI Event-Loop
+        for scheduler in self.keep_warm:
+            scheduler.start(get_background_loop())
+        
         # Bot starten
         logger.info("🤖 AdonisAI Bot wird gestartet...")
         try:
@@ -6,13 +6,15 @@ Sammelt Daten für:
 - Verhaltensmuster-Analyse
 - Präferenzen-Learning
 - Fine-tuning Dataset Export
+- Token, Latenz und Kosten der AI-Aufrufe pro Interaktion (ai_calls)
 """
 
+import math
 import sqlite3
 import json
 import logging
 from datetime import datetime
-from typing import Optional, Dict, List, Any
+from typing import Optional, Dict, List, Any, Callable
 from pathlib import Path
 from contextlib import contextmanager
 
@@ -33,10 +35,21 @@ class InteractionLogger:
             db_path: Pfad zur SQLite Datenbank
         """
         self.db_path = db_path
+        self.listeners: List[Callable[[Dict[str, Any]], None]] = []
         self._ensure_db_directory()
         self._init_database()
         logger.info(f"✅ InteractionLogger initialisiert: {db_path}")
     
+    def add_listener(self, listener: Callable[[Dict[str, Any]], None]):
+        """
+        Registriert einen Callback für neu gespeicherte Interaktionen
+        
+        Args:
+            listener: Erhält die Zeile (id, timestamp, user_id, user_input,
+                      bot_output, bot_action, is_sensitive, ai_calls) nach dem Commit
+        """
+        self.listeners.append(listener)
+    
     def _ensure_db_directory(self):
         """Stellt sicher, dass das data/ Verzeichnis existiert"""
         db_dir = Path(self.db_path).parent
@@ -125,12 +138,43 @@ class InteractionLogger:
                 )
             """)
             
+            # AI Calls Tabelle - Token, Latenz und Kosten pro Provider-Aufruf
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS ai_calls (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    interaction_id INTEGER,  -- interactions.id
+                    timestamp TEXT NOT NULL,
+                    user_id INTEGER,
+                    provider TEXT NOT NULL,
+                    model TEXT NOT NULL,
+                    prompt_tokens INTEGER,
+                    completion_tokens INTEGER,
+                    cached_tokens INTEGER,
+                    estimated BOOLEAN DEFAULT 0,  -- Token lokal geschätzt (keine usage)
+                    seconds REAL,  -- Gesamtdauer inkl. Retries
+                    ttfb REAL,  -- Zeit bis zum ersten Byte / Stream-Fragment
+                    streamed BOOLEAN DEFAULT 0,
+                    cost REAL,  -- Geschätzte Kosten in USD
+                    error TEXT
+                )
+            """)
+            
             # Indices für Performance
             cursor.execute("""
                 CREATE INDEX IF NOT EXISTS idx_user_timestamp 
                 ON interactions(user_id, timestamp)
             """)
             
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_ai_calls_interaction 
+                ON ai_calls(interaction_id)
+            """)
+            
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_ai_calls_model_timestamp 
+                ON ai_calls(model, timestamp)
+            """)
+            
             cursor.execute("""
                 CREATE INDEX IF NOT EXISTS idx_bot_action 
                 ON interactions(bot_action)
@@ -149,7 +193,8 @@ class InteractionLogger:
         context_data: Optional[Dict[str, Any]] = None,
         conversation_history: Optional[List[Dict]] = None,
         session_id: Optional[str] = None,
-        is_sensitive: bool = False
+        is_sensitive: bool = False,
+        ai_calls: Optional[List[Dict[str, Any]]] = None
     ) -> int:
         """
         Speichert eine Bot-Interaktion
@@ -165,6 +210,7 @@ class InteractionLogger:
             conversation_history: Liste der vorherigen Nachrichten
             session_id: Session Identifier
             is_sensitive: Ob diese Nachricht vom Training ausgeschlossen werden soll
+            ai_calls: AI-Aufrufe dieser Interaktion (siehe src/ai/usage.py collect_calls)
             
         Returns:
             ID des erstellten Records
@@ -197,17 +243,159 @@ class InteractionLogger:
                 
                 interaction_id = cursor.lastrowid
                 
+                if ai_calls:
+                    self._insert_ai_calls(cursor, interaction_id, user_id, ai_calls)
+                
                 if not is_sensitive:
                     logger.debug(f"📝 Interaction logged: ID={interaction_id}, User={user_id}")
                 else:
                     logger.debug(f"🔒 Sensitive interaction logged (no training): ID={interaction_id}")
                 
-                return interaction_id
-                
             except sqlite3.IntegrityError:
                 # Duplicate - ignorieren oder updaten
                 logger.warning(f"⚠️ Duplicate interaction ignored: {user_id} @ {timestamp}")
                 return -1
+        
+        # Nach dem Commit: Listener (z.B. Langzeitgedächtnis) benachrichtigen
+        row = {
+            'id': interaction_id,
+            'timestamp': timestamp,
+            'user_id': user_id,
+            'user_input': user_input,
+            'bot_output': bot_output,
+            'bot_action': bot_action,
+            'is_sensitive': is_sensitive,
+            'ai_calls': ai_calls or []
+        }
+        for listener in self.listeners:
+            try:
+                listener(row)
+            except Exception as e:
+                logger.warning(f"⚠️ Interaction-Listener fehlgeschlagen: {e}")
+        
+        return interaction_id
+    
+    def _insert_ai_calls(self, cursor, interaction_id: Optional[int], user_id: Optional[int],
+                         ai_calls: List[Dict[str, Any]]):
+        """Speichert AI-Aufrufe (in der Transaktion der Interaktion)"""
+        cursor.executemany("""
+            INSERT INTO ai_calls (
+                interaction_id, timestamp, user_id, provider, model,
+                prompt_tokens, completion_tokens, cached_tokens, estimated,
+                seconds, ttfb, streamed, cost, error
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, [(
+            interaction_id,
+            datetime.fromtimestamp(call['timestamp']).isoformat(),
+            call.get('user_id') if call.get('user_id') is not None else user_id,
+            call['provider'], call['model'],
+            call.get('prompt_tokens'), call.get('completion_tokens'), call.get('cached_tokens'),
+            bool(call.get('estimated')),
+            call.get('seconds'), call.get('ttfb'), bool(call.get('streamed')),
+            call.get('cost'), call.get('error')
+        ) for call in ai_calls])
+    
+    def log_ai_calls(self, ai_calls: List[Dict[str, Any]], interaction_id: Optional[int] = None):
+        """
+        Speichert AI-Aufrufe ohne eigene Interaktion (z.B. Hintergrund-Zusammenfassungen)
+        
+        Args:
+            ai_calls: Aufrufe (siehe src/ai/usage.py)
+            interaction_id: Optional - zugehörige Interaktion
+        """
+        if not ai_calls:
+            return
+        with self._get_connection() as conn:
+            self._insert_ai_calls(conn.cursor(), interaction_id, None, ai_calls)
+    
+    def get_model_latency(self, since: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Latenz-Quantile und Verbrauch pro Modell
+        
+        Args:
+            since: Optional - nur Aufrufe ab diesem ISO-Zeitpunkt
+        
+        Returns:
+            Dict Modell -> provider, calls, errors, p50, p95, ttfb_p50, ttfb_p95,
+            prompt_tokens, completion_tokens, cost
+        """
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            
+            query = "SELECT provider, model, seconds, ttfb, prompt_tokens, completion_tokens, cost, error FROM ai_calls"
+            params: List[Any] = []
+            if since:
+                query += " WHERE timestamp >= ?"
+                params.append(since)
+            cursor.execute(query, params)
+            rows = cursor.fetchall()
+        
+        grouped: Dict[str, Dict[str, Any]] = {}
+        for row in rows:
+            model = grouped.setdefault(row['model'], {
+                'provider': row['provider'], 'calls': 0, 'errors': 0,
+                'prompt_tokens': 0, 'completion_tokens': 0, 'cost': 0.0,
+                'seconds': [], 'ttfb': []
+            })
+            model['calls'] += 1
+            model['prompt_tokens'] += row['prompt_tokens'] or 0
+            model['completion_tokens'] += row['completion_tokens'] or 0
+            model['cost'] += row['cost'] or 0.0
+            if row['error']:
+                model['errors'] += 1
+                continue
+            model['seconds'].append(row['seconds'])
+            if row['ttfb'] is not None:
+                model['ttfb'].append(row['ttfb'])
+        
+        for model in grouped.values():
+            seconds = sorted(model.pop('seconds'))
+            ttfb = sorted(model.pop('ttfb'))
+            model['p50'] = _percentile(seconds, 0.5)
+            model['p95'] = _percentile(seconds, 0.95)
+            model['ttfb_p50'] = _percentile(ttfb, 0.5)
+            model['ttfb_p95'] = _percentile(ttfb, 0.95)
+        return grouped
+    
+    def get_daily_token_usage(
+        self,
+        user_id: Optional[int] = None,
+        since: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Token und Kosten pro User und Tag
+        
+        Args:
+            user_id: Optional - nur für bestimmten User
+            since: Optional - nur ab diesem Datum (ISO)
+        
+        Returns:
+            Liste von Dicts mit user_id, day, calls, prompt_tokens, completion_tokens, cost
+        """
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            
+            query = """
+                SELECT user_id, substr(timestamp, 1, 10) as day,
+                       COUNT(*) as calls,
+                       SUM(prompt_tokens) as prompt_tokens,
+                       SUM(completion_tokens) as completion_tokens,
+                       SUM(cost) as cost
+                FROM ai_calls
+                WHERE 1 = 1
+            """
+            params: List[Any] = []
+            if user_id:
+                query += " AND user_id = ?"
+                params.append(user_id)
+            if since:
+                query += " AND timestamp >= ?"
+                params.append(since)
+            
+            query += " GROUP BY user_id, day ORDER BY day, user_id"
+            
+            cursor.execute(query, params)
+            return [dict(row) for row in cursor.fetchall()]
     
     def add_feedback(
         self,
@@ -268,6 +456,64 @@ class InteractionLogger:
             
             return [dict(row) for row in rows]
     
+    def get_completion_lengths(self, limit: int = 5000) -> List[Dict[str, Any]]:
+        """
+        Antwort-Länge der neuesten Interaktionen (längster erfolgreicher AI-Aufruf)
+        
+        Args:
+            limit: Maximale Anzahl
+            
+        Returns:
+            Liste von Dicts mit user_input, completion_tokens (neueste zuerst)
+        """
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT i.user_input, MAX(c.completion_tokens) as completion_tokens
+                FROM ai_calls c
+                JOIN interactions i ON i.id = c.interaction_id
+                WHERE c.error IS NULL AND c.completion_tokens > 0
+                GROUP BY i.id
+                ORDER BY i.id DESC
+                LIMIT ?
+            """, (limit,))
+            return [dict(row) for row in cursor.fetchall()]
+    
+    def get_all_interactions(
+        self,
+        limit: Optional[int] = None,
+        include_sensitive: bool = False,
+        min_id: int = 0
+    ) -> List[Dict[str, Any]]:
+        """
+        Ruft Interaktionen aller User in Einfüge-Reihenfolge ab
+        
+        Args:
+            limit: Maximale Anzahl (None = alle)
+            include_sensitive: Ob sensible Nachrichten inkludiert werden sollen
+            min_id: Nur Interaktionen mit ID größer als dieser Wert
+            
+        Returns:
+            Liste von Interaktionen als Dicts (aufsteigend nach ID)
+        """
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            
+            query = "SELECT * FROM interactions WHERE id > ?"
+            params: List[Any] = [min_id]
+            
+            if not include_sensitive:
+                query += " AND is_sensitive = 0"
+            
+            query += " ORDER BY id"
+            
+            if limit:
+                query += " LIMIT ?"
+                params.append(limit)
+            
+            cursor.execute(query, params)
+            return [dict(row) for row in cursor.fetchall()]
+    
     def get_statistics(self, user_id: Optional[int] = None) -> Dict[str, Any]:
         """
         Berechnet Statistiken über gespeicherte Interaktionen
@@ -426,3 +672,11 @@ class InteractionLogger:
                     'text': f"### Instruction:\n{row['user_input']}\n\n### Response:\n{row['bot_output']}"
                 }
                 f.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+
+def _percentile(values: List[float], q: float) -> Optional[float]:
+    """Quantil einer sortierten Liste (nächster Rang)"""
+    if not values:
+        return None
+    index = min(len(values) - 1, max(0, math.ceil(q * len(values)) - 1))
+    return values[index]
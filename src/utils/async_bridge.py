@@ -0,0 +1,179 @@
+"""
+Async Bridge - Führt Coroutinen aus synchronem Code aus
+
+Der Telegram Bot (python-telegram-bot 12.x) arbeitet mit synchronen
+Handlern in Worker-Threads. Alle AI-Aufrufe laufen auf einem einzigen
+Hintergrund-Event-Loop, damit sich die Handler einen HTTP-Pool teilen
+und viele Requests gleichzeitig offen sein können.
+"""
+
+import asyncio
+import logging
+import threading
+from concurrent.futures import CancelledError, Future
+from typing import Any, AsyncIterator, Awaitable, Iterator, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_thread: Optional[threading.Thread] = None
+_lock = threading.Lock()
+
+# Max. Wartezeit auf das Aufräumen einer per CancelToken abgebrochenen Coroutine
+CANCEL_CLEANUP_TIMEOUT = 1.0
+
+
+def get_background_loop() -> asyncio.AbstractEventLoop:
+    """
+    Gibt den Hintergrund-Event-Loop zurück (startet ihn beim ersten Aufruf)
+    
+    Returns:
+        Laufender Event-Loop in einem Daemon-Thread
+    """
+    global _loop, _thread
+    
+    with _lock:
+        if _loop is None or not _thread.is_alive():
+            _loop = asyncio.new_event_loop()
+            _thread = threading.Thread(
+                target=_loop.run_forever,
+                name='adonis-ai-loop',
+                daemon=True
+            )
+            _thread.start()
+            logger.info("🔄 AI Event-Loop gestartet")
+    
+    return _loop
+
+
+class CancelToken:
+    """
+    Bricht laufende run_sync-Aufrufe aus einem anderen Thread ab
+    
+    Wartende Aufrufer bekommen sofort einen concurrent.futures.CancelledError,
+    die Coroutine auf dem Hintergrund-Loop wird abgebrochen.
+    """
+    
+    def __init__(self):
+        self.cancelled = False
+        self._futures: Set[Future] = set()
+        self._lock = threading.Lock()
+    
+    def cancel(self) -> None:
+        """Bricht alle laufenden und künftigen Aufrufe mit diesem Token ab"""
+        with self._lock:
+            self.cancelled = True
+            futures = list(self._futures)
+        for future in futures:
+            future.cancel()
+    
+    def attach(self, future: Future) -> None:
+        """Registriert einen laufenden Aufruf (bereits abgebrochen: sofort abbrechen)"""
+        with self._lock:
+            if not self.cancelled:
+                self._futures.add(future)
+                return
+        future.cancel()
+    
+    def detach(self, future: Future) -> None:
+        """Entfernt einen beendeten Aufruf"""
+        with self._lock:
+            self._futures.discard(future)
+
+
+def run_sync(coro: Awaitable[Any], timeout: Optional[float] = None,
+             token: Optional[CancelToken] = None) -> Any:
+    """
+    Führt eine Coroutine auf dem Hintergrund-Loop aus und wartet auf das Ergebnis
+    
+    Args:
+        coro: Auszuführende Coroutine
+        timeout: Max. Wartezeit in Sekunden (None = unbegrenzt)
+        token: Optionales CancelToken zum Abbrechen aus einem anderen Thread
+    
+    Returns:
+        Ergebnis der Coroutine
+    
+    Raises:
+        concurrent.futures.CancelledError: Wenn das Token abgebrochen wurde
+    """
+    if token is None:
+        future = asyncio.run_coroutine_threadsafe(coro, get_background_loop())
+        try:
+            return future.result(timeout)
+        except Exception:
+            future.cancel()
+            raise
+    
+    if token.cancelled:
+        coro.close()
+        raise CancelledError()
+    
+    finished = threading.Event()
+    
+    async def tracked():
+        try:
+            return await coro
+        finally:
+            finished.set()
+    
+    future = asyncio.run_coroutine_threadsafe(tracked(), get_background_loop())
+    token.attach(future)
+    try:
+        return future.result(timeout)
+    except CancelledError:
+        # Aufräumen der Coroutine abwarten (z.B. Verbrauch abgebrochener Aufrufe erfassen)
+        finished.wait(CANCEL_CLEANUP_TIMEOUT)
+        raise
+    except Exception:
+        future.cancel()
+        raise
+    finally:
+        token.detach(future)
+
+
+def iterate_sync(agen: AsyncIterator[Any], timeout: Optional[float] = None,
+                 token: Optional[CancelToken] = None) -> Iterator[Any]:
+    """
+    Iteriert einen asynchronen Generator aus synchronem Code
+    
+    Jedes Element wird auf dem Hintergrund-Loop angefordert. Bricht der
+    Aufrufer die Iteration ab, wird der Generator sauber geschlossen
+    (z.B. damit die HTTP-Verbindung eines Streams freigegeben wird).
+    
+    Args:
+        agen: Asynchroner Generator
+        timeout: Max. Wartezeit pro Element in Sekunden
+        token: Optionales CancelToken (bricht auch das Warten auf das nächste Element ab)
+        
+    Yields:
+        Elemente des Generators
+    """
+    pending = {'task': None}
+    
+    async def _next():
+        pending['task'] = asyncio.ensure_future(agen.__anext__())
+        return await pending['task']
+    
+    async def _close():
+        # Abgebrochenes __anext__ erst zu Ende laufen lassen - sonst "already
+        # running" beim aclose(). Hängt es, wird es selbst abgebrochen.
+        task = pending['task']
+        if task is not None and not task.done():
+            await asyncio.wait([task], timeout=CANCEL_CLEANUP_TIMEOUT)
+            if not task.done():
+                task.cancel()
+                await asyncio.wait([task])
+        await agen.aclose()
+    
+    exhausted = False
+    try:
+        while True:
+            try:
+                yield run_sync(_next(), timeout, token)
+            except StopAsyncIteration:
+                exhausted = True
+                return
+    finally:
+        if not exhausted:
+            run_sync(_close())
@@ -2,25 +2,36 @@
 Context Manager - Verwaltet Chat-Historie für KI-Kontext
 """
 
-from typing import Dict, List
+from typing import Dict, List, Optional
 from datetime import datetime, timedelta
 
+# Max. verdrängte Nachrichten pro User, die auf die Zusammenfassung warten
+MAX_EVICTED = 100
+
 
 class ContextManager:
     """
     Verwaltet Chat-Kontext pro User
     Speichert die letzten N Nachrichten für Kontext-Awareness
+    und optional eine laufende Zusammenfassung älterer Nachrichten
     """
     
-    def __init__(self, max_messages: int = 10, ttl_minutes: int = 30):
+    def __init__(self, max_messages: int = 10, ttl_minutes: int = 30,
+                 summary_ttl_minutes: int = 24 * 60, keep_evicted: bool = False):
         """
         Args:
             max_messages: Max. Anzahl Nachrichten pro User
             ttl_minutes: Time-to-live in Minuten (alte Nachrichten werden gelöscht)
+            summary_ttl_minutes: Time-to-live der Zusammenfassung in Minuten
+            keep_evicted: Verdrängte Nachrichten für die Zusammenfassung aufheben
         """
         self.max_messages = max_messages
         self.ttl_minutes = ttl_minutes
+        self.summary_ttl_minutes = summary_ttl_minutes
+        self.keep_evicted = keep_evicted
         self.contexts: Dict[int, List[Dict]] = {}  # user_id -> messages
+        self.summaries: Dict[int, Dict] = {}  # user_id -> {text, until, updated}
+        self.evicted: Dict[int, List[Dict]] = {}  # user_id -> noch nicht zusammengefasst
     
     def add_message(self, user_id: int, role: str, content: str):
         """
@@ -47,6 +58,7 @@ class ContextManager:
         
         # Limitiere auf max_messages
         if len(self.contexts[user_id]) > self.max_messages:
+            self._evict(user_id, self.contexts[user_id][:-self.max_messages])
             self.contexts[user_id] = self.contexts[user_id][-self.max_messages:]
     
     def get_context(self, user_id: int) -> List[Dict]:
@@ -70,6 +82,64 @@ class ContextManager:
             for msg in self.contexts[user_id]
         ]
     
+    def get_messages(self, user_id: int) -> List[Dict]:
+        """
+        Nachrichten eines Users mit Zeitstempel (für die Zusammenfassung)
+        
+        Args:
+            user_id: Telegram User ID
+            
+        Returns:
+            Liste von Messages (role, content, timestamp)
+        """
+        if user_id not in self.contexts:
+            return []
+        
+        self._cleanup_old_messages(user_id)
+        return [dict(msg) for msg in self.contexts[user_id]]
+    
+    def take_evicted(self, user_id: int) -> List[Dict]:
+        """
+        Verdrängte, noch nicht zusammengefasste Nachrichten (werden entfernt)
+        
+        Args:
+            user_id: Telegram User ID
+            
+        Returns:
+            Liste von Messages (role, content, timestamp), älteste zuerst
+        """
+        return self.evicted.pop(user_id, [])
+    
+    def set_summary(self, user_id: int, text: str, until: datetime):
+        """
+        Speichert die laufende Zusammenfassung eines Users
+        
+        Args:
+            user_id: Telegram User ID
+            text: Zusammenfassung
+            until: Zeitstempel der letzten zusammengefassten Nachricht
+        """
+        self.summaries[user_id] = {'text': text, 'until': until, 'updated': datetime.now()}
+    
+    def get_summary(self, user_id: int) -> Optional[Dict]:
+        """
+        Laufende Zusammenfassung eines Users
+        
+        Args:
+            user_id: Telegram User ID
+            
+        Returns:
+            Dict mit text, until, updated oder None (keine / abgelaufen)
+        """
+        summary = self.summaries.get(user_id)
+        if summary is None:
+            return None
+        
+        if datetime.now() - summary['updated'] > timedelta(minutes=self.summary_ttl_minutes):
+            del self.summaries[user_id]
+            return None
+        return summary
+    
     def get_context_summary(self, user_id: int) -> str:
         """
         Erstellt eine textuelle Zusammenfassung des Kontexts
@@ -101,6 +171,8 @@ class ContextManager:
         """
         if user_id in self.contexts:
             del self.contexts[user_id]
+        self.summaries.pop(user_id, None)
+        self.evicted.pop(user_id, None)
     
     def _cleanup_old_messages(self, user_id: int):
         """
@@ -114,7 +186,26 @@ class ContextManager:
         
         cutoff_time = datetime.now() - timedelta(minutes=self.ttl_minutes)
         
+        self._evict(user_id, [
+            msg for msg in self.contexts[user_id]
+            if msg['timestamp'] <= cutoff_time
+        ])
         self.contexts[user_id] = [
             msg for msg in self.contexts[user_id]
             if msg['timestamp'] > cutoff_time
         ]
+    
+    def _evict(self, user_id: int, messages: List[Dict]):
+        """
+        Hebt verdrängte Nachrichten für die Zusammenfassung auf
+        
+        Args:
+            user_id: Telegram User ID
+            messages: Aus dem Kontext entfernte Nachrichten
+        """
+        if not self.keep_evicted or not messages:
+            return
+        
+        evicted = self.evicted.setdefault(user_id, [])
+        evicted.extend(messages)
+        del evicted[:-MAX_EVICTED]
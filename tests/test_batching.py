@@ -0,0 +1,183 @@
+"""
+Test für Micro-Batching der Hugging Face Anfragen - Funktioniert OHNE Internet!
+Startet einen lokalen Server im Format der HF Inference API.
+"""
+
+import os
+import sys
+import time
+import asyncio
+
+from aiohttp import web
+
+# Path setup
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.ai.batching import MicroBatcher
+from src.ai.http_transport import AsyncHTTPTransport
+from src.ai.hf_provider import HuggingFaceProvider
+from src.ai.rate_limiter import RateLimitedProvider, RateLimiter
+
+
+async def _start_server():
+    """Lokaler Server: antwortet pro Input mit 'Echo: <letzte Zeile>'"""
+    requests = []
+    
+    async def inference(request):
+        data = await request.json()
+        inputs = data['inputs']
+        requests.append(inputs)
+        await asyncio.sleep(0.05)
+        
+        def answer(text):
+            return {'generated_text': f"Echo: {text.splitlines()[-1]}"}
+        
+        if isinstance(inputs, list):
+            return web.json_response([answer(text) for text in inputs])
+        return web.json_response([answer(inputs)])
+    
+    app = web.Application()
+    app.router.add_post('/model', inference)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://127.0.0.1:{port}/model", requests
+
+
+def test_batcher_flushes_by_size_and_time():
+    """Test: Flush bei voller Batch-Größe oder nach der Wartezeit"""
+    print("=" * 60)
+    print("🧪 Test: Flush nach Größe und Zeit")
+    print("=" * 60)
+    
+    batches = []
+    
+    async def send(key, items):
+        batches.append(list(items))
+        return [item * 2 for item in items]
+    
+    batcher = MicroBatcher(send, max_batch_size=4, max_wait_ms=30)
+    
+    async def run():
+        start = time.perf_counter()
+        results = await asyncio.gather(*[batcher.submit('k', i) for i in range(6)])
+        return results, time.perf_counter() - start
+    
+    results, elapsed = asyncio.run(run())
+    print(f"\n📦 Batches: {batches} in {elapsed * 1000:.0f}ms")
+    
+    assert results == [0, 2, 4, 6, 8, 10]
+    assert batches == [[0, 1, 2, 3], [4, 5]]
+    assert elapsed >= 0.025
+
+
+def test_batcher_separates_keys_and_errors():
+    """Test: Unterschiedliche Schlüssel getrennt, Fehler gehen an alle Wartenden"""
+    print("\n" + "=" * 60)
+    print("🧪 Test: Schlüssel und Fehler")
+    print("=" * 60)
+    
+    async def send(key, items):
+        if key == 'kaputt':
+            raise RuntimeError("503")
+        return [f"{key}:{item}" for item in items]
+    
+    batcher = MicroBatcher(send, max_wait_ms=5)
+    
+    async def run():
+        return await asyncio.gather(
+            batcher.submit('a', 1), batcher.submit('b', 2),
+            batcher.submit('kaputt', 3), batcher.submit('kaputt', 4),
+            return_exceptions=True
+        )
+    
+    results = asyncio.run(run())
+    print(f"\n🔑 {results}")
+    
+    assert results[:2] == ['a:1', 'b:2']
+    assert all(isinstance(r, RuntimeError) for r in results[2:])
+    assert batcher.stats['failed_batches'] == 1
+
+
+def test_hf_provider_batches_requests():
+    """Test: 16 gleichzeitige Prompts -> wenige HTTP-Requests, richtige Zuordnung"""
+    print("\n" + "=" * 60)
+    print("🧪 Test: Hugging Face Batch-Requests")
+    print("=" * 60)
+    
+    async def run():
+        runner, url, requests = await _start_server()
+        transport = AsyncHTTPTransport()
+        provider = HuggingFaceProvider(api_token='test', model='gpt2', transport=transport)
+        provider.api_url = url
+        try:
+            answers = await asyncio.gather(*[
+                provider.generate_response(f"Frage {i}") for i in range(16)
+            ])
+        finally:
+            await transport.close()
+            await runner.cleanup()
+        return answers, requests, provider.batcher.get_statistics()
+    
+    answers, requests, stats = asyncio.run(run())
+    print(f"\n📨 HTTP-Requests: {len(requests)}, Stats: {stats}")
+    
+    assert answers == [f"Echo: Frage {i}" for i in range(16)]
+    assert len(requests) == 2
+    assert stats['largest_batch'] == 8
+
+
+def test_rate_limit_per_upstream_request():
+    """Test: Gebündelte Prompts verbrauchen einen Rate-Limit-Token pro HTTP-Request"""
+    print("\n" + "=" * 60)
+    print("🧪 Test: Rate-Limit pro Batch")
+    print("=" * 60)
+    
+    # Burst 2: pro Prompt wären 14 der 16 Prompts in der Warteschlange gelandet
+    limiter = RateLimiter(provider_rate=0.5, provider_burst=2, user_rate=100, user_burst=100)
+    
+    async def run():
+        runner, url, requests = await _start_server()
+        transport = AsyncHTTPTransport()
+        provider = HuggingFaceProvider(api_token='test', model='gpt2', transport=transport)
+        provider.api_url = url
+        limited = RateLimitedProvider(provider, limiter)
+        try:
+            start = time.perf_counter()
+            answers = await asyncio.gather(*[
+                limited.generate_response(f"Frage {i}") for i in range(16)
+            ])
+            return answers, requests, time.perf_counter() - start
+        finally:
+            await transport.close()
+            await runner.cleanup()
+    
+    answers, requests, elapsed = asyncio.run(run())
+    stats = limiter.get_statistics()
+    print(f"\n📊 {len(requests)} HTTP-Requests in {elapsed:.2f}s, Limiter: {stats}")
+    
+    assert answers == [f"Echo: Frage {i}" for i in range(16)]
+    assert len(requests) == 2
+    assert stats['granted'] == 2 and stats['queued'] == 0
+    assert elapsed < 1.0
+
+
+def main():
+    """Führt alle Tests aus"""
+    print("\n🚀 AdonisAI Micro-Batching Tests")
+    print("=" * 60)
+    
+    test_batcher_flushes_by_size_and_time()
+    test_batcher_separates_keys_and_errors()
+    test_hf_provider_batches_requests()
+    test_rate_limit_per_upstream_request()
+    
+    print("\n" + "=" * 60)
+    print("✅ Micro-Batching Tests abgeschlossen")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+"""
+Test für die Model-Kaskade (kleines Modell zuerst) - Funktioniert OHNE Internet!
+"""
+
+import os
+import sys
+import asyncio
+
+# Path setup
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.ai.ai_client import AIClient, AIProvider, normalize_context
+from src.ai.cascade import CascadePolicy
+
+
+class ScriptedProvider(AIProvider):
+    """Provider mit fester Antwort und Verzögerung, zählt Aufrufe"""
+    
+    def __init__(self, model: str, answer: str, delay: float = 0.0, streaming: bool = False):
+        self.model = model
+        self.answer = answer
+        self.delay = delay
+        self.supports_streaming = streaming
+        self.calls = 0
+        self.contexts = []
+    
+    async def generate_response(self, prompt, context=None):
+        self.calls += 1
+        self.contexts.append(normalize_context(context))
+        await asyncio.sleep(self.delay)
+        return self.answer
+    
+    async def stream_response(self, prompt, context=None):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        for word in self.answer.split(' '):
+            yield word + ' '
+    
+    async def analyze_intent(self, text):
+        return {'intent': 'chat', 'confidence': 1.0, 'entities': {}}
+
+
+def test_simple_messages_and_validator():
+    """Test: Welche Nachrichten einfach sind und welche Antworten abgelehnt werden"""
+    print("=" * 60)
+    print("🧪 Test: Einfache Nachrichten + Validator")
+    print("=" * 60)
+    
+    policy = CascadePolicy(ScriptedProvider('small', ''), max_words=6)
+    
+    for message in ["Hallo", "Danke!", "Wie geht's?"]:
+        assert policy.is_simple(message), message
+    for message in [
+        "Erstelle einen Termin morgen um 14 Uhr",
+        "Erinnere mich an den Müll",
+        "Erkläre mir bitte ausführlich, wie ein Verbrennungsmotor im Detail funktioniert",
+    ]:
+        assert not policy.is_simple(message), message
+    assert not policy.is_simple("Hallo", {'response_format': 'json'})
+    print(f"\n📊 {policy.stats['simple']} einfach, {policy.stats['complex']} komplex")
+    
+    assert policy.validate("Hallo", "Hallo! Wie kann ich helfen?") is None
+    assert policy.validate("Hallo", "⚠️ Fehler: 503") == 'error'
+    assert policy.validate("Hallo", "") == 'error'
+    assert policy.validate("Hallo", "a") == 'too_short'
+    assert policy.validate("Hallo", "hallo.") == 'echo'
+    assert policy.validate("Wer bist du?", "Ich weiß nicht.") == 'uncertain'
+    assert policy.validate("Hi", "ja ja ja ja ja ja ja ja") == 'repetitive'
+    
+    custom = CascadePolicy(ScriptedProvider('small', ''),
+                           validator=lambda message, response: None if '!' in response else 'custom')
+    assert custom.validate("Hallo", "Hallo zurück") == 'custom'
+    assert custom.validate("Hallo", "Hallo zurück!") is None
+
+
+def test_small_model_answers_simple_chat():
+    """Test: Einfache Nachricht -> kleines Modell, Latenz-Ersparnis wird gezählt"""
+    print("\n" + "=" * 60)
+    print("🧪 Test: Kleines Modell antwortet")
+    print("=" * 60)
+    
+    small = ScriptedProvider('small', "Hallo! Wie kann ich helfen?")
+    large = ScriptedProvider('large', "Hallo, schön dich zu sehen!", delay=0.05)
+    client = AIClient(large, cascade=CascadePolicy(small, max_tokens=40))
+    
+    async def run():
+        # Latenz der Kette messen (lange Nachricht geht am kleinen Modell vorbei)
+        for _ in range(3):
+            await client.chat("Kannst du mir bitte etwas über die Geschichte Roms erzählen?")
+        return await client.chat("Hallo")
+    
+    answer = asyncio.run(run())
+    stats = client.cascade.get_statistics()
+    print(f"\n💬 {answer}")
+    print(f"📊 {stats}")
+    
+    assert answer == small.answer
+    assert small.calls == 1 and large.calls == 3
+    assert small.contexts[0]['max_tokens'] == 40
+    assert stats['accepted'] == 1 and stats['escalation_rate'] == 0.0
+    assert stats['saved_seconds'] > 0.03
+
+
+def test_rejected_answer_escalates():
+    """Test: Abgelehnte Antwort -> große Kette, auch beim Streaming"""
+    print("\n" + "=" * 60)
+    print("🧪 Test: Eskalation")
+    print("=" * 60)
+    
+    small = ScriptedProvider('small', "Keine Ahnung.")
+    large = ScriptedProvider('large', "Mir geht es gut, danke!", streaming=True)
+    client = AIClient(large, cascade=CascadePolicy(small))
+    
+    async def run():
+        answer = await client.chat("Wie geht's?")
+        parts = [chunk async for chunk in client.chat_stream("Wie geht es dir?")]
+        return answer, ''.join(parts).strip()
+    
+    answer, streamed = asyncio.run(run())
+    stats = client.cascade.get_statistics()
+    print(f"\n💬 {answer} / {streamed}")
+    print(f"📊 {stats}")
+    
+    assert answer == large.answer and streamed == large.answer
+    assert small.calls == 2 and large.calls == 2
+    assert stats['escalated'] == 2 and stats['escalation_rate'] == 1.0
+    assert stats['rejections'] == {'uncertain': 2}
+    assert stats['saved_seconds'] <= 0
+    
+    # Akzeptierte Antwort beim Streaming: ein Fragment vom kleinen Modell
+    small.answer = "Gut, danke!"
+    parts = asyncio.run(_collect(client.chat_stream("Wie läuft's?")))
+    assert parts == ["Gut, danke!"] and large.calls == 2
+
+
+async def _collect(stream):
+    return [chunk async for chunk in stream]
+
+
+def main():
+    """Führt alle Tests aus"""
+    print("\n🚀 AdonisAI Kaskaden Tests")
+    print("=" * 60)
+    
+    test_simple_messages_and_validator()
+    test_small_model_answers_simple_chat()
+    test_rejected_answer_escalates()
+    
+    print("\n" + "=" * 60)
+    print("✅ Kaskaden Tests abgeschlossen")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
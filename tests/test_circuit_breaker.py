@@ -0,0 +1,247 @@
+"""
+Test für Circuit Breaker und adaptive Timeouts - Funktioniert OHNE Internet!
+"""
+
+import os
+import sys
+import time
+import asyncio
+
+from aiohttp import web
+
+# Path setup
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.ai.circuit_breaker import (
+    AdaptiveTimeout,
+    CircuitBreaker,
+    CircuitOpenError,
+    ProviderGuard
+)
+from src.ai.http_transport import AsyncHTTPTransport, HTTPStatusError, TransportTimeout
+from src.ai.hf_provider import HuggingFaceProvider
+
+
+async def _start_server():
+    """Lokaler Server: /down antwortet immer mit 503"""
+    calls = {'down': 0}
+    
+    async def down(request):
+        calls['down'] += 1
+        return web.json_response({'error': 'Model is loading'}, status=503)
+    
+    app = web.Application()
+    app.router.add_post('/down', down)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://127.0.0.1:{port}", calls
+
+
+def test_breaker_states():
+    """Test: closed -> open -> half_open -> closed"""
+    print("=" * 60)
+    print("🧪 Test: Breaker-Zustände")
+    print("=" * 60)
+    
+    breaker = CircuitBreaker('test', min_calls=4, failure_rate=0.5, open_seconds=0.1)
+    
+    breaker.record_success()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == 'closed'
+    breaker.record_failure()
+    assert breaker.state == 'open'
+    
+    try:
+        breaker.check()
+        assert False, "Breaker hätte ablehnen müssen"
+    except CircuitOpenError as e:
+        print(f"\n🔴 {e}")
+    
+    time.sleep(0.15)
+    assert breaker.state == 'half_open'
+    breaker.check()
+    
+    # Nur ein Probe-Aufruf gleichzeitig
+    try:
+        breaker.check()
+        assert False, "Zweiter Probe-Aufruf hätte abgelehnt werden müssen"
+    except CircuitOpenError:
+        pass
+    
+    breaker.record_success()
+    print(f"🟢 {breaker.get_status()}")
+    assert breaker.state == 'closed'
+    assert breaker.stats['opened'] == 1
+
+
+def test_adaptive_timeout():
+    """Test: Timeout folgt der p99-Latenz, begrenzt durch das feste Timeout"""
+    print("\n" + "=" * 60)
+    print("🧪 Test: Adaptives Timeout")
+    print("=" * 60)
+    
+    timeouts = AdaptiveTimeout(factor=2.0, min_timeout=1.0, min_samples=10)
+    assert timeouts.timeout(30) == 30
+    
+    for _ in range(50):
+        timeouts.record(1.5)
+    
+    value = timeouts.timeout(30)
+    print(f"\n⏱️  Timeout bei p99≈1.5s: {value:.2f}s")
+    
+    assert 2.5 < value < 4.0
+    assert timeouts.timeout(2.0) == 2.0
+
+
+def _slow_provider(needed):
+    """Fake-Request: dauert `needed` Sekunden, läuft bei kürzerem Timeout ab"""
+    seen = []
+    
+    async def request(timeout):
+        seen.append(timeout)
+        if timeout < needed:
+            raise TransportTimeout(f"nach {timeout:.1f}s")
+        return 'ok'
+    
+    return request, seen
+
+
+def test_timeout_recovers_after_cold_start():
+    """Test: Zensierte Timeout-Samples heben das Timeout wieder an"""
+    print("\n" + "=" * 60)
+    print("🧪 Test: Timeout nach Kaltstart")
+    print("=" * 60)
+    
+    timeouts = AdaptiveTimeout(factor=2.0, min_timeout=0.5, min_samples=10)
+    guard = ProviderGuard('test', CircuitBreaker('test', min_calls=1000), timeouts)
+    for _ in range(50):
+        timeouts.record(1.0)
+    
+    # Provider ist plötzlich kalt und braucht 8s
+    request, seen = _slow_provider(8.0)
+    
+    async def run():
+        for _ in range(10):
+            try:
+                return await guard.call(request, 30)
+            except TransportTimeout:
+                pass
+    
+    result = asyncio.run(run())
+    print(f"\n⏱️  Timeouts der Versuche: {[round(t, 1) for t in seen]}")
+    
+    assert result == 'ok'
+    assert seen[0] < 8.0
+    assert all(later > earlier for earlier, later in zip(seen, seen[1:]))
+
+
+def test_half_open_probe_gets_ceiling():
+    """Test: Der Probe-Aufruf im half_open-Zustand nutzt das volle Timeout"""
+    print("\n" + "=" * 60)
+    print("🧪 Test: Probe mit voller Obergrenze")
+    print("=" * 60)
+    
+    timeouts = AdaptiveTimeout(factor=2.0, min_timeout=0.5, min_samples=10)
+    breaker = CircuitBreaker('test', min_calls=3, open_seconds=0.05)
+    guard = ProviderGuard('test', breaker, timeouts)
+    for _ in range(50):
+        timeouts.record(1.0)
+    
+    request, seen = _slow_provider(25.0)
+    
+    async def run():
+        for _ in range(3):
+            try:
+                await guard.call(request, 30)
+            except TransportTimeout:
+                pass
+        assert breaker.state == 'open'
+        await asyncio.sleep(0.06)
+        return await guard.call(request, 30)
+    
+    result = asyncio.run(run())
+    print(f"\n🟢 Probe mit {seen[-1]:.0f}s: {result}, Zustand {breaker.state}")
+    
+    assert result == 'ok'
+    assert seen[-1] == 30
+    assert breaker.state == 'closed'
+
+
+def test_guard_ignores_client_errors():
+    """Test: 4xx (außer 429) öffnen den Breaker nicht"""
+    print("\n" + "=" * 60)
+    print("🧪 Test: Client-Fehler zählen nicht")
+    print("=" * 60)
+    
+    guard = ProviderGuard('test', CircuitBreaker('test', min_calls=2))
+    
+    async def unauthorized(timeout):
+        raise HTTPStatusError(401, 'Unauthorized')
+    
+    async def run():
+        for _ in range(5):
+            try:
+                await guard.call(unauthorized, 30)
+            except HTTPStatusError:
+                pass
+    
+    asyncio.run(run())
+    print(f"\n🟢 {guard.get_status()}")
+    
+    assert guard.breaker.state == 'closed'
+
+
+def test_provider_fails_fast_when_open():
+    """Test: Nach wiederholten 503 antwortet der Provider ohne HTTP-Aufruf"""
+    print("\n" + "=" * 60)
+    print("🧪 Test: Fail-Fast bei offenem Breaker")
+    print("=" * 60)
+    
+    async def run():
+        runner, base_url, calls = await _start_server()
+        transport = AsyncHTTPTransport()
+        provider = HuggingFaceProvider(api_token='test', transport=transport)
+        provider.api_url = f"{base_url}/down"
+        provider.guard.breaker.min_calls = 3
+        # Nur der Breaker soll wirken (Retries testet test_retry.py)
+        provider.retry.max_attempts = 1
+        try:
+            answers = [await provider.generate_response(f"Frage {i}") for i in range(6)]
+        finally:
+            await transport.close()
+            await runner.cleanup()
+        return answers, calls['down'], provider.guard.get_status()
+    
+    answers, http_calls, status = asyncio.run(run())
+    print(f"\n🔴 {answers[-1]}")
+    print(f"📊 {status}")
+    
+    assert all(answer.startswith("⚠️ Fehler") for answer in answers)
+    assert http_calls == 3
+    assert status['state'] == 'open'
+    assert status['rejected'] == 3
+
+
+def main():
+    """Führt alle Tests aus"""
+    print("\n🚀 AdonisAI Circuit Breaker Tests")
+    print("=" * 60)
+    
+    test_breaker_states()
+    test_adaptive_timeout()
+    test_timeout_recovers_after_cold_start()
+    test_half_open_probe_gets_ceiling()
+    test_guard_ignores_client_errors()
+    test_provider_fails_fast_when_open()
+    
+    print("\n" + "=" * 60)
+    print("✅ Circuit Breaker Tests abgeschlossen")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
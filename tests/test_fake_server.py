@@ -0,0 +1,151 @@
+"""
+Test für den lokalen Fake LLM Server (OpenRouter + HF API) - Funktioniert OHNE Internet!
+"""
+
+import os
+import sys
+import time
+import random
+import asyncio
+
+# Path setup
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.ai.fake_server import FakeLLMServer, FaultInjector, LatencyDistribution
+from src.ai.http_transport import AsyncHTTPTransport
+from src.ai.hf_provider import HuggingFaceProvider
+from src.ai.openrouter_provider import OpenRouterProvider
+from src.ai.retry import RetryPolicy
+
+
+def test_latency_and_fault_specs():
+    """Test: Latenz-Specs und Fehler-Raten sind reproduzierbar"""
+    print("=" * 60)
+    print("🧪 Test: Latenz-Verteilungen und Fehler-Raten")
+    print("=" * 60)
+    
+    rng = random.Random(1)
+    fixed = LatencyDistribution.parse('0.25')
+    uniform = LatencyDistribution.parse('uniform:0.1,0.2', rng)
+    lognormal = LatencyDistribution.parse('lognormal:0.4,0.5', rng)
+    samples = sorted(lognormal.sample() for _ in range(2000))
+    print(f"\n⏱️  {lognormal}: Median {samples[1000]:.3f}s, p99 {samples[1980]:.3f}s")
+    
+    assert fixed.sample() == 0.25
+    assert all(0.1 <= uniform.sample() <= 0.2 for _ in range(100))
+    assert 0.35 < samples[1000] < 0.45 and samples[1980] > 1.0
+    
+    faults = FaultInjector(rate_429=0.1, rate_503=0.05, rate_timeout=0.05, rng=random.Random(2))
+    picks = [faults.pick() for _ in range(4000)]
+    print(f"💥 429: {picks.count('429')}, 503: {picks.count('503')}, Timeout: {picks.count('timeout')}")
+    assert 320 < picks.count('429') < 480
+    assert 140 < picks.count('503') < 260 and 140 < picks.count('timeout') < 260
+
+
+def test_providers_via_base_url():
+    """Test: OpenRouter (JSON + SSE) und HF (auch Batch) laufen gegen den Fake-Server"""
+    print("\n" + "=" * 60)
+    print("🧪 Test: Provider über Basis-URL")
+    print("=" * 60)
+    
+    server = FakeLLMServer(token_latency=LatencyDistribution('fixed', 0.01), seed=3)
+    
+    async def run():
+        await server.start()
+        transport = AsyncHTTPTransport()
+        openrouter = OpenRouterProvider(api_key='fake', transport=transport, base_url=server.openrouter_base_url)
+        hf = HuggingFaceProvider(api_token='fake', transport=transport, base_url=server.hf_base_url)
+        try:
+            answer = await openrouter.generate_response("Hallo Welt", "Du bist AdonisAI.")
+            chunks = [chunk async for chunk in openrouter.stream_response("Wie spät ist es?")]
+            hf_answers = await asyncio.gather(*[hf.generate_response(f"Frage {i}") for i in range(3)])
+            return answer, chunks, hf_answers, openrouter.prompt_cache.last
+        finally:
+            await transport.close()
+            await server.stop()
+    
+    answer, chunks, hf_answers, usage = asyncio.run(run())
+    print(f"\n💬 {answer} | {chunks} | {hf_answers}")
+    print(f"📊 {server.stats}")
+    
+    assert answer == "Echo: Hallo Welt"
+    assert ''.join(chunks) == "Echo: Wie spät ist es?" and len(chunks) == 5
+    assert hf_answers == [f"Echo: Beantworte die folgende Frage: Frage {i}" for i in range(3)]
+    assert server.stats['streams'] == 1 and server.stats['huggingface'] >= 1
+    assert server.stats['completion_tokens'] > 0
+    
+    # Umgebungsvariable, wenn keine Basis-URL übergeben wird
+    os.environ['OPENROUTER_BASE_URL'] = 'http://127.0.0.1:9/api/v1/'
+    try:
+        assert OpenRouterProvider(api_key='fake').api_url == 'http://127.0.0.1:9/api/v1/chat/completions'
+    finally:
+        del os.environ['OPENROUTER_BASE_URL']
+    assert HuggingFaceProvider(api_token='fake').api_url.startswith(HuggingFaceProvider.DEFAULT_BASE_URL)
+
+
+def test_injected_errors_reach_retry_policy():
+    """Test: 429/503 mit Retry-After bzw. estimated_time, hängende Anfragen laufen ins Timeout"""
+    print("\n" + "=" * 60)
+    print("🧪 Test: Fehler-Injektion")
+    print("=" * 60)
+    
+    server = FakeLLMServer(faults=FaultInjector(rate_429=1.0), responses=["Kanonisch"],
+                           retry_after=0.05, estimated_time=0.05, hang_seconds=1)
+    server.start_background()
+    try:
+        async def run():
+            transport = AsyncHTTPTransport()
+            provider = OpenRouterProvider(api_key='fake', transport=transport, base_url=server.openrouter_base_url)
+            provider.retry = RetryPolicy(max_attempts=3, base_delay=0.01)
+            try:
+                limited = await provider.generate_response("Hallo")
+                
+                # Danach: erst 503, dann Antwort (Retry nach estimated_time)
+                server.faults.rates = [('503', 1.0)]
+                hf = HuggingFaceProvider(api_token='fake', transport=transport, base_url=server.hf_base_url)
+                hf.batcher = None
+                hf.retry = RetryPolicy(max_attempts=2, base_delay=0.01)
+                loading = asyncio.create_task(hf.generate_response("Hallo"))
+                await asyncio.sleep(0.02)
+                server.faults.rates = []
+                recovered = await loading
+                
+                server.faults.rates = [('timeout', 1.0)]
+                start = time.perf_counter()
+                try:
+                    await provider._make_request([{'role': 'user', 'content': 'Hallo'}], timeout=0.3)
+                    hung = None
+                except Exception as e:
+                    hung = str(e)
+                return limited, recovered, hung, time.perf_counter() - start
+            finally:
+                await transport.close()
+        
+        limited, recovered, hung, waited = asyncio.run(run())
+    finally:
+        server.stop_background()
+    
+    print(f"\n💥 {limited} | {recovered} | {hung} ({waited:.2f}s)")
+    print(f"📊 {server.stats}")
+    assert limited.startswith("⚠️ Fehler") and server.stats['429'] == 3
+    assert recovered == "Kanonisch" and server.stats['503'] >= 1
+    assert 'Timeout' in hung and waited < 2
+    assert server.stats['timeout'] == 1
+
+
+def main():
+    """Führt alle Tests aus"""
+    print("\n🚀 AdonisAI Fake LLM Server Tests")
+    print("=" * 60)
+    
+    test_latency_and_fault_specs()
+    test_providers_via_base_url()
+    test_injected_errors_reach_retry_policy()
+    
+    print("\n" + "=" * 60)
+    print("✅ Fake LLM Server Tests abgeschlossen")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+"""
+Test für Hedging über mehrere Provider - Funktioniert OHNE Internet!
+Nutzt künstlich verzögerte Fake-Provider.
+"""
+
+import os
+import sys
+import time
+import asyncio
+
+# Path setup
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.ai.ai_client import AIClient, AIProvider
+from src.ai.hedging import HedgingPolicy
+from src.ai.latency import LatencyHistogram
+
+
+class FakeProvider(AIProvider):
+    """Provider mit fester Verzögerung"""
+    
+    def __init__(self, model: str, delay: float, answer: str = None):
+        self.model = model
+        self.delay = delay
+        self.answer = answer or f"Antwort von {model}"
+        self.calls = 0
+        self.cancelled = 0
+        self.closed = 0
+    
+    async def generate_response(self, prompt, context=None):
+        self.calls += 1
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        return self.answer
+    
+    async def stream_response(self, prompt, context=None):
+        self.calls += 1
+        try:
+            await asyncio.sleep(self.delay)
+            for word in self.answer.split(' '):
+                yield word + ' '
+        finally:
+            self.closed += 1
+    
+    async def analyze_intent(self, text):
+        return {'intent': 'unknown'}
+
+
+def test_histogram_quantiles():
+    """Test: Quantile aus dem Histogramm liegen nahe an den echten Werten"""
+    print("=" * 60)
+    print("🧪 Test: Latenz-Histogramm")
+    print("=" * 60)
+    
+    histogram = LatencyHistogram()
+    for i in range(1, 101):
+        histogram.record(i / 100)
+    
+    summary = histogram.summary()
+    print(f"\n📊 {summary}")
+    
+    assert abs(summary['p50'] - 0.5) < 0.05
+    assert abs(summary['p90'] - 0.9) < 0.1
+    assert summary['count'] == 100
+
+
+def test_hedge_beats_slow_primary():
+    """Test: Langsamer Primär-Provider wird vom Hedge überholt"""
+    print("\n" + "=" * 60)
+    print("🧪 Test: Hedge gewinnt")
+    print("=" * 60)
+    
+    slow = FakeProvider('slow', delay=2.0)
+    fast = FakeProvider('fast', delay=0.05)
+    policy = HedgingPolicy(default_delay=0.1)
+    client = AIClient(slow, fallback_providers=[fast], hedging=policy)
+    
+    async def run():
+        start = time.perf_counter()
+        answer = await client.chat("Hallo")
+        return answer, time.perf_counter() - start
+    
+    answer, elapsed = asyncio.run(run())
+    print(f"\n🏁 {answer} nach {elapsed:.2f}s, Stats: {policy.get_statistics()}")
+    
+    assert answer == "Antwort von fast"
+    assert elapsed < 1.0
+    assert slow.cancelled == 1
+    assert policy.stats['hedges'] == 1
+    assert policy.stats['hedge_wins'] == 1
+
+
+def test_no_hedge_when_primary_fast():
+    """Test: Schneller Primär-Provider - kein zweiter Aufruf"""
+    print("\n" + "=" * 60)
+    print("🧪 Test: Kein Hedge nötig")
+    print("=" * 60)
+    
+    primary = FakeProvider('primary', delay=0.01)
+    backup = FakeProvider('backup', delay=0.01)
+    policy = HedgingPolicy(default_delay=0.5)
+    client = AIClient(primary, fallback_providers=[backup], hedging=policy)
+    
+    async def run():
+        return [await client.chat(f"Frage {i}") for i in range(10)]
+    
+    answers = asyncio.run(run())
+    print(f"\n📈 Latenz primary: {client.latency.get(primary.name).summary()}")
+    
+    assert set(answers) == {"Antwort von primary"}
+    assert backup.calls == 0
+    assert client.latency.get(primary.name).count == 10
+    # Gelerntes p90 ersetzt die Standard-Verzögerung
+    assert policy.hedge_delay(client.latency, primary.name) == policy.min_delay
+
+
+def test_failover_on_error_response():
+    """Test: Fehlertext des Providers führt sofort zum nächsten Provider"""
+    print("\n" + "=" * 60)
+    print("🧪 Test: Failover")
+    print("=" * 60)
+    
+    broken = FakeProvider('broken', delay=0.0, answer="⚠️ Fehler: 503")
+    backup = FakeProvider('backup', delay=0.01)
+    policy = HedgingPolicy(default_delay=5.0)
+    client = AIClient(broken, fallback_providers=[backup], hedging=policy)
+    
+    answer = asyncio.run(client.chat("Hallo"))
+    print(f"\n🔁 {answer}")
+    
+    assert answer == "Antwort von backup"
+    assert policy.stats['failovers'] == 1
+
+
+def test_failover_on_cancelled_attempt():
+    """Test: Ein abgebrochener Versuch beendet nicht das ganze Rennen"""
+    print("\n" + "=" * 60)
+    print("🧪 Test: Abgebrochener Versuch")
+    print("=" * 60)
+    
+    class CancellingProvider(FakeProvider):
+        async def generate_response(self, prompt, context=None):
+            self.calls += 1
+            raise asyncio.CancelledError()
+    
+    cancelled = CancellingProvider('cancelled', delay=0.0)
+    backup = FakeProvider('backup', delay=0.01)
+    policy = HedgingPolicy(default_delay=5.0)
+    client = AIClient(cancelled, fallback_providers=[backup], hedging=policy)
+    
+    answer = asyncio.run(client.chat("Hallo"))
+    print(f"\n🔁 {answer}")
+    
+    assert answer == "Antwort von backup"
+    assert cancelled.calls == 1 and policy.stats['failovers'] == 1
+
+
+def test_stream_hedge_closes_loser():
+    """Test: Beim Streaming gewinnt das erste Token, der Verlierer wird geschlossen"""
+    print("\n" + "=" * 60)
+    print("🧪 Test: Stream-Hedge")
+    print("=" * 60)
+    
+    slow = FakeProvider('slow', delay=2.0, answer="langsam")
+    fast = FakeProvider('fast', delay=0.05, answer="schnell und fertig")
+    policy = HedgingPolicy(default_delay=0.1)
+    client = AIClient(slow, fallback_providers=[fast], hedging=policy)
+    
+    async def run():
+        return [chunk async for chunk in client.chat_stream("Hallo")]
+    
+    chunks = asyncio.run(run())
+    print(f"\n🌊 {chunks}")
+    
+    assert ''.join(chunks).strip() == "schnell und fertig"
+    assert slow.closed == 1
+    assert fast.closed == 1
+    assert client.stream_latency.get(fast.name).count == 1
+
+
+def test_cancelled_attempts_keep_delay():
+    """Test: Abgebrochene Versuche zählen als Messung - die Hedge-Verzögerung sinkt nicht"""
+    print("\n" + "=" * 60)
+    print("🧪 Test: Zensierte Messungen")
+    print("=" * 60)
+    
+    slow = FakeProvider('slow', delay=2.0)
+    fast = FakeProvider('fast', delay=0.01)
+    policy = HedgingPolicy(default_delay=0.1, min_delay=0.01, min_samples=3)
+    client = AIClient(slow, fallback_providers=[fast], hedging=policy)
+    
+    async def run():
+        for i in range(5):
+            await policy.race([slow, fast], lambda p: p.generate_response("x"), client.latency)
+    
+    asyncio.run(run())
+    delay = policy.hedge_delay(client.latency, slow.name)
+    print(f"\n⏱️  Hedge-Verzögerung für slow: {delay:.2f}s, Stats: {policy.get_statistics()}")
+    
+    assert client.latency.get(slow.name).count == 5
+    assert delay >= 0.09
+    assert policy.stats['censored'] == 5
+
+
+def main():
+    """Führt alle Tests aus"""
+    print("\n🚀 AdonisAI Hedging Tests")
+    print("=" * 60)
+    
+    test_histogram_quantiles()
+    test_hedge_beats_slow_primary()
+    test_no_hedge_when_primary_fast()
+    test_failover_on_error_response()
+    test_failover_on_cancelled_attempt()
+    test_stream_hedge_closes_loser()
+    test_cancelled_attempts_keep_delay()
+    
+    print("\n" + "=" * 60)
+    print("✅ Hedging Tests abgeschlossen")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""
+Test für den asynchronen HTTP Transport - Funktioniert OHNE Internet!
+Startet einen lokalen aiohttp Server als Gegenstelle.
+"""
+
+import os
+import sys
+import time
+import asyncio
+
+from aiohttp import web
+
+# Path setup
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.ai.http_transport import AsyncHTTPTransport, HTTPStatusError, TransportTimeout
+from src.ai.openrouter_provider import OpenRouterProvider
+
+
+async def _start_server(delay: float = 0.2):
+    """Lokaler Server: /slow antwortet verzögert, /error mit 503"""
+    async def slow(request):
+        data = await request.json()
+        await asyncio.sleep(delay)
+        return web.json_response({'echo': data})
+    
+    async def error(request):
+        return web.json_response({'error': 'loading'}, status=503)
+    
+    async def chat(request):
+        data = await request.json()
+        await asyncio.sleep(delay)
+        content = data['messages'][-1]['content']
+        return web.json_response({'choices': [{'message': {'content': f"Echo: {content}"}}]})
+    
+    app = web.Application()
+    app.router.add_post('/slow', slow)
+    app.router.add_post('/error', error)
+    app.router.add_post('/chat', chat)
+    
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://127.0.0.1:{port}"
+
+
+def test_concurrent_requests():
+    """Test: Viele Requests laufen parallel statt nacheinander"""
+    print("=" * 60)
+    print("🧪 Test: 100 parallele Requests")
+    print("=" * 60)
+    
+    async def run():
+        runner, base_url = await _start_server(delay=0.2)
+        transport = AsyncHTTPTransport(max_connections=200, max_per_host=100)
+        try:
+            start = time.perf_counter()
+            results = await asyncio.gather(*[
+                transport.post_json(f"{base_url}/slow", {'i': i}) for i in range(100)
+            ])
+            elapsed = time.perf_counter() - start
+        finally:
+            await transport.close()
+            await runner.cleanup()
+        return results, elapsed
+    
+    results, elapsed = asyncio.run(run())
+    print(f"\n⏱️  100 Requests à 200ms in {elapsed:.2f}s")
+    
+    assert [r['echo']['i'] for r in results] == list(range(100))
+    assert elapsed < 5.0
+
+
+def test_error_mapping():
+    """Test: Statuscodes und Timeouts werden als Transport-Fehler gemeldet"""
+    print("\n" + "=" * 60)
+    print("🧪 Test: Fehler-Mapping")
+    print("=" * 60)
+    
+    async def run():
+        runner, base_url = await _start_server(delay=1.0)
+        transport = AsyncHTTPTransport()
+        errors = []
+        try:
+            try:
+                await transport.post_json(f"{base_url}/error", {})
+            except HTTPStatusError as e:
+                errors.append(e.status)
+            try:
+                await transport.post_json(f"{base_url}/slow", {}, timeout=0.1)
+            except TransportTimeout:
+                errors.append('timeout')
+        finally:
+            await transport.close()
+            await runner.cleanup()
+        return errors
+    
+    errors = asyncio.run(run())
+    print(f"\n❌ Erkannte Fehler: {errors}")
+    
+    assert errors == [503, 'timeout']
+
+
+def test_openrouter_via_transport():
+    """Test: OpenRouter Provider nutzt den Transport (awaitable)"""
+    print("\n" + "=" * 60)
+    print("🧪 Test: OpenRouter Provider über lokalen Server")
+    print("=" * 60)
+    
+    async def run():
+        runner, base_url = await _start_server(delay=0.1)
+        transport = AsyncHTTPTransport()
+        provider = OpenRouterProvider(api_key='test', transport=transport)
+        provider.api_url = f"{base_url}/chat"
+        try:
+            return await asyncio.gather(*[
+                provider.generate_response(f"Frage {i}") for i in range(20)
+            ])
+        finally:
+            await transport.close()
+            await runner.cleanup()
+    
+    answers = asyncio.run(run())
+    print(f"\n💬 {answers[0]}")
+    
+    assert answers == [f"Echo: Frage {i}" for i in range(20)]
+
+
+def main():
+    """Führt alle Tests aus"""
+    print("\n🚀 AdonisAI HTTP Transport Tests")
+    print("=" * 60)
+    
+    test_concurrent_requests()
+    test_error_mapping()
+    test_openrouter_via_transport()
+    
+    print("\n" + "=" * 60)
+    print("✅ HTTP Transport Tests abgeschlossen")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""
+Test für den lokalen Intent-Classifier - Funktioniert OHNE Internet!
+"""
+
+import os
+import sys
+import time
+import asyncio
+
+# Path setup
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.ai.ai_client import AIClient, AIProvider
+from src.ai.intent_classifier import LocalIntentClassifier
+
+
+class RemoteProvider(AIProvider):
+    """Fake Remote-Provider der Intent-Aufrufe zählt"""
+    
+    def __init__(self):
+        self.intent_calls = 0
+    
+    async def generate_response(self, prompt, context=None):
+        return "Antwort"
+    
+    async def analyze_intent(self, text):
+        self.intent_calls += 1
+        return {'intent': 'question', 'confidence': 0.8, 'entities': [], 'raw_text': text}
+
+
+def test_obvious_commands():
+    """Test: Eindeutige Befehle werden lokal sicher erkannt"""
+    print("=" * 60)
+    print("🧪 Test: Eindeutige Befehle")
+    print("=" * 60)
+    
+    classifier = LocalIntentClassifier(threshold=0.85)
+    cases = [
+        ("Was habe ich heute?", 'calendar', 'list', 'today'),
+        ("Wann ist mein nächster Termin?", 'calendar', 'list', 'next'),
+        ("Zeig mir meine Termine diese Woche", 'calendar', 'list', 'week'),
+        ("Termin morgen 15 Uhr Meeting mit Team", 'calendar', 'create', 'tomorrow'),
+        ("Erinnere mich an den Zahnarzt", 'reminder', None, None),
+        ("Hallo, wie geht es dir?", 'general', None, None),
+    ]
+    
+    for text, intent, operation, timeframe in cases:
+        result = classifier.classify(text)
+        entities = {e['type']: e['value'] for e in result['entities']}
+        print(f"\n🎯 '{text}' → {result['intent']} ({result['confidence']:.2f}) {entities}")
+        
+        assert result['intent'] == intent
+        assert classifier.is_confident(result)
+        assert entities.get('operation') == operation
+        assert entities.get('timeframe') == timeframe
+
+
+def test_no_local_create_for_other_operations():
+    """Test: Löschen, Absagen, Verschieben, Verneinung und Fragen legen keinen Termin an"""
+    print("\n" + "=" * 60)
+    print("🧪 Test: Kein lokales Erstellen")
+    print("=" * 60)
+    
+    classifier = LocalIntentClassifier(threshold=0.85)
+    cases = [
+        "Lösche den Termin morgen um 15 Uhr",
+        "Sag den Termin morgen um 15 Uhr ab",
+        "Verschiebe meinen Termin morgen 15 Uhr auf 16 Uhr",
+        "Hatte ich gestern um 15 Uhr einen Termin?",
+        "Erstelle keinen Termin morgen um 15 Uhr",
+        "Ich habe morgen um 15 Uhr einen Termin",
+        "Lösche meine Termine heute",
+    ]
+    
+    for text in cases:
+        result = classifier.classify(text)
+        entities = {e['type']: e['value'] for e in result['entities']}
+        print(f"\n🚫 '{text}' → {result['intent']} {entities}")
+        
+        assert entities.get('operation') is None
+
+
+def test_ambiguous_falls_through():
+    """Test: Unsichere Eingaben gehen an den Remote-Provider"""
+    print("\n" + "=" * 60)
+    print("🧪 Test: Gestufte Intent-Erkennung")
+    print("=" * 60)
+    
+    provider = RemoteProvider()
+    client = AIClient(provider, intent_classifier=LocalIntentClassifier(threshold=0.85))
+    
+    async def run():
+        local = await client.understand_command("Was habe ich morgen?")
+        remote = await client.understand_command("Mittwoch")
+        return local, remote
+    
+    local, remote = asyncio.run(run())
+    print(f"\n📊 {client.intent_stats}")
+    
+    assert local['tier'] == 'local'
+    assert remote['tier'] == 'remote'
+    assert provider.intent_calls == 1
+    assert client.intent_stats == {'local': 1, 'remote': 1}
+
+
+def test_fit_learns_new_phrases():
+    """Test: Nachtrainieren mit eigenen Beispielen"""
+    print("\n" + "=" * 60)
+    print("🧪 Test: Nachtrainieren")
+    print("=" * 60)
+    
+    classifier = LocalIntentClassifier()
+    examples = [
+        ("Trag mir Freitag 10 Uhr Friseur ein", 'calendar'),
+        ("Erinnere mich morgen an Milch", 'reminder'),
+        ("Was ist die Hauptstadt von Frankreich?", 'question'),
+        ("Danke dir", 'general'),
+    ]
+    accuracy = classifier.fit(examples, epochs=30)
+    print(f"\n🎓 Genauigkeit: {accuracy:.0%}")
+    
+    assert accuracy == 1.0
+
+
+def test_classification_speed():
+    """Test: Lokale Klassifikation ist schnell genug für jeden Request"""
+    print("\n" + "=" * 60)
+    print("🧪 Test: Geschwindigkeit")
+    print("=" * 60)
+    
+    classifier = LocalIntentClassifier()
+    start = time.perf_counter()
+    for _ in range(1000):
+        classifier.classify("Termin morgen 15 Uhr Meeting mit Team")
+    per_call_us = (time.perf_counter() - start) * 1000
+    
+    print(f"\n⏱️  {per_call_us:.1f} µs pro Klassifikation")
+    assert per_call_us < 1000
+
+
+def main():
+    """Führt alle Tests aus"""
+    print("\n🚀 AdonisAI Intent Classifier Tests")
+    print("=" * 60)
+    
+    test_obvious_commands()
+    test_no_local_create_for_other_operations()
+    test_ambiguous_falls_through()
+    test_fit_learns_new_phrases()
+    test_classification_speed()
+    
+    print("\n" + "=" * 60)
+    print("✅ Intent Classifier Tests abgeschlossen")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+"""
+Test für den Keep-Warm Scheduler (HuggingFace Kaltstarts) - Funktioniert OHNE Internet!
+"""
+
+import os
+import sys
+import time
+import asyncio
+
+from aiohttp import web
+
+# Path setup
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.ai.hf_provider import HuggingFaceProvider
+from src.ai.http_transport import AsyncHTTPTransport
+from src.ai.keep_warm import KeepWarmScheduler
+
+
+class FakeClock:
+    """Verstellbare Uhr"""
+    
+    def __init__(self, start: float):
+        self.now = start
+    
+    def __call__(self):
+        return self.now
+
+
+class FakeProvider:
+    """Provider mit probe() ohne Netzwerk"""
+    
+    name = 'HuggingFaceProvider:fake'
+    cost_per_1k_tokens = 0.0
+    
+    def __init__(self):
+        self.probes = 0
+    
+    async def probe(self):
+        self.probes += 1
+        return 2
+
+
+def _monday(hour: int) -> float:
+    """Zeitstempel eines Montags (lokale Zeit) zur angegebenen Stunde"""
+    return time.mktime((2024, 1, 1, hour, 0, 0, 0, 0, -1))
+
+
+def test_interval_learned_from_cold_start():
+    """Test: Ein Kaltstart nach langer Pause verkürzt das Probe-Intervall"""
+    print("=" * 60)
+    print("🧪 Test: Intervall aus Kaltstarts lernen")
+    print("=" * 60)
+    
+    clock = FakeClock(_monday(9))
+    scheduler = KeepWarmScheduler(FakeProvider(), default_interval=300, min_interval=60, clock=clock)
+    
+    for _ in range(6):
+        clock.now += 10
+        scheduler.record_request(0.5)
+    assert scheduler.stats['cold_starts'] == 0
+    assert scheduler.state == 'warm'
+    
+    # 15 Minuten Leerlauf, dann 20s Kaltstart
+    clock.now += 900
+    scheduler.record_request(20.0)
+    status = scheduler.get_status()
+    print(f"\n🥶 Leerlauf bis Kaltstart: {status['idle_limit']:.0f}s, Intervall: {status['interval']:.0f}s")
+    
+    assert status['cold_starts'] == 1
+    assert 870 <= status['idle_limit'] <= 900
+    assert 430 <= status['interval'] <= 450
+    assert status['state'] == 'warm'
+    
+    clock.now += 1000
+    assert scheduler.state == 'cold'
+
+
+def test_probe_only_when_idle():
+    """Test: Echter Traffic hält warm - Probe erst nach Ablauf des Intervalls"""
+    print("\n" + "=" * 60)
+    print("🧪 Test: Probe nur im Leerlauf")
+    print("=" * 60)
+    
+    clock = FakeClock(_monday(9))
+    provider = FakeProvider()
+    scheduler = KeepWarmScheduler(provider, default_interval=300, clock=clock)
+    
+    async def run():
+        decisions = []
+        for _ in range(10):
+            clock.now += 100
+            scheduler.record_request(0.5)
+            decisions.append(scheduler.should_probe())
+        clock.now += 301
+        decisions.append(scheduler.should_probe())
+        if decisions[-1]:
+            await scheduler.probe()
+        return decisions
+    
+    decisions = asyncio.run(run())
+    status = scheduler.get_status()
+    print(f"\n🔥 Entscheidungen: {decisions}")
+    print(f"📊 {status}")
+    
+    assert decisions[:-1] == [False] * 10
+    assert decisions[-1] is True
+    assert provider.probes == 1
+    assert status['probe_tokens'] == 2
+    assert status['skipped_busy'] >= 3
+    assert not scheduler.should_probe()
+
+
+def test_no_probes_in_quiet_hours():
+    """Test: Nachts (ohne üblichen Traffic) wird nicht gewärmt, vor dem Morgen schon"""
+    print("\n" + "=" * 60)
+    print("🧪 Test: Ruhige Stunden")
+    print("=" * 60)
+    
+    clock = FakeClock(_monday(9))
+    scheduler = KeepWarmScheduler(FakeProvider(), default_interval=300, clock=clock)
+    
+    # Zwei Tage lang nur morgens zwischen 9 und 10 Uhr Anfragen
+    for day in range(2):
+        for minute in range(0, 60, 5):
+            clock.now = _monday(9) + day * 86400 + minute * 60
+            scheduler.record_request(0.5)
+    
+    clock.now = _monday(3) + 2 * 86400
+    night = scheduler.should_probe()
+    clock.now = _monday(8) + 2 * 86400 + 1800
+    morning = scheduler.should_probe()
+    print(f"\n🌙 3 Uhr: {night}, ☀️ 8:30 Uhr: {morning}")
+    
+    assert night is False
+    assert scheduler.stats['skipped_quiet'] == 1
+    assert morning is True
+
+
+def test_hf_probe_request():
+    """Test: Probe umgeht den API-Cache; echte Anfragen werden gemeldet"""
+    print("\n" + "=" * 60)
+    print("🧪 Test: HuggingFace Probe")
+    print("=" * 60)
+    
+    payloads = []
+    
+    async def model(request):
+        payloads.append(await request.json())
+        return web.json_response([{'generated_text': 'ok'}])
+    
+    async def run():
+        app = web.Application()
+        app.router.add_post('/model', model)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, '127.0.0.1', 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        
+        transport = AsyncHTTPTransport()
+        provider = HuggingFaceProvider(api_token='test', transport=transport)
+        provider.api_url = f"http://127.0.0.1:{port}/model"
+        provider.keep_warm = KeepWarmScheduler(provider)
+        try:
+            await provider.keep_warm.probe()
+            await provider.generate_response("Hallo")
+        finally:
+            await transport.close()
+            await runner.cleanup()
+        return provider.keep_warm
+    
+    scheduler = asyncio.run(run())
+    print(f"\n📨 Probe-Payload: {payloads[0]}")
+    
+    assert payloads[0]['options']['use_cache'] is False
+    assert payloads[0]['parameters'] == {'max_length': 1}
+    assert scheduler.stats['probes'] == 1
+    assert scheduler.last_request is not None
+
+
+def main():
+    """Führt alle Tests aus"""
+    print("\n🚀 AdonisAI Keep-Warm Tests")
+    print("=" * 60)
+    
+    test_interval_learned_from_cold_start()
+    test_probe_only_when_idle()
+    test_no_probes_in_quiet_hours()
+    test_hf_probe_request()
+    
+    print("\n" + "=" * 60)
+    print("✅ Keep-Warm Tests abgeschlossen")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""
+Test für den lokalen Modell-Provider - Funktioniert OHNE Internet und OHNE Modell!
+Ein Fake-Loader ersetzt llama.cpp.
+"""
+
+import os
+import sys
+import time
+import asyncio
+import threading
+
+# Path setup
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.ai.local_provider import LocalModelProvider
+
+
+class FakeLlama:
+    """Minimales Llama-Objekt mit create_chat_completion"""
+    
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.calls = 0
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+    
+    def create_chat_completion(self, messages, temperature, max_tokens):
+        with self._lock:
+            self.calls += 1
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(self.delay)
+        with self._lock:
+            self.active -= 1
+        
+        text = messages[-1]['content']
+        if 'Intent' in messages[0]['content']:
+            content = 'calendar' if 'Termin' in text else 'general'
+        else:
+            content = f"Lokal: {text}"
+        return {'choices': [{'message': {'content': content}}]}
+
+
+def _provider(delay=0.0, pool_size=1, max_queue=8):
+    """Provider mit Fake-Modellen (eines pro Pool-Slot)"""
+    models = []
+    
+    def loader(path, n_ctx, n_threads):
+        model = FakeLlama(delay)
+        models.append(model)
+        return model
+    
+    provider = LocalModelProvider(model_path='/models/tiny.gguf', pool_size=pool_size,
+                                  max_queue=max_queue, model_loader=loader)
+    return provider, models
+
+
+def test_loads_once_and_generates():
+    """Test: Gewichte einmal geladen, Warm-up ausgeführt, Antwort + Intent"""
+    print("=" * 60)
+    print("🧪 Test: Laden und Generieren")
+    print("=" * 60)
+    
+    provider, models = _provider()
+    
+    async def run():
+        answer = await provider.generate_response("Hallo", "System")
+        intent = await provider.analyze_intent("Termin morgen")
+        return answer, intent
+    
+    answer, intent = asyncio.run(run())
+    print(f"\n🖥️  {provider.name}: {answer} / {intent['intent']}")
+    
+    assert len(models) == 1
+    assert models[0].calls == 3  # Warm-up + Antwort + Intent
+    assert answer == "Lokal: Hallo"
+    assert intent['intent'] == 'calendar'
+    assert provider.name == 'LocalModelProvider:tiny.gguf'
+
+
+def test_pool_bounds_parallelism():
+    """Test: Höchstens pool_size Generierungen gleichzeitig"""
+    print("\n" + "=" * 60)
+    print("🧪 Test: Begrenzter Pool")
+    print("=" * 60)
+    
+    provider, models = _provider(delay=0.05, pool_size=2)
+    
+    async def run():
+        return await asyncio.gather(*[provider.generate_response(f"F{i}") for i in range(6)])
+    
+    answers = asyncio.run(run())
+    busiest = max(model.max_active for model in models)
+    print(f"\n🧵 Antworten: {len(answers)}, max. parallel pro Instanz: {busiest}")
+    
+    assert answers == [f"Lokal: F{i}" for i in range(6)]
+    assert busiest == 1
+    assert sum(model.calls for model in models) == 6 + 2
+
+
+def test_queue_full_and_cancel_accounting():
+    """Test: Volle Warteschlange lehnt ab; abgebrochene Aufrufer belegen den Slot weiter"""
+    print("\n" + "=" * 60)
+    print("🧪 Test: Warteschlange und Abbruch")
+    print("=" * 60)
+    
+    provider, _ = _provider(delay=0.2, pool_size=1, max_queue=1)
+    
+    async def run():
+        first = asyncio.ensure_future(provider.generate_response("A"))
+        await asyncio.sleep(0.02)
+        first.cancel()
+        await asyncio.sleep(0.01)
+        pending_after_cancel = provider.pending
+        
+        second = await asyncio.gather(
+            provider.generate_response("B"), provider.generate_response("C")
+        )
+        return pending_after_cancel, second
+    
+    pending_after_cancel, (second, third) = asyncio.run(run())
+    print(f"\n📊 Offen nach Abbruch: {pending_after_cancel}, Antworten: {second} / {third}")
+    
+    # Die abgebrochene Generierung läuft im Thread weiter und zählt mit
+    assert pending_after_cancel == 1
+    assert second == "Lokal: B"
+    assert third.startswith("⚠️ Fehler") and "ausgelastet" in third
+    
+    time.sleep(0.3)
+    assert provider.pending == 0
+
+
+def main():
+    """Führt alle Tests aus"""
+    print("\n🚀 AdonisAI Local Provider Tests")
+    print("=" * 60)
+    
+    test_loads_once_and_generates()
+    test_pool_bounds_parallelism()
+    test_queue_full_and_cancel_accounting()
+    
+    print("\n" + "=" * 60)
+    print("✅ Local Provider Tests abgeschlossen")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+"""
+Test für das Langzeitgedächtnis (Vektor-Index über Interaktionen) - Funktioniert OHNE Internet!
+"""
+
+import os
+import sys
+import time
+import tempfile
+
+import numpy as np
+
+# Path setup
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.ai.memory_index import InteractionMemory
+from src.storage.interaction_logger import InteractionLogger
+
+
+HISTORY = [
+    ("Wann hat meine Schwester Geburtstag?", "Deine Schwester Anna hat am 12. März Geburtstag."),
+    ("Wie wird das Wetter morgen?", "Morgen wird es sonnig bei 20 Grad."),
+    ("Ich habe einen Zahnarzttermin am Freitag", "Alles klar, der Zahnarzttermin ist eingetragen."),
+    ("Mein Lieblingsessen ist Lasagne", "Lasagne, gute Wahl! Ich merke es mir."),
+]
+
+
+def _row(row_id, user_id, user_input, bot_output, **extra):
+    row = {
+        'id': row_id,
+        'timestamp': f"2026-01-{row_id % 28 + 1:02d}T10:00:00",
+        'user_id': user_id,
+        'user_input': user_input,
+        'bot_output': bot_output,
+        'bot_action': None,
+        'is_sensitive': False
+    }
+    row.update(extra)
+    return row
+
+
+def _memory(**kwargs):
+    memory = InteractionMemory(exclude_recent=0, **kwargs)
+    memory.loaded = True
+    return memory
+
+
+def test_retrieval_and_filters():
+    """Test: Relevante Gespräche werden gefunden, gefilterte Zeilen nie"""
+    print("=" * 60)
+    print("🧪 Test: Suche + Filter")
+    print("=" * 60)
+    
+    memory = _memory(top_k=2)
+    for row_id, (user_input, bot_output) in enumerate(HISTORY, start=1):
+        assert memory.add(_row(row_id, 1, user_input, bot_output))
+    
+    # Nicht indexiert: sensibel, Fehler, Fast-Path, abgelöst
+    assert not memory.add(_row(10, 1, "Mein Passwort ist geheim123", "Ok", is_sensitive=True))
+    assert not memory.add(_row(11, 1, "Geburtstag Schwester?", "⚠️ Fehler: 503"))
+    assert not memory.add(_row(12, 1, "Hallo", "Hallo!", bot_action='fast_greeting'))
+    assert not memory.add(_row(13, 1, "Geburtstag", "", bot_action='superseded'))
+    
+    hits = memory.search(1, "Wann ist der Geburtstag meiner Schwester?")
+    print(f"\n🔎 {[(hit['user_input'], round(hit['similarity'], 2)) for hit in hits]}")
+    assert hits and hits[0]['id'] == 1
+    assert memory.search(1, "Zahnarzt am Freitag verschieben")[0]['id'] == 3
+    
+    # Keine Treffer für Unverwandtes und keine fremden Shards
+    assert memory.search(1, "Was machst du so?") == []
+    assert memory.search(2, "Wann hat meine Schwester Geburtstag?") == []
+    assert not memory.search(1, "Passwort")
+    
+    stats = memory.get_statistics()
+    print(f"📊 {stats}")
+    assert stats['entries'] == 4 and stats['skipped'] == 4 and stats['users'] == 1
+    
+    # Die letzten Gespräche stehen im Kurzzeit-Kontext und werden übersprungen
+    recent = InteractionMemory(exclude_recent=2)
+    recent.loaded = True
+    for row_id, (user_input, bot_output) in enumerate(HISTORY, start=1):
+        recent.add(_row(row_id, 1, user_input, bot_output))
+    assert recent.search(1, "Wann hat meine Schwester Geburtstag?")[0]['id'] == 1
+    assert recent.search(1, "Zahnarzttermin am Freitag") == []
+
+
+def test_token_budget():
+    """Test: context_for_prompt hält das Token-Budget ein"""
+    print("\n" + "=" * 60)
+    print("🧪 Test: Token-Budget")
+    print("=" * 60)
+    
+    memory = _memory(top_k=5, token_budget=60, max_entry_tokens=40, min_similarity=0.1)
+    long_answer = "Zum Projekt Phoenix: " + "Die Planung läuft weiter. " * 40
+    for row_id in range(1, 6):
+        memory.add(_row(row_id, 1, f"Wie steht es um Projekt Phoenix, Teil {row_id}?", long_answer))
+    
+    context = memory.context_for_prompt(1, "Projekt Phoenix Stand")
+    tokens = sum(memory.counter.count(hit['user_input']) + memory.counter.count(hit['bot_output'])
+                 for hit in context)
+    print(f"\n📏 {len(context)} Gespräche, {tokens} Token")
+    assert 1 <= len(context) < 5
+    assert tokens <= 60
+    assert all(hit['bot_output'].endswith('…') for hit in context)
+
+
+def test_incremental_updates_from_logger():
+    """Test: Bestand laden + neue Interaktionen per Listener (auch während des Ladens)"""
+    print("\n" + "=" * 60)
+    print("🧪 Test: Inkrementelle Updates")
+    print("=" * 60)
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        interaction_logger = InteractionLogger(db_path=os.path.join(tmp, 'interactions.db'))
+        for user_input, bot_output in HISTORY[:2]:
+            interaction_logger.log_interaction(user_id=1, user_input=user_input, bot_output=bot_output)
+        
+        memory = InteractionMemory(exclude_recent=0)
+        interaction_logger.add_listener(memory.on_interaction)
+        
+        # Vor dem Laden: gepuffert, nicht doppelt indexiert
+        user_input, bot_output = HISTORY[2]
+        interaction_logger.log_interaction(user_id=1, user_input=user_input, bot_output=bot_output)
+        assert len(memory) == 0 and len(memory._pending) == 1
+        
+        assert memory.load(interaction_logger, batch_size=2) == 3
+        assert len(memory) == 3 and memory.loaded
+        
+        # Nach dem Laden: direkt im Index
+        user_input, bot_output = HISTORY[3]
+        interaction_logger.log_interaction(user_id=1, user_input=user_input, bot_output=bot_output)
+        interaction_logger.log_interaction(user_id=1, user_input="Mein Passwort ist 1234",
+                                           bot_output="Notiert", is_sensitive=True)
+        print(f"\n📊 {memory.get_statistics()}")
+        assert len(memory) == 4
+        assert memory.search(1, "Was ist mein Lieblingsessen?")[0]['user_input'] == HISTORY[3][0]
+
+
+def test_ivf_matches_flat():
+    """Test: IVF-Index findet dieselben Treffer wie Brute-Force, schneller"""
+    print("\n" + "=" * 60)
+    print("🧪 Test: IVF vs. Brute-Force")
+    print("=" * 60)
+    
+    rng = np.random.default_rng(1)
+    dim, rows = 256, 20000
+    # Gruppierte Vektoren (wie Gespräche zu wiederkehrenden Themen)
+    centers = rng.normal(size=(200, dim))
+    vectors = centers[rng.integers(0, 200, rows)] + 0.3 * rng.normal(size=(rows, dim))
+    vectors = (vectors / np.linalg.norm(vectors, axis=1, keepdims=True)).astype(np.float32)
+    
+    indexes = {}
+    for kind in ('flat', 'ivf'):
+        memory = _memory(index=kind, min_similarity=-1.0, nprobe=8)
+        memory.embedder.embed = lambda text: vectors[int(text)]
+        memory.embed = lambda user_input, bot_output='': vectors[int(user_input)]
+        start = time.perf_counter()
+        for row_id in range(rows):
+            memory.add(_row(row_id + 1, 1, str(row_id), 'x'))
+        print(f"\n🏗️  {kind}: Aufbau {time.perf_counter() - start:.2f}s, "
+              f"{memory.stats['trainings']} Trainings")
+        indexes[kind] = memory
+    
+    queries = [str(i) for i in rng.integers(0, rows, 50)]
+    recall = 0
+    for query in queries:
+        exact = {hit['id'] for hit in indexes['flat'].search(1, query)}
+        approx = {hit['id'] for hit in indexes['ivf'].search(1, query)}
+        recall += len(exact & approx) / len(exact)
+    recall /= len(queries)
+    
+    for kind, memory in indexes.items():
+        stats = memory.get_statistics()
+        print(f"⏱️  {kind}: p50 {stats['p50_ms']:.2f}ms, p95 {stats['p95_ms']:.2f}ms")
+    print(f"🎯 Recall@3: {recall:.2f}")
+    
+    assert indexes['ivf'].stats['trainings'] >= 1
+    assert recall >= 0.9
+    assert indexes['ivf'].get_statistics()['p50_ms'] < 50
+
+
+def main():
+    """Führt alle Tests aus"""
+    print("\n🚀 AdonisAI Langzeitgedächtnis Tests")
+    print("=" * 60)
+    
+    test_retrieval_and_filters()
+    test_token_budget()
+    test_incremental_updates_from_logger()
+    test_ivf_matches_flat()
+    
+    print("\n" + "=" * 60)
+    print("✅ Langzeitgedächtnis Tests abgeschlossen")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
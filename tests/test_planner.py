@@ -0,0 +1,131 @@
+"""
+Test für AIClient.plan() (Intent, Slots und Antwort in einem Aufruf) - Funktioniert OHNE Internet!
+"""
+
+import os
+import sys
+import json
+import asyncio
+from datetime import date, datetime
+
+# Path setup
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.ai.ai_client import AIClient, AIProvider, normalize_context
+from src.ai.planner import PLAN_SCHEMA, Plan, parse_plan, plan_context
+
+
+class ScriptedProvider(AIProvider):
+    """Provider mit vorgegebener Antwort, merkt sich die Kontexte"""
+    
+    model = 'scripted'
+    
+    def __init__(self, answer: str):
+        self.answer = answer
+        self.contexts = []
+    
+    async def generate_response(self, prompt, context=None):
+        self.contexts.append(normalize_context(context))
+        return self.answer
+    
+    async def analyze_intent(self, text):
+        raise AssertionError("plan() darf keinen zweiten Aufruf machen")
+
+
+def _fields(**values):
+    """Vollständige Plan-Felder (fehlende als null)"""
+    fields = {name: None for name in PLAN_SCHEMA['required']}
+    fields.update(values)
+    return json.dumps(fields)
+
+
+def test_plan_single_call():
+    """Test: Ein Provider-Aufruf liefert Intent, Slots und Antwort"""
+    print("=" * 60)
+    print("🧪 Test: Plan in einem Aufruf")
+    print("=" * 60)
+    
+    answer = _fields(action='create_event', date='2026-03-04', time='14:30',
+                     title='Termin mit Kunde Max', location='Büro',
+                     reply='Ich trage den Termin ein.')
+    provider = ScriptedProvider(answer)
+    client = AIClient(provider)
+    
+    plan = asyncio.run(client.plan("Mittwoch 14:30 mit Max im Büro", "Du bist AdonisAI."))
+    print(f"\n🗺️  {plan} -> {plan.to_dict()}")
+    
+    assert isinstance(plan, Plan)
+    assert plan.intent == 'create_event' and plan.is_action
+    assert plan.slots == {'date': '2026-03-04', 'time': '14:30',
+                          'title': 'Termin mit Kunde Max', 'location': 'Büro'}
+    assert plan.reply == 'Ich trage den Termin ein.'
+    assert len(provider.contexts) == 1
+    
+    context = provider.contexts[0]
+    assert context['response_format'] == PLAN_SCHEMA
+    assert context['system_prompt'].startswith("Du bist AdonisAI.")
+    assert client.plan_stats['structured'] == 1
+    
+    event = plan.event_data("Mittwoch 14:30 mit Max im Büro")
+    assert event['start'] == datetime(2026, 3, 4, 14, 30)
+    assert event['end'] == datetime(2026, 3, 4, 15, 30)
+    assert event['title'] == 'Termin mit Kunde Max'
+    assert event['location'] == 'Büro'
+
+
+def test_plan_reply_and_fallbacks():
+    """Test: Chat-Antworten, Freitext ohne JSON und Provider-Fehler"""
+    print("\n" + "=" * 60)
+    print("🧪 Test: Antworten und Fallbacks")
+    print("=" * 60)
+    
+    chat = parse_plan(_fields(action='reply', reply='Hallo! Wie kann ich helfen?'))
+    text = parse_plan("Hallo! Wie kann ich helfen?")
+    listing = parse_plan(_fields(action='list_events', timeframe='week'))
+    print(f"\n💬 {chat}, {text}, {listing}")
+    
+    assert chat.intent == 'reply' and chat.structured and not chat.is_action
+    assert chat.reply == 'Hallo! Wie kann ich helfen?'
+    assert text.intent == 'reply' and not text.structured
+    assert text.reply == 'Hallo! Wie kann ich helfen?'
+    assert listing.to_action()['timeframe'] == 'week'
+    
+    client = AIClient(ScriptedProvider("⚠️ Fehler: API Timeout"))
+    failed = asyncio.run(client.plan("Hallo"))
+    assert failed.intent == 'reply' and failed.reply.startswith("⚠️ Fehler")
+    assert client.plan_stats['errors'] == 1
+
+
+def test_plan_context_and_slot_fallback():
+    """Test: Datum im Kontext, Uhrzeit aus dem Text wenn der Slot fehlt"""
+    print("\n" + "=" * 60)
+    print("🧪 Test: Kontext und Slot-Fallback")
+    print("=" * 60)
+    
+    context = plan_context({'system_prompt': 'System', 'temperature': 0.2}, today=date(2026, 3, 2))
+    print(f"\n📝 {context['system_prompt']}")
+    assert 'Montag, der 2026-03-02' in context['system_prompt']
+    assert context['temperature'] == 0.2
+    
+    plan = Plan('create_event', slots={'date': '2026-03-05', 'time': 'nachmittags'},
+                text='Zahnarzt 15 Uhr')
+    event = plan.event_data("Zahnarzt")
+    assert event['start'] == datetime(2026, 3, 5, 15, 0)
+
+
+def main():
+    """Führt alle Tests aus"""
+    print("\n🚀 AdonisAI Planner Tests")
+    print("=" * 60)
+    
+    test_plan_single_call()
+    test_plan_reply_and_fallbacks()
+    test_plan_context_and_slot_fallback()
+    
+    print("\n" + "=" * 60)
+    print("✅ Planner Tests abgeschlossen")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""
+Test für Prompt-Prefix-Caching (cache_control, Token-Ersparnis) - Funktioniert OHNE Internet!
+"""
+
+import os
+import sys
+import json
+import asyncio
+
+from aiohttp import web
+
+# Path setup
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.ai.http_transport import AsyncHTTPTransport
+from src.ai.openrouter_provider import OpenRouterProvider
+from src.ai.prompt_cache import PromptCacheStats, PromptPrefix, TokenCounter, prefix_tokens
+
+
+PREFIX = "Du bist AdonisAI. " + "Regel: antworte kurz und präzise. " * 40
+
+
+async def _start_server():
+    """
+    Lokaler Server mit Prompt-Cache: der erste Aufruf mit einem Prefix ist
+    langsam, danach meldet er cached_tokens und antwortet schneller
+    """
+    seen = set()
+    payloads = []
+    
+    async def chat(request):
+        data = await request.json()
+        payloads.append(data)
+        system = data['messages'][0]['content']
+        prefix = system[0]['text'] if isinstance(system, list) else system[:len(PREFIX)]
+        cached = 300 if prefix in seen else 0
+        seen.add(prefix)
+        await asyncio.sleep(0.02 if cached else 0.15)
+        usage = {'prompt_tokens': 350, 'completion_tokens': 5,
+                 'prompt_tokens_details': {'cached_tokens': cached}}
+        
+        if not data.get('stream'):
+            return web.json_response({'choices': [{'message': {'content': 'Okay'}}], 'usage': usage})
+        
+        response = web.StreamResponse(headers={'Content-Type': 'text/event-stream'})
+        await response.prepare(request)
+        for token in ["Ok", "ay"]:
+            chunk = {'choices': [{'delta': {'content': token}}]}
+            await response.write(f"data: {json.dumps(chunk)}\n\n".encode())
+        await response.write(f"data: {json.dumps({'choices': [], 'usage': usage})}\n\n".encode())
+        await response.write(b"data: [DONE]\n\n")
+        return response
+    
+    app = web.Application()
+    app.router.add_post('/chat', chat)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://127.0.0.1:{port}/chat", payloads
+
+
+def test_prefix_tokens_precomputed():
+    """Test: Prefix-Token werden einmal gezählt, Schätzung ohne tiktoken plausibel"""
+    print("=" * 60)
+    print("🧪 Test: Prefix-Token lokal")
+    print("=" * 60)
+    
+    counter = TokenCounter()
+    count = counter.count("Hallo, wie geht's?")
+    print(f"\n🔢 'Hallo, wie geht's?' = {count} Token (exakt: {counter.exact})")
+    assert 4 <= count <= 8
+    
+    prefix_tokens.cache_clear()
+    first = PromptPrefix(PREFIX)
+    second = PromptPrefix(PREFIX)
+    info = prefix_tokens.cache_info()
+    print(f"💾 {first.tokens} Token, Cache: {info}")
+    
+    assert first.tokens == second.tokens > 100
+    assert info.misses == 1 and info.hits >= 1
+    context = first.context("\nAktuelle Nachricht: Hallo")
+    assert context['system_prompt'].startswith(context['system_prefix'])
+
+
+def test_cache_control_only_for_explicit_models():
+    """Test: cache_control Breakpoint für Anthropic, unveränderter String sonst"""
+    print("\n" + "=" * 60)
+    print("🧪 Test: cache_control")
+    print("=" * 60)
+    
+    context = PromptPrefix(PREFIX).context("\nHistorie: -")
+    claude = OpenRouterProvider(api_key='test', model='claude')
+    gpt = OpenRouterProvider(api_key='test', model='gpt-3.5')
+    
+    claude_system = claude._build_messages("Hallo", context)[0]['content']
+    gpt_system = gpt._build_messages("Hallo", context)[0]['content']
+    print(f"\n🧷 {claude.model}: {[part.get('cache_control') for part in claude_system]}")
+    
+    assert claude_system[0] == {'type': 'text', 'text': PREFIX, 'cache_control': {'type': 'ephemeral'}}
+    assert claude_system[1]['text'] == "\nHistorie: -"
+    assert gpt_system == context['system_prompt']
+
+
+def test_savings_reported_per_request():
+    """Test: cached_tokens und Latenz-Ersparnis pro Anfrage (auch beim Stream)"""
+    print("\n" + "=" * 60)
+    print("🧪 Test: Ersparnis pro Anfrage")
+    print("=" * 60)
+    
+    async def run():
+        runner, url, payloads = await _start_server()
+        transport = AsyncHTTPTransport()
+        provider = OpenRouterProvider(api_key='test', model='claude', transport=transport)
+        provider.api_url = url
+        provider.prompt_cache = PromptCacheStats()
+        try:
+            reports = []
+            for suffix in ("\nFrage 1", "\nFrage 2"):
+                await provider.generate_response("Hallo", PromptPrefix(PREFIX).context(suffix))
+                reports.append(provider.prompt_cache.last)
+            chunks = [chunk async for chunk in
+                      provider.stream_response("Hallo", PromptPrefix(PREFIX).context("\nFrage 3"))]
+            reports.append(provider.prompt_cache.last)
+            await provider.generate_response("Ohne Prefix", "Nur ein System-Prompt")
+            return reports, chunks, provider.prompt_cache.get_statistics(), payloads
+        finally:
+            await transport.close()
+            await runner.cleanup()
+    
+    reports, chunks, stats, payloads = asyncio.run(run())
+    for report in reports:
+        print(f"\n💾 {report}")
+    print(f"📊 {stats}")
+    
+    assert reports[0]['cached_tokens'] == 0 and reports[0]['saved_seconds'] is None
+    assert reports[1]['cached_tokens'] == 300
+    assert reports[1]['saved_seconds'] > 0.05
+    assert chunks == ["Ok", "ay"]
+    assert reports[2]['cached_tokens'] == 300
+    assert payloads[2]['usage'] == {'include': True}
+    assert stats['requests'] == 3 and stats['hits'] == 2
+    assert stats['cached_tokens'] == 600
+
+
+def main():
+    """Führt alle Tests aus"""
+    print("\n🚀 AdonisAI Prompt-Cache Tests")
+    print("=" * 60)
+    
+    test_prefix_tokens_precomputed()
+    test_cache_control_only_for_explicit_models()
+    test_savings_reported_per_request()
+    
+    print("\n" + "=" * 60)
+    print("✅ Prompt-Cache Tests abgeschlossen")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+"""
+Test für Rate Limiter (Token Buckets + faire Warteschlange) - Funktioniert OHNE Internet!
+"""
+
+import os
+import sys
+import time
+import asyncio
+
+# Path setup
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.ai.ai_client import AIClient, AIProvider
+from src.ai.rate_limiter import (
+    RateLimitedProvider,
+    RateLimitExceeded,
+    RateLimiter,
+    TokenBucket,
+    current_user,
+    parse_provider_limits
+)
+
+
+class EchoProvider(AIProvider):
+    """Provider der sofort antwortet"""
+    
+    model = 'echo'
+    
+    async def generate_response(self, prompt, context=None):
+        return f"Antwort auf {prompt}"
+    
+    async def analyze_intent(self, text):
+        return {'intent': 'general', 'confidence': 0.8, 'entities': [], 'raw_text': text}
+
+
+def test_token_bucket():
+    """Test: Burst sofort, danach im Takt der Rate"""
+    print("=" * 60)
+    print("🧪 Test: Token Bucket")
+    print("=" * 60)
+    
+    bucket = TokenBucket(rate=10, capacity=2)
+    assert bucket.try_consume()
+    assert bucket.try_consume()
+    assert not bucket.try_consume()
+    
+    wait = bucket.wait_time()
+    print(f"\n🪣 Wartezeit nach Burst: {wait:.3f}s")
+    assert 0.05 < wait <= 0.1
+    
+    time.sleep(wait)
+    assert bucket.try_consume()
+
+
+def test_fair_queue_round_robin():
+    """Test: Ein gesprächiger User hungert die anderen nicht aus"""
+    print("\n" + "=" * 60)
+    print("🧪 Test: Faire Warteschlange")
+    print("=" * 60)
+    
+    limiter = RateLimiter(provider_rate=200, provider_burst=1)
+    order = []
+    
+    async def request(user):
+        await limiter.acquire('provider', user)
+        order.append(user)
+    
+    async def run():
+        # Burst-Token verbrauchen, dann stellt sich alles an
+        await limiter.acquire('provider', 'warmup')
+        tasks = [asyncio.ensure_future(request('vielschreiber')) for _ in range(6)]
+        await asyncio.sleep(0)
+        tasks += [asyncio.ensure_future(request(user)) for user in ('anna', 'ben')]
+        await asyncio.gather(*tasks)
+    
+    asyncio.run(run())
+    print(f"\n🔄 Reihenfolge: {order}")
+    
+    # anna und ben kommen unter den ersten vier dran, nicht erst nach allen sechs
+    assert set(order[:4]) >= {'anna', 'ben'}
+    assert order.count('vielschreiber') == 6
+
+
+def test_estimate_wait():
+    """Test: Wartezeit wächst mit der Warteschlange vor dem User"""
+    print("\n" + "=" * 60)
+    print("🧪 Test: Wartezeit-Schätzung")
+    print("=" * 60)
+    
+    limiter = RateLimiter(provider_rate=2, provider_burst=1, user_rate=1, user_burst=1)
+    
+    async def run():
+        assert limiter.estimate_wait('anna', 'provider') == 0
+        await limiter.acquire('provider', 'anna')
+        waiting = [asyncio.ensure_future(limiter.acquire('provider', 'ben')) for _ in range(3)]
+        await asyncio.sleep(0)
+        estimates = (limiter.estimate_wait('anna', 'provider'), limiter.estimate_wait('ben', 'provider'))
+        for task in waiting:
+            task.cancel()
+        await asyncio.gather(*waiting, return_exceptions=True)
+        return estimates
+    
+    anna, ben = asyncio.run(run())
+    print(f"\n⏳ anna: {anna:.2f}s, ben: {ben:.2f}s")
+    
+    # anna überholt bens Warteschlange (Round Robin), ben steht hinten an
+    assert 0 < anna < ben
+    assert 1.5 < ben < 2.5
+
+
+def test_user_bucket_throttles():
+    """Test: Der Bucket des Users verzögert nur diesen User"""
+    print("\n" + "=" * 60)
+    print("🧪 Test: User-Drosselung")
+    print("=" * 60)
+    
+    limiter = RateLimiter(user_rate=20, user_burst=1)
+    
+    async def run():
+        start = time.perf_counter()
+        await limiter.admit_user('anna')
+        await limiter.admit_user('ben')
+        fast = time.perf_counter() - start
+        await limiter.admit_user('anna')
+        return fast, time.perf_counter() - start
+    
+    fast, total = asyncio.run(run())
+    print(f"\n🚦 Ohne Wartezeit: {fast:.3f}s, mit Drosselung: {total:.3f}s")
+    
+    assert fast < 0.02
+    assert total >= 0.04
+    assert limiter.get_statistics()['user_throttled'] == 1
+
+
+def test_full_queue_fails_over():
+    """Test: Volle Warteschlange -> Fallback auf den nächsten Provider"""
+    print("\n" + "=" * 60)
+    print("🧪 Test: Volle Warteschlange")
+    print("=" * 60)
+    
+    limiter = RateLimiter(provider_rate=0.01, provider_burst=1, max_queue=0)
+    primary = RateLimitedProvider(EchoProvider(), limiter)
+    backup = EchoProvider()
+    backup.model = 'backup'
+    client = AIClient(primary, fallback_providers=[backup])
+    
+    async def run():
+        current_user.set('anna')
+        first = await client.chat("Frage 1")
+        second = await client.chat("Frage 2")
+        return first, second
+    
+    first, second = asyncio.run(run())
+    stats = limiter.get_statistics()
+    print(f"\n📊 {stats}")
+    
+    assert first == "Antwort auf Frage 1"
+    assert second == "Antwort auf Frage 2"
+    assert stats['rejected'] == 1
+    
+    try:
+        asyncio.run(RateLimiter(provider_rate=0.01, provider_burst=0, max_queue=0).acquire('p'))
+        assert False, "RateLimitExceeded erwartet"
+    except RateLimitExceeded:
+        pass
+
+
+def test_parse_provider_limits():
+    """Test: Provider-Limits aus der Umgebung"""
+    limits = parse_provider_limits('HuggingFaceProvider=0.5/3, OpenRouterProvider=2')
+    assert limits == {'HuggingFaceProvider': (0.5, 3.0), 'OpenRouterProvider': (2.0, 2.0)}
+    
+    limiter = RateLimiter(provider_limits=limits)
+    assert limiter._provider_bucket('HuggingFaceProvider:gpt2').rate == 0.5
+
+
+def main():
+    """Führt alle Tests aus"""
+    print("\n🚀 AdonisAI Rate Limiter Tests")
+    print("=" * 60)
+    
+    test_token_bucket()
+    test_fair_queue_round_robin()
+    test_estimate_wait()
+    test_user_bucket_throttles()
+    test_full_queue_fails_over()
+    test_parse_provider_limits()
+    
+    print("\n" + "=" * 60)
+    print("✅ Rate Limiter Tests abgeschlossen")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+"""
+Test für den Replay Benchmark (Nachrichten aus interactions.db abspielen) - Funktioniert OHNE Internet!
+"""
+
+import os
+import sys
+import asyncio
+import tempfile
+
+# Path setup
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.ai.ai_client import AIProvider, normalize_context
+from src.ai.fake_server import FakeLLMServer, LatencyDistribution
+from src.ai.http_transport import AsyncHTTPTransport
+from src.ai.openrouter_provider import OpenRouterProvider
+from src.ai.replay import check_action, load_workload, replay
+from src.storage.interaction_logger import InteractionLogger
+
+ACTION = '{"action": "create_event", "text": "Zahnarzt morgen 14 Uhr"}'
+
+
+class ScriptedProvider(AIProvider):
+    """Antwortet je nach Nachricht: Aktion, kaputtes JSON, Fehler, Exception, hängt"""
+    
+    def __init__(self):
+        self.model = 'scripted'
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.contexts = []
+    
+    async def generate_response(self, prompt, context=None):
+        self.contexts.append(normalize_context(context))
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(0.01)
+            if prompt.startswith('Termin'):
+                return f"Klar! {ACTION}"
+            if prompt.startswith('Kaputt'):
+                return '{"action": "create_event", "text": '
+            if prompt.startswith('Fehler'):
+                return "⚠️ Fehler: 503"
+            if prompt.startswith('Absturz'):
+                raise ConnectionError("weg")
+            if prompt.startswith('Hängt'):
+                await asyncio.sleep(5)
+            return "Gern geschehen!"
+        finally:
+            self.in_flight -= 1
+    
+    async def analyze_intent(self, text):
+        return {'intent': 'general', 'confidence': 1.0, 'entities': {}}
+
+
+def test_load_workload():
+    """Test: Nachrichten aus der Datenbank ohne Fast-Path und sensible Einträge"""
+    print("=" * 60)
+    print("🧪 Test: Workload laden")
+    print("=" * 60)
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        interaction_logger = InteractionLogger(db_path=os.path.join(tmp, 'interactions.db'))
+        rows = [
+            ("Hallo", 'ai_response', False),
+            ("Was habe ich heute vor?", 'fast_agenda', False),
+            ("Mein Passwort ist 1234", 'ai_response', True),
+            ("Termin morgen 14 Uhr", 'ai_response', False),
+            ("Danke", 'superseded', False),
+            ("Schreib ein Gedicht", 'ai_response', False),
+        ]
+        for user_input, action, sensitive in rows:
+            interaction_logger.log_interaction(user_id=1, user_input=user_input, bot_output="ok",
+                                               bot_action=action, is_sensitive=sensitive)
+        
+        prompts = load_workload(interaction_logger)
+        print(f"\n📋 {prompts}")
+        assert prompts == ["Hallo", "Termin morgen 14 Uhr", "Schreib ein Gedicht"]
+        assert load_workload(interaction_logger, limit=2) == ["Termin morgen 14 Uhr", "Schreib ein Gedicht"]
+        assert len(load_workload(interaction_logger, include_fast_path=True)) == 5
+
+
+def test_check_action():
+    """Test: Aktionen wie in _process_ai_response erkennen"""
+    print("\n" + "=" * 60)
+    print("🧪 Test: Aktionen parsen")
+    print("=" * 60)
+    
+    assert check_action(f"Klar! {ACTION}") == \
+        {'attempted': True, 'parsed': True, 'truncated': False, 'calendar': True}
+    assert check_action("Gern geschehen!") == \
+        {'attempted': False, 'parsed': False, 'truncated': False, 'calendar': False}
+    
+    # Abgeschnitten: _process_ai_response würde trotzdem handeln, zählt aber nicht als Erfolg
+    truncated = check_action('{"action": "create_event", "text": ')
+    assert truncated['attempted'] and truncated['truncated'] and not truncated['parsed']
+    
+    # Strukturierter Modus: jede Antwort soll ein Plan sein, reply ist gültig
+    assert check_action('{"action": "reply", "reply": "Hi"}', structured=True)['parsed']
+    assert check_action("Hi", structured=True) == \
+        {'attempted': True, 'parsed': False, 'truncated': False, 'calendar': False}
+
+
+def test_replay_report():
+    """Test: Durchsatz, Quantile, Fehlerarten, Parse-Quote und Parallelität"""
+    print("\n" + "=" * 60)
+    print("🧪 Test: Replay")
+    print("=" * 60)
+    
+    provider = ScriptedProvider()
+    prompts = (["Termin morgen"] * 6 + ["Kaputt"] * 2 + ["Danke"] * 8
+               + ["Fehler"] * 2 + ["Absturz", "Hängt"])
+    seen = []
+    
+    def context(prompt):
+        seen.append(prompt)
+        return f"System für {prompt}"
+    
+    report = asyncio.run(replay(provider, prompts, concurrency=3, context=context, timeout=0.5))
+    print(f"\n📊 {report}")
+    
+    assert report['requests'] == 20 and len(seen) == 20
+    assert provider.max_in_flight == 3
+    assert provider.contexts[0]['system_prompt'].startswith("System für")
+    assert report['errors'] == 4 and report['error_rate'] == 0.2
+    assert report['error_kinds'] == {'error_response': 2, 'ConnectionError': 1, 'timeout': 1}
+    assert report['attempted'] == 8 and report['parsed'] == 6 and report['truncated'] == 2
+    assert report['parse_rate'] == 0.75
+    assert 0.005 < report['p50'] <= report['p95'] <= report['p99'] <= report['max'] < 0.5
+    assert report['throughput'] > 0
+
+
+def test_replay_against_fake_server():
+    """Test: Echter OpenRouterProvider gegen den Fake LLM Server"""
+    print("\n" + "=" * 60)
+    print("🧪 Test: Fake LLM Server")
+    print("=" * 60)
+    
+    server = FakeLLMServer(latency=LatencyDistribution('fixed', 0.02), responses=[ACTION, "Hallo!"])
+    server.start_background()
+    try:
+        async def run():
+            transport = AsyncHTTPTransport()
+            provider = OpenRouterProvider(api_key='fake', transport=transport, base_url=server.openrouter_base_url)
+            try:
+                return await replay(provider, ["Termin morgen", "Hallo"] * 10, concurrency=5)
+            finally:
+                await transport.close()
+        
+        report = asyncio.run(run())
+    finally:
+        server.stop_background()
+    
+    print(f"\n📊 {report['throughput']:.1f} req/s, p50 {report['p50']:.3f}s, "
+          f"{report['calendar_actions']} Aktionen, Fehler {report['error_rate']:.0%}")
+    assert report['errors'] == 0
+    assert report['calendar_actions'] == 10 and report['parse_rate'] == 1.0
+    assert report['p50'] >= 0.02
+
+
+def main():
+    """Führt alle Tests aus"""
+    print("\n🚀 AdonisAI Replay Benchmark Tests")
+    print("=" * 60)
+    
+    test_load_workload()
+    test_check_action()
+    test_replay_report()
+    test_replay_against_fake_server()
+    
+    print("\n" + "=" * 60)
+    print("✅ Replay Benchmark Tests abgeschlossen")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
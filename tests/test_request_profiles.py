@@ -0,0 +1,172 @@
+"""
+Test für Anfrage-Profile (max_tokens/temperature pro Klasse) - Funktioniert OHNE Internet!
+"""
+
+import os
+import sys
+import time
+import asyncio
+import tempfile
+
+# Path setup
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.ai.ai_client import AIClient, AIProvider, normalize_context
+from src.ai.request_profiles import RequestProfiles
+from src.storage.interaction_logger import InteractionLogger
+
+
+class RecordingProvider(AIProvider):
+    """Provider, der den Kontext jedes Aufrufs speichert"""
+    
+    def __init__(self):
+        self.model = 'recording'
+        self.contexts = []
+    
+    async def generate_response(self, prompt, context=None):
+        self.contexts.append(normalize_context(context))
+        return "ok"
+    
+    async def analyze_intent(self, text):
+        return {'intent': 'general', 'confidence': 1.0, 'entities': {}}
+
+
+def _call(completion_tokens, error=None):
+    return {'timestamp': time.time(), 'provider': 'RecordingProvider', 'model': 'recording',
+            'prompt_tokens': 100, 'completion_tokens': completion_tokens, 'error': error}
+
+
+def test_classify_and_apply():
+    """Test: Klassen und Parameter, explizite Parameter haben Vorrang"""
+    print("=" * 60)
+    print("🧪 Test: Klassen")
+    print("=" * 60)
+    
+    profiles = RequestProfiles()
+    cases = {
+        "Erstelle einen Termin morgen um 14 Uhr": 'action',
+        "Erinnere mich an den Müll": 'action',
+        "Hallo, wie geht's?": 'chat',
+        "Danke!": 'chat',
+        "Schreib mir eine kurze Bewerbung als Koch": 'longform',
+        "Erkläre mir, wie ein Kühlschrank funktioniert": 'longform',
+    }
+    for message, expected in cases.items():
+        print(f"   {profiles.classify(message):9} {message}")
+        assert profiles.classify(message) == expected, message
+    
+    context = profiles.apply("Danke!", "System-Prompt")
+    assert context == {'system_prompt': "System-Prompt", 'max_tokens': 200,
+                       'max_length': 200, 'temperature': 0.8}
+    assert profiles.apply("Termin morgen um 9 Uhr")['temperature'] == 0.3
+    
+    # Vom Aufrufer gesetzte Werte (z.B. Summarizer) bleiben
+    context = profiles.apply("Danke!", {'max_tokens': 50, 'temperature': 0.2})
+    assert context['max_tokens'] == 50 and context['temperature'] == 0.2
+
+
+def test_learns_from_output_lengths():
+    """Test: max_tokens folgt dem Quantil der Antwort-Längen, Limit am Anschlag wird angehoben"""
+    print("\n" + "=" * 60)
+    print("🧪 Test: Lernen")
+    print("=" * 60)
+    
+    profiles = RequestProfiles(min_samples=20, refit_every=10)
+    
+    # Kurze Chat-Antworten: 10-40 Token
+    for index in range(100):
+        profiles.record("Hallo!", 10 + index % 31)
+    chat = profiles.get_statistics()['chat']
+    print(f"\n💬 chat: {chat}")
+    assert chat['samples'] == 100 and chat['fits'] >= 1
+    assert 40 <= chat['max_tokens'] <= 60  # p95 ~39 * 1.25
+    
+    # Untergrenze: Kalender-Aktionen nie unter min_tokens
+    for _ in range(30):
+        profiles.record("Termin morgen um 10 Uhr", 20)
+    assert profiles.profiles['action']['max_tokens'] == 120
+    
+    # Antworten stoßen ans Limit (abgeschnitten) -> anheben statt schrumpfen
+    for _ in range(30):
+        profiles.record("Schreib mir einen Brief", 800)
+    longform = profiles.get_statistics()['longform']
+    print(f"📝 longform: {longform}")
+    assert longform['max_tokens'] > 800 and longform['raised'] >= 1
+    
+    # Obergrenze
+    for _ in range(60):
+        profiles.record("Schreib mir einen Brief", 5000)
+    assert profiles.profiles['longform']['max_tokens'] == 1500
+
+
+def test_load_and_listener():
+    """Test: Lernen aus ai_calls der Datenbank und per Listener"""
+    print("\n" + "=" * 60)
+    print("🧪 Test: Datenbank + Listener")
+    print("=" * 60)
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        interaction_logger = InteractionLogger(db_path=os.path.join(tmp, 'interactions.db'))
+        for index in range(40):
+            # Fehlgeschlagener Aufruf zählt nicht, der längste erfolgreiche schon
+            interaction_logger.log_interaction(
+                user_id=1, user_input="Wie geht's?", bot_output="Gut!",
+                ai_calls=[_call(None, error="503"), _call(5), _call(20 + index % 5)]
+            )
+        
+        lengths = interaction_logger.get_completion_lengths(limit=10)
+        assert len(lengths) == 10 and all(20 <= row['completion_tokens'] <= 24 for row in lengths)
+        
+        profiles = RequestProfiles(min_samples=20, refit_every=5)
+        assert profiles.load(interaction_logger) == 40
+        learned = profiles.profiles['chat']['max_tokens']
+        print(f"\n📐 chat nach load(): {learned}")
+        assert learned == 40  # p95 24 * 1.25 = 31 -> min_tokens
+        
+        interaction_logger.add_listener(profiles.on_interaction)
+        for _ in range(20):
+            interaction_logger.log_interaction(user_id=1, user_input="Hey, was geht?", bot_output="...",
+                                               ai_calls=[_call(90)])
+        print(f"📐 chat nach Listener: {profiles.profiles['chat']['max_tokens']}")
+        assert profiles.get_statistics()['chat']['samples'] == 60
+        assert profiles.profiles['chat']['max_tokens'] > learned
+
+
+def test_ai_client_applies_profiles():
+    """Test: AIClient setzt die Parameter der Klasse für jeden Provider-Aufruf"""
+    print("\n" + "=" * 60)
+    print("🧪 Test: AIClient")
+    print("=" * 60)
+    
+    provider = RecordingProvider()
+    client = AIClient(provider, profiles=RequestProfiles())
+    
+    async def run():
+        await client.chat("Danke dir!", "System")
+        return [chunk async for chunk in client.chat_stream("Schreib ein Gedicht über den Herbst")]
+    
+    asyncio.run(run())
+    print(f"\n📨 {[(c['max_tokens'], c['temperature']) for c in provider.contexts]}")
+    assert provider.contexts[0]['max_tokens'] == 200 and provider.contexts[0]['system_prompt'] == "System"
+    assert provider.contexts[1]['max_tokens'] == 800
+    stats = client.profiles.get_statistics()
+    assert stats['chat']['requests'] == 1 and stats['longform']['requests'] == 1
+
+
+def main():
+    """Führt alle Tests aus"""
+    print("\n🚀 AdonisAI Anfrage-Profile Tests")
+    print("=" * 60)
+    
+    test_classify_and_apply()
+    test_learns_from_output_lengths()
+    test_load_and_listener()
+    test_ai_client_applies_profiles()
+    
+    print("\n" + "=" * 60)
+    print("✅ Anfrage-Profile Tests abgeschlossen")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+"""
+Test für den AI Response Cache - Funktioniert OHNE Internet!
+"""
+
+import os
+import sys
+import time
+import asyncio
+import tempfile
+from types import SimpleNamespace
+
+# Path setup
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.ai.ai_client import AIProvider
+from src.ai.planner import plan_context
+from src.ai.response_cache import CachedProvider, ResponseCache, is_cacheable, make_cache_key
+from src.bot.telegram_bot import AdonisBot
+
+
+class CountingProvider(AIProvider):
+    """Fake Provider der Aufrufe zählt"""
+    
+    model = 'fake-model'
+    
+    def __init__(self, answer="Antwort"):
+        self.calls = 0
+        self.answer = answer
+    
+    async def generate_response(self, prompt, context=None):
+        self.calls += 1
+        return f"{self.answer} {self.calls}"
+    
+    async def analyze_intent(self, text):
+        return {'intent': 'general', 'confidence': 0.5, 'entities': [], 'raw_text': text}
+
+
+def _bot():
+    """Nur die Felder, die der Prompt-Aufbau des Bots liest"""
+    bot = SimpleNamespace(calendar_provider=True, structured_output=False,
+                          _cached_prompt_prefix=None, summarizer=None, memory=None)
+    bot._prompt_prefix = lambda: AdonisBot._prompt_prefix(bot)
+    return bot
+
+
+def test_memory_hit_and_normalization():
+    """Test: Gleiche Frage (anders geschrieben) trifft den Cache"""
+    print("=" * 60)
+    print("🧪 Test: Memory-Treffer")
+    print("=" * 60)
+    
+    provider = CountingProvider()
+    cached = CachedProvider(provider, ResponseCache(max_entries=10))
+    
+    async def run():
+        first = await cached.generate_response("Was habe ich heute?")
+        second = await cached.generate_response("was habe  ich heute")
+        other = await cached.generate_response("Was habe ich morgen?")
+        return first, second, other
+    
+    first, second, other = asyncio.run(run())
+    stats = cached.cache.get_statistics()
+    print(f"\n📊 {stats}")
+    
+    assert first == second == "Antwort 1"
+    assert other == "Antwort 2"
+    assert provider.calls == 2
+    assert stats['memory_hits'] == 1
+
+
+def test_live_state_and_errors_bypass():
+    """Test: Live-Kalenderdaten und Fehler werden nie gecacht"""
+    print("\n" + "=" * 60)
+    print("🧪 Test: Live-State und Fehler")
+    print("=" * 60)
+    
+    provider = CountingProvider()
+    cached = CachedProvider(provider, ResponseCache())
+    live = {'system_prompt': "System", 'live_state': True}
+    
+    async def run():
+        await cached.generate_response("Was habe ich heute?", live)
+        await cached.generate_response("Was habe ich heute?", live)
+        
+        provider.answer = "⚠️ Fehler: API Timeout"
+        await cached.generate_response("Hallo")
+        provider.answer = "Hallo!"
+        return await cached.generate_response("Hallo")
+    
+    answer = asyncio.run(run())
+    stats = cached.cache.get_statistics()
+    print(f"\n📊 {stats}")
+    
+    assert provider.calls == 4
+    assert answer == "Hallo! 4"
+    assert stats['bypassed'] == 2
+
+
+def test_bot_marks_live_calendar_data():
+    """Test: Bot setzt live_state, wenn die Historie Kalender-Ergebnisse enthält"""
+    print("\n" + "=" * 60)
+    print("🧪 Test: live_state vom Bot")
+    print("=" * 60)
+    
+    bot = _bot()
+    chat = [{'role': 'user', 'content': "Hallo"}, {'role': 'assistant', 'content': "Hi!"},
+            {'role': 'user', 'content': "Wie geht's?"}]
+    calendar = [{'role': 'user', 'content': "Was habe ich heute vor?"},
+                {'role': 'assistant', 'content': "[fast_list_today]"},
+                {'role': 'user', 'content': "Und wann ist der erste?"}]
+    
+    plain = AdonisBot._build_system_prompt(bot, "Wie geht's?", chat, None)
+    live = AdonisBot._build_system_prompt(bot, "Und wann ist der erste?", calendar, None)
+    
+    assert 'live_state' not in plain and is_cacheable(plain)
+    assert live['live_state'] is True and not is_cacheable(live)
+
+
+def test_key_ignores_history_and_echoed_message():
+    """Test: Schlüssel aus dem echten Bot-Prompt ohne Historie und wiederholte Nachricht"""
+    print("\n" + "=" * 60)
+    print("🧪 Test: Schlüssel mit Bot-Prompt")
+    print("=" * 60)
+    
+    bot = _bot()
+    first = [{'role': 'user', 'content': "Hallo"}, {'role': 'assistant', 'content': "Hi!"},
+             {'role': 'user', 'content': "Was ist ein Schaltjahr?"}]
+    second = [{'role': 'user', 'content': "Guten Morgen"}, {'role': 'assistant', 'content': "Morgen!"},
+              {'role': 'user', 'content': "was ist ein schaltjahr"}]
+    
+    a = AdonisBot._build_system_prompt(bot, "Was ist ein Schaltjahr?", first, None)
+    b = AdonisBot._build_system_prompt(bot, "was ist ein schaltjahr", second, None)
+    assert a['system_prompt'] != b['system_prompt']
+    assert make_cache_key("Was ist ein Schaltjahr?", a, 'm') == make_cache_key("was ist ein schaltjahr", b, 'm')
+    
+    other = AdonisBot._build_system_prompt(bot, "Was ist ein Dreisatz?", first, None)
+    assert make_cache_key("Was ist ein Dreisatz?", other, 'm') != make_cache_key("Was ist ein Schaltjahr?", a, 'm')
+    
+    # Strukturierter Modus: angehängte Plan-Anweisungen bleiben Teil des Schlüssels
+    planned = plan_context(a)
+    assert make_cache_key("Was ist ein Schaltjahr?", planned, 'm') == \
+        make_cache_key("was ist ein schaltjahr", plan_context(b), 'm')
+    assert make_cache_key("Was ist ein Schaltjahr?", planned, 'm') != make_cache_key("Was ist ein Schaltjahr?", a, 'm')
+    
+    # Ohne markierten Suffix wird nur die wiederholte Nachricht entfernt
+    plain = {'system_prompt': 'System. Frage: "Hallo"'}
+    assert make_cache_key("Hallo", plain, 'm') == make_cache_key("Hallo", {'system_prompt': 'System. Frage: ""'}, 'm')
+
+
+def test_ttl_and_lru_eviction():
+    """Test: Einträge laufen ab und älteste werden verdrängt"""
+    print("\n" + "=" * 60)
+    print("🧪 Test: TTL und LRU")
+    print("=" * 60)
+    
+    cache = ResponseCache(max_entries=2, ttl_seconds=0.05)
+    cache.put('a', 'A')
+    cache.put('b', 'B')
+    cache.put('c', 'C')
+    
+    assert cache.get('a') is None
+    assert cache.get('c') == 'C'
+    
+    time.sleep(0.06)
+    assert cache.get('c') is None
+    print("\n✅ Verdrängung und Ablauf funktionieren")
+
+
+def test_sqlite_tier_survives_restart():
+    """Test: SQLite-Tier liefert Antworten nach Neustart"""
+    print("\n" + "=" * 60)
+    print("🧪 Test: SQLite-Tier")
+    print("=" * 60)
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'response_cache.db')
+        
+        provider = CountingProvider()
+        first = CachedProvider(provider, ResponseCache(db_path=db_path))
+        asyncio.run(first.generate_response("Hallo"))
+        
+        restarted = CachedProvider(provider, ResponseCache(db_path=db_path))
+        answer = asyncio.run(restarted.generate_response("Hallo"))
+        stats = restarted.cache.get_statistics()
+        print(f"\n📊 {stats}")
+        
+        assert answer == "Antwort 1"
+        assert provider.calls == 1
+        assert stats['disk_hits'] == 1
+
+
+def main():
+    """Führt alle Tests aus"""
+    print("\n🚀 AdonisAI Response Cache Tests")
+    print("=" * 60)
+    
+    test_memory_hit_and_normalization()
+    test_live_state_and_errors_bypass()
+    test_bot_marks_live_calendar_data()
+    test_key_ignores_history_and_echoed_message()
+    test_ttl_and_lru_eviction()
+    test_sqlite_tier_survives_restart()
+    
+    print("\n" + "=" * 60)
+    print("✅ Response Cache Tests abgeschlossen")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,269 @@
+"""
+Test für die Retry-Policy (Backoff, Server-Hinweise, Budget) - Funktioniert OHNE Internet!
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+from email.utils import formatdate
+
+from aiohttp import web
+
+# Path setup
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.ai.http_transport import (
+    AsyncHTTPTransport,
+    HTTPStatusError,
+    TransportConnectError,
+    TransportError,
+    TransportTimeout
+)
+from src.ai.hf_provider import HuggingFaceProvider
+from src.ai.openrouter_provider import OpenRouterProvider
+from src.ai.retry import (
+    RetryBudget,
+    RetryPolicy,
+    is_retryable,
+    parse_retry_after,
+    server_retry_hint
+)
+
+
+async def _start_server():
+    """
+    Lokaler Server:
+    /hf     - 503 mit estimated_time (zweimal), dann Antwort
+    /chat   - 429 mit Retry-After (einmal), dann Antwort
+    /stream - 429 mit Retry-After (einmal), dann SSE-Stream
+    """
+    calls = {'hf': 0, 'chat': 0, 'stream': 0}
+    
+    async def hf(request):
+        calls['hf'] += 1
+        if calls['hf'] <= 2:
+            return web.json_response({'error': 'Model is loading', 'estimated_time': 0.05}, status=503)
+        return web.json_response([{'generated_text': 'Bereit'}])
+    
+    async def chat(request):
+        calls['chat'] += 1
+        if calls['chat'] == 1:
+            return web.json_response({'error': 'rate limited'}, status=429, headers={'Retry-After': '0'})
+        return web.json_response({'choices': [{'message': {'content': 'Hallo'}}]})
+    
+    async def stream(request):
+        calls['stream'] += 1
+        if calls['stream'] == 1:
+            return web.json_response({'error': 'rate limited'}, status=429, headers={'Retry-After': '0'})
+        response = web.StreamResponse(headers={'Content-Type': 'text/event-stream'})
+        await response.prepare(request)
+        for token in ["Hal", "lo"]:
+            chunk = {'choices': [{'delta': {'content': token}}]}
+            await response.write(f"data: {json.dumps(chunk)}\n\n".encode())
+        await response.write(b"data: [DONE]\n\n")
+        return response
+    
+    app = web.Application()
+    app.router.add_post('/hf', hf)
+    app.router.add_post('/chat', chat)
+    app.router.add_post('/stream', stream)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://127.0.0.1:{port}", calls
+
+
+def test_server_hints():
+    """Test: Retry-After (Sekunden/Datum) und HF estimated_time"""
+    print("=" * 60)
+    print("🧪 Test: Server-Hinweise")
+    print("=" * 60)
+    
+    assert parse_retry_after('7') == 7
+    assert parse_retry_after(None) is None
+    assert parse_retry_after('morgen') is None
+    in_ten = parse_retry_after(formatdate(time.time() + 10, usegmt=True))
+    print(f"\n📅 Retry-After als Datum: {in_ten:.1f}s")
+    assert 8 < in_ten <= 10
+    
+    loading = HTTPStatusError(503, 'Service Unavailable', body='{"error": "loading", "estimated_time": 12.5}')
+    throttled = HTTPStatusError(429, 'Too Many Requests', headers={'retry-after': '3'})
+    assert server_retry_hint(loading) == 12.5
+    assert server_retry_hint(throttled) == 3
+    assert server_retry_hint(HTTPStatusError(500, 'Internal Server Error')) is None
+
+
+def test_idempotency():
+    """Test: Nicht-idempotente Anfragen nur wiederholen, wenn sicher nicht bearbeitet"""
+    print("\n" + "=" * 60)
+    print("🧪 Test: Idempotenz")
+    print("=" * 60)
+    
+    assert is_retryable(TransportTimeout('t'), idempotent=True)
+    assert not is_retryable(TransportTimeout('t'), idempotent=False)
+    assert is_retryable(HTTPStatusError(502, 'Bad Gateway'), idempotent=True)
+    assert not is_retryable(HTTPStatusError(502, 'Bad Gateway'), idempotent=False)
+    assert is_retryable(HTTPStatusError(429, 'Too Many Requests'), idempotent=False)
+    assert not is_retryable(HTTPStatusError(401, 'Unauthorized'))
+    
+    # Verbindungsabbruch nach dem Senden: nur idempotent wiederholen
+    assert is_retryable(TransportError('Server disconnected'), idempotent=True)
+    assert not is_retryable(TransportError('Server disconnected'), idempotent=False)
+    
+    # Verbindung kam nie zustande: Anfrage wurde nicht gesendet
+    assert is_retryable(TransportConnectError('refused'), idempotent=False)
+    
+    async def connect_refused():
+        transport = AsyncHTTPTransport()
+        try:
+            # Port 9 (discard) ist lokal geschlossen
+            await transport.post_json('http://127.0.0.1:9/', {}, timeout=2)
+        except TransportError as e:
+            return e
+        finally:
+            await transport.close()
+    
+    error = asyncio.run(connect_refused())
+    print(f"\n🔌 {type(error).__name__}: {error}")
+    assert isinstance(error, TransportConnectError)
+    assert is_retryable(error, idempotent=False)
+
+
+def test_backoff_full_jitter():
+    """Test: Backoff zufällig zwischen 0 und base * 2^n, begrenzt durch max_delay"""
+    print("\n" + "=" * 60)
+    print("🧪 Test: Full Jitter")
+    print("=" * 60)
+    
+    policy = RetryPolicy(base_delay=1.0, max_delay=5.0)
+    delays = [policy.backoff(attempt) for attempt in (1, 2, 3, 4, 5) for _ in range(200)]
+    print(f"\n🎲 min {min(delays):.2f}s, max {max(delays):.2f}s")
+    
+    assert all(0 <= delay <= 5.0 for delay in delays)
+    assert all(policy.backoff(1) <= 1.0 for _ in range(100))
+    assert max(delays) > 4.0
+
+
+def test_budget_limits_retries():
+    """Test: Das Retry-Budget stoppt Retry-Stürme"""
+    print("\n" + "=" * 60)
+    print("🧪 Test: Retry-Budget")
+    print("=" * 60)
+    
+    policy = RetryPolicy(max_attempts=5, base_delay=0.001,
+                         budget=RetryBudget(ratio=0.1, min_retries=2))
+    attempts = []
+    
+    async def failing():
+        attempts.append(1)
+        raise HTTPStatusError(503, 'Service Unavailable')
+    
+    async def run():
+        for _ in range(5):
+            try:
+                await policy.call(failing)
+            except HTTPStatusError:
+                pass
+    
+    asyncio.run(run())
+    stats = policy.get_statistics()
+    print(f"\n💸 {stats}")
+    
+    # 5 erste Versuche + höchstens 2 Retries aus dem Budget
+    assert len(attempts) == 7
+    assert stats['retries'] == 2
+    assert stats['budget_exhausted'] >= 1
+
+
+def test_cancel_during_backoff():
+    """Test: Abbruch während der Wartezeit beendet den Aufruf sofort"""
+    print("\n" + "=" * 60)
+    print("🧪 Test: Abbruch im Backoff")
+    print("=" * 60)
+    
+    policy = RetryPolicy(max_attempts=3)
+    attempts = []
+    
+    async def throttled():
+        attempts.append(1)
+        raise HTTPStatusError(429, 'Too Many Requests', headers={'Retry-After': '30'})
+    
+    async def run():
+        task = asyncio.ensure_future(policy.call(throttled))
+        await asyncio.sleep(0.05)
+        task.cancel()
+        start = time.perf_counter()
+        try:
+            await task
+        except asyncio.CancelledError:
+            return time.perf_counter() - start
+    
+    elapsed = asyncio.run(run())
+    print(f"\n🛑 Abgebrochen nach {elapsed * 1000:.1f}ms")
+    
+    assert elapsed is not None and elapsed < 0.1
+    assert len(attempts) == 1
+
+
+def test_providers_honor_hints():
+    """Test: HF wartet estimated_time ab, OpenRouter Retry-After (auch beim Stream)"""
+    print("\n" + "=" * 60)
+    print("🧪 Test: Provider mit Server-Hinweisen")
+    print("=" * 60)
+    
+    async def run():
+        runner, base_url, calls = await _start_server()
+        transport = AsyncHTTPTransport()
+        hf = HuggingFaceProvider(api_token='test', transport=transport)
+        hf.api_url = f"{base_url}/hf"
+        hf.batcher = None
+        openrouter = OpenRouterProvider(api_key='test', transport=transport)
+        try:
+            openrouter.api_url = f"{base_url}/chat"
+            answer = await openrouter.generate_response("Hallo")
+            openrouter.api_url = f"{base_url}/stream"
+            chunks = [chunk async for chunk in openrouter.stream_response("Hallo")]
+            return await hf.generate_response("Status?"), answer, chunks, calls, hf, openrouter
+        finally:
+            await transport.close()
+            await runner.cleanup()
+    
+    hf_answer, answer, chunks, calls, hf, openrouter = asyncio.run(run())
+    hf_stats = hf.retry.get_statistics()
+    print(f"\n🤗 {hf_answer} nach {calls['hf']} Versuchen: {hf_stats}")
+    print(f"🔀 {answer} / {''.join(chunks)}: {openrouter.retry.get_statistics()}")
+    
+    assert hf_answer == 'Bereit'
+    assert calls['hf'] == 3
+    assert hf_stats['hinted'] == 2
+    assert hf_stats['avg_added_latency'] >= 0.1
+    assert [a['error'] for a in hf.retry.attempts] == ['HTTPStatusError', 'HTTPStatusError', None]
+    
+    assert answer == 'Hallo'
+    assert chunks == ["Hal", "lo"]
+    assert calls['chat'] == 2 and calls['stream'] == 2
+
+
+def main():
+    """Führt alle Tests aus"""
+    print("\n🚀 AdonisAI Retry Tests")
+    print("=" * 60)
+    
+    test_server_hints()
+    test_idempotency()
+    test_backoff_full_jitter()
+    test_budget_limits_retries()
+    test_cancel_during_backoff()
+    test_providers_honor_hints()
+    
+    print("\n" + "=" * 60)
+    print("✅ Retry Tests abgeschlossen")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
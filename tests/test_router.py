@@ -0,0 +1,153 @@
+"""
+Test für den Provider-Router - Funktioniert OHNE Internet!
+Nutzt Fake-Provider mit fester Latenz, Kosten und Fehlern.
+"""
+
+import os
+import sys
+import json
+import asyncio
+import tempfile
+
+# Path setup
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.ai.ai_client import AIClient, AIProvider
+from src.ai.latency import LatencyTracker
+from src.ai.router import ProviderRouter
+
+
+class FakeProvider(AIProvider):
+    """Provider mit fester Verzögerung, Kosten und optionalem Fehler"""
+    
+    def __init__(self, model: str, delay: float = 0.0, cost: float = 0.0, broken: bool = False):
+        self.model = model
+        self.delay = delay
+        self.cost_per_1k_tokens = cost
+        self.broken = broken
+        self.calls = 0
+    
+    async def generate_response(self, prompt, context=None):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.broken:
+            return "⚠️ Fehler: 503 Service Unavailable"
+        return f"Antwort von {self.model}"
+    
+    async def analyze_intent(self, text):
+        self.calls += 1
+        if self.broken:
+            return {'intent': 'unknown', 'confidence': 0.0, 'entities': [], 'error': '503'}
+        return {'intent': 'general', 'confidence': 0.8, 'entities': [], 'raw_text': text}
+
+
+def test_rank_by_latency_and_cost():
+    """Test: Schneller und günstiger Provider wird zuerst gefragt"""
+    print("=" * 60)
+    print("🧪 Test: Ranking")
+    print("=" * 60)
+    
+    slow = FakeProvider('slow')
+    fast = FakeProvider('fast')
+    pricey = FakeProvider('pricey', cost=0.01)
+    
+    latency = LatencyTracker()
+    for _ in range(5):
+        latency.record(slow.name, 4.0)
+        latency.record(fast.name, 0.5)
+        latency.record(pricey.name, 0.4)
+    
+    router = ProviderRouter()
+    decision = router.rank([slow, pricey, fast], 'chat', latency)
+    order = [p.model for p in decision['providers']]
+    print(f"\n🧭 Reihenfolge: {order}")
+    print(f"📊 Scores: {decision['scores']}")
+    
+    # pricey: 0.4s + 0.01$ * 0.6 * 1000 = 6.4 > slow 4.0
+    assert order == ['fast', 'slow', 'pricey']
+
+
+def test_fallback_chain():
+    """Test: Fehlerhafter Provider -> nächster in der Kette"""
+    print("\n" + "=" * 60)
+    print("🧪 Test: Fallback-Kette")
+    print("=" * 60)
+    
+    broken = FakeProvider('broken', broken=True)
+    backup = FakeProvider('backup')
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        log_path = os.path.join(tmp, 'routing.jsonl')
+        client = AIClient(broken, fallback_providers=[backup], router=ProviderRouter(log_path=log_path))
+        
+        answer = asyncio.run(client.chat("Hallo"))
+        intent = asyncio.run(client.understand_command("Irgendwas"))
+        
+        with open(log_path, encoding='utf-8') as f:
+            records = [json.loads(line) for line in f]
+    
+    print(f"\n🔁 {answer} / {intent['intent']}")
+    print(f"📝 {records[0]}")
+    
+    assert answer == "Antwort von backup"
+    assert intent['intent'] == 'general'
+    assert [r['winner'] for r in records] == [backup.name, backup.name]
+    assert records[0]['attempts'] == 2
+    # Zweite Anfrage: Router kennt die Fehlerquote schon
+    assert records[1]['chain'][0] == backup.name
+    assert client.router.stats['fallbacks'] == 1
+
+
+def test_router_learns_error_rate():
+    """Test: Nach Fehlern wird der kaputte Provider nicht mehr zuerst gefragt"""
+    print("\n" + "=" * 60)
+    print("🧪 Test: Fehlerquote senkt Priorität")
+    print("=" * 60)
+    
+    broken = FakeProvider('broken', broken=True)
+    backup = FakeProvider('backup')
+    client = AIClient(broken, fallback_providers=[backup])
+    
+    async def run():
+        return [await client.chat(f"Frage {i}") for i in range(10)]
+    
+    answers = asyncio.run(run())
+    print(f"\n📉 Aufrufe broken: {broken.calls}, backup: {backup.calls}")
+    print(f"📊 {client.router.get_statistics()}")
+    
+    assert set(answers) == {"Antwort von backup"}
+    assert broken.calls < 5
+    assert backup.calls == 10
+
+
+def test_all_failed_returns_error():
+    """Test: Schlagen alle fehl, kommt die Fehlermeldung zurück"""
+    print("\n" + "=" * 60)
+    print("🧪 Test: Alle Provider fehlerhaft")
+    print("=" * 60)
+    
+    client = AIClient(FakeProvider('a', broken=True), fallback_providers=[FakeProvider('b', broken=True)])
+    answer = asyncio.run(client.chat("Hallo"))
+    print(f"\n❌ {answer}")
+    
+    assert answer.startswith("⚠️ Fehler")
+    assert client.router.stats['failed'] == 1
+
+
+def main():
+    """Führt alle Tests aus"""
+    print("\n🚀 AdonisAI Router Tests")
+    print("=" * 60)
+    
+    test_rank_by_latency_and_cost()
+    test_fallback_chain()
+    test_router_learns_error_rate()
+    test_all_failed_returns_error()
+    
+    print("\n" + "=" * 60)
+    print("✅ Router Tests abgeschlossen")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
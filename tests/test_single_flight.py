@@ -0,0 +1,221 @@
+"""
+Test für Single-Flight (Bündelung identischer Anfragen) - Funktioniert OHNE Internet!
+"""
+
+import os
+import sys
+import asyncio
+
+# Path setup
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.ai.ai_client import AIClient, AIProvider
+from src.ai.single_flight import SingleFlight
+
+
+class CountingProvider(AIProvider):
+    """Provider der Aufrufe zählt und kurz wartet"""
+    
+    model = 'counting'
+    
+    def __init__(self, delay: float = 0.05):
+        self.delay = delay
+        self.calls = 0
+    
+    async def generate_response(self, prompt, context=None):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return f"Antwort auf {prompt}"
+    
+    async def stream_response(self, prompt, context=None):
+        self.calls += 1
+        for word in f"Antwort auf {prompt}".split():
+            await asyncio.sleep(self.delay / 5)
+            yield word + ' '
+    
+    async def analyze_intent(self, text):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return {'intent': 'general', 'confidence': 0.8, 'entities': [], 'raw_text': text}
+
+
+def test_identical_requests_share_call():
+    """Test: 50 gleiche Fragen -> ein Provider-Aufruf"""
+    print("=" * 60)
+    print("🧪 Test: Identische Anfragen bündeln")
+    print("=" * 60)
+    
+    provider = CountingProvider()
+    client = AIClient(provider, single_flight=SingleFlight())
+    
+    async def run():
+        return await asyncio.gather(*[client.chat("Was ist los?", "System") for _ in range(50)])
+    
+    answers = asyncio.run(run())
+    stats = client.single_flight.get_statistics()
+    print(f"\n🤝 {stats}")
+    
+    assert set(answers) == {"Antwort auf Was ist los?"}
+    assert provider.calls == 1
+    assert stats['saved'] == 49
+    assert stats['in_flight'] == 0
+
+
+def test_different_params_not_shared():
+    """Test: Anderer Prompt oder andere Parameter -> eigener Aufruf"""
+    print("\n" + "=" * 60)
+    print("🧪 Test: Unterschiedliche Anfragen")
+    print("=" * 60)
+    
+    provider = CountingProvider()
+    client = AIClient(provider, single_flight=SingleFlight())
+    
+    async def run():
+        return await asyncio.gather(
+            client.chat("Frage A", {'temperature': 0.7}),
+            client.chat("Frage A", {'temperature': 0.2}),
+            client.chat("Frage B", {'temperature': 0.7}),
+            client.understand_command("Frage A"),
+            client.understand_command("Frage A")
+        )
+    
+    asyncio.run(run())
+    print(f"\n📞 Provider-Aufrufe: {provider.calls}")
+    
+    assert provider.calls == 4
+
+
+def test_cancelled_waiter_keeps_flight():
+    """Test: Abgebrochener Wartender stoppt den Aufruf für die anderen nicht"""
+    print("\n" + "=" * 60)
+    print("🧪 Test: Abbruch eines Wartenden")
+    print("=" * 60)
+    
+    flight = SingleFlight()
+    
+    async def slow():
+        await asyncio.sleep(0.1)
+        return 42
+    
+    async def run():
+        first = asyncio.ensure_future(flight.do('k', slow))
+        second = asyncio.ensure_future(flight.do('k', slow))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        return await second, first.cancelled()
+    
+    result, cancelled = asyncio.run(run())
+    print(f"\n✅ Ergebnis: {result}, erster abgebrochen: {cancelled}")
+    
+    assert result == 42
+    assert cancelled
+
+
+def test_exception_shared():
+    """Test: Fehler des Aufrufs erreicht alle Wartenden"""
+    print("\n" + "=" * 60)
+    print("🧪 Test: Geteilte Exception")
+    print("=" * 60)
+    
+    flight = SingleFlight()
+    calls = []
+    
+    async def failing():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        raise ValueError("kaputt")
+    
+    async def run():
+        return await asyncio.gather(*[flight.do('k', failing) for _ in range(5)],
+                                    return_exceptions=True)
+    
+    results = asyncio.run(run())
+    print(f"\n❌ {results}")
+    
+    assert len(calls) == 1
+    assert all(isinstance(r, ValueError) for r in results)
+
+
+def test_identical_streams_share_call():
+    """Test: Gleiche Streams -> ein Upstream-Stream, alle erhalten jedes Fragment"""
+    print("\n" + "=" * 60)
+    print("🧪 Test: Identische Streams bündeln")
+    print("=" * 60)
+    
+    provider = CountingProvider()
+    client = AIClient(provider, single_flight=SingleFlight())
+    
+    async def read():
+        return ''.join([chunk async for chunk in client.chat_stream("Was ist los?", "System")])
+    
+    async def late_reader():
+        await asyncio.sleep(provider.delay / 2)
+        return await read()
+    
+    async def run():
+        return await asyncio.gather(*[read() for _ in range(10)], late_reader())
+    
+    answers = asyncio.run(run())
+    stats = client.single_flight.get_statistics()
+    print(f"\n🤝 {stats}")
+    
+    assert set(answers) == {"Antwort auf Was ist los? "}
+    assert provider.calls == 1
+    assert stats['saved'] == 10
+    assert stats['in_flight'] == 0
+
+
+def test_abandoned_stream_cancels_upstream():
+    """Test: Liest niemand mehr, wird der Upstream-Stream beendet"""
+    print("\n" + "=" * 60)
+    print("🧪 Test: Verlassener Stream")
+    print("=" * 60)
+    
+    flight = SingleFlight()
+    closed = []
+    
+    async def endless():
+        try:
+            while True:
+                await asyncio.sleep(0.005)
+                yield 'x'
+        finally:
+            closed.append(True)
+    
+    async def run():
+        first = flight.stream('k', endless)
+        second = flight.stream('k', endless)
+        assert await first.__anext__() == 'x'
+        assert await second.__anext__() == 'x'
+        await first.aclose()
+        assert await second.__anext__() == 'x'
+        await second.aclose()
+        await asyncio.sleep(0.02)
+        return flight.in_flight
+    
+    in_flight = asyncio.run(run())
+    print(f"\n🛑 Upstream geschlossen: {closed}, laufend: {in_flight}")
+    
+    assert closed == [True]
+    assert in_flight == 0
+
+
+def main():
+    """Führt alle Tests aus"""
+    print("\n🚀 AdonisAI Single-Flight Tests")
+    print("=" * 60)
+    
+    test_identical_requests_share_call()
+    test_different_params_not_shared()
+    test_cancelled_waiter_keeps_flight()
+    test_exception_shared()
+    test_identical_streams_share_call()
+    test_abandoned_stream_cancels_upstream()
+    
+    print("\n" + "=" * 60)
+    print("✅ Single-Flight Tests abgeschlossen")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
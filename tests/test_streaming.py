@@ -0,0 +1,259 @@
+"""
+Test für Token-Streaming - Funktioniert OHNE Internet!
+OpenRouter SSE-Stream gegen lokalen Server + schrittweise Telegram-Edits
+"""
+
+import os
+import sys
+import json
+import asyncio
+import concurrent.futures
+
+from aiohttp import web
+from telegram.error import RetryAfter
+
+# Path setup
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.ai.http_transport import AsyncHTTPTransport
+from src.ai.openrouter_provider import OpenRouterProvider
+from src.bot.stream_renderer import MAX_MESSAGE_LENGTH, StreamingReply
+from src.utils.async_bridge import iterate_sync
+
+
+TOKENS = ["Hallo", "!", " Ich", " bin", " AdonisAI", "."]
+
+
+async def _start_sse_server():
+    """Lokaler Server der Token als Server-Sent Events sendet"""
+    async def chat(request):
+        data = await request.json()
+        assert data['stream'] is True
+        
+        response = web.StreamResponse(headers={'Content-Type': 'text/event-stream'})
+        await response.prepare(request)
+        await response.write(b": OPENROUTER PROCESSING\n\n")
+        for token in TOKENS:
+            chunk = {'choices': [{'delta': {'content': token}}]}
+            await response.write(f"data: {json.dumps(chunk)}\n\n".encode())
+            await asyncio.sleep(0.01)
+        await response.write(b"data: [DONE]\n\n")
+        return response
+    
+    app = web.Application()
+    app.router.add_post('/chat', chat)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://127.0.0.1:{port}/chat"
+
+
+class FakeMessage:
+    """Minimale Telegram-Message für Renderer-Tests"""
+    
+    def __init__(self, flood_edits=0):
+        self.replies = []
+        self.edits = []
+        self.deleted = False
+        self.flood_edits = flood_edits
+    
+    def reply_text(self, text, **kwargs):
+        reply = FakeMessage(self.flood_edits)
+        reply.text = text
+        self.replies.append(reply)
+        return reply
+    
+    def edit_text(self, text, **kwargs):
+        # Die ersten flood_edits Edits scheitern an Flood-Control
+        if self.flood_edits:
+            self.flood_edits -= 1
+            raise RetryAfter(0)
+        self.edits.append(text)
+    
+    def delete(self):
+        self.deleted = True
+
+
+def test_openrouter_stream():
+    """Test: OpenRouter liefert Token-Fragmente in Reihenfolge"""
+    print("=" * 60)
+    print("🧪 Test: OpenRouter SSE-Stream")
+    print("=" * 60)
+    
+    async def run():
+        runner, url = await _start_sse_server()
+        transport = AsyncHTTPTransport()
+        provider = OpenRouterProvider(api_key='test', transport=transport)
+        provider.api_url = url
+        try:
+            chunks = [chunk async for chunk in provider.stream_response("Hallo")]
+            return chunks, provider.guard.stream_timeouts.histogram.count
+        finally:
+            await transport.close()
+            await runner.cleanup()
+    
+    chunks, samples = asyncio.run(run())
+    print(f"\n🌊 Fragmente: {chunks}")
+    
+    assert chunks == TOKENS
+    assert samples == 1
+
+
+def test_renderer_throttles_edits():
+    """Test: Renderer bündelt Edits und zeigt am Ende den vollen Text"""
+    print("\n" + "=" * 60)
+    print("🧪 Test: Gedrosselte Edits")
+    print("=" * 60)
+    
+    incoming = FakeMessage()
+    reply = StreamingReply(incoming, min_interval=0.0, min_chars=10)
+    reply.start()
+    
+    for token in TOKENS:
+        reply.feed(token)
+    reply.finish()
+    
+    placeholder = incoming.replies[0]
+    print(f"\n✏️  {len(placeholder.edits)} Edits: {placeholder.edits}")
+    
+    assert placeholder.edits[-1] == "".join(TOKENS)
+    assert len(placeholder.edits) < len(TOKENS)
+
+
+def test_renderer_holds_actions():
+    """Test: JSON-Aktionen werden nicht als Zwischenstand angezeigt"""
+    print("\n" + "=" * 60)
+    print("🧪 Test: Aktionen zurückhalten")
+    print("=" * 60)
+    
+    incoming = FakeMessage()
+    reply = StreamingReply(incoming, min_interval=0.0, min_chars=1)
+    reply.start()
+    
+    for token in ['{"action": ', '"list_events", ', '"timeframe": "today"}']:
+        reply.feed(token)
+    reply.discard()
+    
+    placeholder = incoming.replies[0]
+    print(f"\n🛑 Edits: {placeholder.edits}, gelöscht: {placeholder.deleted}")
+    
+    assert placeholder.edits == []
+    assert placeholder.deleted
+
+
+def test_renderer_final_text_under_flood_control():
+    """Test: Endgültiger Text kommt trotz RetryAfter an"""
+    print("\n" + "=" * 60)
+    print("🧪 Test: Flood-Control beim letzten Edit")
+    print("=" * 60)
+    
+    # Einmal RetryAfter: zweiter Versuch bearbeitet den Platzhalter
+    incoming = FakeMessage(flood_edits=1)
+    reply = StreamingReply(incoming)
+    reply.start()
+    reply.finish("Fertige Antwort")
+    assert incoming.replies[0].edits == ["Fertige Antwort"]
+    assert len(incoming.replies) == 1
+    
+    # Dauerhaft RetryAfter: neue Nachricht statt halbem Text mit Cursor
+    incoming = FakeMessage(flood_edits=10)
+    reply = StreamingReply(incoming)
+    reply.start()
+    reply.finish("Fertige Antwort")
+    placeholder, fallback = incoming.replies
+    print(f"\n📨 Platzhalter gelöscht: {placeholder.deleted}, neu: {fallback.text!r}")
+    assert placeholder.deleted and fallback.text == "Fertige Antwort"
+
+
+def test_renderer_splits_long_answer():
+    """Test: Antworten über 4096 Zeichen gehen als weitere Nachrichten raus"""
+    print("\n" + "=" * 60)
+    print("🧪 Test: Lange Antwort")
+    print("=" * 60)
+    
+    text = "\n".join(f"Zeile {i}: " + "x" * 60 for i in range(150))
+    incoming = FakeMessage()
+    reply = StreamingReply(incoming)
+    reply.start()
+    reply.finish(text)
+    
+    placeholder, *extra = incoming.replies
+    parts = [placeholder.edits[-1]] + [message.text for message in extra]
+    print(f"\n📏 {len(text)} Zeichen -> {[len(part) for part in parts]}")
+    assert len(extra) == 2
+    assert all(len(part) <= MAX_MESSAGE_LENGTH for part in parts)
+    assert "\n".join(parts) == text
+
+
+def test_iterate_sync():
+    """Test: Async-Generator aus synchronem Code iterieren"""
+    print("\n" + "=" * 60)
+    print("🧪 Test: iterate_sync")
+    print("=" * 60)
+    
+    async def numbers():
+        for i in range(5):
+            await asyncio.sleep(0)
+            yield i
+    
+    result = list(iterate_sync(numbers()))
+    print(f"\n🔢 {result}")
+    
+    assert result == [0, 1, 2, 3, 4]
+
+
+def test_iterate_sync_closes_after_timeout():
+    """Test: Generator wird erst geschlossen, wenn das abgebrochene __anext__ fertig ist"""
+    print("\n" + "=" * 60)
+    print("🧪 Test: iterate_sync Abbruch")
+    print("=" * 60)
+    
+    events = []
+    
+    async def slow():
+        yield 1
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            # Aufräumen dauert länger als das Abbrechen (z.B. Verbindung schließen)
+            await asyncio.sleep(0.2)
+            events.append('cancelled')
+            raise
+        finally:
+            events.append('closed')
+        yield 2
+    
+    received = []
+    try:
+        for item in iterate_sync(slow(), timeout=0.1):
+            received.append(item)
+    except concurrent.futures.TimeoutError:
+        pass
+    
+    print(f"\n🧹 {received}, {events}")
+    assert received == [1]
+    assert events == ['cancelled', 'closed']
+
+
+def main():
+    """Führt alle Tests aus"""
+    print("\n🚀 AdonisAI Streaming Tests")
+    print("=" * 60)
+    
+    test_openrouter_stream()
+    test_renderer_throttles_edits()
+    test_renderer_holds_actions()
+    test_renderer_final_text_under_flood_control()
+    test_renderer_splits_long_answer()
+    test_iterate_sync()
+    test_iterate_sync_closes_after_timeout()
+    
+    print("\n" + "=" * 60)
+    print("✅ Streaming Tests abgeschlossen")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
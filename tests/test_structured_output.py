@@ -0,0 +1,229 @@
+"""
+Test für strukturierte Ausgabe und inkrementelles JSON-Parsen - Funktioniert OHNE Internet!
+"""
+
+import os
+import sys
+import json
+import asyncio
+
+from aiohttp import web
+
+# Path setup
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.ai.hf_provider import HuggingFaceProvider
+from src.ai.http_transport import AsyncHTTPTransport
+from src.ai.openrouter_provider import OpenRouterProvider
+from src.ai.structured_output import ActionStream, StreamingJSONParser, parse_action
+
+
+# Aktion zuerst, danach noch ein langer Erklärungstext
+ACTION_TOKENS = ['{"act', 'ion": "list_', 'events", "time', 'frame": "week"', ', "reply": "Hier',
+                 ' sind', ' deine', ' Termine', ' für', ' die', ' Woche', '."}']
+
+
+async def _start_server():
+    """Lokaler Server: /chat (JSON), /stream (SSE mit Aktion), /hf (Inference API)"""
+    received = {'payloads': [], 'streamed': 0}
+    
+    async def chat(request):
+        received['payloads'].append(await request.json())
+        content = json.dumps({'action': 'reply', 'reply': 'Hallo!'})
+        return web.json_response({'choices': [{'message': {'content': content}}]})
+    
+    async def stream(request):
+        received['payloads'].append(await request.json())
+        response = web.StreamResponse(headers={'Content-Type': 'text/event-stream'})
+        await response.prepare(request)
+        try:
+            for token in ACTION_TOKENS:
+                chunk = {'choices': [{'delta': {'content': token}}]}
+                await response.write(f"data: {json.dumps(chunk)}\n\n".encode())
+                received['streamed'] += 1
+                await asyncio.sleep(0.02)
+            await response.write(b"data: [DONE]\n\n")
+        except (ConnectionResetError, asyncio.CancelledError):
+            pass
+        return response
+    
+    async def hf(request):
+        received['payloads'].append(await request.json())
+        return web.json_response([{'generated_text': '{"action": "next_event"}'}])
+    
+    app = web.Application()
+    app.router.add_post('/chat', chat)
+    app.router.add_post('/stream', stream)
+    app.router.add_post('/hf', hf)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://127.0.0.1:{port}", received
+
+
+def test_parse_nested_json():
+    """Test: Verschachteltes JSON und Text vor der Aktion"""
+    print("=" * 60)
+    print("🧪 Test: Verschachteltes JSON")
+    print("=" * 60)
+    
+    text = ('Klar! {"hinweis": "kein Objekt mit Aktion"} '
+            '{"action": "create_event", "text": "Termin {Mittwoch} 14 Uhr", '
+            '"details": {"ort": "Büro", "teilnehmer": ["Max", "Eva"]}, "dauer": 60}')
+    action = parse_action(text)
+    print(f"\n🧩 {action}")
+    
+    assert action['action'] == 'create_event'
+    assert action['text'] == 'Termin {Mittwoch} 14 Uhr'
+    assert action['details'] == {'ort': 'Büro', 'teilnehmer': ['Max', 'Eva']}
+    assert action['dauer'] == 60
+    assert parse_action("Einfach nur Text.") is None
+    assert parse_action('{"action": "list_events", "timeframe": "today"}') == \
+        {'action': 'list_events', 'timeframe': 'today'}
+
+
+def test_action_ready_before_stream_end():
+    """Test: Aktion steht fest, sobald ihre Felder vollständig sind"""
+    print("\n" + "=" * 60)
+    print("🧪 Test: Frühe Aktion")
+    print("=" * 60)
+    
+    actions = ActionStream()
+    ready_at = None
+    for index, token in enumerate(ACTION_TOKENS):
+        if actions.feed(token):
+            ready_at = index
+            break
+    print(f"\n⚡ Aktion nach Token {ready_at + 1} von {len(ACTION_TOKENS)}: {actions.action}")
+    
+    assert ready_at == 3
+    assert actions.action == {'action': 'list_events', 'timeframe': 'week'}
+    
+    # next_event braucht keine weiteren Felder
+    actions = ActionStream()
+    assert actions.feed('{"action": "next_event"') == {'action': 'next_event'}
+    
+    # list_events ohne timeframe: erst am Objektende
+    actions = ActionStream()
+    assert actions.feed('{"action": "list_events", "note": "x"') is None
+    assert actions.feed('}') == {'action': 'list_events', 'note': 'x'}
+
+
+def test_partial_reply():
+    """Test: Antworttext wird schon während des Streams dekodiert"""
+    print("\n" + "=" * 60)
+    print("🧪 Test: Teil-Antwort")
+    print("=" * 60)
+    
+    parser = StreamingJSONParser()
+    seen = []
+    for token in ['{"action": "reply", "reply": "Zeile 1\\', 'nZitat: \\"', 'Hi\\" \\u00', 'fc', 'ber"}']:
+        parser.feed(token)
+        seen.append(parser.partial('reply'))
+    print(f"\n✍️  {seen}")
+    
+    assert seen[0] == 'Zeile 1'
+    assert seen[1] == 'Zeile 1\nZitat: "'
+    assert seen[2] == 'Zeile 1\nZitat: "Hi" '
+    assert seen[-1] == 'Zeile 1\nZitat: "Hi" über'
+    assert parser.done
+    
+    actions = ActionStream()
+    actions.feed('{"action": "create_event", "text": "Termin')
+    assert actions.reply_text() is None
+
+
+def test_provider_structured_mode():
+    """Test: OpenRouter sendet response_format, HF bekommt die Vorgabe im Prompt"""
+    print("\n" + "=" * 60)
+    print("🧪 Test: Provider im strukturierten Modus")
+    print("=" * 60)
+    
+    context = {'system_prompt': 'Du bist AdonisAI.', 'response_format': 'json'}
+    
+    async def run():
+        runner, base_url, received = await _start_server()
+        transport = AsyncHTTPTransport()
+        openrouter = OpenRouterProvider(api_key='test', transport=transport)
+        hf = HuggingFaceProvider(api_token='test', transport=transport)
+        hf.api_url = f"{base_url}/hf"
+        hf.batcher = None
+        try:
+            openrouter.api_url = f"{base_url}/chat"
+            answer = await openrouter.generate_response("Hallo", context)
+            plain = await openrouter.generate_response("Hallo", 'Du bist AdonisAI.')
+            hf_answer = await hf.generate_response("Nächster Termin?", context)
+            return answer, plain, hf_answer, received
+        finally:
+            await transport.close()
+            await runner.cleanup()
+    
+    answer, plain, hf_answer, received = asyncio.run(run())
+    structured, unstructured, hf_payload = received['payloads']
+    print(f"\n📨 response_format: {structured['response_format']['type']}")
+    
+    assert parse_action(answer) == {'action': 'reply', 'reply': 'Hallo!'}
+    assert structured['response_format']['json_schema']['strict'] is True
+    assert 'create_event' in json.dumps(structured['response_format'])
+    assert 'response_format' not in unstructured
+    assert 'AUSGABEFORMAT' in hf_payload['inputs']
+    assert parse_action(hf_answer) == {'action': 'next_event'}
+
+
+def test_stream_closed_after_action():
+    """Test: Nach erkannter Aktion wird der restliche Stream nicht mehr gelesen"""
+    print("\n" + "=" * 60)
+    print("🧪 Test: Stream nach Aktion schließen")
+    print("=" * 60)
+    
+    async def run():
+        runner, base_url, received = await _start_server()
+        transport = AsyncHTTPTransport()
+        provider = OpenRouterProvider(api_key='test', transport=transport)
+        provider.api_url = f"{base_url}/stream"
+        actions = ActionStream()
+        consumed = 0
+        stream = provider.stream_response("Termine diese Woche?", {'response_format': 'json'})
+        try:
+            async for chunk in stream:
+                consumed += 1
+                if actions.feed(chunk):
+                    break
+        finally:
+            await stream.aclose()
+        await asyncio.sleep(0.1)
+        try:
+            return actions.action, consumed, received
+        finally:
+            await transport.close()
+            await runner.cleanup()
+    
+    action, consumed, received = asyncio.run(run())
+    print(f"\n⚡ {action} nach {consumed} Fragmenten, Server hat {received['streamed']} gesendet")
+    
+    assert action == {'action': 'list_events', 'timeframe': 'week'}
+    assert consumed == 4
+    assert received['streamed'] < len(ACTION_TOKENS)
+    assert 'response_format' in received['payloads'][0]
+
+
+def main():
+    """Führt alle Tests aus"""
+    print("\n🚀 AdonisAI Structured Output Tests")
+    print("=" * 60)
+    
+    test_parse_nested_json()
+    test_action_ready_before_stream_end()
+    test_partial_reply()
+    test_provider_structured_mode()
+    test_stream_closed_after_action()
+    
+    print("\n" + "=" * 60)
+    print("✅ Structured Output Tests abgeschlossen")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
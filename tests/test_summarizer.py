@@ -0,0 +1,186 @@
+"""
+Test für den Hintergrund-Summarizer (Zusammenfassung + Token-Budget) - Funktioniert OHNE Internet!
+"""
+
+import os
+import sys
+import time
+import asyncio
+import threading
+from datetime import datetime, timedelta
+
+# Path setup
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.ai.ai_client import AIClient, AIProvider, normalize_context
+from src.ai.prompt_cache import TokenCounter
+from src.ai.summarizer import ConversationSummarizer, extractive_summary
+from src.utils.context_manager import ContextManager
+
+
+CONVERSATION = [
+    ('user', "Hallo, wie geht's?"),
+    ('assistant', "Mir geht's gut, danke! Wie kann ich helfen?"),
+    ('user', "Ich treffe Max Müller am Dienstag um 14:30 im Büro."),
+    ('assistant', "Alles klar. Soll ich den Termin eintragen?"),
+    ('user', "Ja bitte, und erinnere mich an die Präsentation."),
+    ('assistant', "Gerne. Ich habe es notiert."),
+    ('user', "Was ist das Wetter so?"),
+    ('assistant', "Das kann ich leider nicht sagen."),
+]
+
+
+class SlowProvider(AIProvider):
+    """Provider mit Verzögerung, merkt sich die Kontexte"""
+    
+    model = 'slow'
+    
+    def __init__(self, answer: str, delay: float = 0.0):
+        self.answer = answer
+        self.delay = delay
+        self.contexts = []
+    
+    async def generate_response(self, prompt, context=None):
+        self.contexts.append(normalize_context(context))
+        await asyncio.sleep(self.delay)
+        return self.answer
+    
+    async def analyze_intent(self, text):
+        return {'intent': 'chat', 'confidence': 1.0, 'entities': {}}
+
+
+def _fill(manager: ContextManager, user_id: int = 1):
+    """Schreibt die Beispiel-Konversation in den Kontext"""
+    for role, content in CONVERSATION:
+        manager.add_message(user_id, role, content)
+
+
+def test_evicted_messages_kept_for_summary():
+    """Test: Nach max_messages / TTL verdrängte Nachrichten gehen nicht verloren"""
+    print("=" * 60)
+    print("🧪 Test: Verdrängte Nachrichten")
+    print("=" * 60)
+    
+    manager = ContextManager(max_messages=4, ttl_minutes=30, keep_evicted=True)
+    _fill(manager)
+    evicted = manager.take_evicted(1)
+    print(f"\n🗂️  {len(evicted)} verdrängt, {len(manager.get_context(1))} im Kontext")
+    
+    assert [msg['content'] for msg in evicted] == [content for _, content in CONVERSATION[:4]]
+    assert manager.take_evicted(1) == []
+    
+    # TTL: abgelaufene Nachrichten landen ebenfalls bei den verdrängten
+    manager.contexts[1][0]['timestamp'] = datetime.now() - timedelta(minutes=31)
+    assert len(manager.get_context(1)) == 3
+    assert manager.take_evicted(1)[0]['content'] == CONVERSATION[4][1]
+    
+    # Ohne keep_evicted bleibt das alte Verhalten
+    plain = ContextManager(max_messages=4)
+    _fill(plain)
+    assert plain.take_evicted(1) == []
+
+
+def test_extractive_summary_keeps_facts_within_budget():
+    """Test: Lokale Zusammenfassung behält Namen, Zeiten, Daten im Budget"""
+    print("\n" + "=" * 60)
+    print("🧪 Test: Extraktive Zusammenfassung")
+    print("=" * 60)
+    
+    counter = TokenCounter()
+    messages = [{'role': role, 'content': content} for role, content in CONVERSATION]
+    messages.append({'role': 'assistant', 'content': '[fast_list_today]'})
+    summary = extractive_summary(None, messages, max_tokens=40, counter=counter)
+    print(f"\n📝 ({counter.count(summary)} Token)\n{summary}")
+    
+    assert counter.count(summary) <= 40
+    assert 'Max Müller' in summary and '14:30' in summary and 'Dienstag' in summary
+    assert 'fast_list_today' not in summary
+    
+    # Laufende Zusammenfassung: alte Fakten bleiben bei neuen Nachrichten erhalten
+    updated = extractive_summary(summary, [{'role': 'user', 'content': "Ok."}], max_tokens=40, counter=counter)
+    assert '14:30' in updated
+
+
+def test_schedule_runs_in_background():
+    """Test: schedule() blockiert nicht, Zusammenfassung wird beim Kontext gespeichert"""
+    print("\n" + "=" * 60)
+    print("🧪 Test: Hintergrund-Zusammenfassung")
+    print("=" * 60)
+    
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    try:
+        manager = ContextManager(max_messages=10, keep_evicted=True)
+        _fill(manager)
+        provider = SlowProvider("- Treffen mit Max Müller Dienstag 14:30", delay=0.3)
+        summarizer = ConversationSummarizer(manager, AIClient(provider), mode='provider', keep_recent=2)
+        
+        start = time.perf_counter()
+        summarizer.schedule(1, loop)
+        summarizer.schedule(1, loop)  # läuft schon - wird nur vorgemerkt
+        elapsed = time.perf_counter() - start
+        print(f"\n⏱️  schedule(): {elapsed * 1000:.1f}ms")
+        assert elapsed < 0.05
+        assert manager.get_summary(1) is None
+        
+        deadline = time.time() + 5
+        while summarizer._running and time.time() < deadline:
+            time.sleep(0.02)
+        
+        summary = manager.get_summary(1)
+        print(f"📝 {summary['text']}")
+        assert summary['text'] == "- Treffen mit Max Müller Dienstag 14:30"
+        assert summary['until'] == manager.get_messages(1)[-3]['timestamp']
+        assert len(provider.contexts) == 1  # zweiter Lauf hatte nichts Neues
+        assert provider.contexts[0]['no_cache'] is True
+        assert summarizer.get_statistics()['provider'] == 1
+    finally:
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout=1)
+
+
+def test_prompt_history_within_budget_and_provider_fallback():
+    """Test: Historie im Prompt bleibt im Token-Budget; Provider-Fehler -> extraktiv"""
+    print("\n" + "=" * 60)
+    print("🧪 Test: Token-Budget und Fallback")
+    print("=" * 60)
+    
+    counter = TokenCounter()
+    manager = ContextManager(max_messages=10, keep_evicted=True)
+    _fill(manager)
+    manager.add_message(1, 'user', "Wann war nochmal das Treffen?")
+    
+    provider = SlowProvider("⚠️ Fehler: API Timeout")
+    summarizer = ConversationSummarizer(manager, AIClient(provider), mode='provider',
+                                        keep_recent=2, token_budget=60, summary_tokens=30, counter=counter)
+    text = asyncio.run(summarizer.summarize(1))
+    print(f"\n📝 {text}")
+    assert summarizer.stats['fallbacks'] == 1 and summarizer.stats['extractive'] == 1
+    assert '14:30' in text
+    
+    summary, recent = summarizer.history_for_prompt(1)
+    used = counter.count(summary) + sum(counter.count(msg['content']) + 3 for msg in recent)
+    print(f"📏 {used}/60 Token, {len(recent)} Nachrichten wörtlich")
+    assert used <= 60
+    assert recent[-1]['content'] == CONVERSATION[-1][1]
+    assert all(msg['content'] != "Wann war nochmal das Treffen?" for msg in recent)
+
+
+def main():
+    """Führt alle Tests aus"""
+    print("\n🚀 AdonisAI Summarizer Tests")
+    print("=" * 60)
+    
+    test_evicted_messages_kept_for_summary()
+    test_extractive_summary_keeps_facts_within_budget()
+    test_schedule_runs_in_background()
+    test_prompt_history_within_budget_and_provider_fallback()
+    
+    print("\n" + "=" * 60)
+    print("✅ Summarizer Tests abgeschlossen")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,300 @@
+"""
+Test für das Ablösen laufender KI-Anfragen durch neuere Nachrichten - Funktioniert OHNE Internet!
+"""
+
+import os
+import sys
+import time
+import asyncio
+import tempfile
+import threading
+from concurrent.futures import CancelledError
+from types import SimpleNamespace
+
+# Path setup
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.ai.ai_client import AIClient, AIProvider, normalize_context
+from src.ai.summarizer import ConversationSummarizer
+from src.bot.supersession import RequestSupersession
+from src.bot.telegram_bot import AdonisBot
+from src.storage.interaction_logger import InteractionLogger
+from src.utils.async_bridge import CancelToken, iterate_sync, run_sync
+from src.utils.context_manager import ContextManager
+
+
+class SlowCall:
+    """Langsamer "Provider-Aufruf", merkt sich Start und Abbruch"""
+    
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.started = []
+        self.cancelled = []
+    
+    async def __call__(self, text: str) -> str:
+        self.started.append(text)
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled.append(text)
+            raise
+        return f"Antwort auf {text!r}"
+
+
+class RecordingProvider(AIProvider):
+    """Provider, der den System-Prompt jedes Aufrufs speichert"""
+    
+    model = 'recording'
+    
+    def __init__(self):
+        self.calls = []
+    
+    async def generate_response(self, prompt, context=None):
+        self.calls.append((prompt, normalize_context(context).get('system_prompt') or ''))
+        return "Wann genau?"
+    
+    async def analyze_intent(self, text):
+        return {'intent': 'general', 'confidence': 1.0, 'entities': {}}
+
+
+class FakeMessage:
+    """Minimale Telegram-Message"""
+    
+    def __init__(self, text):
+        self.text = text
+        self.replies = []
+    
+    def reply_text(self, text, **kwargs):
+        self.replies.append(text)
+
+
+def _bot(tmp):
+    """AdonisBot ohne Telegram: nur die Felder, die handle_message liest (Summarizer aktiv)"""
+    bot = AdonisBot.__new__(AdonisBot)
+    provider = RecordingProvider()
+    bot.ai_provider = provider
+    bot.ai_client = AIClient(provider)
+    bot.context_manager = ContextManager(keep_evicted=True)
+    bot.summarizer = ConversationSummarizer(bot.context_manager)
+    bot.supersession = RequestSupersession(quiet_window=0.2, merge=True)
+    bot.interaction_logger = InteractionLogger(db_path=os.path.join(tmp, 'interactions.db'))
+    bot.calendar_provider = None
+    bot.rate_limiter = None
+    bot.memory = None
+    bot.structured_output = False
+    bot.streaming_enabled = False
+    bot._cached_prompt_prefix = None
+    return bot, provider
+
+
+def _handler(supersession, call, user_id, text, results):
+    """Vereinfachter handle_message: ablösen, Ruhefenster, Aufruf, commit"""
+    request = supersession.begin(user_id, text)
+    try:
+        if not supersession.wait_quiet(request):
+            results.append(('debounced', text))
+            return
+        answer = run_sync(call(request.prompt), token=request.token)
+        if not supersession.commit(request):
+            raise CancelledError()
+        results.append(('answered', answer))
+    except CancelledError:
+        results.append(('cancelled', text))
+    finally:
+        supersession.finish(request)
+
+
+def test_cancel_token():
+    """Test: CancelToken bricht run_sync und iterate_sync aus einem anderen Thread ab"""
+    print("=" * 60)
+    print("🧪 Test: CancelToken")
+    print("=" * 60)
+    
+    call = SlowCall(delay=5)
+    token = CancelToken()
+    threading.Timer(0.1, token.cancel).start()
+    start = time.perf_counter()
+    try:
+        run_sync(call('a'), token=token)
+        assert False, "nicht abgebrochen"
+    except CancelledError:
+        pass
+    elapsed = time.perf_counter() - start
+    print(f"\n⏱️  Abbruch nach {elapsed:.2f}s")
+    assert elapsed < 1
+    
+    # Bereits abgebrochenes Token: sofort CancelledError
+    try:
+        run_sync(asyncio.sleep(5), token=token)
+        assert False, "nicht abgebrochen"
+    except CancelledError:
+        pass
+    
+    closed = []
+    
+    async def chunks():
+        try:
+            for index in range(100):
+                await asyncio.sleep(0.02)
+                yield index
+        finally:
+            closed.append(True)
+    
+    token = CancelToken()
+    received = []
+    try:
+        for chunk in iterate_sync(chunks(), token=token):
+            received.append(chunk)
+            if chunk == 2:
+                threading.Timer(0.01, token.cancel).start()
+    except CancelledError:
+        pass
+    time.sleep(0.05)
+    print(f"📦 {len(received)} Fragmente vor dem Abbruch, Generator geschlossen: {bool(closed)}")
+    assert len(received) < 10 and closed
+
+
+def test_newer_message_cancels_pending_call():
+    """Test: Zweite Nachricht bricht den laufenden Aufruf ab und übernimmt beide Texte"""
+    print("\n" + "=" * 60)
+    print("🧪 Test: Abbrechen + Zusammenführen")
+    print("=" * 60)
+    
+    supersession = RequestSupersession(merge=True)
+    call = SlowCall(delay=0.3)
+    results = []
+    
+    first = threading.Thread(target=_handler, args=(supersession, call, 1, "Termin morgen", results))
+    first.start()
+    time.sleep(0.1)
+    second = threading.Thread(target=_handler, args=(supersession, call, 1, "um 15 Uhr", results))
+    second.start()
+    first.join()
+    second.join()
+    time.sleep(0.05)
+    
+    print(f"\n📨 {results}")
+    print(f"📊 {supersession.get_statistics()}")
+    assert results[0] == ('cancelled', "Termin morgen")
+    assert results[1] == ('answered', "Antwort auf 'Termin morgen\\num 15 Uhr'")
+    assert call.cancelled == ["Termin morgen"]
+    assert supersession.stats['superseded'] == 1 and supersession.stats['merged'] == 1
+    assert supersession.get_statistics()['pending'] == 0
+    
+    # Anderer User wird nicht abgelöst
+    other = []
+    threads = [threading.Thread(target=_handler, args=(supersession, call, uid, "Hallo", other))
+               for uid in (2, 3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert [status for status, _ in other] == ['answered', 'answered']
+
+
+def test_quiet_window_debounces():
+    """Test: Im Ruhefenster startet nur die letzte Nachricht einen Aufruf"""
+    print("\n" + "=" * 60)
+    print("🧪 Test: Ruhefenster")
+    print("=" * 60)
+    
+    supersession = RequestSupersession(quiet_window=0.2, merge=True)
+    call = SlowCall(delay=0.01)
+    results = []
+    
+    threads = []
+    for text in ["Hallo", "ich brauche", "einen Termin"]:
+        thread = threading.Thread(target=_handler, args=(supersession, call, 1, text, results))
+        thread.start()
+        threads.append(thread)
+        time.sleep(0.05)
+    for thread in threads:
+        thread.join()
+    
+    print(f"\n📨 {results}")
+    assert call.started == ["Hallo\nich brauche\neinen Termin"]
+    assert [status for status, _ in results] == ['debounced', 'debounced', 'answered']
+    assert supersession.stats['debounced'] == 2
+    
+    # Ohne Zusammenführen: nur die neueste Nachricht
+    plain = RequestSupersession(quiet_window=0.2, merge=False)
+    first = plain.begin(1, "a")
+    second = plain.begin(1, "b")
+    assert not plain.wait_quiet(first) and second.prompt == "b"
+
+
+def test_committed_request_not_superseded():
+    """Test: Übernommene Antworten (z.B. Termin angelegt) werden nicht mehr abgelöst"""
+    print("\n" + "=" * 60)
+    print("🧪 Test: Commit")
+    print("=" * 60)
+    
+    supersession = RequestSupersession(merge=True)
+    first = supersession.begin(1, "Erstelle Termin morgen 10 Uhr")
+    assert supersession.commit(first)
+    
+    second = supersession.begin(1, "Danke!")
+    print(f"\n📝 Prompt: {second.prompt!r}")
+    assert not first.superseded and not first.token.cancelled
+    assert second.prompt == "Danke!"
+    
+    # finish() der älteren Anfrage entfernt die neuere nicht
+    supersession.finish(first)
+    assert supersession.pending[1] is second
+    supersession.finish(second)
+    assert not supersession.pending
+
+
+def test_bot_merged_messages_not_repeated_in_history():
+    """Test: Zusammengeführte Nachrichten stehen mit Summarizer nicht zusätzlich in der Historie"""
+    print("\n" + "=" * 60)
+    print("🧪 Test: Bot mit Summarizer")
+    print("=" * 60)
+    
+    handle_message = AdonisBot.handle_message.__wrapped__
+    user = SimpleNamespace(id=7, username='anna')
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        bot, provider = _bot(tmp)
+        bot.context_manager.add_message(user.id, 'user', "Kunde Max hat angerufen")
+        bot.context_manager.add_message(user.id, 'assistant', "Was wollte er?")
+        
+        threads = []
+        for text in ["Er möchte einen Termin", "nächste Woche Mittwoch"]:
+            update = SimpleNamespace(effective_user=user, message=FakeMessage(text))
+            thread = threading.Thread(target=handle_message, args=(bot, update, None))
+            thread.start()
+            threads.append(thread)
+            time.sleep(0.05)
+        for thread in threads:
+            thread.join()
+    
+    assert len(provider.calls) == 1
+    prompt, system_prompt = provider.calls[0]
+    history = system_prompt.split('Aktuelle User-Nachricht:')[0]
+    print(f"\n📝 Prompt: {prompt!r}\n{history[-300:]}")
+    
+    assert prompt == "Er möchte einen Termin\nnächste Woche Mittwoch"
+    assert "Kunde Max hat angerufen" in history
+    assert "Er möchte einen Termin" not in history
+    assert "nächste Woche Mittwoch" not in history
+
+
+def main():
+    """Führt alle Tests aus"""
+    print("\n🚀 AdonisAI Supersession Tests")
+    print("=" * 60)
+    
+    test_cancel_token()
+    test_newer_message_cancels_pending_call()
+    test_quiet_window_debounces()
+    test_committed_request_not_superseded()
+    test_bot_merged_messages_not_repeated_in_history()
+    
+    print("\n" + "=" * 60)
+    print("✅ Supersession Tests abgeschlossen")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+Test für Usage-Accounting (Token, Latenz, Kosten pro AI-Aufruf) - Funktioniert OHNE Internet!
+"""
+
+import os
+import sys
+import asyncio
+import tempfile
+
+# Path setup
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.ai.fake_server import FakeLLMServer, FaultInjector, LatencyDistribution
+from src.ai.hf_provider import HuggingFaceProvider
+from src.ai.http_transport import AsyncHTTPTransport
+from src.ai.openrouter_provider import OpenRouterProvider
+from src.ai.rate_limiter import current_user
+from src.ai.retry import RetryPolicy
+from src.ai.usage import UsageStats, collect_calls, current_calls
+from src.storage.interaction_logger import InteractionLogger
+
+
+def test_provider_calls_recorded():
+    """Test: usage, Dauer, TTFB und Kosten von OpenRouter (JSON + Stream) und HF"""
+    print("=" * 60)
+    print("🧪 Test: Aufrufe der Provider erfassen")
+    print("=" * 60)
+    
+    server = FakeLLMServer(latency=LatencyDistribution('fixed', 0.05),
+                           token_latency=LatencyDistribution('fixed', 0.02))
+    stats = UsageStats()
+    
+    async def run():
+        await server.start()
+        transport = AsyncHTTPTransport()
+        openrouter = OpenRouterProvider(api_key='fake', transport=transport, base_url=server.openrouter_base_url)
+        hf = HuggingFaceProvider(api_token='fake', transport=transport, base_url=server.hf_base_url)
+        hf.batcher = None
+        openrouter.usage = hf.usage = stats
+        current_user.set(42)
+        calls = collect_calls()
+        try:
+            await openrouter.generate_response("Hallo Welt, wie geht es dir heute?")
+            [chunk async for chunk in openrouter.stream_response("Erzähl mir etwas")]
+            await hf.generate_response("Frage")
+            
+            server.faults = FaultInjector(rate_503=1.0)
+            openrouter.retry = RetryPolicy(max_attempts=1)
+            await openrouter.generate_response("Hallo")
+            return calls
+        finally:
+            current_calls.set(None)
+            current_user.set(None)
+            await transport.close()
+            await server.stop()
+    
+    calls = asyncio.run(run())
+    for call in calls:
+        print(f"\n🧾 {call['model']}: {call['prompt_tokens']}+{call['completion_tokens']} "
+              f"{call['seconds']:.3f}s ttfb={call['ttfb']} stream={call['streamed']} error={call['error']}")
+    
+    plain, streamed, hf_call, failed = calls
+    assert plain['user_id'] == 42 and plain['provider'] == 'OpenRouterProvider'
+    assert plain['prompt_tokens'] > 0 and plain['completion_tokens'] > 0 and not plain['estimated']
+    assert 0.05 <= plain['ttfb'] <= plain['seconds']
+    assert plain['cost'] > 0
+    assert streamed['streamed'] and not streamed['estimated']
+    assert 0.05 <= streamed['ttfb'] < streamed['seconds'] - 0.02
+    assert hf_call['estimated'] and hf_call['completion_tokens'] > 0 and hf_call['ttfb'] is not None
+    assert failed['error'] and failed['prompt_tokens'] == 0
+    
+    latency = stats.get_model_latency()
+    assert latency['openai/gpt-3.5-turbo']['calls'] == 3
+    assert latency['openai/gpt-3.5-turbo']['errors'] == 1
+    assert latency['openai/gpt-3.5-turbo']['p95'] >= latency['openai/gpt-3.5-turbo']['p50'] > 0
+    daily = stats.get_daily_tokens(user_id=42)
+    assert len(daily) == 1 and daily[0]['calls'] == 4
+
+
+def test_calls_stored_with_interaction():
+    """Test: Aufrufe landen neben der Interaktion, Aggregate pro Modell und Tag"""
+    print("\n" + "=" * 60)
+    print("🧪 Test: Speicherung und Aggregate")
+    print("=" * 60)
+    
+    stats = UsageStats()
+    with tempfile.TemporaryDirectory() as tmp:
+        logger = InteractionLogger(db_path=os.path.join(tmp, 'interactions.db'))
+        
+        for i in range(20):
+            current_user.set(7 if i % 2 else 8)
+            calls = collect_calls()
+            stats.record('OpenRouterProvider', 'fast-model', 0.1 + i * 0.01,
+                         usage={'prompt_tokens': 100, 'completion_tokens': 20}, ttfb=0.05)
+            if i % 5 == 0:
+                stats.record('HuggingFaceProvider', 'slow-model', 2.0 + i * 0.1,
+                             prompt="Frage", completion="Antwort")
+            logger.log_interaction(user_id=current_user.get(), user_input=f"Nachricht {i}",
+                                   bot_output="ok", ai_calls=calls)
+        current_user.set(None)
+        current_calls.set(None)
+        
+        latency = logger.get_model_latency()
+        daily = logger.get_daily_token_usage()
+        only_seven = logger.get_daily_token_usage(user_id=7)
+    
+    print(f"\n📊 {latency}")
+    print(f"📅 {daily}")
+    
+    assert latency['fast-model']['calls'] == 20
+    assert abs(latency['fast-model']['p50'] - 0.19) < 1e-9
+    assert abs(latency['fast-model']['p95'] - 0.28) < 1e-9
+    assert latency['slow-model']['calls'] == 4 and latency['slow-model']['ttfb_p50'] is None
+    assert {row['user_id'] for row in daily} == {7, 8}
+    assert only_seven[0]['calls'] == 12 and only_seven[0]['prompt_tokens'] == 1000 + 2 * 2
+    assert sum(row['calls'] for row in daily) == stats.get_statistics()['calls'] == 24
+
+
+def main():
+    """Führt alle Tests aus"""
+    print("\n🚀 AdonisAI Usage Tests")
+    print("=" * 60)
+    
+    test_provider_calls_recorded()
+    test_calls_stored_with_interaction()
+    
+    print("\n" + "=" * 60)
+    print("✅ Usage Tests abgeschlossen")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()